@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)
 class UserSettings:
     symbol: str = "BTCUSDT"
     timeframe: str = "1H"
@@ -1,6 +1,8 @@
 import threading
 import time
+from api.retry_policy import cancel_scope
 from utils.logging_setup import setup_logger
+from utils.metrics_exporter import MetricSample, global_metrics_registry
 
 logger = setup_logger()
 
@@ -9,9 +11,25 @@ class TradingSession:
         self._trading_service = trading_service
         self._interval = interval_sec
         self._on_signal = on_signal
+        # Сигналы усреднения по тикам приходят вне торгового цикла
+        if hasattr(trading_service, "on_signal"):
+            trading_service.on_signal = on_signal
 
         self._running = False
         self._thread = None
+        # Прерывает паузу между итерациями и повторы запросов при остановке
+        self._stop_event = threading.Event()
+
+        # Длительность итераций торгового цикла
+        self.stats = {
+            "iterations": 0,
+            "errors": 0,
+            "total_loop_seconds": 0.0,
+            "last_loop_seconds": 0.0,
+            "max_loop_seconds": 0.0,
+        }
+
+        global_metrics_registry.register(self)
 
     @property
     def is_running(self) -> bool:
@@ -19,12 +37,15 @@ class TradingSession:
 
     def set_signal_handler(self, on_signal):
         self._on_signal = on_signal
+        if hasattr(self._trading_service, "on_signal"):
+            self._trading_service.on_signal = on_signal
 
     def start(self) -> None:
         if self._running:
             raise RuntimeError("Trading session already running")
 
         self._running = True
+        self._stop_event.clear()
         self._thread = threading.Thread(
             target=self._run_loop,
             daemon=True
@@ -35,14 +56,58 @@ class TradingSession:
 
     def stop(self) -> None:
         self._running = False
+        self._stop_event.set()
 
         if self._thread:
             self._thread.join(timeout=2)
 
+        stop_service = getattr(self._trading_service, "stop", None)
+        if callable(stop_service):
+            stop_service()
+
         logger.info("Trading session stopped")
 
+    def collect_metrics(self):
+        labels = {"symbol": getattr(self._trading_service, "symbol", "")}
+        return [
+            MetricSample(
+                "bot_session_loop_duration_seconds", "summary",
+                "Trading session loop iteration duration",
+                self.stats["total_loop_seconds"], labels, "_sum"
+            ),
+            MetricSample(
+                "bot_session_loop_duration_seconds", "summary",
+                "Trading session loop iteration duration",
+                self.stats["iterations"], labels, "_count"
+            ),
+            MetricSample(
+                "bot_session_loop_last_duration_seconds", "gauge",
+                "Duration of the last trading loop iteration",
+                self.stats["last_loop_seconds"], labels
+            ),
+            MetricSample(
+                "bot_session_loop_max_duration_seconds", "gauge",
+                "Longest trading loop iteration",
+                self.stats["max_loop_seconds"], labels
+            ),
+            MetricSample(
+                "bot_session_loop_errors", "counter",
+                "Trading loop iterations that raised",
+                self.stats["errors"], labels, "_total"
+            ),
+            MetricSample(
+                "bot_session_running", "gauge",
+                "Trading session state", int(self._running), labels
+            ),
+        ]
+
     def _run_loop(self):
+        with cancel_scope(self._stop_event):
+            self._loop()
+
+    def _loop(self):
         while self._running:
+            loop_started = time.monotonic()
             try:
                 signal = self._trading_service.process_signal()
 
@@ -51,12 +116,19 @@ class TradingSession:
                         self._on_signal(signal)
 
             except Exception as e:
+                self.stats["errors"] += 1
                 logger.exception("Trading loop error")
                 # Don't let exceptions crash the thread
                 # Continue with the next iteration
                 pass
 
+            loop_seconds = time.monotonic() - loop_started
+            self.stats["iterations"] += 1
+            self.stats["total_loop_seconds"] += loop_seconds
+            self.stats["last_loop_seconds"] = loop_seconds
+            self.stats["max_loop_seconds"] = max(self.stats["max_loop_seconds"], loop_seconds)
+
             # Only sleep if still running
             if self._running:
-                time.sleep(self._interval)
+                self._stop_event.wait(self._interval)
 
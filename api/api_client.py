@@ -1,7 +1,9 @@
-import json
 import time
 import requests
 from abc import ABC, abstractmethod
+from api.retry_policy import RetryPolicy, get_retry_policy, is_retry_safe, request_deadline
+from utils.exceptions import RequestDeadlineExceeded
+from utils import json_codec
 from utils.logging_setup import setup_logger
 
 
@@ -17,6 +19,14 @@ class APIClient(ABC):
         self.secret_key: str = secret_key
         self.passphrase = passphrase
         self.logger = setup_logger()
+        # Часы сервера биржи (ServerClock); без них используется локальное время
+        self.clock = None
+
+    def _timestamp(self):
+        """Timestamp для подписи запроса с поправкой на время сервера."""
+        if self.clock is not None:
+            return self.clock.timestamp()
+        return _get_timestamp()
 
     @abstractmethod
     def _sign(self, message):
@@ -28,7 +38,7 @@ class APIClient(ABC):
         """Сформировать заголовки (зависит от биржи)."""
         pass
 
-    def _make_request(self, method, endpoint, params=None, body=None, max_retries=3, retry_delay=2):
+    def _make_request(self, method, endpoint, params=None, body=None, policy: RetryPolicy = None):
         """
         Выполняет API запрос с обработкой сетевых ошибок и повторными попытками
         
@@ -37,90 +47,102 @@ class APIClient(ABC):
             endpoint: API endpoint
             params: URL параметры
             body: Тело запроса
-            max_retries: Максимальное количество попыток (по умолчанию 3)
-            retry_delay: Задержка между попытками в секундах (по умолчанию 2)
+            policy: Политика повторов (по умолчанию - для класса операций по умолчанию)
             
         Returns:
             requests.Response: Объект ответа
             
         Raises:
-            Exception: После исчерпания всех попыток
+            RequestDeadlineExceeded: Попытки исчерпаны, истёк дедлайн или запрос отменён
         """
-        # Таймауты: (connect_timeout, read_timeout)
-        timeout = (5, 30)
+        policy = policy or get_retry_policy()
+        # Повторяем только запросы, которые не исполнятся дважды
+        max_attempts = policy.max_attempts if is_retry_safe(method, body) else 1
         
-        timestamp = _get_timestamp()
         request_path = endpoint
 
         sorted_params = sorted(params.items()) if params else []
         query_string = "&".join(f"{k}={v}" for k, v in sorted_params)
         request_path_with_query = f"{request_path}?{query_string}" if sorted_params else request_path
 
-        body_str = json.dumps(body) if body else ""
-
-        pre_hash_message = self._pre_hash(
-            timestamp=timestamp,
-            method=method,
-            endpoint=request_path,  
-            query_string=query_string, 
-            body=body_str
-        )
-
-        signature = self._sign(pre_hash_message)
-        headers = self._get_headers(timestamp, signature, method, body_str)
+        body_str = json_codec.dumps(body) if body else ""
         url = self.base_url + request_path_with_query
 
         last_error = None
-        
-        for attempt in range(max_retries):
-            try:
-                # Выполнение запроса с таймаутом
-                if method == "GET":
-                    response = requests.get(url, headers=headers, timeout=timeout)
-                elif method == "POST":
-                    response = requests.post(url, headers=headers, data=body_str, timeout=timeout)
-                else:
-                    raise ValueError(f"Unsupported HTTP method: {method}")
-
-                return response
-                
-            except requests.exceptions.Timeout as e:
-                last_error = e
-                error_type = "Timeout"
-                self.logger.error(
-                    f"Timeout при запросе к {endpoint} (попытка {attempt + 1}/{max_retries}): {e}"
-                )
-                
-            except requests.exceptions.ConnectionError as e:
-                last_error = e
-                error_type = "ConnectionError"
-                self.logger.error(
-                    f"Ошибка соединения с {endpoint} (попытка {attempt + 1}/{max_retries}): {e}"
-                )
-                
-            except requests.exceptions.RequestException as e:
-                last_error = e
-                error_type = "RequestException"
-                self.logger.error(
-                    f"Ошибка запроса к {endpoint} (попытка {attempt + 1}/{max_retries}): {e}"
-                )
-            
-            # Если это не последняя попытка - ждем перед повтором
-            if attempt < max_retries - 1:
-                wait_time = retry_delay * (attempt + 1)  # Увеличиваем задержку с каждой попыткой
-                self.logger.warning(
-                    f"⏳ Повторная попытка через {wait_time} секунд..."
+        attempt = 0
+
+        with request_deadline(policy.deadline_seconds) as deadline:
+            while attempt < max_attempts and not deadline.cancelled():
+                # Бюджет мог истечь между проверками: таймаут (0, 0) requests не примет
+                remaining = deadline.remaining()
+                if remaining <= 0:
+                    break
+
+                # Подпись заново на каждой попытке: после паузы старый timestamp может устареть
+                timestamp = self._timestamp()
+                pre_hash_message = self._pre_hash(
+                    timestamp=timestamp,
+                    method=method,
+                    endpoint=request_path,
+                    query_string=query_string,
+                    body=body_str
                 )
-                time.sleep(wait_time)
-            else:
-                # Последняя попытка не удалась
-                self.logger.error(
-                    f"Все {max_retries} попыток исчерпаны для {endpoint}. "
-                    f"Последняя ошибка: {error_type}"
+                signature = self._sign(pre_hash_message)
+                headers = self._get_headers(timestamp, signature, method, body_str)
+
+                # Таймауты: (connect_timeout, read_timeout), не дольше оставшегося бюджета
+                timeout = (
+                    min(policy.connect_timeout, remaining),
+                    min(policy.read_timeout, remaining)
                 )
-        
-        # Если все попытки не удались - пробрасываем исключение
-        raise Exception(f"Network error after {max_retries} attempts: {last_error}")
+                attempt += 1
+
+                try:
+                    # Выполнение запроса с таймаутом
+                    if method == "GET":
+                        response = requests.get(url, headers=headers, timeout=timeout)
+                    elif method == "POST":
+                        response = requests.post(url, headers=headers, data=body_str, timeout=timeout)
+                    else:
+                        raise ValueError(f"Unsupported HTTP method: {method}")
+
+                    return response
+
+                except requests.exceptions.Timeout as e:
+                    last_error = e
+                    self.logger.error(
+                        "Timeout при запросе к %s (попытка %s/%s): %s",
+                        endpoint, attempt, max_attempts, e
+                    )
+
+                except requests.exceptions.ConnectionError as e:
+                    last_error = e
+                    self.logger.error(
+                        "Ошибка соединения с %s (попытка %s/%s): %s",
+                        endpoint, attempt, max_attempts, e
+                    )
+
+                except requests.exceptions.RequestException as e:
+                    last_error = e
+                    self.logger.error(
+                        "Ошибка запроса к %s (попытка %s/%s): %s",
+                        endpoint, attempt, max_attempts, e
+                    )
+
+                if attempt < max_attempts:
+                    wait_time = policy.backoff_delay(attempt - 1)
+                    self.logger.warning(
+                        "⏳ Повторная попытка через %.2f секунд (осталось %.1f с бюджета)...",
+                        wait_time, deadline.remaining()
+                    )
+                    if not deadline.wait(wait_time):
+                        break
+
+        self.logger.error(
+            "Запрос к %s прекращён после %s попыток (политика %s). Последняя ошибка: %s",
+            endpoint, attempt, policy.name, type(last_error).__name__ if last_error else "дедлайн"
+        )
+        raise RequestDeadlineExceeded(endpoint, attempt, last_error)
 
     def _pre_hash(self, timestamp, method, endpoint, query_string, body):
         return f"{timestamp}{method.upper()}{endpoint}?{query_string}{body}"
\ No newline at end of file
@@ -4,11 +4,25 @@ import requests
 import time
 import os
 from api.api_client import APIClient
-from config import ExchangeConfig
+from api.client_oid import ensure_client_oid
+from api.entity.candle_series import CandleSeries
+from api.entity.plan_order import PlanOrderRecord
+from api.entity.position import PositionRecord
+from api.contract_metadata import ContractMetadataService
+from api.order_book import OrderBookStore
+from api.price_snapshot import PriceSnapshotService
+from api.hedging import get_request_hedger
+from api.request_scheduler import SchedulerTimeout, global_request_scheduler, lane_for_operation
+from api.retry_policy import current_deadline, get_retry_policy, request_deadline
+from api.server_clock import get_server_clock
+from config import CircuitBreakerConfig, ExchangeConfig, HedgingConfig
 from utils.logging_setup import setup_logger
 from api.base_exchange_connector import BaseExchangeConnector
+from utils import json_codec
 from utils.exceptions import MissingAPIKeyError, APIKeySecurityError
+from utils.metrics_exporter import MetricSample, global_metrics_registry
 from utils.monitoring import APIMonitor
+from utils.tracing import global_tracer
 from utils.safety_checks import SafetyValidator
 from utils.unified_error_handler import UnifiedErrorHandler, ErrorType
 
@@ -22,6 +36,8 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
         self.api_calls_count = 0
         self.last_log_time = time.time()
         self.rate_limit_sleep_time = 5  # Задержка при превышении лимита
+        self.rate_limit_waits = 0
+        self.rate_limit_wait_seconds = 0.0
         
         self.error_handler = UnifiedErrorHandler("BitgetConnector")
         
@@ -42,8 +58,24 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
         self._validate_keys()
         self._check_env_security()
 
+        # Timestamp подписи по времени сервера биржи
+        self.clock = get_server_clock(self.base_url)
+
         # Инициализация мониторинга API запросов
         self.api_monitor = APIMonitor()
+        self.api_monitor.error_handler = self.error_handler
+
+        # Последние успешные ответы рыночных данных - запасной вариант при открытом breaker
+        self._last_good_responses = {}
+
+        # Параметры контрактов (шаг цены/объёма, минимумы) - загружаются при первом обращении
+        self.contracts = ContractMetadataService(self)
+
+        # Общая таблица цен всех символов (один запрос all-tickers вместо fetch_ticker на символ)
+        self.prices = PriceSnapshotService(self)
+
+        # Локальные стаканы из WebSocket (BitgetWebSocketClient(order_books=...))
+        self.order_books = OrderBookStore()
         
         # Инициализируем SafetyValidator если включены проверки безопасности
         if self.enable_safety_checks:
@@ -51,6 +83,8 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
         else:
             self.safety_validator = None
 
+        global_metrics_registry.register(self)
+
     def _sign(self, message):
         mac = hmac.new(
             bytes(self.secret_key, encoding="utf-8"),
@@ -59,6 +93,16 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
         )
         return base64.b64encode(mac.digest()).decode("utf-8")
 
+    def websocket_login_args(self) -> dict:
+        """Аргументы op=login для приватного WebSocket (timestamp в секундах)"""
+        timestamp = str(int(self._timestamp()) // 1000)
+        return {
+            "apiKey": self.api_key,
+            "passphrase": self.passphrase,
+            "timestamp": timestamp,
+            "sign": self._sign(f"{timestamp}GET/user/verify")
+        }
+
     def _get_headers(self, timestamp, signature, method, body_str):
         headers = {
             "ACCESS-KEY": self.api_key,
@@ -182,17 +226,182 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
             calls_per_minute = self.api_calls_count / elapsed_minutes if elapsed_minutes > 0 else 0
             
             self.logger.info(
-                f"API статистика: {self.api_calls_count} вызовов за {elapsed_minutes:.1f} мин "
-                f"({calls_per_minute:.1f} вызовов/мин)"
+                "API статистика: %s вызовов за %.1f мин (%.1f вызовов/мин)",
+                self.api_calls_count, elapsed_minutes, calls_per_minute
             )
             
             self.api_calls_count = 0
             self.last_log_time = current_time
     
-    def _safe_api_request(self, method: str, endpoint: str, params=None, body=None, operation: str = "") -> dict:
+    def _wait_rate_limit(self):
+        """Пауза после ответа о превышении лимита запросов"""
+        wait_started = time.monotonic()
+        # Остальные потоки тоже притормаживают рыночные данные и историю
+        global_request_scheduler.on_rate_limited(self.rate_limit_sleep_time)
+        deadline = current_deadline()
+        if deadline is not None:
+            # Не ждём дольше бюджета запроса; пауза прерывается отменой
+            deadline.wait(self.rate_limit_sleep_time)
+        else:
+            time.sleep(self.rate_limit_sleep_time)
+        
+        self.rate_limit_waits += 1
+        self.rate_limit_wait_seconds += time.monotonic() - wait_started
+
+    def collect_metrics(self) -> list:
+        """Метрики коннектора для экспорта в OpenMetrics"""
+        labels = {"exchange": "bitget", "demo": str(self.demo_trading).lower()}
+        return [
+            MetricSample(
+                "bot_rate_limit_waits", "counter",
+                "Pauses caused by exchange rate limiting", self.rate_limit_waits, labels, "_total"
+            ),
+            MetricSample(
+                "bot_rate_limit_wait_seconds", "counter",
+                "Time spent waiting on exchange rate limits", self.rate_limit_wait_seconds, labels, "_total"
+            ),
+        ]
+    
+    def _safe_api_request(
+        self, method: str, endpoint: str, params=None, body=None, operation: str = "", allow_stale: bool = False
+    ) -> dict:
         """
         Безопасный API запрос с полной обработкой сетевых и API ошибок
+
+        allow_stale: при открытом circuit breaker допустим последний успешный
+        ответ из кэша (помечен stale) - только для данных, которым не важна свежесть
+        """
+        # Бюджет времени и повторы зависят от класса операции (RetryConfig)
+        policy = get_retry_policy(operation)
+
+        with global_tracer.span(
+            f"api.{operation or endpoint}",
+            method=method,
+            endpoint=endpoint
+        ) as span, request_deadline(policy.deadline_seconds) as deadline:
+            result = self._guarded_request(method, endpoint, params, body, operation, policy, deadline, allow_stale)
+            result["budget_remaining"] = deadline.remaining()
+            if span is not None:
+                span.set_attribute("success", result.get("success", False))
+                if not result.get("success", False):
+                    span.status = "error"
+                    span.error = result.get("error") or result.get("message")
+            return result
+
+    def _guarded_request(
+        self, method: str, endpoint: str, params, body, operation: str, policy, deadline, allow_stale: bool = False
+    ) -> dict:
+        """Запрос через circuit breaker endpoint и очередь приоритетов"""
+        # Слот в полосе приоритета: ордера и защитные действия идут раньше рыночных данных
+        lane = lane_for_operation(operation)
+
+        breaker = self.error_handler.get_circuit_breaker(endpoint, **CircuitBreakerConfig.SETTINGS)
+        # Закрытие позиций не блокируется breaker: попытка лучше быстрого отказа
+        exempt = lane == "emergency" or self._is_closing_order(body)
+        if not exempt and not breaker.allow_request():
+            return self._circuit_open_response(method, endpoint, params, operation, allow_stale)
+
+        try:
+            with global_request_scheduler.slot(lane, timeout=deadline.remaining()):
+                started = time.monotonic()
+                result = self._execute_api_request(method, endpoint, params, body, operation, policy)
+                latency_ms = (time.monotonic() - started) * 1000
+        except SchedulerTimeout as e:
+            if not exempt:
+                breaker.release()
+            result = self.error_handler.handle_error(
+                e,
+                ErrorType.RATE_LIMIT_ERROR,
+                {"operation": operation, "endpoint": endpoint, "lane": lane}
+            )
+            result.update({
+                "error": f"Запрос {operation or endpoint} не дождался очереди ({lane})",
+                "message": str(e),
+                "scheduler_timeout": True
+            })
+            return result
+
+        if result.get("rate_limit"):
+            # Пауза после 429 - уже без слота полосы, чтобы не держать очередь остальных запросов
+            self._wait_rate_limit()
+
+        # Breaker считает только сбои биржи/сети; ошибки валидации (4xx) - не повод его открывать
+        if not exempt:
+            breaker.record(not self._is_ambiguous_failure(result), latency_ms)
+
+        if result.get("success") and method == "GET" and operation in CircuitBreakerConfig.CACHEABLE_OPERATIONS:
+            self._last_good_responses[self._cache_key(endpoint, params)] = (time.monotonic(), result)
+
+        return result
+
+    @staticmethod
+    def _is_closing_order(body) -> bool:
+        """Ордер только на уменьшение/закрытие позиции"""
+        return bool(body) and (body.get("reduceOnly") == "YES" or body.get("tradeSide") == "close")
+
+    @staticmethod
+    def _cache_key(endpoint: str, params) -> tuple:
+        return endpoint, tuple(sorted((params or {}).items()))
+
+    def _circuit_open_response(
+        self, method: str, endpoint: str, params, operation: str, allow_stale: bool = False
+    ) -> dict:
+        """
+        Ответ при открытом breaker: быстрая ошибка или, если вызывающий
+        согласен (allow_stale), последний успешный ответ с пометкой stale
+        """
+        if allow_stale and method == "GET" and operation in CircuitBreakerConfig.CACHEABLE_OPERATIONS:
+            cached = self._last_good_responses.get(self._cache_key(endpoint, params))
+            if cached is not None:
+                age = time.monotonic() - cached[0]
+                if age <= CircuitBreakerConfig.STALE_MAX_AGE_SECONDS:
+                    self.logger.warning(
+                        "Circuit breaker %s открыт: возвращаем данные %s из кэша (возраст %.0f с)",
+                        endpoint, operation, age
+                    )
+                    return {**cached[1], "stale": True, "stale_age_seconds": age, "circuit_open": True}
+
+        error_response = self.error_handler.handle_error(
+            Exception(f"Circuit breaker open for {endpoint}"),
+            ErrorType.API_ERROR,
+            {"operation": operation, "endpoint": endpoint},
+            should_log=False
+        )
+        error_response.update({
+            "error": f"Endpoint {endpoint} временно недоступен (circuit breaker)",
+            "message": "circuit breaker open",
+            "circuit_open": True
+        })
+        return error_response
+
+    def _read_request(self, endpoint: str, params: dict, operation: str, allow_stale: bool = False) -> dict:
         """
+        GET запрос рыночных данных, при HedgingConfig.ENABLED - с запасным
+        запросом, если ответ не пришёл за наблюдаемый p95 endpoint.
+        """
+        def request():
+            return self._safe_api_request(
+                "GET", endpoint, params=params, operation=operation, allow_stale=allow_stale
+            )
+
+        if not HedgingConfig.ENABLED or operation not in HedgingConfig.OPERATIONS:
+            return request()
+
+        p95_ms = self.api_monitor.get_latency_percentile(
+            HedgingConfig.LATENCY_PERCENTILE,
+            endpoint=endpoint,
+            min_samples=HedgingConfig.MIN_SAMPLES
+        )
+        hedge_after = None
+        if p95_ms is not None:
+            hedge_after = min(
+                max(p95_ms, HedgingConfig.MIN_HEDGE_DELAY_MS),
+                HedgingConfig.MAX_HEDGE_DELAY_MS
+            ) / 1000
+
+        return get_request_hedger().execute(request, hedge_after)
+
+    def _execute_api_request(self, method: str, endpoint: str, params, body, operation: str, policy) -> dict:
         # Замеряем время выполнения запроса
         start_time = time.time()
 
@@ -201,7 +410,7 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
         self._log_api_stats()
 
         try:
-            response = self._make_request(method, endpoint, params=params, body=body)
+            response = self._make_request(method, endpoint, params=params, body=body, policy=policy)
 
             result = self._handle_api_error(response, operation)
 
@@ -213,7 +422,8 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
                 success=success,
                 latency_ms=latency_ms,
                 error_type=error_type,
-                endpoint=endpoint
+                endpoint=endpoint,
+                operation=operation
             )
 
             return result
@@ -243,7 +453,8 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
                 success=False,
                 latency_ms=latency_ms,
                 error_type="NetworkError",
-                endpoint=endpoint
+                endpoint=endpoint,
+                operation=operation
             )
 
             return error_response
@@ -264,7 +475,6 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
                         f"Превышен лимит запросов{operation_info}\n"
                         f"   Задержка {self.rate_limit_sleep_time} секунд перед следующим запросом..."
                     )
-                    time.sleep(self.rate_limit_sleep_time)
                     
                     error_response = self.error_handler.handle_api_error(
                         response.status_code,
@@ -280,9 +490,13 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
                     return error_response
                 
                 try:
-                    error_data = response.json()
+                    error_data = json_codec.loads(response.content)
                     api_code = error_data.get("code", "unknown")
                     api_msg = error_data.get("msg", response.text)
+
+                    # 40008 - устаревший ACCESS-TIMESTAMP: пересинхронизируем часы
+                    if str(api_code) == "40008" and self.clock is not None:
+                        self.clock.request_sync()
                     
                     self.logger.error(
                         f"{error_msg}:\n"
@@ -297,6 +511,8 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
                     )
                     
                     error_response.update({
+                        "code": str(api_code),
+                        "message": api_msg,
                         "http_status": response.status_code
                     })
                     
@@ -327,7 +543,7 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
                     return error_response
             
             try:
-                json_data = response.json()
+                json_data = json_codec.loads(response.content)
             except ValueError as e:
                 error_msg = f"Ошибка парсинга JSON{operation_info}"
                 self.logger.error(f"{error_msg}: {e}")
@@ -361,7 +577,6 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
                         f"   Сообщение: {api_msg}\n"
                         f"   Задержка {self.rate_limit_sleep_time} секунд..."
                     )
-                    time.sleep(self.rate_limit_sleep_time)
                     
                     # Use unified error handler for rate limit
                     error_response = self.error_handler.handle_api_error(
@@ -397,7 +612,7 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
                 
                 return error_response
             
-            self.logger.debug(f"API запрос успешен{operation_info}")
+            self.logger.debug("API запрос успешен%s", operation_info)
             
             return {
                 "success": True,
@@ -468,8 +683,9 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
         symbol: str,
         market_type: str = "spot",
         product_type: str = "",
+        allow_stale: bool = False,
     ):
-        self.logger.info(f"Fetching {market_type} ticker for {symbol}")
+        self.logger.info("Fetching %s ticker for %s", market_type, symbol)
 
         if market_type == "spot":
             endpoint = "/api/v2/spot/market/tickers"
@@ -486,13 +702,26 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
             raise ValueError("Неподдерживаемый тип рынка")
 
         
-        result = self._safe_api_request("GET", endpoint, params=params, operation="fetch_ticker")
+        result = self._read_request(endpoint, params, "fetch_ticker", allow_stale)
         
         if result["success"]:
             return result["raw_response"]
         else:
             raise Exception(f"Failed to fetch ticker: {result.get('error')}")
+
+    def fetch_tickers(self, product_type: str = "USDT-FUTURES", allow_stale: bool = False) -> list:
+        """ Тикеры всех символов типа продукта одним запросом. """
+        endpoint = "/api/v2/mix/market/tickers"
+        params = {"productType": product_type}
+
+        result = self._read_request(endpoint, params, "fetch_tickers", allow_stale)
+
+        if result["success"]:
+            return result.get("data") or []
+        else:
+            raise Exception(f"Failed to fetch tickers: {result.get('error')}")
     
+    @global_tracer.traced("connector.get_available_balance")
     def get_available_balance(
         self,
         symbol: str,
@@ -527,6 +756,7 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
                 return currency
         raise ValueError(f"Неподдерживаемый символ: {symbol}")
     
+    @global_tracer.traced("connector.calculate_quantity")
     def calculate_quantity(
         self,
         required_amount: float,
@@ -556,7 +786,27 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
         commission = effective_amount * commission_rate
 
         quantity = (effective_amount - commission) / current_price
-        return round(quantity, ExchangeConfig.QUANTITY_PRECISION) 
+
+        if order_type == "market":
+            # Есть свежий стакан - считаем по средней цене исполнения, а не по lastPr
+            book = self.order_books.get(symbol)
+            if book is not None:
+                avg_price, filled = book.vwap(side, quantity)
+                if avg_price and filled >= quantity:
+                    current_price = avg_price
+                    quantity = (effective_amount - commission) / current_price
+
+        if market_type == "futures":
+            quantity = self.contracts.round_size(symbol, quantity, product_type or "USDT-FUTURES")
+            size_error = self.contracts.validate_order_size(
+                symbol, quantity, current_price, product_type or "USDT-FUTURES"
+            )
+            if size_error:
+                self.logger.warning("Ордер не будет размещён: %s", size_error)
+                return 0.0
+            return quantity
+
+        return round(quantity, ExchangeConfig.QUANTITY_PRECISION)
     
     def get_commission_rate(self, market_type: str, order_type: str = "market") -> float:
         """
@@ -592,7 +842,132 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
             "margin_coin": "USDT",
         }
     
+    @staticmethod
+    def _is_ambiguous_failure(result: dict) -> bool:
+        """Ошибка, после которой неизвестно, принят ли ордер биржей (сеть, таймаут, 5xx)"""
+        return bool(result.get("network_error")) or result.get("http_status", 0) >= 500
+
+    @staticmethod
+    def _is_duplicate_client_oid(result: dict) -> bool:
+        """Биржа отклонила ордер как дубликат clientOid - значит, он уже принят"""
+        if str(result.get("code", "")) in ExchangeConfig.DUPLICATE_CLIENT_OID_CODES:
+            return True
+        message = str(result.get("message", "")).lower()
+        return "clientoid" in message and ("duplicate" in message or "exist" in message)
+
+    def _submit_order(self, endpoint: str, body: dict, operation: str, lookup) -> dict:
+        """
+        Разместить ордер с clientOid и безопасным повтором.
+
+        После неоднозначной ошибки ордер ищется по clientOid: если биржа его
+        приняла, возвращается найденный ордер, иначе запрос повторяется
+        с тем же clientOid. Отказ "дубликат clientOid" на любой попытке
+        (в том числе на внутреннем сетевом повторе _make_request) означает,
+        что ордер уже на бирже, и он тоже восстанавливается поиском.
+        """
+        client_oid = body["clientOid"]
+        result = self._safe_api_request("POST", endpoint, body=body, operation=operation)
+
+        for attempt in range(2):
+            if result["success"]:
+                return result
+
+            duplicate = self._is_duplicate_client_oid(result)
+            if not duplicate and not self._is_ambiguous_failure(result):
+                return result
+
+            self.logger.warning(
+                "%s %s (clientOid %s): %s. Проверяем ордер на бирже",
+                "Дубликат clientOid при" if duplicate else "Неоднозначный результат",
+                operation, client_oid, result.get("message") or result.get("error_message")
+            )
+
+            recovered = self._recover_order(lookup, client_oid)
+            if recovered is not None:
+                return recovered
+
+            # Дубликат без найденного ордера или повтор уже был - повторять нельзя
+            if duplicate or attempt:
+                return result
+
+            result = self._safe_api_request("POST", endpoint, body=body, operation=operation)
+
+        return result
+
+    def _recover_order(self, lookup, client_oid: str):
+        """Найти ордер по clientOid; вернуть результат в формате _safe_api_request или None"""
+        try:
+            order = lookup()
+        except Exception as e:
+            self.logger.warning("Не удалось проверить ордер %s: %s", client_oid, e)
+            return None
+
+        if not order:
+            return None
+
+        data = {"orderId": order.get("orderId"), "clientOid": order.get("clientOid", client_oid)}
+        self.logger.info("Ордер %s найден на бирже (orderId %s), повтор не нужен", client_oid, data["orderId"])
+
+        return {
+            "success": True,
+            "data": data,
+            "code": "00000",
+            "message": "success",
+            "raw_response": {"code": "00000", "msg": "success", "data": data},
+            "recovered": True
+        }
+
+    def get_order_by_client_oid(
+            self,
+            symbol: str,
+            client_oid: str,
+            market_type: str = "futures",
+            product_type: str = "USDT-FUTURES"
+    ):
+        """ Ищет обычный ордер по clientOid. Возвращает данные ордера или None. """
+        if market_type == "futures":
+            endpoint = "/api/v2/mix/order/detail"
+            params = {"symbol": symbol, "productType": product_type, "clientOid": client_oid}
+        elif market_type == "spot":
+            endpoint = "/api/v2/spot/trade/orderInfo"
+            params = {"clientOid": client_oid}
+        else:
+            raise ValueError("Неподдерживаемый тип рынка")
+
+        result = self._safe_api_request("GET", endpoint, params=params, operation="get_order_detail")
+
+        if not result["success"]:
+            if self._is_ambiguous_failure(result):
+                raise Exception(f"Failed to get order detail: {result.get('error')}")
+            # Биржа ответила, что ордера нет
+            return None
+
+        data = result.get("data")
+        if isinstance(data, list):
+            data = data[0] if data else None
+        return data or None
+
+    def get_plan_order_by_client_oid(
+            self,
+            symbol: str,
+            client_oid: str,
+            product_type: str = "USDT-FUTURES",
+            plan_type: str = "normal_plan"
+    ):
+        """ Ищет активный плановый (или TP/SL) ордер по clientOid. """
+        orders = self.get_active_plan_orders(
+            symbol=symbol,
+            product_type=product_type,
+            plan_type=plan_type,
+            client_oid=client_oid
+        )
+        for order in orders:
+            if order.get("clientOid") == client_oid:
+                return order
+        return None
+
     # @retry_on_failure(max_retries=3)
+    @global_tracer.traced("connector.place_order")
     def place_order(
             self,
             order_params: dict,
@@ -630,7 +1005,18 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
             body["price"] = str(order_params["price"])
             body["force"] = order_params["force"]
 
-        result = self._safe_api_request("POST", endpoint, body=body, operation="place_order")
+        if order_params.get("clientOid"):
+            body["clientOid"] = order_params["clientOid"]
+        ensure_client_oid(body)
+
+        result = self._submit_order(
+            endpoint,
+            body,
+            "place_order",
+            lambda: self.get_order_by_client_oid(
+                body["symbol"], body["clientOid"], market_type, product_type
+            )
+        )
         
         if result["success"]:
             return result["raw_response"]
@@ -638,6 +1024,7 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
             raise Exception(f"Failed to place order: {result.get('error')}")
 
 
+    @global_tracer.traced("connector.place_plan_order")
     def place_plan_order(self, order_params: dict, market_type: str) -> dict:
         if market_type == "spot":
             endpoint = "/api/v2/spot/trade/place-plan-order"
@@ -659,13 +1046,26 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
             if order_params["orderType"] == "limit" and "price" not in order_params:
                 raise ValueError("Для лимитного ордера требуется параметр price")
 
-        result = self._safe_api_request("POST", endpoint, body=order_params, operation="place_plan_order")
+        ensure_client_oid(order_params)
+
+        result = self._submit_order(
+            endpoint,
+            order_params,
+            "place_plan_order",
+            lambda: self.get_plan_order_by_client_oid(
+                order_params["symbol"],
+                order_params["clientOid"],
+                order_params.get("productType", "USDT-FUTURES"),
+                order_params.get("planType") or "normal_plan"
+            ) if market_type == "futures" else None
+        )
         
         if result["success"]:
             return result["raw_response"]
         else:
             raise Exception(f"Failed to place plan order: {result.get('error')}")
 
+    @global_tracer.traced("connector.place_tpsl_order")
     def place_tpsl_order(self, order_params: dict) -> dict:
         """ Размещает стоп-лосс или тейк-профит ордер через специальный API для фьючерсов. """
         endpoint = "/api/v2/mix/order/place-tpsl-order"
@@ -738,12 +1138,7 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
                 size_val = float(order_params["size"])
 
                 symbol = order_params.get("symbol", "")
-                # Извлекаем базовую валюту из символа (например, BTC из BTCUSDT)
-                base_currency = symbol.replace("USDT", "").replace("USD", "")
-                max_decimal_places = ExchangeConfig.QUANTITY_PRECISION_MAP.get(
-                    base_currency.upper(),
-                    ExchangeConfig.DEFAULT_QUANTITY_PRECISION
-                )
+                max_decimal_places = self.contracts.size_precision(symbol, order_params["productType"])
                 
                 # Проверяем количество знаков после запятой
                 size_str = str(size_val)
@@ -766,7 +1161,19 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
 
         self.logger.info(f"Размещение TP/SL ордера: {order_params['planType']} для {order_params['symbol']}")
         
-        result = self._safe_api_request("POST", endpoint, body=order_params, operation="place_tpsl_order")
+        ensure_client_oid(order_params)
+
+        result = self._submit_order(
+            endpoint,
+            order_params,
+            "place_tpsl_order",
+            lambda: self.get_plan_order_by_client_oid(
+                order_params["symbol"],
+                order_params["clientOid"],
+                order_params["productType"],
+                "profit_loss"
+            )
+        )
         
         if result["success"]:
             self.logger.info(f"TP/SL ордер успешно размещен. Order ID: {result.get('data', {}).get('orderId')}")
@@ -783,7 +1190,15 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
         client_oid: str = "",
         limit: int = 100
     ) -> list:
-        """ Получает активные плановые ордера. """
+        """
+        Получает активные плановые ордера.
+        Без order_id / client_oid читает все страницы (idLessThan = endId
+        предыдущей страницы), не более ExchangeConfig.PLAN_ORDERS_MAX_PAGES.
+
+        Raises:
+            Exception: ошибка запроса или список не уместился в предел страниц
+                (неполный список нельзя выдавать за полный)
+        """
         if not plan_type:
             raise ValueError("Параметр plan_type обязателен согласно документации API")
             
@@ -800,13 +1215,62 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
             params["orderId"] = order_id
         if client_oid:
             params["clientOid"] = client_oid
-            
-        result = self._safe_api_request("GET", endpoint, params=params, operation="get_active_plan_orders")
-        
+
+        records = []
+        for _ in range(ExchangeConfig.PLAN_ORDERS_MAX_PAGES):
+            result = self._safe_api_request("GET", endpoint, params=params, operation="get_active_plan_orders")
+
+            if not result["success"]:
+                raise Exception(f"Failed to get active plan orders: {result.get('error')}")
+
+            data = result.get("data") or {}
+            entrusted = data.get("entrustedList") or []
+            records.extend(PlanOrderRecord.from_api(order) for order in entrusted)
+
+            end_id = data.get("endId")
+            if order_id or client_oid or len(entrusted) < limit or not end_id \
+                    or end_id == params.get("idLessThan"):
+                break
+            params["idLessThan"] = end_id
+        else:
+            raise Exception(
+                f"Active plan orders ({plan_type}) exceed {ExchangeConfig.PLAN_ORDERS_MAX_PAGES} pages "
+                f"of {limit}; {len(records)} read"
+            )
+
+        return records
+
+    def get_plan_order_history(
+        self,
+        symbol: str = "",
+        product_type: str = "USDT-FUTURES",
+        plan_type: str = "normal_plan",
+        order_id: str = "",
+        client_oid: str = "",
+        limit: int = 100
+    ) -> list:
+        """ Завершённые плановые ордера (исполненные, отменённые, неудачные). """
+        endpoint = "/api/v2/mix/order/orders-plan-history"
+        params = {
+            "productType": product_type,
+            "planType": plan_type,
+            "limit": str(limit)
+        }
+
+        if symbol:
+            params["symbol"] = symbol
+        if order_id:
+            params["orderId"] = order_id
+        if client_oid:
+            params["clientOid"] = client_oid
+
+        result = self._safe_api_request("GET", endpoint, params=params, operation="get_plan_order_history")
+
         if not result["success"]:
-            raise Exception(f"Failed to get active plan orders: {result.get('error')}")
-        
-        return result.get("data", {}).get("entrustedList", [])
+            raise Exception(f"Failed to get plan order history: {result.get('error')}")
+
+        entrusted = (result.get("data") or {}).get("entrustedList") or []
+        return [PlanOrderRecord.from_api(order) for order in entrusted]
 
     def cancel_trigger_order(
             self, 
@@ -905,12 +1369,9 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
         )
         
         if self.enable_safety_checks and self.safety_validator:
-            try:
-                ticker_data = self.fetch_ticker(symbol, "futures", product_type)
-                current_price = float(ticker_data["data"][0]["lastPr"])
-            except Exception as e:
-                self.logger.warning(f"Не удалось получить текущую цену для валидации: {e}")
-                current_price = None
+            current_price = self.prices.get_price(symbol, product_type)
+            if current_price is None:
+                self.logger.warning("Не удалось получить текущую цену для валидации %s", symbol)
             
             validation_errors = []
             
@@ -1115,9 +1576,13 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
                 size_float = float(size)
                 if size_float <= 0:
                     raise ValueError("size должен быть положительным числом")
-                # Проверяем количество десятичных знаков (максимум 4 для Bitget)
-                if len(str(size_float).split('.')[-1]) > 4:
-                    raise ValueError("size должен иметь максимум 4 десятичных знака")
+                # Проверяем количество десятичных знаков по параметрам контракта
+                max_decimal_places = self.contracts.size_precision(
+                    order_params["symbol"], order_params["productType"]
+                )
+                decimal_part = str(size_float).split('.')[-1].rstrip('0')
+                if len(decimal_part) > max_decimal_places:
+                    raise ValueError(f"size должен иметь максимум {max_decimal_places} десятичных знака")
             except (ValueError, TypeError):
                 if size != "":  # Пустая строка допустима для позиционных ордеров
                     raise ValueError("Неверный формат size")
@@ -1129,12 +1594,9 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
             
             # Получаем текущую рыночную цену для валидации
             if symbol and product_type:
-                try:
-                    ticker_data = self.fetch_ticker(symbol, "futures", product_type)
-                    current_price = float(ticker_data["data"][0]["lastPr"])
-                except Exception as e:
-                    self.logger.warning(f"Не удалось получить текущую цену для валидации: {e}")
-                    current_price = None
+                current_price = self.prices.get_price(symbol, product_type)
+                if current_price is None:
+                    self.logger.warning("Не удалось получить текущую цену для валидации %s", symbol)
                 
                 validation_errors = []
                 
@@ -1176,7 +1638,7 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
         product_type: str = "USDT-FUTURES",
         margin_coin: str = "USDT"
     ) -> list:
-        """ Получает список всех позиций. """
+        """ Получает список открытых позиций (PositionRecord). """
         endpoint = "/api/v2/mix/position/all-position"
         params = {
             "productType": product_type
@@ -1186,14 +1648,14 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
         if margin_coin:
             params["marginCoin"] = margin_coin
             
-        self.logger.debug(f"Получение позиций: {symbol or 'все символы'} ({product_type})")
+        self.logger.debug("Получение позиций: %s (%s)", symbol or "все символы", product_type)
         
-        result = self._safe_api_request("GET", endpoint, params=params, operation="get_positions")
+        result = self._read_request(endpoint, params, "get_positions")
         
         if not result["success"]:
             raise Exception(f"Failed to get positions: {result.get('error')}")
         
-        all_positions = result.get("data", [])
+        all_positions = result.get("data") or []
 
         if symbol:
             filtered_positions = [
@@ -1202,16 +1664,33 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
             ]
         else:
             filtered_positions = all_positions
-            
-        open_positions = [
-            pos for pos in filtered_positions 
-            if float(pos.get('total', 0)) != 0
-        ]
+
+        open_positions = []
+        for raw in filtered_positions:
+            pos = PositionRecord.from_api(raw)
+            if pos.total != 0:
+                open_positions.append(pos)
         
-        self.logger.info(f"Получено позиций: {len(all_positions)} всего, {len(filtered_positions)} отфильтровано по символу, {len(open_positions)} открытых")
+        self.logger.info(
+            "Получено позиций: %s всего, %s отфильтровано по символу, %s открытых",
+            len(all_positions), len(filtered_positions), len(open_positions)
+        )
         
         return open_positions    
 
+    def get_contracts(self, product_type: str = "USDT-FUTURES") -> list:
+        """ Получает параметры всех контрактов типа продукта одним запросом. """
+        endpoint = "/api/v2/mix/market/contracts"
+        params = {"productType": product_type}
+
+        # Параметры контрактов меняются редко - при недоступности биржи подойдёт кэш
+        result = self._safe_api_request("GET", endpoint, params=params, operation="get_contracts", allow_stale=True)
+
+        if not result["success"]:
+            raise Exception(f"Failed to get contracts: {result.get('error')}")
+
+        return result.get("data", [])
+
     def get_candles(
             self,
             symbol: str,
@@ -1219,7 +1698,18 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
             limit: int = 200,
             product_type: str = "USDT-FUTURES"
     ) -> list:
-        self.logger.info(f"Получение свечей для {symbol} ({timeframe}), лимит: {limit}")
+        """ Свечи в виде списка словарей (см. get_candle_series для колоночного формата). """
+        return self.get_candle_series(symbol, timeframe, limit, product_type).to_dicts()
+
+    def get_candle_series(
+            self,
+            symbol: str,
+            timeframe: str = "1H",
+            limit: int = 200,
+            product_type: str = "USDT-FUTURES"
+    ) -> CandleSeries:
+        """ Свечи, разобранные сразу в массивы timestamps/OHLCV. """
+        self.logger.info("Получение свечей для %s (%s), лимит: %s", symbol, timeframe, limit)
         
         endpoint = "/api/v2/mix/market/candles"
         
@@ -1230,33 +1720,20 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
             "productType": product_type
         }
         
-        result = self._safe_api_request("GET", endpoint, params=params, operation="get_candles")
+        result = self._read_request(endpoint, params, "get_candles")
         
         if result["success"]:
-            raw_data = result.get("data", [])
-            candles = []
-            
-            # Преобразуем сырые данные в стандартный формат
-            for item in raw_data:
-                try:
-                    candle = {
-                        "timestamp": int(item[0]),
-                        "open": float(item[1]),
-                        "high": float(item[2]),
-                        "low": float(item[3]),
-                        "close": float(item[4]),
-                        "volume": float(item[5])
-                    }
-                    candles.append(candle)
-                except (ValueError, IndexError) as e:
-                    self.logger.warning(f"Пропущены некорректные данные свечи: {item} - Ошибка: {e}")
-                    continue
-            
-            self.logger.debug(f"Успешно получено {len(candles)} свечей для {symbol}")
-            return candles
+            series = CandleSeries.from_rows(result.get("data") or [])
+
+            if series.skipped:
+                self.logger.warning("Пропущено %s некорректных свечей для %s", series.skipped, symbol)
+
+            self.logger.debug("Успешно получено %s свечей для %s", len(series), symbol)
+            return series
         else:
             raise Exception(f"Failed to get candles: {result.get('error')}")
     
+    @global_tracer.traced("connector.set_leverage")
     def set_leverage(
         self,
         symbol: str,
@@ -1289,6 +1766,12 @@ class BitgetConnector(APIClient, BaseExchangeConnector):
 
             if not any([leverage, long_leverage, short_leverage]):
                 raise ValueError("Необходимо указать хотя бы один параметр плеча: leverage, long_leverage или short_leverage")
+
+            spec = self.contracts.get(symbol.upper(), product_type)
+            if spec is not None:
+                requested = max(float(value) for value in (leverage, long_leverage, short_leverage) if value)
+                if requested > spec.max_lever:
+                    raise ValueError(f"Плечо {requested}x превышает максимальное {spec.max_lever}x для {symbol}")
             
             self.logger.info(f"Изменение плеча для {symbol}: {params}")
 
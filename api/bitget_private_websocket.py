@@ -0,0 +1,99 @@
+"""
+Приватный WebSocket Bitget: вход по API ключу и поток событий ордеров
+
+Канал orders-algo присылает изменения статуса плановых ордеров (live,
+executing, executed, fail_execute, cancelled) сразу, без опроса REST API.
+"""
+
+import asyncio
+from typing import Callable, Dict
+from api.bitget_websocket import BitgetWebSocketClient
+from utils import json_codec
+from utils.unified_error_handler import ErrorType
+
+
+PRIVATE_WS_URL = "wss://ws.bitget.com/v2/ws/private"
+PRIVATE_WS_DEMO_URL = "wss://wspap.bitget.com/v2/ws/private"
+
+
+class BitgetPrivateWebSocketClient(BitgetWebSocketClient):
+    """ WebSocket клиент приватных каналов Bitget """
+
+    LOGIN_TIMEOUT = 10
+
+    def __init__(self, connector, url: str = ""):
+        super().__init__(url or (PRIVATE_WS_DEMO_URL if connector.demo_trading else PRIVATE_WS_URL))
+        # Коннектор подписывает запрос входа своим секретным ключом
+        self.connector = connector
+        self.is_logged_in = False
+
+    async def login(self) -> bool:
+        """Вход по API ключу; вызывается после connect() и до listen()"""
+        if not self.is_connected:
+            self.logger.error("WebSocket не подключен")
+            return False
+
+        try:
+            await self.websocket.send(json_codec.dumps({
+                "op": "login",
+                "args": [self.connector.websocket_login_args()]
+            }))
+
+            message = await asyncio.wait_for(self._wait_login_response(), self.LOGIN_TIMEOUT)
+            if message.get("event") == "login":
+                self.is_logged_in = True
+                self.logger.info("Вход в приватный WebSocket выполнен")
+                return True
+
+            self.logger.error(
+                f"Ошибка входа в приватный WebSocket: код {message.get('code')} - {message.get('msg')}"
+            )
+            return False
+
+        except Exception as e:
+            self.error_handler.handle_error(
+                e,
+                ErrorType.AUTHENTICATION_ERROR,
+                {
+                    "operation": "websocket_login",
+                    "url": self.url
+                }
+            )
+            self.logger.error(f"Ошибка входа в приватный WebSocket: {e}")
+            return False
+
+    async def _wait_login_response(self) -> Dict:
+        while True:
+            message = json_codec.loads(await self.websocket.recv())
+            if message.get("event") in ("login", "error"):
+                return message
+
+    async def disconnect(self):
+        self.is_logged_in = False
+        await super().disconnect()
+
+    async def subscribe_plan_orders(self, callback: Callable, inst_type: str = "USDT-FUTURES") -> bool:
+        """
+        Подписка на события плановых ордеров (orders-algo).
+        callback получает каждую запись data: {"orderId", "clientOid", "status", ...}
+        """
+        if not self.is_logged_in:
+            self.logger.error("Приватный WebSocket: нужен вход перед подпиской")
+            return False
+
+        async def handle(message: Dict):
+            for order in message.get("data", []):
+                await callback(order)
+
+        try:
+            await self.websocket.send(json_codec.dumps({
+                "op": "subscribe",
+                "args": [{"instType": inst_type, "channel": "orders-algo", "instId": "default"}]
+            }))
+            self.channel_callbacks["orders-algo"] = handle
+            self.logger.info("Подписка на orders-algo")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Ошибка подписки на orders-algo: {e}")
+            return False
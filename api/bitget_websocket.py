@@ -1,23 +1,59 @@
 import asyncio
-import json
 import ssl
 import websockets
 import certifi
-from typing import Dict, Callable
+from typing import Dict, Callable, List, Set
+from api.entity.ticker import TickerRecord
+from api.order_book import OrderBookStore
+from utils import json_codec
 from utils.logging_setup import setup_logger
+from utils.metrics_exporter import MetricSample, global_metrics_registry
 from utils.unified_error_handler import UnifiedErrorHandler, ErrorType
 
 
 class BitgetWebSocketClient:
     """ Упрощенный WebSocket клиент для Bitget ticker канала """
     
-    def __init__(self, url: str = "wss://ws.bitget.com/v2/ws/public"):
+    BOOK_CHANNELS = ("books", "books1", "books5", "books15")
+
+    def __init__(self, url: str = "wss://ws.bitget.com/v2/ws/public", price_snapshot=None, order_books=None):
         self.url = url
+        # PriceSnapshotService: тики подписок обновляют общую таблицу цен
+        self.price_snapshot = price_snapshot
+        # OrderBookStore: локальные стаканы подписанных символов
+        self.order_books = order_books if order_books is not None else OrderBookStore()
+        self.book_subscriptions: Dict[str, str] = {}  # {symbol: channel}
+        # Символы, для которых запрошен новый снимок: изменения до него не применяются
+        self._book_resyncs: Set[str] = set()
+        # Прочие каналы (например, приватные): {channel: callback(message)}
+        self.channel_callbacks: Dict[str, Callable] = {}
         self.logger = setup_logger()
         self.error_handler = UnifiedErrorHandler("BitgetWebSocket")
         self.is_connected = False
+        self.websocket = None
         self.subscriptions = {}
         self.ping_task = None
+
+        # Конфлюэнция тиков: пока обработчик символа занят, хранится только
+        # последний тик, промежуточные отбрасываются
+        self._latest_ticks: Dict[str, TickerRecord] = {}
+        self._dispatch_tasks: Dict[str, asyncio.Task] = {}
+        
+        self.stats = {
+            "connects": 0,
+            "reconnects": 0,
+            "disconnects": 0,
+            "messages_received": 0,
+            "ticker_messages": 0,
+            "ticks_delivered": 0,
+            "ticks_dropped": 0,
+            "book_messages": 0,
+            "book_checksum_failures": 0,
+            "book_resyncs": 0,
+            "decode_errors": 0
+        }
+        
+        global_metrics_registry.register(self)
         
     async def connect(self) -> bool:
         """Подключение к WebSocket"""
@@ -28,6 +64,10 @@ class BitgetWebSocketClient:
             self.websocket = await websockets.connect(self.url, ssl=ssl_context)
             
             self.is_connected = True
+            
+            self.stats["connects"] += 1
+            if self.stats["connects"] > 1:
+                self.stats["reconnects"] += 1
 
             self.ping_task = asyncio.create_task(self._send_ping())
             
@@ -57,11 +97,21 @@ class BitgetWebSocketClient:
                 await self.ping_task
             except asyncio.CancelledError:
                 pass
+
+        for task in list(self._dispatch_tasks.values()):
+            task.cancel()
+        self._dispatch_tasks.clear()
+        self._latest_ticks.clear()
         
         if self.websocket:
             await self.websocket.close()
         
         self.subscriptions.clear()
+        for symbol in self.book_subscriptions:
+            self.order_books.book(symbol).synced = False
+        self.book_subscriptions.clear()
+        self._book_resyncs.clear()
+        self.channel_callbacks.clear()
         self.logger.info("WebSocket отключен")
     
     async def subscribe_ticker(self, symbol: str, callback: Callable) -> bool:
@@ -92,7 +142,7 @@ class BitgetWebSocketClient:
         }
         
         try:
-            await self.websocket.send(json.dumps(subscription_message))
+            await self.websocket.send(json_codec.dumps(subscription_message))
             self.subscriptions[symbol] = callback
             self.logger.info(f"Подписка на ticker {symbol}")
             return True
@@ -126,8 +176,9 @@ class BitgetWebSocketClient:
         }
         
         try:
-            await self.websocket.send(json.dumps(unsubscription_message))
+            await self.websocket.send(json_codec.dumps(unsubscription_message))
             self.subscriptions.pop(symbol, None)
+            self._latest_ticks.pop(symbol, None)
             self.logger.info(f"Отписка от ticker {symbol}")
             return True
             
@@ -135,6 +186,167 @@ class BitgetWebSocketClient:
             self.logger.error(f"Ошибка отписки от {symbol}: {e}")
             return False
     
+    async def subscribe_books(self, symbol: str, channel: str = "books15") -> bool:
+        """
+        Подписка на стакан символа. books - снимок и изменения с контрольной
+        суммой (полная глубина), books1/books5/books15 - снимок N уровней на
+        каждое сообщение.
+        """
+        if channel not in self.BOOK_CHANNELS:
+            raise ValueError(f"Неизвестный канал стакана: {channel}")
+
+        if not self.is_connected:
+            self.logger.error("WebSocket не подключен")
+            return False
+
+        try:
+            await self.websocket.send(json_codec.dumps(self._book_message("subscribe", symbol, channel)))
+            self.book_subscriptions[symbol] = channel
+            self.logger.info(f"Подписка на {channel} {symbol}")
+            return True
+
+        except Exception as e:
+            self.error_handler.handle_error(
+                e,
+                ErrorType.NETWORK_ERROR,
+                {
+                    "operation": "subscribe_books",
+                    "symbol": symbol,
+                    "channel": channel
+                }
+            )
+            self.logger.error(f"Ошибка подписки на стакан {symbol}: {e}")
+            return False
+
+    async def unsubscribe_books(self, symbol: str) -> bool:
+        """ Отписка от стакана символа """
+        channel = self.book_subscriptions.pop(symbol, None)
+        self._book_resyncs.discard(symbol)
+        self.order_books.remove(symbol)
+        if channel is None or not self.is_connected:
+            return False
+
+        try:
+            await self.websocket.send(json_codec.dumps(self._book_message("unsubscribe", symbol, channel)))
+            self.logger.info(f"Отписка от {channel} {symbol}")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Ошибка отписки от стакана {symbol}: {e}")
+            return False
+
+    @staticmethod
+    def _book_message(op: str, symbol: str, channel: str) -> dict:
+        return {
+            "op": op,
+            "args": [
+                {
+                    "instType": "USDT-FUTURES",
+                    "channel": channel,
+                    "instId": symbol.upper()
+                }
+            ]
+        }
+
+    def _handle_books_data(self, message: Dict):
+        """Применение снимка или изменения стакана"""
+        try:
+            inst_id = message.get("arg", {}).get("instId")
+            if not inst_id or inst_id not in self.book_subscriptions:
+                return
+
+            data_list = message.get("data", [])
+            if not data_list:
+                return
+
+            book = self.order_books.book(inst_id, self.book_subscriptions[inst_id])
+            if message.get("action") == "update":
+                # Снимок уже запрошен - изменения до его прихода отбрасываются
+                if inst_id in self._book_resyncs:
+                    return
+                if book.apply_update(data_list[0]):
+                    return
+                self.stats["book_checksum_failures"] += 1
+                self.logger.warning(f"Стакан {inst_id}: контрольная сумма не совпала, запрашиваем снимок")
+                self._book_resyncs.add(inst_id)
+                asyncio.create_task(self._resync_books(inst_id))
+            else:
+                book.apply_snapshot(data_list[0])
+                self._book_resyncs.discard(inst_id)
+
+        except Exception as e:
+            self.logger.error(f"Ошибка обработки стакана: {e}")
+
+    async def _resync_books(self, symbol: str):
+        """Переподписка на канал стакана: биржа пришлёт новый снимок"""
+        channel = self.book_subscriptions.get(symbol)
+        if channel is None or not self.is_connected:
+            self._book_resyncs.discard(symbol)
+            return
+
+        self.stats["book_resyncs"] += 1
+        try:
+            await self.websocket.send(json_codec.dumps(self._book_message("unsubscribe", symbol, channel)))
+            await self.websocket.send(json_codec.dumps(self._book_message("subscribe", symbol, channel)))
+        except Exception as e:
+            # Следующее изменение снова запросит снимок
+            self._book_resyncs.discard(symbol)
+            self.logger.error(f"Ошибка переподписки на стакан {symbol}: {e}")
+
+    def collect_metrics(self) -> List[MetricSample]:
+        """Метрики WebSocket клиента для экспорта в OpenMetrics"""
+        labels = {"url": self.url}
+        return [
+            MetricSample(
+                "bot_ws_messages", "counter",
+                "WebSocket messages received", self.stats["messages_received"], labels, "_total"
+            ),
+            MetricSample(
+                "bot_ws_ticker_messages", "counter",
+                "WebSocket ticker messages received", self.stats["ticker_messages"], labels, "_total"
+            ),
+            MetricSample(
+                "bot_ws_ticks_delivered", "counter",
+                "Ticker updates delivered to subscribers", self.stats["ticks_delivered"], labels, "_total"
+            ),
+            MetricSample(
+                "bot_ws_ticks_dropped", "counter",
+                "Ticker updates replaced by a newer one before delivery", self.stats["ticks_dropped"], labels, "_total"
+            ),
+            MetricSample(
+                "bot_ws_book_checksum_failures", "counter",
+                "Order book updates that failed checksum validation", self.stats["book_checksum_failures"], labels, "_total"
+            ),
+            MetricSample(
+                "bot_ws_book_resyncs", "counter",
+                "Order book resubscriptions for a fresh snapshot", self.stats["book_resyncs"], labels, "_total"
+            ),
+            MetricSample(
+                "bot_ws_decode_errors", "counter",
+                "WebSocket frames that failed to decode", self.stats["decode_errors"], labels, "_total"
+            ),
+            MetricSample(
+                "bot_ws_reconnects", "counter",
+                "WebSocket reconnections", self.stats["reconnects"], labels, "_total"
+            ),
+            MetricSample(
+                "bot_ws_disconnects", "counter",
+                "WebSocket connection losses", self.stats["disconnects"], labels, "_total"
+            ),
+            MetricSample(
+                "bot_ws_connected", "gauge",
+                "WebSocket connection state", int(self.is_connected), labels
+            ),
+            MetricSample(
+                "bot_ws_subscriptions", "gauge",
+                "Active WebSocket subscriptions", len(self.subscriptions), labels
+            ),
+            MetricSample(
+                "bot_ws_book_subscriptions", "gauge",
+                "Active order book subscriptions", len(self.book_subscriptions), labels
+            ),
+        ]
+    
     def get_subscribed_symbols(self) -> list:
         """Возвращает список символов с активными подписками"""
         return list(self.subscriptions.keys())
@@ -144,11 +356,22 @@ class BitgetWebSocketClient:
         while self.is_connected:
             try:
                 message_str = await self.websocket.recv()
-                message = json.loads(message_str)
+                self.stats["messages_received"] += 1
+                message = json_codec.loads(message_str)
 
-                if "data" in message and message.get("arg", {}).get("channel") == "ticker":
+                channel = message.get("arg", {}).get("channel")
+
+                if "data" in message and channel == "ticker":
+                    self.stats["ticker_messages"] += 1
                     await self._handle_ticker_data(message)
 
+                elif "data" in message and channel in self.BOOK_CHANNELS:
+                    self.stats["book_messages"] += 1
+                    self._handle_books_data(message)
+
+                elif "data" in message and channel in self.channel_callbacks:
+                    await self._handle_channel_data(channel, message)
+
                 elif "event" in message and message["event"] == "error":
                     await self._handle_subscription_error(message)
 
@@ -166,9 +389,11 @@ class BitgetWebSocketClient:
                     }
                 )
                 self.is_connected = False
+                self.stats["disconnects"] += 1
                 break
                     
-            except json.JSONDecodeError as e:
+            except json_codec.JSONDecodeError as e:
+                self.stats["decode_errors"] += 1
                 self.logger.error(f"Ошибка парсинга JSON: {e}")
                 self.error_handler.handle_error(
                     e,
@@ -215,20 +440,52 @@ class BitgetWebSocketClient:
             if not data_list:
                 return
 
-            ticker_raw = data_list[0]
+            # Типизированная запись вместо промежуточного словаря
+            ticker_data = TickerRecord.from_ws(data_list[0])
+
+            if self.price_snapshot is not None:
+                self.price_snapshot.update(ticker_data, arg.get("instType", "USDT-FUTURES"))
 
-            ticker_data = {
-                "symbol": ticker_raw.get("instId"),
-                "last_price": float(ticker_raw.get("lastPr", 0)),
-                "mark_price": float(ticker_raw.get("markPrice", 0))
-            }
+            if inst_id in self._latest_ticks:
+                # Предыдущий тик ещё не доставлен - он устарел
+                self.stats["ticks_dropped"] += 1
+            self._latest_ticks[inst_id] = ticker_data
 
-            callback = self.subscriptions[inst_id]
-            await callback(ticker_data)
+            if inst_id not in self._dispatch_tasks:
+                self._dispatch_tasks[inst_id] = asyncio.create_task(self._dispatch_ticks(inst_id))
                 
         except Exception as e:
             self.logger.error(f"Ошибка обработки ticker данных: {e}")
+
+    async def _dispatch_ticks(self, inst_id: str):
+        """
+        Доставка тиков символа подписчику по одному. Чтение сокета не ждёт
+        обработчик; пока он занят, новые тики заменяют друг друга, и следующим
+        всегда доставляется самый свежий.
+        """
+        try:
+            while True:
+                ticker_data = self._latest_ticks.pop(inst_id, None)
+                callback = self.subscriptions.get(inst_id)
+                if ticker_data is None or callback is None:
+                    return
+
+                self.stats["ticks_delivered"] += 1
+                try:
+                    await callback(ticker_data)
+                except Exception as e:
+                    self.logger.error(f"Ошибка обработчика ticker {inst_id}: {e}")
+        finally:
+            if self._dispatch_tasks.get(inst_id) is asyncio.current_task():
+                del self._dispatch_tasks[inst_id]
     
+    async def _handle_channel_data(self, channel: str, message: Dict):
+        """Передача сообщения канала его обработчику"""
+        try:
+            await self.channel_callbacks[channel](message)
+        except Exception as e:
+            self.logger.error(f"Ошибка обработки канала {channel}: {e}")
+
     async def _handle_subscription_error(self, message: Dict):
         """Обработка ошибок подписки"""
         code = message.get("code")
@@ -0,0 +1,43 @@
+"""
+Генерация clientOid для идемпотентного размещения ордеров
+
+clientOid строится из хэша намерения (символ, сторона, объём, тип, цены) и
+correlation id: внутри трассы сигнала это id трассы и текущего спана, вне
+трассы - случайный nonce. Один и тот же вызов размещения (со всеми своими
+повторами) использует один clientOid, поэтому биржа не создаст дубликат,
+а по clientOid можно выяснить судьбу ордера после сетевой ошибки.
+"""
+
+import hashlib
+import json
+import uuid
+from utils.tracing import global_tracer
+
+
+CLIENT_OID_PREFIX = "wx"
+CLIENT_OID_MAX_LENGTH = 50  # лимит Bitget
+
+# Поля тела запроса, определяющие ордер
+INTENT_FIELDS = (
+    "symbol", "productType", "side", "tradeSide", "orderType", "size",
+    "price", "planType", "triggerPrice", "executePrice", "holdSide", "rangeRate",
+)
+
+
+def make_client_oid(body: dict) -> str:
+    """Сформировать clientOid для тела запроса размещения ордера"""
+    correlation = global_tracer.client_oid(prefix="") or uuid.uuid4().hex[:16]
+    intent = {field: str(body[field]) for field in INTENT_FIELDS if body.get(field) not in (None, "")}
+
+    digest = hashlib.sha1(
+        (json.dumps(intent, sort_keys=True) + correlation).encode("utf-8")
+    ).hexdigest()[:12]
+
+    return f"{CLIENT_OID_PREFIX}{correlation}-{digest}"[:CLIENT_OID_MAX_LENGTH]
+
+
+def ensure_client_oid(body: dict) -> str:
+    """Добавить clientOid в тело запроса, если его нет; вернуть итоговый clientOid"""
+    if not body.get("clientOid"):
+        body["clientOid"] = make_client_oid(body)
+    return body["clientOid"]
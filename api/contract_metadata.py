@@ -0,0 +1,218 @@
+"""
+Справочник параметров фьючерсных контрактов Bitget
+
+Загружает /api/v2/mix/market/contracts одним запросом на тип продукта и
+хранит для каждого символа шаг цены, шаг объёма, минимальный объём и
+минимальную сумму ордера, максимальное плечо. Таблица обновляется в фоне
+раз в ExchangeConfig.CONTRACTS_REFRESH_INTERVAL секунд.
+
+Если справочник недоступен (нет сети, неизвестный символ), точность берётся
+из ExchangeConfig.QUANTITY_PRECISION_MAP, как раньше. После неудачной загрузки
+следующая попытка делается не раньше, чем через CONTRACTS_RETRY_DELAY секунд
+(пауза удваивается до CONTRACTS_RETRY_MAX_DELAY), чтобы каждый расчёт объёма
+не ждал недоступную биржу.
+"""
+
+import threading
+import time
+from decimal import Decimal, ROUND_DOWN
+from typing import Dict, NamedTuple, Optional
+from config import ExchangeConfig
+from utils.logging_setup import setup_logger
+
+
+class ContractSpec(NamedTuple):
+    """Параметры одного контракта"""
+    symbol: str
+    price_place: int  # знаков после запятой в цене
+    price_end_step: int  # шаг последней цифры цены (1, 5, ...)
+    volume_place: int  # знаков после запятой в объёме
+    size_multiplier: float  # шаг объёма
+    min_trade_num: float  # минимальный объём в базовой валюте
+    min_trade_usdt: float  # минимальная сумма ордера в USDT
+    max_lever: int
+
+    @property
+    def tick_size(self) -> float:
+        return self.price_end_step / (10 ** self.price_place)
+
+
+def _parse_contract(item: dict) -> ContractSpec:
+    return ContractSpec(
+        symbol=item["symbol"],
+        price_place=int(item.get("pricePlace", 2)),
+        price_end_step=int(item.get("priceEndStep", 1) or 1),
+        volume_place=int(item.get("volumePlace", ExchangeConfig.DEFAULT_QUANTITY_PRECISION)),
+        size_multiplier=float(item.get("sizeMultiplier", 0) or 0),
+        min_trade_num=float(item.get("minTradeNum", 0) or 0),
+        min_trade_usdt=float(item.get("minTradeUSDT", 0) or 0),
+        max_lever=int(float(item.get("maxLever", ExchangeConfig.MAX_LEVERAGE) or ExchangeConfig.MAX_LEVERAGE)),
+    )
+
+
+def _floor_to_step(value: float, step: float) -> float:
+    if step <= 0:
+        return value
+    step_dec = Decimal(str(step))
+    steps = (Decimal(str(value)) / step_dec).to_integral_value(rounding=ROUND_DOWN)
+    return float(steps * step_dec)
+
+
+class ContractMetadataService:
+    """Кэш параметров контрактов с периодическим обновлением"""
+
+    def __init__(self, connector, refresh_interval: int = None):
+        self.connector = connector
+        self.logger = setup_logger()
+        self.refresh_interval = refresh_interval or ExchangeConfig.CONTRACTS_REFRESH_INTERVAL
+
+        # product_type -> {symbol: ContractSpec}
+        self._tables: Dict[str, Dict[str, ContractSpec]] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        # Одна первая загрузка на тип продукта: параллельные вызовы ждут её
+        self._load_locks: Dict[str, threading.Lock] = {}
+        # Неудачные загрузки: product_type -> (число ошибок подряд, время следующей попытки)
+        self._failures: Dict[str, tuple] = {}
+
+    def load(self, product_type: str = "USDT-FUTURES") -> bool:
+        """Загрузить (или перезагрузить) таблицу контрактов"""
+        try:
+            contracts = self.connector.get_contracts(product_type)
+        except Exception as e:
+            self._record_failure(product_type)
+            self.logger.warning("Не удалось загрузить параметры контрактов %s: %s", product_type, e)
+            return False
+
+        table = {}
+        for item in contracts:
+            try:
+                spec = _parse_contract(item)
+            except (KeyError, ValueError, TypeError):
+                continue
+            table[spec.symbol] = spec
+
+        if not table:
+            self._record_failure(product_type)
+            return False
+
+        with self._lock:
+            self._tables[product_type] = table
+            self._loaded_at[product_type] = time.monotonic()
+            self._failures.pop(product_type, None)
+
+        self.logger.info("Загружены параметры %s контрактов %s", len(table), product_type)
+        return True
+
+    def _record_failure(self, product_type: str):
+        with self._lock:
+            failures = self._failures.get(product_type, (0, 0.0))[0] + 1
+            delay = min(
+                ExchangeConfig.CONTRACTS_RETRY_DELAY * 2 ** (failures - 1),
+                ExchangeConfig.CONTRACTS_RETRY_MAX_DELAY
+            )
+            self._failures[product_type] = (failures, time.monotonic() + delay)
+
+    def _retry_blocked(self, product_type: str) -> bool:
+        """Последняя загрузка не удалась, и пауза перед повтором ещё не прошла"""
+        failure = self._failures.get(product_type)
+        return failure is not None and time.monotonic() < failure[1]
+
+    def _load_lock(self, product_type: str) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(product_type, threading.Lock())
+
+    def _refresh_in_background(self, product_type: str):
+        with self._lock:
+            if product_type in self._refreshing:
+                return
+            self._refreshing.add(product_type)
+
+        def refresh():
+            try:
+                self.load(product_type)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(product_type)
+
+        threading.Thread(target=refresh, name="ContractMetadataRefresh", daemon=True).start()
+
+    def get(self, symbol: str, product_type: str = "USDT-FUTURES") -> Optional[ContractSpec]:
+        """
+        Параметры контракта или None.
+
+        Первое обращение загружает таблицу синхронно, устаревшая таблица
+        обновляется в фоне, а до обновления используется старая. После
+        неудачной загрузки до конца паузы сразу возвращается None.
+        """
+        table = self._tables.get(product_type)
+        if table is None:
+            if self._retry_blocked(product_type):
+                return None
+            with self._load_lock(product_type):
+                # Таблицу мог загрузить другой поток, пока мы ждали
+                table = self._tables.get(product_type)
+                if table is None:
+                    if self._retry_blocked(product_type) or not self.load(product_type):
+                        return None
+                    table = self._tables.get(product_type, {})
+        elif time.monotonic() - self._loaded_at.get(product_type, 0) > self.refresh_interval:
+            if not self._retry_blocked(product_type):
+                self._refresh_in_background(product_type)
+
+        return table.get(symbol)
+
+    def size_precision(self, symbol: str, product_type: str = "USDT-FUTURES") -> int:
+        spec = self.get(symbol, product_type)
+        if spec is not None:
+            return spec.volume_place
+
+        base_currency = symbol.replace("USDT", "").replace("USD", "").upper()
+        return ExchangeConfig.QUANTITY_PRECISION_MAP.get(
+            base_currency,
+            ExchangeConfig.DEFAULT_QUANTITY_PRECISION
+        )
+
+    def price_precision(self, symbol: str, product_type: str = "USDT-FUTURES") -> Optional[int]:
+        spec = self.get(symbol, product_type)
+        return spec.price_place if spec is not None else None
+
+    def round_size(self, symbol: str, size: float, product_type: str = "USDT-FUTURES") -> float:
+        """Округлить объём вниз до шага контракта"""
+        spec = self.get(symbol, product_type)
+        if spec is None:
+            return round(size, self.size_precision(symbol, product_type))
+
+        step = spec.size_multiplier or 10 ** -spec.volume_place
+        return round(_floor_to_step(size, step), spec.volume_place)
+
+    def round_price(self, symbol: str, price: float, product_type: str = "USDT-FUTURES") -> Optional[float]:
+        """Округлить цену до шага цены контракта (None - контракт неизвестен)"""
+        spec = self.get(symbol, product_type)
+        if spec is None:
+            return None
+
+        tick = spec.tick_size
+        rounded = round(Decimal(str(price)) / Decimal(str(tick))) * Decimal(str(tick))
+        return round(float(rounded), spec.price_place)
+
+    def validate_order_size(
+        self,
+        symbol: str,
+        size: float,
+        price: float,
+        product_type: str = "USDT-FUTURES"
+    ) -> Optional[str]:
+        """Проверить минимальный объём и сумму ордера. Возвращает текст ошибки или None"""
+        spec = self.get(symbol, product_type)
+        if spec is None:
+            return None
+
+        if spec.min_trade_num and size < spec.min_trade_num:
+            return f"объём {size} меньше минимального {spec.min_trade_num} для {symbol}"
+
+        if spec.min_trade_usdt and price and size * price < spec.min_trade_usdt:
+            return f"сумма ордера {size * price:.2f} USDT меньше минимальной {spec.min_trade_usdt} для {symbol}"
+
+        return None
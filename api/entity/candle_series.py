@@ -0,0 +1,111 @@
+from array import array
+from typing import List, Sequence
+
+from strategies.entity.Candle import Candle
+
+
+class CandleSeries:
+    """
+    Свечи в колоночном виде: timestamps (int64) и OHLCV (float64).
+
+    Строки ответа API разбираются сразу в заранее выделенные массивы, без
+    промежуточных словарей. Объекты Candle создаются только по запросу
+    (series[i], series.candles()) для кода, который работает со списком свечей.
+    """
+
+    __slots__ = ("timestamps", "open", "high", "low", "close", "volume", "skipped", "_candles")
+
+    def __init__(self, timestamps: array, open_: array, high: array, low: array, close: array, volume: array):
+        self.timestamps = timestamps
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.skipped = 0  # строки, которые не удалось разобрать
+        self._candles = None
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence]) -> "CandleSeries":
+        """Разобрать строки Bitget [ts, open, high, low, close, volume, ...]"""
+        size = len(rows)
+        timestamps = array("q", bytes(8 * size))
+        open_ = array("d", bytes(8 * size))
+        high = array("d", bytes(8 * size))
+        low = array("d", bytes(8 * size))
+        close = array("d", bytes(8 * size))
+        volume = array("d", bytes(8 * size))
+
+        count = 0
+        for row in rows:
+            try:
+                timestamps[count] = int(row[0])
+                open_[count] = float(row[1])
+                high[count] = float(row[2])
+                low[count] = float(row[3])
+                close[count] = float(row[4])
+                volume[count] = float(row[5])
+            except (ValueError, IndexError, TypeError):
+                continue
+            count += 1
+
+        series = cls(timestamps, open_, high, low, close, volume)
+        if count < size:
+            series.skipped = size - count
+            for column in (timestamps, open_, high, low, close, volume):
+                del column[count:]
+        return series
+
+    @classmethod
+    def from_candles(cls, candles: Sequence[Candle]) -> "CandleSeries":
+        return cls(
+            array("q", (c.timestamp for c in candles)),
+            array("d", (c.open for c in candles)),
+            array("d", (c.high for c in candles)),
+            array("d", (c.low for c in candles)),
+            array("d", (c.close for c in candles)),
+            array("d", (c.volume for c in candles)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, index: int) -> Candle:
+        if self._candles is not None:
+            return self._candles[index]
+        return Candle(
+            timestamp=self.timestamps[index],
+            open=self.open[index],
+            high=self.high[index],
+            low=self.low[index],
+            close=self.close[index],
+            volume=self.volume[index],
+        )
+
+    @property
+    def closes(self) -> array:
+        return self.close
+
+    @property
+    def last_timestamp(self):
+        return self.timestamps[-1] if self.timestamps else None
+
+    def candles(self) -> List[Candle]:
+        """Список Candle для существующего кода (создаётся один раз)"""
+        if self._candles is None:
+            self._candles = [
+                Candle(timestamp=ts, open=o, high=h, low=l, close=c, volume=v)
+                for ts, o, h, l, c, v in zip(
+                    self.timestamps, self.open, self.high, self.low, self.close, self.volume
+                )
+            ]
+        return self._candles
+
+    def to_dicts(self) -> List[dict]:
+        """Формат BitgetConnector.get_candles"""
+        return [
+            {"timestamp": ts, "open": o, "high": h, "low": l, "close": c, "volume": v}
+            for ts, o, h, l, c, v in zip(
+                self.timestamps, self.open, self.high, self.low, self.close, self.volume
+            )
+        ]
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+
+from api.entity.record import ApiRecord
+
+
+@dataclass(slots=True)
+class PlanOrderRecord(ApiRecord):
+    """
+    Плановый / TP-SL ордер из /api/v2/mix/order/orders-plan-pending
+    (или orders-plan-history).
+
+    Доступ по ключам API (order.get("planType"), order["orderId"]) сохранён
+    для существующего кода.
+    """
+    order_id: str
+    client_oid: str
+    symbol: str
+    plan_type: str
+    side: str = ""
+    trade_side: str = ""
+    pos_side: str = ""
+    size: float = 0.0
+    trigger_price: float = 0.0
+    execute_price: float = 0.0
+    trigger_type: str = ""
+    plan_status: str = ""
+    c_time: int = 0
+
+    API_FIELDS = {
+        "orderId": "order_id",
+        "clientOid": "client_oid",
+        "planType": "plan_type",
+        "tradeSide": "trade_side",
+        "posSide": "pos_side",
+        "triggerPrice": "trigger_price",
+        "executePrice": "execute_price",
+        "triggerType": "trigger_type",
+        "planStatus": "plan_status",
+        "cTime": "c_time",
+    }
+
+    @classmethod
+    def from_api(cls, raw: dict) -> "PlanOrderRecord":
+        return cls(
+            raw.get("orderId") or "",
+            raw.get("clientOid") or "",
+            raw.get("symbol") or "",
+            raw.get("planType") or "",
+            raw.get("side") or "",
+            raw.get("tradeSide") or "",
+            raw.get("posSide") or "",
+            float(raw.get("size") or 0),
+            float(raw.get("triggerPrice") or 0),
+            float(raw.get("executePrice") or 0),
+            raw.get("triggerType") or "",
+            raw.get("planStatus") or "",
+            int(raw.get("cTime") or 0),
+        )
@@ -0,0 +1,59 @@
+from dataclasses import dataclass
+
+from api.entity.record import ApiRecord
+
+
+@dataclass(slots=True)
+class PositionRecord(ApiRecord):
+    """
+    Позиция из /api/v2/mix/position/all-position.
+
+    Числовые поля разбираются один раз при получении ответа; доступ по ключам
+    API (pos.get("total"), pos["holdSide"]) сохранён для существующего кода.
+    """
+    symbol: str
+    hold_side: str
+    total: float
+    available: float = 0.0
+    open_price_avg: float = 0.0
+    mark_price: float = 0.0
+    unrealized_pl: float = 0.0
+    achieved_profits: float = 0.0
+    leverage: int = 1
+    margin_mode: str = "unknown"
+    margin_size: float = 0.0
+    margin_coin: str = ""
+    liquidation_price: float = 0.0
+    c_time: int = 0  # время открытия, мс
+
+    API_FIELDS = {
+        "holdSide": "hold_side",
+        "openPriceAvg": "open_price_avg",
+        "markPrice": "mark_price",
+        "unrealizedPL": "unrealized_pl",
+        "achievedProfits": "achieved_profits",
+        "marginMode": "margin_mode",
+        "marginSize": "margin_size",
+        "marginCoin": "margin_coin",
+        "liquidationPrice": "liquidation_price",
+        "cTime": "c_time",
+    }
+
+    @classmethod
+    def from_api(cls, raw: dict) -> "PositionRecord":
+        return cls(
+            raw.get("symbol", ""),
+            (raw.get("holdSide") or "").lower(),
+            float(raw.get("total") or 0),
+            float(raw.get("available") or 0),
+            float(raw.get("openPriceAvg") or 0),
+            float(raw.get("markPrice") or 0),
+            float(raw.get("unrealizedPL") or 0),
+            float(raw.get("achievedProfits") or 0),
+            int(float(raw.get("leverage") or 1)),
+            raw.get("marginMode") or "unknown",
+            float(raw.get("marginSize") or 0),
+            raw.get("marginCoin") or "",
+            float(raw.get("liquidationPrice") or 0),
+            int(raw.get("cTime") or 0),
+        )
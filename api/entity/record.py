@@ -0,0 +1,30 @@
+class ApiRecord:
+    """
+    Доступ к записи как к словарю ответа API.
+
+    Наследники - dataclass(slots=True); API_FIELDS сопоставляет ключи Bitget
+    (holdSide, openPriceAvg, ...) с полями записи, поэтому код, написанный
+    под словари (pos.get("total", 0), order["orderId"]), работает без изменений.
+    Неизвестный ключ ведёт себя как отсутствующий ключ словаря.
+    """
+
+    __slots__ = ()
+
+    API_FIELDS = {}
+
+    def _field_name(self, key: str):
+        name = self.API_FIELDS.get(key, key)
+        return name if name in self.__slots__ else None
+
+    def __getitem__(self, key: str):
+        name = self._field_name(key)
+        if name is None:
+            raise KeyError(key)
+        return getattr(self, name)
+
+    def __contains__(self, key: str) -> bool:
+        return self._field_name(key) is not None
+
+    def get(self, key: str, default=None):
+        name = self._field_name(key)
+        return default if name is None else getattr(self, name)
@@ -0,0 +1,43 @@
+from dataclasses import dataclass
+
+from api.entity.record import ApiRecord
+
+
+@dataclass(slots=True)
+class TickerRecord(ApiRecord):
+    """
+    Тикер из WebSocket канала ticker.
+
+    Поддерживает доступ как к словарю (record["last_price"], record.get(...)),
+    чтобы существующие обработчики тикеров работали без изменений.
+    """
+    symbol: str
+    last_price: float
+    mark_price: float
+    bid_price: float = 0.0
+    ask_price: float = 0.0
+    ts: int = 0
+
+    @classmethod
+    def from_ws(cls, raw: dict) -> "TickerRecord":
+        """Создать запись из элемента data[] сообщения ticker"""
+        return cls(
+            raw.get("instId"),
+            float(raw.get("lastPr") or 0),
+            float(raw.get("markPrice") or 0),
+            float(raw.get("bidPr") or 0),
+            float(raw.get("askPr") or 0),
+            int(raw.get("ts") or 0),
+        )
+
+    @classmethod
+    def from_rest(cls, raw: dict) -> "TickerRecord":
+        """Создать запись из элемента ответа /api/v2/mix/market/tickers"""
+        return cls(
+            raw.get("symbol"),
+            float(raw.get("lastPr") or 0),
+            float(raw.get("markPrice") or 0),
+            float(raw.get("bidPr") or 0),
+            float(raw.get("askPr") or 0),
+            int(raw.get("ts") or 0),
+        )
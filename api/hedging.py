@@ -0,0 +1,140 @@
+"""
+Хеджированные GET запросы для снижения хвостовой задержки
+
+Если идемпотентный GET не вернулся за наблюдаемый p95 своего endpoint
+(по данным APIMonitor), отправляется второй такой же запрос и берётся
+первый успешный ответ. Число дополнительных запросов ограничено общим
+бюджетом (token bucket), чтобы хеджирование не удвоило нагрузку на API
+при общей деградации биржи.
+
+Включается через HedgingConfig.ENABLED.
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, List, Optional
+from config import HedgingConfig
+from utils.metrics_exporter import MetricSample, global_metrics_registry
+
+
+class HedgeBudget:
+    """Token bucket: не более rate хеджей в секунду с запасом burst"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class RequestHedger:
+    """Выполнение GET запросов с запасным (hedge) запросом после порога задержки"""
+
+    def __init__(self, budget: Optional[HedgeBudget] = None, max_workers: int = None):
+        self.budget = budget or HedgeBudget(HedgingConfig.HEDGES_PER_SECOND, HedgingConfig.HEDGE_BURST)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or HedgingConfig.MAX_WORKERS,
+            thread_name_prefix="HedgedRequest"
+        )
+
+        self.stats = {
+            "requests": 0,
+            "hedges_sent": 0,
+            "hedges_won": 0,
+            "hedges_skipped": 0,
+        }
+        self._stats_lock = threading.Lock()
+
+        global_metrics_registry.register(self)
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _submit(self, request: Callable[[], dict]):
+        # Трасса, дедлайн и приоритет вызывающего потока переносятся в пул
+        context = contextvars.copy_context()
+        return self._executor.submit(context.run, request)
+
+    def execute(self, request: Callable[[], dict], hedge_after_seconds: Optional[float]) -> dict:
+        """
+        Выполнить запрос; если он не завершился за hedge_after_seconds,
+        отправить копию (при наличии бюджета) и вернуть первый успешный ответ.
+        """
+        self._count("requests")
+
+        if hedge_after_seconds is None:
+            return request()
+
+        primary = self._submit(request)
+        done, _ = wait([primary], timeout=hedge_after_seconds)
+        if done:
+            return primary.result()
+
+        if not self.budget.try_acquire():
+            self._count("hedges_skipped")
+            return primary.result()
+
+        self._count("hedges_sent")
+        hedge = self._submit(request)
+        pending = {primary, hedge}
+        first_result = None
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result.get("success"):
+                    if future is hedge:
+                        self._count("hedges_won")
+                    return result
+                if first_result is None:
+                    first_result = result
+
+        return first_result
+
+    def collect_metrics(self) -> List[MetricSample]:
+        return [
+            MetricSample(
+                "bot_hedged_requests", "counter",
+                "GET requests executed through the hedger", self.stats["requests"], {}, "_total"
+            ),
+            MetricSample(
+                "bot_hedges_sent", "counter",
+                "Hedge requests sent after the latency threshold", self.stats["hedges_sent"], {}, "_total"
+            ),
+            MetricSample(
+                "bot_hedges_won", "counter",
+                "Hedge requests that answered before the primary", self.stats["hedges_won"], {}, "_total"
+            ),
+            MetricSample(
+                "bot_hedges_skipped", "counter",
+                "Hedges not sent because the budget was exhausted", self.stats["hedges_skipped"], {}, "_total"
+            ),
+        ]
+
+
+_hedger = None
+_hedger_lock = threading.Lock()
+
+
+def get_request_hedger() -> RequestHedger:
+    """Общий RequestHedger процесса (создаётся при первом использовании)"""
+    global _hedger
+    with _hedger_lock:
+        if _hedger is None:
+            _hedger = RequestHedger()
+        return _hedger
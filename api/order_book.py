@@ -0,0 +1,265 @@
+"""
+Локальные L2 стаканы из WebSocket каналов books / books1 / books5 / books15
+
+Канал books присылает снимок, затем инкрементальные изменения (размер "0" -
+уровень удалён) с контрольной суммой CRC32 первых 25 уровней. При расхождении
+стакан помечается несинхронизированным, и клиент заново подписывается, чтобы
+получить свежий снимок. Каналы books1/5/15 каждый раз присылают полный снимок.
+
+Цены уровней хранятся в отсортированных списках (bisect), размеры - в словаре
+по цене, поэтому лучшая цена, глубина и VWAP на объём считаются без обращения
+к REST API.
+
+Стакан пишется из цикла событий WebSocket, а читается из торговых потоков,
+поэтому изменения и чтения идут под блокировкой стакана.
+"""
+
+import threading
+import time
+import zlib
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Sequence, Tuple
+from config import ExchangeConfig
+
+
+CHECKSUM_LEVELS = 25
+
+
+class OrderBook:
+    """ L2 стакан одного символа """
+
+    __slots__ = (
+        "symbol", "channel", "_bid_keys", "_ask_keys", "_bids", "_asks",
+        "seq", "ts", "updated_at", "synced", "_lock"
+    )
+
+    def __init__(self, symbol: str, channel: str = "books"):
+        self.symbol = symbol
+        # Канал-источник: books - полная глубина, books1/5/15 - только N лучших уровней
+        self.channel = channel
+        # Биды хранятся с отрицательной ценой, чтобы оба списка шли от лучшей цены
+        self._bid_keys: List[float] = []
+        self._ask_keys: List[float] = []
+        # цена -> (строка цены, строка размера, размер)
+        self._bids: Dict[float, Tuple[str, str, float]] = {}
+        self._asks: Dict[float, Tuple[str, str, float]] = {}
+        self.seq = 0
+        self.ts = 0
+        self.updated_at = 0.0
+        self.synced = False
+        self._lock = threading.RLock()
+
+    @property
+    def full_depth(self) -> bool:
+        """Стакан содержит все уровни (канал books), а не только N лучших"""
+        return self.channel == "books"
+
+    def apply_snapshot(self, data: dict) -> None:
+        """Заменить стакан снимком"""
+        with self._lock:
+            self._bid_keys.clear()
+            self._ask_keys.clear()
+            self._bids.clear()
+            self._asks.clear()
+            self._apply_levels(data.get("bids", ()), self._bids, self._bid_keys, -1.0)
+            self._apply_levels(data.get("asks", ()), self._asks, self._ask_keys, 1.0)
+            self._mark_updated(data)
+            self.synced = True
+
+    def apply_update(self, data: dict) -> bool:
+        """
+        Применить инкрементальное изменение; False, если контрольная сумма
+        не совпала и нужен новый снимок
+        """
+        with self._lock:
+            if not self.synced:
+                return False
+
+            self._apply_levels(data.get("bids", ()), self._bids, self._bid_keys, -1.0)
+            self._apply_levels(data.get("asks", ()), self._asks, self._ask_keys, 1.0)
+            self._mark_updated(data)
+
+            checksum = data.get("checksum")
+            if checksum is not None and int(checksum) != self.checksum():
+                self.synced = False
+                return False
+            return True
+
+    @staticmethod
+    def _apply_levels(levels: Sequence, book: dict, keys: List[float], sign: float):
+        for level in levels:
+            price_str, size_str = level[0], level[1]
+            price = float(price_str)
+            size = float(size_str)
+            key = sign * price
+
+            if size == 0:
+                if book.pop(price, None) is not None:
+                    index = bisect_left(keys, key)
+                    if index < len(keys) and keys[index] == key:
+                        del keys[index]
+                continue
+
+            if price not in book:
+                insort(keys, key)
+            book[price] = (price_str, size_str, size)
+
+    def _mark_updated(self, data: dict):
+        self.seq = int(data.get("seq", self.seq) or 0)
+        self.ts = int(data.get("ts", self.ts) or 0)
+        self.updated_at = time.monotonic()
+
+    def checksum(self) -> int:
+        """CRC32 первых 25 уровней в формате Bitget (знаковое 32-битное число)"""
+        parts = []
+        with self._lock:
+            for i in range(CHECKSUM_LEVELS):
+                if i < len(self._bid_keys):
+                    price_str, size_str, _ = self._bids[-self._bid_keys[i]]
+                    parts.append(f"{price_str}:{size_str}")
+                if i < len(self._ask_keys):
+                    price_str, size_str, _ = self._asks[self._ask_keys[i]]
+                    parts.append(f"{price_str}:{size_str}")
+
+        value = zlib.crc32(":".join(parts).encode())
+        return value - (1 << 32) if value >= (1 << 31) else value
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        """(цена, размер) лучшего бида"""
+        with self._lock:
+            if not self._bid_keys:
+                return None
+            price = -self._bid_keys[0]
+            return price, self._bids[price][2]
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        """(цена, размер) лучшего аска"""
+        with self._lock:
+            if not self._ask_keys:
+                return None
+            price = self._ask_keys[0]
+            return price, self._asks[price][2]
+
+    def mid_price(self) -> Optional[float]:
+        with self._lock:
+            bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def spread(self) -> Optional[float]:
+        with self._lock:
+            bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def _levels(self, side: str):
+        """Уровни, которые съедает рыночный ордер side, от лучшей цены (вызывать под self._lock)"""
+        if side == "buy":
+            for key in self._ask_keys:
+                yield key, self._asks[key][2]
+        elif side == "sell":
+            for key in self._bid_keys:
+                yield -key, self._bids[-key][2]
+        else:
+            raise ValueError(f"Неизвестная сторона ордера: {side}")
+
+    def depth_to_price(self, side: str, price_limit: float) -> float:
+        """Объём, доступный ордеру side до цены price_limit включительно"""
+        total = 0.0
+        with self._lock:
+            for price, size in self._levels(side):
+                if (side == "buy" and price > price_limit) or (side == "sell" and price < price_limit):
+                    break
+                total += size
+        return total
+
+    def price_for_size(self, side: str, quantity: float) -> Optional[float]:
+        """Цена последнего уровня, до которого дойдёт ордер на quantity"""
+        remaining = quantity
+        with self._lock:
+            for price, size in self._levels(side):
+                remaining -= size
+                if remaining <= 0:
+                    return price
+        return None
+
+    def vwap(self, side: str, quantity: float) -> Tuple[Optional[float], float]:
+        """
+        Средняя цена исполнения рыночного ордера на quantity
+
+        Returns:
+            (vwap, исполненный объём); объём меньше quantity, если стакана не хватило
+        """
+        remaining = quantity
+        cost = 0.0
+        with self._lock:
+            for price, size in self._levels(side):
+                take = size if size < remaining else remaining
+                cost += take * price
+                remaining -= take
+                if remaining <= 0:
+                    break
+
+        filled = quantity - remaining
+        return (cost / filled if filled > 0 else None), filled
+
+    def slippage(self, side: str, quantity: float) -> Optional[float]:
+        """Проскальзывание VWAP относительно лучшей цены (доля); None, если стакана не хватает"""
+        with self._lock:
+            best = self.best_ask() if side == "buy" else self.best_bid()
+            avg_price, filled = self.vwap(side, quantity)
+        if best is None or avg_price is None or filled < quantity:
+            return None
+        return abs(avg_price - best[0]) / best[0]
+
+    def depth(self, levels: int = 5) -> Dict[str, List[Tuple[float, float]]]:
+        with self._lock:
+            return {
+                "bids": [(-key, self._bids[-key][2]) for key in self._bid_keys[:levels]],
+                "asks": [(key, self._asks[key][2]) for key in self._ask_keys[:levels]],
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._bid_keys) + len(self._ask_keys)
+
+
+class OrderBookStore:
+    """
+    Стаканы по символам. Заполняется WebSocket клиентом
+    (BitgetWebSocketClient(order_books=...)), читается коннектором и проверками
+    безопасности.
+    """
+
+    def __init__(self, max_age: Optional[float] = None):
+        self.max_age = max_age if max_age is not None else ExchangeConfig.ORDER_BOOK_MAX_AGE
+        self._books: Dict[str, OrderBook] = {}
+        self._lock = threading.Lock()
+
+    def book(self, symbol: str, channel: Optional[str] = None) -> OrderBook:
+        """Стакан символа для записи (создаётся при первом обращении)"""
+        with self._lock:
+            book = self._books.get(symbol)
+            if book is None:
+                book = self._books[symbol] = OrderBook(symbol, channel or "books")
+            elif channel is not None:
+                book.channel = channel
+            return book
+
+    def get(self, symbol: str) -> Optional[OrderBook]:
+        """Синхронизированный и свежий стакан символа или None"""
+        book = self._books.get(symbol)
+        if book is None or not book.synced:
+            return None
+        if time.monotonic() - book.updated_at > self.max_age:
+            return None
+        return book
+
+    def remove(self, symbol: str) -> None:
+        with self._lock:
+            self._books.pop(symbol, None)
+
+    def symbols(self) -> List[str]:
+        return list(self._books)
@@ -0,0 +1,143 @@
+"""
+Общая таблица текущих цен по всем символам
+
+Загружает /api/v2/mix/market/tickers одним запросом на тип продукта и хранит
+для каждого символа TickerRecord (last, mark, bid, ask, ts). Все потребители
+(PnL, break-even, проверки безопасности) берут цены отсюда: пока таблица
+свежее max_age, запросов к бирже нет, устаревшая таблица перезагружается
+целиком одним запросом - вместо fetch_ticker на каждую позицию.
+
+Если подключён WebSocket ticker (BitgetWebSocketClient(price_snapshot=...)),
+пришедшие тики обновляют свои символы, и они остаются свежими без REST.
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+from config import ExchangeConfig
+from api.entity.ticker import TickerRecord
+from utils.logging_setup import setup_logger
+
+
+class PriceSnapshotService:
+    """Кэш тикеров всех символов с ограничением свежести"""
+
+    def __init__(self, connector, max_age: float = None):
+        self.connector = connector
+        self.logger = setup_logger()
+        self.max_age = max_age if max_age is not None else ExchangeConfig.PRICE_SNAPSHOT_MAX_AGE
+
+        # product_type -> {symbol: (TickerRecord, время получения по monotonic)}
+        self._tables: Dict[str, Dict[str, Tuple[TickerRecord, float]]] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        # Одна загрузка на тип продукта: параллельные потребители ждут её результат
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+        self.stats = {"refreshes": 0, "hits": 0, "ws_updates": 0}
+
+    def _load_lock(self, product_type: str) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(product_type, threading.Lock())
+
+    def refresh(self, product_type: str = "USDT-FUTURES") -> bool:
+        """Перезагрузить таблицу одним запросом all-tickers"""
+        # Время отправки запроса: цены в ответе не новее него, а тики
+        # WebSocket, пришедшие после, точно свежее ответа
+        now = time.monotonic()
+        try:
+            tickers = self.connector.fetch_tickers(product_type)
+        except Exception as e:
+            self.logger.warning("Не удалось загрузить тикеры %s: %s", product_type, e)
+            return False
+
+        table = {}
+        for item in tickers:
+            try:
+                record = TickerRecord.from_rest(item)
+            except (ValueError, TypeError):
+                continue
+            if record.symbol:
+                table[record.symbol] = (record, now)
+
+        with self._lock:
+            current = self._tables.get(product_type, {})
+            # Тики из WebSocket, пришедшие во время запроса, новее ответа REST
+            for symbol, entry in current.items():
+                if entry[1] > now:
+                    table[symbol] = entry
+            self._tables[product_type] = table
+            self._loaded_at[product_type] = now
+            self.stats["refreshes"] += 1
+
+        self.logger.debug("Загружено %s тикеров %s", len(table), product_type)
+        return True
+
+    def _fresh_entry(self, symbol: str, product_type: str, max_age: float) -> Optional[TickerRecord]:
+        entry = self._tables.get(product_type, {}).get(symbol)
+        if entry is not None and time.monotonic() - entry[1] <= max_age:
+            return entry[0]
+        return None
+
+    def get_many(
+        self,
+        symbols: Iterable[str],
+        product_type: str = "USDT-FUTURES",
+        max_age: float = None
+    ) -> Dict[str, TickerRecord]:
+        """
+        Тикеры для набора символов. Если хотя бы один отсутствует или устарел,
+        таблица перезагружается один раз для всех. Символы, которые и после
+        этого старше max_age (загрузка не удалась), в результат не попадают.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        symbols = list(symbols)
+
+        result = {}
+        missing = []
+        for symbol in symbols:
+            record = self._fresh_entry(symbol, product_type, max_age)
+            if record is None:
+                missing.append(symbol)
+            else:
+                result[symbol] = record
+
+        if missing:
+            with self._load_lock(product_type):
+                # Таблицу мог обновить другой поток, пока мы ждали
+                if time.monotonic() - self._loaded_at.get(product_type, 0) > max_age:
+                    self.refresh(product_type)
+
+            for symbol in missing:
+                record = self._fresh_entry(symbol, product_type, max_age)
+                if record is not None:
+                    result[symbol] = record
+        else:
+            self.stats["hits"] += 1
+
+        return result
+
+    def get(self, symbol: str, product_type: str = "USDT-FUTURES", max_age: float = None) -> Optional[TickerRecord]:
+        return self.get_many((symbol,), product_type, max_age).get(symbol)
+
+    def get_price(
+        self,
+        symbol: str,
+        product_type: str = "USDT-FUTURES",
+        max_age: float = None,
+        field: str = "last_price"
+    ) -> Optional[float]:
+        """Цена символа (last_price, mark_price, bid_price, ask_price) или None"""
+        record = self.get(symbol, product_type, max_age)
+        if record is None:
+            return None
+        price = getattr(record, field)
+        return price or None
+
+    def update(self, record: TickerRecord, product_type: str = "USDT-FUTURES") -> None:
+        """Обновить символ из WebSocket тика"""
+        if not record.symbol:
+            return
+        with self._lock:
+            self._tables.setdefault(product_type, {})[record.symbol] = (record, time.monotonic())
+            self.stats["ws_updates"] += 1
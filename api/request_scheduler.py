@@ -0,0 +1,194 @@
+"""
+Приоритетный планировщик REST запросов
+
+Все запросы коннекторов проходят через общий планировщик с полосами
+(lanes) по важности: emergency > order > account > market_data > history.
+У каждой полосы свой лимит одновременных запросов, кроме того действует
+общий лимит. Свободный слот всегда получает ожидающий запрос с наивысшим
+приоритетом, а аварийные запросы (экстренное закрытие позиций) не
+ограничены общим лимитом - защитные действия не стоят в очереди за
+массовыми get_candles/fetch_ticker.
+
+Полоса определяется классом операции (RetryConfig.OPERATION_CLASSES),
+emergency включается явно через emergency_priority().
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from config import RetryConfig, SchedulerConfig
+from utils.metrics_exporter import MetricSample, global_metrics_registry
+
+
+LANES = ("emergency", "order", "account", "market_data", "history")
+LANE_PRIORITY = {lane: priority for priority, lane in enumerate(LANES)}
+
+_priority_override = contextvars.ContextVar("request_priority_override", default=None)
+
+
+@contextmanager
+def emergency_priority():
+    """Все запросы внутри блока идут по аварийной полосе"""
+    token = _priority_override.set("emergency")
+    try:
+        yield
+    finally:
+        _priority_override.reset(token)
+
+
+def lane_for_operation(operation: str = "") -> str:
+    override = _priority_override.get()
+    if override is not None:
+        return override
+    return RetryConfig.OPERATION_CLASSES.get(operation, RetryConfig.DEFAULT_CLASS)
+
+
+class SchedulerTimeout(Exception):
+    """Слот полосы не освободился до дедлайна запроса"""
+    pass
+
+
+class RequestScheduler:
+    """Полосы с лимитами параллельности и приоритетной выдачей слотов"""
+
+    def __init__(
+        self,
+        lane_limits: Optional[Dict[str, int]] = None,
+        max_concurrent: Optional[int] = None
+    ):
+        self.lane_limits = dict(lane_limits or SchedulerConfig.LANE_CONCURRENCY)
+        self.max_concurrent = max_concurrent or SchedulerConfig.MAX_CONCURRENT_REQUESTS
+
+        self._condition = threading.Condition()
+        self._in_flight = {lane: 0 for lane in LANES}
+        self._waiting = {lane: 0 for lane in LANES}
+        self._paused_until = {lane: 0.0 for lane in LANES}
+
+        self.stats = {
+            lane: {"requests": 0, "wait_seconds": 0.0, "timeouts": 0}
+            for lane in LANES
+        }
+
+        global_metrics_registry.register(self)
+
+    def _total_in_flight(self) -> int:
+        return sum(self._in_flight.values())
+
+    def _lane_ready(self, lane: str, now: float) -> bool:
+        if self._in_flight[lane] >= self.lane_limits.get(lane, 1):
+            return False
+        if now < self._paused_until[lane]:
+            return False
+        # Аварийная полоса не ограничена общим лимитом
+        return lane == "emergency" or self._total_in_flight() < self.max_concurrent
+
+    def _can_start(self, lane: str, now: float) -> bool:
+        if not self._lane_ready(lane, now):
+            return False
+        # Уступаем ожидающим запросам более приоритетных полос, если они могут стартовать
+        for higher in LANES[:LANE_PRIORITY[lane]]:
+            if self._waiting[higher] and self._lane_ready(higher, now):
+                return False
+        return True
+
+    def acquire(self, lane: str, timeout: Optional[float] = None) -> None:
+        started = time.monotonic()
+        deadline = started + timeout if timeout is not None else None
+
+        with self._condition:
+            self._waiting[lane] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self._can_start(lane, now):
+                        break
+
+                    wait_for = None
+                    if deadline is not None:
+                        wait_for = deadline - now
+                        if wait_for <= 0:
+                            self.stats[lane]["timeouts"] += 1
+                            raise SchedulerTimeout(f"Нет свободного слота в полосе {lane}")
+                    if self._paused_until[lane] > now:
+                        pause_left = self._paused_until[lane] - now
+                        wait_for = pause_left if wait_for is None else min(wait_for, pause_left)
+
+                    self._condition.wait(wait_for)
+            finally:
+                self._waiting[lane] -= 1
+
+            self._in_flight[lane] += 1
+            self.stats[lane]["requests"] += 1
+            self.stats[lane]["wait_seconds"] += time.monotonic() - started
+
+    def release(self, lane: str) -> None:
+        with self._condition:
+            self._in_flight[lane] -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, lane: str, timeout: Optional[float] = None):
+        self.acquire(lane, timeout)
+        try:
+            yield
+        finally:
+            self.release(lane)
+
+    def on_rate_limited(self, pause_seconds: Optional[float] = None) -> None:
+        """
+        Биржа ответила 429: притормозить рыночные данные и историю,
+        чтобы оставшийся лимит достался ордерам и защитным действиям.
+        """
+        pause_seconds = pause_seconds or SchedulerConfig.RATE_LIMIT_BACKOFF_SECONDS
+        until = time.monotonic() + pause_seconds
+
+        with self._condition:
+            for lower in LANES[LANE_PRIORITY["account"] + 1:]:
+                self._paused_until[lower] = max(self._paused_until[lower], until)
+            self._condition.notify_all()
+
+    def get_state(self) -> dict:
+        with self._condition:
+            return {
+                lane: {
+                    "in_flight": self._in_flight[lane],
+                    "waiting": self._waiting[lane],
+                    "limit": self.lane_limits.get(lane, 1),
+                    **self.stats[lane]
+                }
+                for lane in LANES
+            }
+
+    def collect_metrics(self) -> List[MetricSample]:
+        samples = []
+        for lane, state in self.get_state().items():
+            labels = {"lane": lane}
+            samples.extend([
+                MetricSample(
+                    "bot_scheduler_in_flight", "gauge",
+                    "Requests currently executing per priority lane", state["in_flight"], labels
+                ),
+                MetricSample(
+                    "bot_scheduler_waiting", "gauge",
+                    "Requests waiting for a slot per priority lane", state["waiting"], labels
+                ),
+                MetricSample(
+                    "bot_scheduler_requests", "counter",
+                    "Requests admitted per priority lane", state["requests"], labels, "_total"
+                ),
+                MetricSample(
+                    "bot_scheduler_wait_seconds", "counter",
+                    "Time spent waiting for a slot per priority lane", state["wait_seconds"], labels, "_total"
+                ),
+                MetricSample(
+                    "bot_scheduler_timeouts", "counter",
+                    "Requests that gave up waiting for a slot", state["timeouts"], labels, "_total"
+                ),
+            ])
+        return samples
+
+
+# Global instance for use across the application
+global_request_scheduler = RequestScheduler()
@@ -0,0 +1,139 @@
+"""
+Политика повторов запросов к бирже с дедлайнами
+
+У каждого класса операций (ордера, рыночные данные, аккаунт, история)
+свой бюджет времени, число попыток и таймауты (RetryConfig в config.py).
+Паузы между попытками - экспоненциальные с full jitter и прерываются
+событием отмены (например, остановкой торговой сессии).
+
+Дедлайн хранится в contextvars: внешний код может ограничить весь свой
+участок (with request_deadline(5): ...), а вложенные запросы не выйдут
+за этот бюджет. Оставшееся время доступно через remaining_budget().
+"""
+
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional
+from config import RetryConfig
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Параметры повторов для класса операций"""
+    name: str
+    max_attempts: int
+    deadline_seconds: float
+    base_delay: float
+    max_delay: float
+    connect_timeout: float
+    read_timeout: float
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Пауза перед повтором номер attempt (с 0): full jitter"""
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, cap)
+
+
+class Deadline:
+    """Момент (time.monotonic), после которого запрос больше не повторяется"""
+
+    __slots__ = ("expires_at", "cancel_event")
+
+    def __init__(self, seconds: float, cancel_event: Optional[threading.Event] = None):
+        self.expires_at = time.monotonic() + seconds
+        self.cancel_event = cancel_event
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def wait(self, delay: float) -> bool:
+        """
+        Подождать перед повтором, не выходя за дедлайн.
+
+        Returns:
+            True, если можно повторять; False - дедлайн истёк или запрос отменён
+        """
+        delay = min(delay, self.remaining())
+        if self.cancel_event is not None:
+            if self.cancel_event.wait(delay):
+                return False
+        elif delay > 0:
+            time.sleep(delay)
+        return not self.expired()
+
+
+_current_deadline = contextvars.ContextVar("request_deadline", default=None)
+_current_cancel_event = contextvars.ContextVar("request_cancel_event", default=None)
+
+
+@contextmanager
+def request_deadline(seconds: float):
+    """
+    Ограничить время выполнения запросов внутри блока.
+
+    Вложенный дедлайн не может быть позже внешнего.
+    """
+    outer = _current_deadline.get()
+    deadline = Deadline(seconds, _current_cancel_event.get())
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline.expires_at = outer.expires_at
+
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+@contextmanager
+def cancel_scope(cancel_event: threading.Event):
+    """Прерывать паузы между повторами при установке cancel_event"""
+    token = _current_cancel_event.set(cancel_event)
+    try:
+        yield
+    finally:
+        _current_cancel_event.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+def remaining_budget() -> Optional[float]:
+    """Оставшееся время текущего дедлайна в секундах (None - дедлайна нет)"""
+    deadline = _current_deadline.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+def get_retry_policy(operation: str = "") -> RetryPolicy:
+    """Политика повторов для операции коннектора (по RetryConfig.OPERATION_CLASSES)"""
+    class_name = RetryConfig.OPERATION_CLASSES.get(operation, RetryConfig.DEFAULT_CLASS)
+    return _POLICIES[class_name]
+
+
+def is_retry_safe(method: str, body: Optional[dict]) -> bool:
+    """
+    Можно ли повторить запрос без риска двойного исполнения.
+
+    GET идемпотентен; POST повторяется только с clientOid - биржа отклонит
+    дубликат вместо повторного размещения ордера.
+    """
+    if method == "GET":
+        return True
+    return bool(body and body.get("clientOid"))
+
+
+_POLICIES = {
+    name: RetryPolicy(name=name, **params)
+    for name, params in RetryConfig.POLICIES.items()
+}
@@ -0,0 +1,161 @@
+"""
+Синхронизация с временем сервера Bitget
+
+ACCESS-TIMESTAMP подписанных запросов должен быть близок к времени биржи.
+ServerClock периодически запрашивает /api/v2/public/time, оценивает
+смещение локальных часов и RTT (берётся замер с минимальным RTT из серии)
+и выдаёт скорректированный timestamp для каждой попытки запроса.
+
+Один экземпляр на base_url используется всеми коннекторами процесса.
+"""
+
+import threading
+import time
+from typing import Dict, List
+import requests
+from config import ExchangeConfig
+from utils.logging_setup import setup_logger
+from utils.metrics_exporter import MetricSample, global_metrics_registry
+
+
+SERVER_TIME_ENDPOINT = "/api/v2/public/time"
+
+
+class ServerClock:
+    """Оценка смещения локальных часов относительно сервера биржи"""
+
+    def __init__(self, base_url: str, sync_interval: int = None, samples: int = 5):
+        self.base_url = base_url
+        self.sync_interval = sync_interval or ExchangeConfig.SERVER_TIME_SYNC_INTERVAL
+        self.samples = samples
+        self.logger = setup_logger()
+
+        self.offset_ms = 0.0  # время сервера - локальное время
+        self.rtt_ms = None
+        self.drift_ms = 0.0  # изменение смещения с прошлой синхронизации
+        self.last_sync = None  # time.monotonic() последней успешной синхронизации
+        self.sync_count = 0
+        self.sync_failures = 0
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        global_metrics_registry.register(self)
+
+    def now_ms(self) -> int:
+        """Текущее время сервера в миллисекундах (оценка)"""
+        return int(time.time() * 1000 + self.offset_ms)
+
+    def timestamp(self) -> str:
+        """Значение для заголовка ACCESS-TIMESTAMP"""
+        return str(self.now_ms())
+
+    def _sample(self):
+        local_send = time.time()
+        response = requests.get(self.base_url + SERVER_TIME_ENDPOINT, timeout=(3, 5))
+        local_receive = time.time()
+
+        response.raise_for_status()
+        server_ms = int(response.json()["data"]["serverTime"])
+
+        rtt_ms = (local_receive - local_send) * 1000
+        # Считаем, что сервер ответил в середине интервала запроса
+        offset_ms = server_ms - (local_send + local_receive) * 500
+        return offset_ms, rtt_ms
+
+    def sync(self) -> bool:
+        """Выполнить серию замеров и обновить смещение по замеру с минимальным RTT"""
+        best = None
+        for _ in range(self.samples):
+            try:
+                sample = self._sample()
+            except Exception as e:
+                self.logger.debug("Ошибка замера времени сервера: %s", e)
+                continue
+            if best is None or sample[1] < best[1]:
+                best = sample
+
+        if best is None:
+            self.sync_failures += 1
+            self.logger.warning("Не удалось синхронизировать время с сервером %s", self.base_url)
+            return False
+
+        offset_ms, rtt_ms = best
+        with self._lock:
+            if self.last_sync is not None:
+                self.drift_ms = offset_ms - self.offset_ms
+            self.offset_ms = offset_ms
+            self.rtt_ms = rtt_ms
+            self.last_sync = time.monotonic()
+            self.sync_count += 1
+
+        self.logger.debug("Время сервера: смещение %.1f мс, RTT %.1f мс", offset_ms, rtt_ms)
+        return True
+
+    def request_sync(self):
+        """Внеочередная синхронизация (например, после ошибки устаревшего timestamp)"""
+        self._wakeup.set()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sync_loop, name="ServerClock", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _sync_loop(self):
+        while not self._stop_event.is_set():
+            self.sync()
+            self._wakeup.wait(self.sync_interval)
+            self._wakeup.clear()
+
+    def collect_metrics(self) -> List[MetricSample]:
+        labels = {"base_url": self.base_url}
+        samples = [
+            MetricSample(
+                "bot_clock_offset_seconds", "gauge",
+                "Estimated exchange server time minus local time", self.offset_ms / 1000, labels
+            ),
+            MetricSample(
+                "bot_clock_drift_seconds", "gauge",
+                "Change of clock offset between the last two syncs", self.drift_ms / 1000, labels
+            ),
+            MetricSample(
+                "bot_clock_syncs", "counter",
+                "Successful server time synchronizations", self.sync_count, labels, "_total"
+            ),
+            MetricSample(
+                "bot_clock_sync_failures", "counter",
+                "Failed server time synchronizations", self.sync_failures, labels, "_total"
+            ),
+        ]
+        if self.rtt_ms is not None:
+            samples.append(MetricSample(
+                "bot_clock_rtt_seconds", "gauge",
+                "Round-trip time of the best server time sample", self.rtt_ms / 1000, labels
+            ))
+        return samples
+
+
+_clocks: Dict[str, ServerClock] = {}
+_clocks_lock = threading.Lock()
+
+
+def get_server_clock(base_url: str) -> ServerClock:
+    """Общий ServerClock для base_url; фоновая синхронизация запускается при первом вызове"""
+    with _clocks_lock:
+        clock = _clocks.get(base_url)
+        if clock is None:
+            clock = _clocks[base_url] = ServerClock(base_url)
+            clock.start()
+        return clock
@@ -0,0 +1,119 @@
+"""
+Бенчмарк компактных сущностей
+
+Память на N свечей (dict / dataclass с __dict__ / dataclass(slots=True) /
+CandleSeries) и скорость разбора ответов API: свечей (строки -> dict ->
+Candle против CandleSeries.from_rows) и позиций (PositionRecord.from_api).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_entities [количество_свечей]
+"""
+
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from api.entity.candle_series import CandleSeries
+from api.entity.position import PositionRecord
+from strategies.entity.Candle import Candle
+
+
+@dataclass
+class DictCandle:
+    """Прежний Candle (dataclass без slots)"""
+    timestamp: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+def make_rows(count: int) -> list:
+    rows = []
+    price = 30000.0
+    for i in range(count):
+        price *= random.uniform(0.995, 1.005)
+        rows.append([
+            str(1700000000000 + i * 60000),
+            f"{price:.2f}", f"{price * 1.002:.2f}", f"{price * 0.998:.2f}",
+            f"{price * 1.001:.2f}", f"{random.uniform(1, 500):.4f}", "0", "0",
+        ])
+    return rows
+
+
+def make_positions(count: int) -> list:
+    return [{
+        "symbol": "BTCUSDT", "holdSide": "long", "total": "0.015", "available": "0.015",
+        "openPriceAvg": "30000.1", "markPrice": "30100.5", "unrealizedPL": "1.5",
+        "achievedProfits": "0", "leverage": "10", "marginMode": "crossed",
+        "marginSize": "45.0", "marginCoin": "USDT", "liquidationPrice": "27000",
+    } for _ in range(count)]
+
+
+def parse_row(row: list) -> dict:
+    return {
+        "timestamp": int(row[0]), "open": float(row[1]), "high": float(row[2]),
+        "low": float(row[3]), "close": float(row[4]), "volume": float(row[5]),
+    }
+
+
+def legacy_candles(rows: list) -> list:
+    """Прежний путь: строка -> dict -> Candle"""
+    dicts = [parse_row(r) for r in rows]
+    return [DictCandle(**d) for d in dicts]
+
+
+def measure_memory(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def measure_rate(func, payload, count: int, rounds: int = 3) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func(payload)
+        best = min(best, time.perf_counter() - started)
+    return count / best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rows = make_rows(count)
+
+    print(f"Свечей: {count}")
+    print("Память (вместе с объектами float):")
+    memory = [
+        ("list[dict]", lambda: [parse_row(r) for r in rows]),
+        ("list[dataclass]", lambda: [DictCandle(**parse_row(r)) for r in rows]),
+        ("list[Candle slots]", lambda: [Candle(**parse_row(r)) for r in rows]),
+        ("CandleSeries", lambda: CandleSeries.from_rows(rows)),
+    ]
+    for name, build in memory:
+        size = measure_memory(build)
+        print(f"  {name:20s} {size / 1024 / 1024:9.1f} MiB  ({size / count:6.1f} байт/свеча)")
+
+    print("Разбор:")
+    legacy_rate = measure_rate(legacy_candles, rows, count)
+    series_rate = measure_rate(CandleSeries.from_rows, rows, count)
+    print(f"  строки -> dict -> Candle {legacy_rate:12,.0f} свечей/с")
+    print(f"  CandleSeries.from_rows   {series_rate:12,.0f} свечей/с ({series_rate / legacy_rate:.2f}x)")
+
+    positions = make_positions(100_000)
+    position_rate = measure_rate(
+        lambda raw: [PositionRecord.from_api(p) for p in raw], positions, len(positions)
+    )
+    print(f"  PositionRecord.from_api  {position_rate:12,.0f} позиций/с")
+
+
+if __name__ == "__main__":
+    main()
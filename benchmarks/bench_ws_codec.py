@@ -0,0 +1,100 @@
+"""
+Бенчмарк разбора WebSocket кадров ticker
+
+Сравнивает прежний путь (json.loads + новый dict на каждый тик) с текущим
+(utils.json_codec + TickerRecord). Кадры повторяют формат Bitget v2.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_ws_codec [количество_кадров]
+"""
+
+import json
+import random
+import sys
+import time
+
+from api.entity.ticker import TickerRecord
+from utils import json_codec
+
+
+SYMBOLS = ("BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT", "DOGEUSDT", "BNBUSDT")
+
+
+def make_frames(count: int) -> list:
+    frames = []
+    for i in range(count):
+        symbol = SYMBOLS[i % len(SYMBOLS)]
+        price = random.uniform(0.1, 70000)
+        frames.append(json.dumps({
+            "action": "snapshot",
+            "arg": {"instType": "USDT-FUTURES", "channel": "ticker", "instId": symbol},
+            "data": [{
+                "instId": symbol,
+                "lastPr": f"{price:.4f}",
+                "bidPr": f"{price * 0.9999:.4f}",
+                "askPr": f"{price * 1.0001:.4f}",
+                "bidSz": "12.5",
+                "askSz": "8.1",
+                "open24h": f"{price * 0.98:.4f}",
+                "high24h": f"{price * 1.02:.4f}",
+                "low24h": f"{price * 0.97:.4f}",
+                "change24h": "0.0123",
+                "fundingRate": "0.0001",
+                "nextFundingTime": "1700000000000",
+                "markPrice": f"{price:.4f}",
+                "indexPrice": f"{price:.4f}",
+                "holdingAmount": "123456.7",
+                "baseVolume": "98765.4",
+                "quoteVolume": "1234567890.1",
+                "openUtc": f"{price:.4f}",
+                "symbolType": "1",
+                "symbol": symbol,
+                "deliveryPrice": "0",
+                "ts": str(1700000000000 + i),
+            }],
+            "ts": 1700000000000 + i,
+        }))
+    return frames
+
+
+def legacy_path(frame: str):
+    message = json.loads(frame)
+    if "data" in message and message.get("arg", {}).get("channel") == "ticker":
+        raw = message["data"][0]
+        return {
+            "symbol": raw.get("instId"),
+            "last_price": float(raw.get("lastPr", 0)),
+            "mark_price": float(raw.get("markPrice", 0)),
+        }
+
+
+def codec_path(frame: str):
+    message = json_codec.loads(frame)
+    if "data" in message and message.get("arg", {}).get("channel") == "ticker":
+        return TickerRecord.from_ws(message["data"][0])
+
+
+def measure(func, frames: list, rounds: int = 5) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for frame in frames:
+            func(frame)
+        best = min(best, time.perf_counter() - started)
+    return len(frames) / best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    frames = make_frames(count)
+
+    legacy_fps = measure(legacy_path, frames)
+    codec_fps = measure(codec_path, frames)
+
+    print(f"Кадров: {count}, backend: {json_codec.BACKEND}")
+    print(f"json.loads + dict:         {legacy_fps:12,.0f} кадров/с")
+    print(f"json_codec + TickerRecord: {codec_fps:12,.0f} кадров/с ({codec_fps / legacy_fps:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -65,6 +65,30 @@ class ExchangeConfig:
     }
     DEFAULT_QUANTITY_PRECISION = 2
 
+    # Период обновления справочника контрактов (сек)
+    CONTRACTS_REFRESH_INTERVAL = 3600
+    # Пауза перед повторной загрузкой справочника после ошибки (сек): удваивается до максимума
+    CONTRACTS_RETRY_DELAY = 5
+    CONTRACTS_RETRY_MAX_DELAY = 300
+
+    # Период синхронизации с временем сервера биржи (сек)
+    SERVER_TIME_SYNC_INTERVAL = 300
+
+    # Допустимый возраст цены из общей таблицы тикеров (сек)
+    PRICE_SNAPSHOT_MAX_AGE = 2.0
+
+    # Допустимый возраст локального стакана из WebSocket (сек)
+    ORDER_BOOK_MAX_AGE = 2.0
+
+    # Коды Bitget "ордер с таким clientOid уже существует"
+    DUPLICATE_CLIENT_OID_CODES = ("40786", "43116")
+
+    # Сколько стоп-лоссов break-even изменяется параллельно за один проход
+    BREAK_EVEN_MAX_PARALLEL_UPDATES = 4
+
+    # Предел страниц (по limit ордеров) при чтении активных plan ордеров через idLessThan/endId
+    PLAN_ORDERS_MAX_PAGES = 20
+
     MIN_USER_POSITION_PERCENTAGE = 0.05
     MAX_USER_POSITION_PERCENTAGE = 0.20
     DAILY_LOSS_LIMIT = 50
@@ -141,9 +165,138 @@ class ExchangeConfig:
         "rsi_len": 14,
         "rsi_stop": 20,
         "anti_rsi_stop": 70,
+        # "candle" - усреднение по закрытию свечи, "exchange" - плановые ордера на бирже сразу после BUYX,
+        # "tick" - проверка уровней на каждом тике WebSocket
+        "averaging_mode": os.getenv("WAVEX_AVERAGING_MODE", "candle"),
         "averaging": [
             {"percent": 4, "enabled": True},
             {"percent": 8, "enabled": True},
             {"percent": 12, "enabled": True},
         ]
     }
+
+
+class MonitoringConfig:
+    # Локальный endpoint OpenMetrics (/metrics) - только по явному включению
+    METRICS_EXPORTER_ENABLED = os.getenv("METRICS_EXPORTER_ENABLED", "false").lower() in ("1", "true", "yes")
+    METRICS_EXPORTER_HOST = os.getenv("METRICS_EXPORTER_HOST", "127.0.0.1")
+    METRICS_EXPORTER_PORT = int(os.getenv("METRICS_EXPORTER_PORT", 9108))
+    # Период сверки позиций потокового PnL с биржей (trayding/pnl_engine.py), сек
+    PNL_POSITION_SYNC_INTERVAL = 30
+
+
+class TracingConfig:
+    # Количество завершённых спанов в кольцевом буфере
+    TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", 2000))
+    # JSONL файл для экспорта трасс (пусто - экспорт выключен)
+    TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "") or None
+
+
+class RetryConfig:
+    # Политики повторов по классам операций: ордера - короткий бюджет,
+    # чтобы не исполнить устаревший сигнал; история - длинный
+    POLICIES = {
+        "order": {
+            "max_attempts": 3, "deadline_seconds": 8.0, "base_delay": 0.2, "max_delay": 1.0,
+            "connect_timeout": 2.0, "read_timeout": 3.0,
+        },
+        "market_data": {
+            "max_attempts": 3, "deadline_seconds": 10.0, "base_delay": 0.3, "max_delay": 2.0,
+            "connect_timeout": 3.0, "read_timeout": 5.0,
+        },
+        "account": {
+            "max_attempts": 3, "deadline_seconds": 15.0, "base_delay": 0.5, "max_delay": 3.0,
+            "connect_timeout": 5.0, "read_timeout": 10.0,
+        },
+        "history": {
+            "max_attempts": 4, "deadline_seconds": 45.0, "base_delay": 1.0, "max_delay": 8.0,
+            "connect_timeout": 5.0, "read_timeout": 30.0,
+        },
+    }
+
+    OPERATION_CLASSES = {
+        "place_order": "order",
+        "place_plan_order": "order",
+        "place_tpsl_order": "order",
+        "modify_tpsl_order": "order",
+        "modify_trigger_order": "order",
+        "cancel_trigger_order": "order",
+        "get_order_detail": "order",
+        "fetch_ticker": "market_data",
+        "fetch_tickers": "market_data",
+        "get_candles": "market_data",
+        "fetch_balance": "account",
+        "get_positions": "account",
+        "get_active_plan_orders": "account",
+        "get_plan_order_history": "account",
+        "set_leverage": "account",
+        "get_account_bills": "history",
+        # Первая загрузка справочника блокирует расчёт объёма ордера - не в полосе истории
+        "get_contracts": "account",
+    }
+
+    DEFAULT_CLASS = "account"
+
+
+class SchedulerConfig:
+    # Одновременные запросы по полосам приоритета (api/request_scheduler.py)
+    LANE_CONCURRENCY = {
+        "emergency": 4,
+        "order": 4,
+        "account": 3,
+        "market_data": 4,
+        "history": 1,
+    }
+    # Общий лимит одновременных запросов (аварийная полоса его не учитывает)
+    MAX_CONCURRENT_REQUESTS = 8
+    # Пауза полос market_data/history после ответа 429 (сек)
+    RATE_LIMIT_BACKOFF_SECONDS = 5
+
+
+class HedgingConfig:
+    # Хеджирование GET запросов рыночных данных (api/hedging.py)
+    ENABLED = os.getenv("HEDGED_REQUESTS_ENABLED", "false").lower() in ("1", "true", "yes")
+    # Операции, для которых допускается запасной запрос
+    OPERATIONS = ("fetch_ticker", "fetch_tickers", "get_candles", "get_positions")
+    # Порог - p95 задержки endpoint, но в этих пределах (мс)
+    LATENCY_PERCENTILE = 0.95  # доля (APIMonitor.get_latency_percentile), не проценты
+    MIN_HEDGE_DELAY_MS = 150
+    MAX_HEDGE_DELAY_MS = 3000
+    # Сколько запросов к endpoint нужно, чтобы доверять p95
+    MIN_SAMPLES = 20
+    # Общий бюджет дополнительных запросов
+    HEDGES_PER_SECOND = 1.0
+    HEDGE_BURST = 5
+    MAX_WORKERS = 8
+
+
+class BlockingExecutorConfig:
+    # Пул для синхронных вызовов биржи из обработчиков WebSocket (utils/blocking_executor.py)
+    MAX_WORKERS = 4
+    # Всего вызовов в работе и в очереди; сверх лимита вызов отклоняется
+    MAX_PENDING = 32
+    # На один ключ (символ): выполняемый + ожидающий
+    MAX_PENDING_PER_KEY = 2
+
+
+class RiskEngineConfig:
+    # Период сверки позиций риск-движка с биржей (trayding/risk_action_engine.py), сек
+    POSITION_SYNC_INTERVAL = 30
+
+
+class CircuitBreakerConfig:
+    # Параметры circuit breaker для endpoint'ов биржи (UnifiedErrorHandler.CircuitBreaker)
+    SETTINGS = {
+        "window_seconds": 60.0,
+        "min_calls": 10,
+        "error_rate_threshold": 0.5,
+        "slow_call_ms": 5000.0,
+        "slow_call_rate_threshold": 0.8,
+        "open_seconds": 30.0,
+        "half_open_max_calls": 1,
+    }
+    # Операции, для которых при открытом breaker можно отдать последний успешный
+    # ответ - только если вызывающий явно согласен (allow_stale=True)
+    CACHEABLE_OPERATIONS = ("fetch_ticker", "fetch_tickers", "get_candles", "get_contracts")
+    # Насколько старый ответ ещё можно отдать (сек)
+    STALE_MAX_AGE_SECONDS = 300
@@ -3,7 +3,8 @@ import asyncio
 from utils.logging_setup import setup_logger
 logger = setup_logger()
 from View.UI.telegram_bot import TelegramTradingBot
-from config import TelegramConfig
+from config import TelegramConfig, MonitoringConfig
+from utils.metrics_exporter import MetricsExporter
 
 def main():
     if not TelegramConfig.BOT_TOKEN:
@@ -11,6 +12,12 @@ def main():
 
     logger.info("🤖 WAVEX Telegram Bot starting...")
 
+    if MonitoringConfig.METRICS_EXPORTER_ENABLED:
+        MetricsExporter(
+            host=MonitoringConfig.METRICS_EXPORTER_HOST,
+            port=MonitoringConfig.METRICS_EXPORTER_PORT,
+        ).start()
+
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
 
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List
 
+from api.entity.candle_series import CandleSeries
 from strategies.entity.Candle import Candle
 
 class CandleService(ABC):
@@ -12,4 +13,15 @@ class CandleService(ABC):
         product_type: str = "USDT-FUTURES"
     ) -> List[Candle]:
         """Получить баланс."""
-        pass
\ No newline at end of file
+        pass
+
+    def get_candle_series(self,
+        symbol: str,
+        timeframe: str = "1H",
+        limit: int = 200,
+        product_type: str = "USDT-FUTURES"
+    ) -> CandleSeries:
+        """Свечи в колоночном виде (по умолчанию - из get_candles)."""
+        return CandleSeries.from_candles(
+            self.get_candles(symbol, timeframe, limit, product_type)
+        )
\ No newline at end of file
@@ -0,0 +1,352 @@
+"""
+Усреднения WAVEX плановыми ордерами на бирже
+
+Сразу после BUYX включённые уровни усреднения выставляются плановыми
+ордерами (normal_plan, market): биржа исполняет их в момент касания уровня,
+а не на закрытии следующей свечи. Исполнение отслеживается по приватному
+каналу orders-algo; на каждом цикле стратегии состояние сверяется с
+активными ордерами и историей ордеров через REST (если событие потока
+было пропущено).
+На CLOSEX все невыполненные ордера отменяются; ордер, который биржа не
+отменила, остаётся за уровнем, и отмена повторяется при следующей сверке.
+"""
+
+import asyncio
+import threading
+import uuid
+from typing import Dict, List, Optional
+from api.bitget_private_websocket import BitgetPrivateWebSocketClient
+from strategies.entity.strategy_state import StrategyState
+from utils.logging_setup import setup_logger
+from utils.metrics_exporter import MetricSample, global_metrics_registry
+
+
+FILLED_STATUSES = ("executed",)
+DEAD_STATUSES = ("cancelled", "fail_execute")
+
+
+class ExchangeAveragingOrders:
+    """ Плановые ордера усреднения одного символа """
+
+    RECONNECT_DELAY = 5
+
+    def __init__(
+        self,
+        position_manager,
+        symbol: str,
+        amount: float,
+        leverage: float,
+        product_type: str = "USDT-FUTURES",
+        margin_coin: str = "USDT",
+        margin_mode: str = "crossed",
+        use_order_stream: bool = True
+    ):
+        self.pm = position_manager
+        self.symbol = symbol
+        self.amount = amount
+        self.leverage = leverage
+        self.product_type = product_type
+        self.margin_coin = margin_coin
+        self.margin_mode = margin_mode
+        self.use_order_stream = use_order_stream
+        self.logger = setup_logger()
+
+        # Уровни меняются из потока ордеров и из торгового цикла
+        self._lock = threading.Lock()
+        self.state: Optional[StrategyState] = None
+
+        self._stream_thread = None
+        self._stream_loop = None
+        self._stream_client = None
+        self._stream_running = False
+
+        # Выход (CLOSEX) запрошен, но не все ордера отменены - сверка повторяет отмену
+        self._cancel_pending = False
+
+        self.stats = {
+            "orders_placed": 0,
+            "orders_filled": 0,
+            "orders_cancelled": 0,
+            "stream_updates": 0,
+            "reconciled_fills": 0,
+            "reconcile_unknown": 0,
+            "cancel_failures": 0,
+            "errors": 0
+        }
+
+        global_metrics_registry.register(self)
+
+    def place(self, state: StrategyState) -> List[Dict]:
+        """Выставить плановые ордера для всех включённых и ещё не исполненных уровней"""
+        self.state = state
+        results = []
+
+        if self._cancel_pending:
+            # Ордера прошлой позиции не должны остаться на бирже без учёта
+            try:
+                self.cancel_all()
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.logger.error(f"Усреднения {self.symbol}: ордера прошлой позиции не отменены: {e}")
+
+        for index, lvl in enumerate(state.averaging_levels):
+            if not lvl.enabled or lvl.filled or lvl.level is None or lvl.order_id:
+                continue
+
+            client_oid = f"wxaver{index + 1}-{uuid.uuid4().hex[:16]}"
+            try:
+                # Уровень считается от средней цены - приводим к шагу цены контракта
+                trigger_price = self.pm.exchange.contracts.round_price(
+                    self.symbol, lvl.level, self.product_type
+                ) or lvl.level
+                quantity = self.pm.calculate_futures_size_at_price(
+                    self.symbol, self.amount, self.leverage, trigger_price, self.product_type
+                )
+                response = self.pm.set_pending_order(
+                    symbol=self.symbol,
+                    quantity=quantity,
+                    side="buy",
+                    trigger_price=trigger_price,
+                    order_type="market",
+                    product_type=self.product_type,
+                    margin_coin=self.margin_coin,
+                    margin_mode=self.margin_mode,
+                    client_oid=client_oid
+                )
+                order_id = (response or {}).get("data", {}).get("orderId")
+                if not order_id:
+                    raise ValueError(f"Нет orderId в ответе: {response}")
+
+                with self._lock:
+                    lvl.order_id = order_id
+                    lvl.client_oid = client_oid
+                self.stats["orders_placed"] += 1
+                results.append({"index": index, "success": True, "order_id": order_id, "quantity": quantity})
+                self.logger.info(
+                    f"AVER{index + 1} {self.symbol}: плановый ордер {order_id} на {trigger_price}, объём {quantity}"
+                )
+
+            except Exception as e:
+                self.stats["errors"] += 1
+                results.append({"index": index, "success": False, "error": str(e)})
+                self.logger.error(f"AVER{index + 1} {self.symbol}: не удалось выставить плановый ордер: {e}")
+
+        if self.use_order_stream and any(r["success"] for r in results):
+            self.start_stream()
+        return results
+
+    def is_pending(self, index: int) -> bool:
+        """Уровень ждёт исполнения планового ордера на бирже"""
+        if self.state is None:
+            return False
+        lvl = self.state.averaging_levels[index]
+        return bool(lvl.order_id) and not lvl.filled
+
+    def _find_level(self, order_id: str = "", client_oid: str = ""):
+        if self.state is None:
+            return None, None
+        for index, lvl in enumerate(self.state.averaging_levels):
+            if lvl.order_id and (lvl.order_id == order_id or (client_oid and lvl.client_oid == client_oid)):
+                return index, lvl
+        return None, None
+
+    def _mark_filled(self, index: int, lvl, source: str):
+        lvl.filled = True
+        lvl.order_id = None
+        lvl.client_oid = None
+        self.stats["orders_filled"] += 1
+        self.logger.info(f"Executed AVER{index + 1} {self.symbol} ({source})")
+
+    async def on_order_update(self, order: Dict):
+        """Событие orders-algo из приватного потока"""
+        if order.get("instId", self.symbol) != self.symbol:
+            return
+        self.stats["stream_updates"] += 1
+
+        status = order.get("status")
+        with self._lock:
+            index, lvl = self._find_level(order.get("orderId", ""), order.get("clientOid", ""))
+            if lvl is None:
+                return
+
+            if status in FILLED_STATUSES:
+                self._mark_filled(index, lvl, "поток ордеров")
+            elif status in DEAD_STATUSES:
+                # Уровень вернётся к проверке на закрытии свечи
+                lvl.order_id = None
+                lvl.client_oid = None
+                self.logger.warning(f"AVER{index + 1} {self.symbol}: плановый ордер {status}")
+
+    def reconcile(self) -> int:
+        """
+        Сверка с биржей: для ордера уровня, которого больше нет среди активных,
+        статус берётся из истории плановых ордеров. Исполненный уровень
+        отмечается, отменённый возвращается к проверке на закрытии свечи,
+        ордер с неизвестным статусом остаётся ждать следующей сверки.
+        После CLOSEX вместо этого повторяет отмену оставшихся ордеров.
+        Возвращает число уровней, отмеченных исполненными.
+        """
+        if self.state is None or not any(lvl.order_id for lvl in self.state.averaging_levels):
+            return 0
+
+        if self._cancel_pending:
+            self.cancel_all()
+            return 0
+
+        pending = self.pm.get_pending_orders(self.symbol, self.product_type)
+        active_ids = {order.get("orderId") for order in pending}
+
+        with self._lock:
+            missing = [
+                (index, lvl.order_id) for index, lvl in enumerate(self.state.averaging_levels)
+                if lvl.order_id and not lvl.filled and lvl.order_id not in active_ids
+            ]
+
+        reconciled = 0
+        for index, order_id in missing:
+            try:
+                status = self.pm.get_pending_order_status(self.symbol, order_id, self.product_type)
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.logger.warning(f"AVER{index + 1} {self.symbol}: статус ордера {order_id} не получен: {e}")
+                continue
+
+            with self._lock:
+                lvl = self.state.averaging_levels[index]
+                # Поток ордеров мог обработать событие, пока шёл запрос
+                if lvl.order_id != order_id or lvl.filled:
+                    continue
+
+                if status in FILLED_STATUSES:
+                    self._mark_filled(index, lvl, "сверка с биржей")
+                    reconciled += 1
+                elif status in DEAD_STATUSES:
+                    lvl.order_id = None
+                    lvl.client_oid = None
+                    self.logger.warning(f"AVER{index + 1} {self.symbol}: плановый ордер {status} (сверка)")
+                else:
+                    self.stats["reconcile_unknown"] += 1
+                    self.logger.warning(
+                        f"AVER{index + 1} {self.symbol}: ордер {order_id} не найден ни среди активных, "
+                        f"ни в истории (статус '{status}') - проверим на следующей свече"
+                    )
+
+        self.stats["reconciled_fills"] += reconciled
+        return reconciled
+
+    def cancel_all(self) -> Dict:
+        """
+        Отменить все невыполненные плановые ордера усреднения.
+
+        Уровень освобождается только для ордеров из successList ответа;
+        неотменённые ордера (failureList или ошибка запроса) остаются за
+        уровнями, и reconcile() повторяет отмену.
+
+        Raises:
+            Exception: запрос отмены не выполнен
+        """
+        if self.state is None:
+            return {}
+
+        with self._lock:
+            orders = [
+                {"orderId": lvl.order_id}
+                for lvl in self.state.averaging_levels if lvl.order_id and not lvl.filled
+            ]
+        if not orders:
+            self._cancel_pending = False
+            return {}
+
+        self._cancel_pending = True
+        result = self.pm.cancel_pending_orders(
+            self.symbol, orders, self.product_type, self.margin_coin
+        )
+        data = (result or {}).get("data") or {}
+        cancelled = {
+            order.get("orderId") or order.get("clientOid") for order in data.get("successList") or []
+        }
+
+        with self._lock:
+            for lvl in self.state.averaging_levels:
+                if lvl.order_id and (lvl.filled or lvl.order_id in cancelled or lvl.client_oid in cancelled):
+                    lvl.order_id = None
+                    lvl.client_oid = None
+            remaining = [lvl.order_id for lvl in self.state.averaging_levels if lvl.order_id]
+
+        cancelled_count = len(orders) - len(remaining)
+        self.stats["orders_cancelled"] += cancelled_count
+        self.logger.info(f"Отменено плановых ордеров усреднения {self.symbol}: {cancelled_count}")
+
+        if remaining:
+            self.stats["cancel_failures"] += len(remaining)
+            failures = data.get("failureList") or []
+            self.logger.error(
+                f"Плановые ордера усреднения {self.symbol} не отменены: {remaining} "
+                f"({[failure.get('errorMsg') for failure in failures]}) - повтор при следующей сверке"
+            )
+        else:
+            self._cancel_pending = False
+        return result
+
+    # ----- Приватный поток ордеров -----
+
+    def start_stream(self):
+        """Запустить поток событий ордеров в отдельном потоке (если ещё не запущен)"""
+        if self._stream_running:
+            return
+        self._stream_running = True
+        self._stream_thread = threading.Thread(
+            target=lambda: asyncio.run(self._run_stream()),
+            name=f"AveragingOrders-{self.symbol}",
+            daemon=True
+        )
+        self._stream_thread.start()
+
+    def stop_stream(self):
+        self._stream_running = False
+        if self._stream_loop is not None and self._stream_client is not None:
+            asyncio.run_coroutine_threadsafe(self._stream_client.disconnect(), self._stream_loop)
+        if self._stream_thread:
+            self._stream_thread.join(timeout=2)
+
+    async def _run_stream(self):
+        self._stream_loop = asyncio.get_running_loop()
+
+        while self._stream_running:
+            client = BitgetPrivateWebSocketClient(self.pm.exchange)
+            self._stream_client = client
+            try:
+                if await client.connect() and await client.login() \
+                        and await client.subscribe_plan_orders(self.on_order_update, self.product_type):
+                    await client.listen()
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.logger.error(f"Поток ордеров усреднения {self.symbol}: {e}")
+            finally:
+                await client.disconnect()
+
+            if self._stream_running:
+                await asyncio.sleep(self.RECONNECT_DELAY)
+
+    def collect_metrics(self) -> List[MetricSample]:
+        labels = {"symbol": self.symbol}
+        samples = [
+            MetricSample(
+                "bot_averaging_orders_pending", "gauge",
+                "Averaging plan orders waiting on the exchange",
+                sum(1 for lvl in self.state.averaging_levels if lvl.order_id) if self.state else 0, labels
+            ),
+        ]
+        for stat_name, help_text in (
+            ("orders_placed", "Averaging plan orders placed"),
+            ("orders_filled", "Averaging plan orders filled"),
+            ("orders_cancelled", "Averaging plan orders cancelled on exit"),
+            ("reconciled_fills", "Averaging fills detected by REST reconciliation"),
+            ("reconcile_unknown", "Averaging orders missing from both pending orders and history"),
+            ("cancel_failures", "Averaging plan orders the exchange did not cancel on exit"),
+            ("errors", "Errors placing or tracking averaging plan orders"),
+        ):
+            samples.append(MetricSample(
+                f"bot_averaging_{stat_name}", "counter", help_text, self.stats[stat_name], labels, "_total"
+            ))
+        return samples
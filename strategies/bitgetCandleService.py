@@ -3,6 +3,7 @@ from strategies.entity.Candle import Candle
     
 from typing import List
 from config import ExchangeConfig
+from api.entity.candle_series import CandleSeries
 from strategies.CandleServiceProtocol import CandleService
 from api.bitget_connector import BitgetConnector
 # import logging
@@ -38,30 +39,26 @@ class BitgetCandleService(CandleService):
             product_type: Product type ("USDT-FUTURES" or "USDT-SPOT")
         """
         
+        return self.get_candle_series(symbol, timeframe, limit, product_type).candles()
+
+    def get_candle_series(
+        self,
+        symbol: str,
+        timeframe: str = "1H",
+        limit: int = 200,
+        product_type: str = "USDT-FUTURES"
+    ) -> CandleSeries:
+        """
+        Fetch candles as column arrays (timestamps, OHLCV) without per-candle objects.
+        """
         try:
-            raw_candles = self.connector.get_candles(
+            return self.connector.get_candle_series(
                 symbol=symbol,
                 timeframe=timeframe,
                 limit=limit,
                 product_type=product_type
             )
-            
-            # Преобразуем сырые данные в объекты Candle
-            candles = []
-            for item in raw_candles:
-                candle = Candle(
-                    timestamp=item["timestamp"],
-                    open=item["open"],
-                    high=item["high"],
-                    low=item["low"],
-                    close=item["close"],
-                    volume=item["volume"]
-                )
-                candles.append(candle)
-            
-            # self.logger.debug(f"Успешно преобразовано {len(candles)} свечей для {symbol}")
-            return candles
-            
+
         except Exception as e:
             # self.logger.error(f"Ошибка при получении свечей для {symbol}: {e}")
             raise Exception(f"Failed to fetch candle data through connector: {e}")
\ No newline at end of file
@@ -1,15 +1,17 @@
 from dataclasses import dataclass, field
 from typing import List, Optional
 
-@dataclass
+@dataclass(slots=True)
 class AveragingLevel:
     percentage: float # AVER_X
     level: Optional[float] = None # averx_level
     filled: bool = False # averx_filled
     enabled: bool = True # USE_AVER_X - в конфиг
+    order_id: Optional[str] = None # плановый ордер на бирже (averaging_mode="exchange")
+    client_oid: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class StrategyState:
     position_open: bool = False
     entry_price: Optional[float] = None
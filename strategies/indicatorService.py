@@ -24,20 +24,18 @@ class IndicatorService(IndicatorServiceProtocol):
         symbol: str,
         timeframe: str = "1H"
     ):
-        candles = self.candle_service.get_candles(
+        candles = self.candle_service.get_candle_series(
             symbol=symbol,
             timeframe=timeframe,
             limit=max(self.ema_len, self.rsi_len) + 10
         )
 
-
-        last_closed_candle = candles[-1]
-        timestamp = last_closed_candle.timestamp
+        timestamp = candles.last_timestamp
 
         if timestamp != self.last_candle_time:
             self.last_candle_time = timestamp
 
-            closes = [c.close for c in candles]
+            closes = candles.closes
 
             ema = self.calculate_ema(closes, self.ema_len)
             rsi = self.calculate_rsi(closes, self.rsi_len)
@@ -0,0 +1,199 @@
+"""
+Усреднения WAVEX по тикам WebSocket
+
+Альтернатива плановым ордерам (averaging_orders.py): уровни усреднения
+регистрируются в PriceTriggerIndex, и каждый тик ticker канала проверяется в
+памяти бинарным поиском. Пересечение уровня вызывает обработчик AVERn сразу,
+а не на закрытии следующей свечи; REST запросов, кроме самого ордера, нет.
+На том же соединении ведётся стакан символа (books15) - по нему
+SafetyValidator проверяет проскальзывание рыночного ордера усреднения.
+Вход и выход (BUYX / CLOSEX) по-прежнему решаются на закрытии свечи.
+"""
+
+import asyncio
+import threading
+from typing import Callable, List, Optional
+from api.bitget_websocket import BitgetWebSocketClient
+from strategies.entity.strategy_state import StrategyState
+from trayding.price_triggers import PriceTriggerIndex
+from utils.blocking_executor import get_blocking_executor
+from utils.exceptions import BlockingCallRejected
+from utils.logging_setup import setup_logger
+from utils.metrics_exporter import MetricSample, global_metrics_registry
+
+
+class TickAveragingTriggers:
+    """ Уровни усреднения одного символа на потоке тикеров """
+
+    RECONNECT_DELAY = 5
+
+    def __init__(
+        self,
+        symbol: str,
+        on_level: Callable[[int, float], None],
+        price_snapshot=None,
+        order_books=None
+    ):
+        """
+        Args:
+            symbol: Торговая пара
+            on_level: Синхронный обработчик (индекс уровня, цена); выполняется в пуле потоков
+            price_snapshot: PriceSnapshotService коннектора - тики обновляют общую таблицу цен
+            order_books: OrderBookStore коннектора - стакан символа для проверки проскальзывания
+        """
+        self.symbol = symbol
+        self.on_level = on_level
+        self.price_snapshot = price_snapshot
+        self.order_books = order_books
+        self.logger = setup_logger()
+
+        self.triggers = PriceTriggerIndex()
+        # Индекс триггеров меняется из торгового цикла и из потока тиков
+        self._lock = threading.Lock()
+
+        self._thread = None
+        self._loop = None
+        self._client = None
+        self._running = False
+        # Сигнал остановки текущего потока тикеров (новый на каждый запуск)
+        self._stop_event = None
+
+        self.stats = {
+            "ticks": 0,
+            "levels_fired": 0,
+            "errors": 0
+        }
+
+        global_metrics_registry.register(self)
+
+    def arm(self, state: StrategyState) -> int:
+        """Зарегистрировать включённые и не исполненные уровни; вернуть их число"""
+        with self._lock:
+            self.triggers.remove_symbol(self.symbol)
+            for index, lvl in enumerate(state.averaging_levels):
+                if lvl.enabled and not lvl.filled and lvl.level is not None:
+                    self.triggers.add_level(self.symbol, "down", lvl.level, index)
+            armed = len(self.triggers)
+
+        if armed:
+            self.start()
+        self.logger.info(f"Усреднения {self.symbol} по тикам: уровней {armed}")
+        return armed
+
+    def disarm(self, index: Optional[int] = None):
+        """Снять уровень index (или все уровни символа); без уровней поток тикеров не нужен"""
+        with self._lock:
+            if index is None:
+                self.triggers.remove_symbol(self.symbol)
+            else:
+                self.triggers.discard(self.symbol, lambda trigger: trigger.owner == index)
+            armed = len(self.triggers)
+
+        if not armed and self._running:
+            # Может вызываться из обработчика уровня, поэтому поток не ждём
+            self._shutdown_stream()
+            self.logger.info(f"Усреднения {self.symbol} по тикам: уровней нет, поток тикеров остановлен")
+
+    def nearest_level(self) -> Optional[float]:
+        return self.triggers.nearest(self.symbol).get("down")
+
+    async def _on_ticker(self, ticker_data):
+        self.stats["ticks"] += 1
+        price = ticker_data["last_price"]
+        if price <= 0:
+            return
+
+        with self._lock:
+            fired = self.triggers.check(self.symbol, price)
+        if not fired:
+            return
+
+        self.stats["levels_fired"] += len(fired)
+        for trigger in sorted(fired, key=lambda t: t.owner):
+            self.logger.info(
+                f"AVER{trigger.owner + 1} {self.symbol}: цена {price} пересекла уровень {trigger.activation_price:.6f}"
+            )
+            try:
+                await get_blocking_executor().run(self.symbol, self.on_level, trigger.owner, price)
+            except BlockingCallRejected as e:
+                # Уровень остаётся в силе - повтор на следующем тике
+                with self._lock:
+                    self.triggers.add(trigger)
+                self.logger.warning(f"AVER{trigger.owner + 1} {self.symbol} отложено: {e}")
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.logger.error(f"Ошибка усреднения {self.symbol} по тику: {e}")
+
+    # ----- Поток тикеров -----
+
+    def start(self):
+        """Запустить поток тикеров в отдельном потоке (если ещё не запущен)"""
+        if self._running:
+            return
+        self._running = True
+        stop_event = self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self._run(stop_event)),
+            name=f"TickAveraging-{self.symbol}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._shutdown_stream()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+
+    def _shutdown_stream(self):
+        """Подать сигнал остановки потоку тикеров и закрыть его соединение"""
+        self._running = False
+        if self._stop_event is not None:
+            self._stop_event.set()
+        loop, client = self._loop, self._client
+        if loop is not None and client is not None and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(client.disconnect(), loop)
+
+    async def _run(self, stop_event: threading.Event):
+        loop = self._loop = asyncio.get_running_loop()
+
+        while not stop_event.is_set():
+            client = BitgetWebSocketClient(price_snapshot=self.price_snapshot, order_books=self.order_books)
+            self._client = client
+            try:
+                if await client.connect() and await client.subscribe_ticker(self.symbol, self._on_ticker):
+                    if self.order_books is not None:
+                        await client.subscribe_books(self.symbol)
+                    await client.listen()
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.logger.error(f"Поток тикеров усреднения {self.symbol}: {e}")
+            finally:
+                await client.disconnect()
+
+            if not stop_event.is_set():
+                await asyncio.sleep(self.RECONNECT_DELAY)
+
+        # Повторный arm() мог уже запустить новый поток
+        if self._loop is loop:
+            self._loop = self._client = None
+
+    def collect_metrics(self) -> List[MetricSample]:
+        labels = {"symbol": self.symbol}
+        return [
+            MetricSample(
+                "bot_tick_averaging_armed_levels", "gauge",
+                "Averaging levels armed on the ticker stream", len(self.triggers), labels
+            ),
+            MetricSample(
+                "bot_tick_averaging_ticks", "counter",
+                "Ticker updates checked against averaging levels", self.stats["ticks"], labels, "_total"
+            ),
+            MetricSample(
+                "bot_tick_averaging_levels_fired", "counter",
+                "Averaging levels crossed on the ticker stream", self.stats["levels_fired"], labels, "_total"
+            ),
+            MetricSample(
+                "bot_tick_averaging_errors", "counter",
+                "Errors executing tick-triggered averaging", self.stats["errors"], labels, "_total"
+            ),
+        ]
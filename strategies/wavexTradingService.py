@@ -1,10 +1,16 @@
-from typing import Optional
+import logging
+import threading
+from typing import Callable, Optional
+from config import ExchangeConfig
+from strategies.averaging_orders import ExchangeAveragingOrders
 from strategies.entity.strategy_state import StrategyState
 from strategies.CandleServiceProtocol import CandleService
 from strategies.indicatorService import IndicatorService
+from strategies.tick_averaging import TickAveragingTriggers
 from strategies.wawexstrategy  import WAVEXStrategy
 from trayding.PositionManagerProtocol import PositionManagerProtocol
 from utils.logging_setup import setup_logger
+from utils.tracing import global_tracer
 
 logger = setup_logger()
 
@@ -23,6 +29,7 @@ class WAVEXTradingService:
         state_strategy: StrategyState = None,
         candle_service: CandleService = None,
         indicator_service: IndicatorService = None,
+        averaging_mode: Optional[str] = None,
     ):
         self.symbol = symbol
         self.timeframe = timeframe
@@ -38,6 +45,29 @@ class WAVEXTradingService:
         # --- Strategy ---
         self.strategy = WAVEXStrategy()
 
+        # --- Averaging ---
+        self.averaging_mode = averaging_mode or ExchangeConfig.STRATEGY_CONFIG.get("averaging_mode", "candle")
+        self.averaging_orders = None
+        self.tick_averaging = None
+        if self.averaging_mode == "exchange":
+            self.averaging_orders = ExchangeAveragingOrders(
+                self.pm, self.symbol, self.amount, self.leverage,
+                product_type="USDT-FUTURES", margin_coin="USDT", margin_mode="crossed"
+            )
+        elif self.averaging_mode == "tick":
+            exchange = getattr(self.pm, "exchange", None)
+            self.tick_averaging = TickAveragingTriggers(
+                self.symbol,
+                self._on_tick_level,
+                price_snapshot=getattr(exchange, "prices", None),
+                order_books=getattr(exchange, "order_books", None)
+            )
+
+        # Сигналы приходят из торгового цикла и из потока тиков
+        self._signal_lock = threading.RLock()
+        # Получатель сигналов, сработавших вне process_signal (Telegram)
+        self.on_signal: Optional[Callable] = None
+
     def process_signal(self):
 
         try:
@@ -57,6 +87,15 @@ class WAVEXTradingService:
 
             logger.info(f"Price: {price}, EMA: {ema}, RSI: {rsi}")
 
+            # Исполнения плановых ордеров, пропущенные потоком ордеров, и
+            # повтор отмены ордеров после CLOSEX; сбой сверки не должен
+            # пропускать свечу (в том числе CLOSEX)
+            if self.averaging_orders:
+                try:
+                    self.averaging_orders.reconcile()
+                except Exception as e:
+                    logger.error(f"Failed to reconcile averaging orders: {e}")
+
             # 2. Вызываем стратегию
             signal = self.strategy.on_candle_close(
                 price=price,
@@ -73,10 +112,36 @@ class WAVEXTradingService:
             logger.error(f"Error in bot cycle: {e}")
 
 
+    def _on_tick_level(self, index: int, price: float):
+        """Уровень усреднения пересечён на тике"""
+        with self._signal_lock:
+            if not self.state.position_open or self.state.averaging_levels[index].filled:
+                return
+            signal = {"signal": f"AVER{index + 1}", "index": index, "price": price}
+            self.handler_signal(signal, price)
+
+        if self.on_signal:
+            self.on_signal(signal)
+
+    def stop(self):
+        """Остановить фоновые потоки усреднений"""
+        if self.tick_averaging:
+            self.tick_averaging.stop()
+        if self.averaging_orders:
+            self.averaging_orders.stop_stream()
+
     def handler_signal(
         self,
         signal: Optional[dict],
         price: float
+    ):
+        with self._signal_lock:
+            self._handle_signal(signal, price)
+
+    def _handle_signal(
+        self,
+        signal: Optional[dict],
+        price: float
     ):
         if not signal:
             logger.info("No signal")
@@ -85,75 +150,113 @@ class WAVEXTradingService:
         signal_type = signal["signal"]
         logger.info(f"Signal received: {signal_type}")
 
-        try:
-
-            # ----- BUYX -----
-            if signal_type == "BUYX":
-
-                self.pm.open_position(
-                    symbol=self.symbol,
-                    side="buy",
-                    amount_type="fixed",
-                    amount=self.amount,
-                    order_type="market",
-                    market_type="futures",
-                    leverage=self.leverage,
-                    product_type="USDT-FUTURES",
-                    margin_coin="USDT",
-                    position_action="open",
-                    margin_mode="crossed"
-                )
-
-                self.state.position_open = True
-                self.state.entry_price = price
-
-                for lvl in self.state.averaging_levels:
-                    lvl.level = price * (1 - lvl.percentage / 100)
-                    lvl.filled = False
-
-                logger.info("Executed BUYX")
-
-            # ----- AVERAGING -----
-            elif signal_type.startswith("AVER"):
-
-                index = signal["index"]
-
-                self.pm.open_position(
-                    symbol=self.symbol,
-                    side="buy",
-                    amount_type="fixed",
-                    amount=self.amount,
-                    order_type="market",
-                    market_type="futures",
-                    leverage=self.leverage,
-                    product_type="USDT-FUTURES",
-                    margin_coin="USDT",
-                    position_action="open",
-                    margin_mode="crossed"
-                )
-
-                self.state.averaging_levels[index].filled = True
-
-                logger.info(f"Executed {signal_type}")
-
-            # ----- CLOSEX -----
-            elif signal_type == "CLOSEX":
-
-                self.pm.close_position_full(
-                    symbol=self.symbol,
-                    product_type="USDT-FUTURES",
-                    margin_coin="USDT",
-                    order_type="market"
-                )
-
-                self.state.position_open = False
-                self.state.entry_price = None
-
-                for lvl in self.state.averaging_levels:
-                    lvl.level = None
-                    lvl.filled = False
-
-                logger.info("Executed CLOSEX")
-
-        except Exception as e:
-            logger.error(f"Error in bot cycle: {e}")
\ No newline at end of file
+        # Трасса сигнал -> ордер: id попадает в clientOid и во все запросы к бирже
+        with global_tracer.start_trace(
+            f"signal.{signal_type}",
+            symbol=self.symbol,
+            price=price
+        ) as trace:
+            try:
+
+                # ----- BUYX -----
+                if signal_type == "BUYX":
+
+                    self.pm.open_position(
+                        symbol=self.symbol,
+                        side="buy",
+                        amount_type="fixed",
+                        amount=self.amount,
+                        order_type="market",
+                        market_type="futures",
+                        leverage=self.leverage,
+                        product_type="USDT-FUTURES",
+                        margin_coin="USDT",
+                        position_action="open",
+                        margin_mode="crossed"
+                    )
+
+                    self.state.position_open = True
+                    self.state.entry_price = price
+
+                    for lvl in self.state.averaging_levels:
+                        lvl.level = price * (1 - lvl.percentage / 100)
+                        lvl.filled = False
+
+                    if self.averaging_orders:
+                        self.averaging_orders.place(self.state)
+                    if self.tick_averaging:
+                        self.tick_averaging.arm(self.state)
+
+                    logger.info("Executed BUYX")
+
+                # ----- AVERAGING -----
+                elif signal_type.startswith("AVER"):
+
+                    index = signal["index"]
+
+                    if self.state.averaging_levels[index].filled:
+                        logger.info(f"{signal_type}: уровень уже исполнен")
+                        return
+
+                    if self.tick_averaging:
+                        self.tick_averaging.disarm(index)
+
+                    if self.averaging_orders and self.averaging_orders.is_pending(index):
+                        logger.info(f"{signal_type}: ждём исполнения планового ордера на бирже")
+                        return
+
+                    self.pm.open_position(
+                        symbol=self.symbol,
+                        side="buy",
+                        amount_type="fixed",
+                        amount=self.amount,
+                        order_type="market",
+                        market_type="futures",
+                        leverage=self.leverage,
+                        product_type="USDT-FUTURES",
+                        margin_coin="USDT",
+                        position_action="open",
+                        margin_mode="crossed"
+                    )
+
+                    self.state.averaging_levels[index].filled = True
+
+                    logger.info(f"Executed {signal_type}")
+
+                # ----- CLOSEX -----
+                elif signal_type == "CLOSEX":
+
+                    if self.tick_averaging:
+                        self.tick_averaging.disarm()
+
+                    if self.averaging_orders:
+                        try:
+                            self.averaging_orders.cancel_all()
+                        except Exception as e:
+                            # Позиция закрывается в любом случае
+                            logger.error(f"Failed to cancel averaging orders: {e}")
+
+                    self.pm.close_position_full(
+                        symbol=self.symbol,
+                        product_type="USDT-FUTURES",
+                        margin_coin="USDT",
+                        order_type="market"
+                    )
+
+                    self.state.position_open = False
+                    self.state.entry_price = None
+
+                    for lvl in self.state.averaging_levels:
+                        lvl.level = None
+                        lvl.filled = False
+
+                    logger.info("Executed CLOSEX")
+
+            except Exception as e:
+                trace.status = "error"
+                trace.error = str(e)
+                logger.error(f"Error in bot cycle: {e}")
+
+        # Waterfall строится только если DEBUG действительно пишется
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(global_tracer.format_waterfall(trace.trace_id))
\ No newline at end of file
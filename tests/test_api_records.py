@@ -0,0 +1,56 @@
+"""Записи ответов API: доступ по ключам Bitget как к словарю"""
+
+import pytest
+from api.entity.plan_order import PlanOrderRecord
+from api.entity.position import PositionRecord
+from api.entity.ticker import TickerRecord
+
+
+POSITION = {
+    "symbol": "BTCUSDT", "holdSide": "LONG", "total": "0.5", "available": "0.5",
+    "openPriceAvg": "100.5", "markPrice": "101", "unrealizedPL": "0.25", "achievedProfits": "0",
+    "leverage": "10", "marginMode": "crossed", "marginSize": "5.025", "marginCoin": "USDT",
+    "liquidationPrice": "90.1", "cTime": "1700000000000",
+}
+
+
+def test_position_api_keys_map_to_fields():
+    pos = PositionRecord.from_api(POSITION)
+
+    assert pos["holdSide"] == pos.hold_side == "long"
+    assert pos.get("openPriceAvg") == 100.5
+    assert pos["total"] == 0.5 and pos["symbol"] == "BTCUSDT"
+    assert pos["leverage"] == 10 and pos["cTime"] == 1700000000000
+    assert "markPrice" in pos and "mark_price" in pos
+
+
+def test_plan_order_api_keys_map_to_fields():
+    order = PlanOrderRecord.from_api({
+        "orderId": "1", "clientOid": "wx-1", "symbol": "BTCUSDT", "planType": "normal_plan",
+        "triggerPrice": "95.5", "size": "0.01", "planStatus": "live",
+    })
+
+    assert order["orderId"] == "1" and order.get("clientOid") == "wx-1"
+    assert order["triggerPrice"] == 95.5 and order["size"] == 0.01
+    assert order.get("executePrice") == 0.0
+
+
+@pytest.mark.parametrize("record", [
+    PositionRecord.from_api(POSITION),
+    TickerRecord("BTCUSDT", 101.0, 101.1),
+])
+def test_unknown_key_behaves_like_missing_dict_key(record):
+    assert record.get("unknownKey") is None
+    assert record.get("unknownKey", "default") == "default"
+    assert "unknownKey" not in record
+    assert "API_FIELDS" not in record and record.get("get") is None
+    with pytest.raises(KeyError):
+        record["unknownKey"]
+
+
+def test_ticker_supports_dict_access():
+    ticker = TickerRecord.from_ws({"instId": "BTCUSDT", "lastPr": "101", "markPrice": "101.1", "ts": "5"})
+
+    assert ticker["last_price"] == 101.0 and ticker["mark_price"] == 101.1
+    assert ticker.get("bid_price", 1.0) == 0.0
+    assert ticker["ts"] == 5
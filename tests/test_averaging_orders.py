@@ -0,0 +1,162 @@
+"""ExchangeAveragingOrders: выставление, сверка с биржей и отмена плановых ордеров"""
+
+import asyncio
+from types import SimpleNamespace
+import pytest
+from strategies.averaging_orders import ExchangeAveragingOrders
+from strategies.entity.strategy_state import AveragingLevel, StrategyState
+
+
+class FakeContracts:
+    def round_price(self, symbol, price, product_type="USDT-FUTURES"):
+        return round(price, 1)
+
+
+class FakePositionManager:
+    def __init__(self):
+        self.exchange = SimpleNamespace(contracts=FakeContracts())
+        self.pending = []
+        self.history = {}
+        self.history_error = None
+        self.placed = []
+        self.cancelled = []
+        self.cancel_failures = set()
+        self.cancel_error = None
+
+    def calculate_futures_size_at_price(self, symbol, amount, leverage, price, product_type="USDT-FUTURES"):
+        return "0.01"
+
+    def set_pending_order(self, **kwargs):
+        self.placed.append(kwargs)
+        return {"data": {"orderId": f"order-{len(self.placed)}"}}
+
+    def get_pending_orders(self, symbol, product_type="USDT-FUTURES", plan_type="normal_plan"):
+        return [{"orderId": order_id} for order_id in self.pending]
+
+    def get_pending_order_status(self, symbol, order_id, product_type="USDT-FUTURES", plan_type="normal_plan"):
+        if self.history_error:
+            raise self.history_error
+        return self.history.get(order_id, "")
+
+    def cancel_pending_orders(self, symbol, orders, product_type="USDT-FUTURES", margin_coin="USDT", plan_type="normal_plan"):
+        if self.cancel_error:
+            raise self.cancel_error
+        self.cancelled.extend(orders)
+        return {"code": "00000", "data": {
+            "successList": [order for order in orders if order["orderId"] not in self.cancel_failures],
+            "failureList": [
+                {"orderId": order["orderId"], "errorMsg": "failed"}
+                for order in orders if order["orderId"] in self.cancel_failures
+            ],
+        }}
+
+
+@pytest.fixture
+def pm():
+    return FakePositionManager()
+
+
+@pytest.fixture
+def orders(pm):
+    state = StrategyState(
+        position_open=True,
+        entry_price=100.0,
+        averaging_levels=[
+            AveragingLevel(percentage=0.01, level=99.04),
+            AveragingLevel(percentage=0.02, level=98.06),
+            AveragingLevel(percentage=0.03, level=97.0, enabled=False),
+        ]
+    )
+    averaging = ExchangeAveragingOrders(pm, "BTCUSDT", 100, 2, use_order_stream=False)
+    averaging.place(state)
+    return averaging
+
+
+def test_place_rounds_trigger_price_and_skips_disabled(orders, pm):
+    assert [order["trigger_price"] for order in pm.placed] == [99.0, 98.1]
+    assert [lvl.order_id for lvl in orders.state.averaging_levels] == ["order-1", "order-2", None]
+    assert orders.is_pending(0) and not orders.is_pending(2)
+
+
+def test_reconcile_keeps_active_orders(orders, pm):
+    pm.pending = ["order-1", "order-2"]
+    assert orders.reconcile() == 0
+    assert not any(lvl.filled for lvl in orders.state.averaging_levels)
+
+
+def test_reconcile_marks_executed_from_history(orders, pm):
+    pm.pending = ["order-2"]
+    pm.history = {"order-1": "executed"}
+
+    assert orders.reconcile() == 1
+    first = orders.state.averaging_levels[0]
+    assert first.filled and first.order_id is None
+    assert orders.stats["reconciled_fills"] == 1
+
+
+def test_reconcile_releases_cancelled_order(orders, pm):
+    pm.pending = ["order-2"]
+    pm.history = {"order-1": "cancelled"}
+
+    assert orders.reconcile() == 0
+    first = orders.state.averaging_levels[0]
+    assert not first.filled and first.order_id is None
+
+
+def test_reconcile_does_not_fill_unknown_order(orders, pm):
+    pm.pending = ["order-2"]
+
+    assert orders.reconcile() == 0
+    first = orders.state.averaging_levels[0]
+    assert not first.filled and first.order_id == "order-1"
+    assert orders.stats["reconcile_unknown"] == 1
+
+
+def test_reconcile_history_failure_leaves_level_pending(orders, pm):
+    pm.pending = []
+    pm.history_error = RuntimeError("timeout")
+
+    assert orders.reconcile() == 0
+    assert all(lvl.order_id for lvl in orders.state.averaging_levels[:2])
+
+
+def test_stream_update_marks_fill(orders):
+    asyncio.run(orders.on_order_update({"instId": "BTCUSDT", "orderId": "order-2", "status": "executed"}))
+    assert orders.state.averaging_levels[1].filled
+
+
+def test_cancel_all_cancels_unfilled_and_clears_ids(orders, pm):
+    orders.state.averaging_levels[0].filled = True
+
+    orders.cancel_all()
+    assert pm.cancelled == [{"orderId": "order-2"}]
+    assert all(lvl.order_id is None for lvl in orders.state.averaging_levels)
+    assert orders.cancel_all() == {}
+
+
+def test_cancel_all_keeps_orders_the_exchange_did_not_cancel(orders, pm):
+    pm.cancel_failures = {"order-2"}
+
+    orders.cancel_all()
+    assert [lvl.order_id for lvl in orders.state.averaging_levels] == [None, "order-2", None]
+    assert orders.stats["cancel_failures"] == 1
+
+    # Следующая сверка повторяет отмену, а не проверяет историю
+    pm.cancel_failures = set()
+    pm.history = {"order-2": "executed"}
+    assert orders.reconcile() == 0
+    assert pm.cancelled[-1] == {"orderId": "order-2"}
+    assert orders.state.averaging_levels[1].order_id is None
+    assert not orders.state.averaging_levels[1].filled
+
+
+def test_cancel_request_failure_keeps_all_orders(orders, pm):
+    pm.cancel_error = RuntimeError("timeout")
+
+    with pytest.raises(RuntimeError):
+        orders.cancel_all()
+    assert [lvl.order_id for lvl in orders.state.averaging_levels[:2]] == ["order-1", "order-2"]
+
+    pm.cancel_error = None
+    orders.place(orders.state)
+    assert pm.cancelled == [{"orderId": "order-1"}, {"orderId": "order-2"}]
@@ -0,0 +1,68 @@
+"""BlockingExecutor: очередь по ключу общая для всех циклов событий"""
+
+import asyncio
+import threading
+import time
+import pytest
+from utils.blocking_executor import BlockingExecutor
+from utils.exceptions import BlockingCallRejected
+
+
+def test_same_key_serialized_across_event_loops():
+    executor = BlockingExecutor(max_workers=4, max_pending=10, max_pending_per_key=10)
+    active = []
+    overlaps = []
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            active.append(1)
+            overlaps.append(len(active))
+        time.sleep(0.01)
+        with lock:
+            active.pop()
+
+    async def burst():
+        await asyncio.gather(*(executor.run("BTCUSDT", call) for _ in range(3)))
+
+    threads = [threading.Thread(target=lambda: asyncio.run(burst())) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(overlaps) == 6 and max(overlaps) == 1
+    assert executor.get_status()["pending"] == 0
+    assert executor._queues == {}
+
+
+def test_same_key_runs_in_submission_order():
+    executor = BlockingExecutor(max_workers=4, max_pending=10, max_pending_per_key=10)
+    order = []
+
+    async def main():
+        await asyncio.gather(*(executor.run("ETHUSDT", order.append, i) for i in range(5)))
+
+    asyncio.run(main())
+    assert order == [0, 1, 2, 3, 4]
+
+
+def test_per_key_limit_rejects_and_errors_propagate():
+    executor = BlockingExecutor(max_workers=2, max_pending=10, max_pending_per_key=1)
+    release = threading.Event()
+
+    def fail():
+        raise ValueError("boom")
+
+    async def main():
+        blocked = asyncio.ensure_future(executor.run("BTCUSDT", release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(BlockingCallRejected):
+            await executor.run("BTCUSDT", time.time)
+        release.set()
+        await blocked
+        with pytest.raises(ValueError):
+            await executor.run("BTCUSDT", fail)
+
+    asyncio.run(main())
+    assert executor.stats["failed"] == 1 and executor.stats["rejected"] == 1
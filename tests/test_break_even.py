@@ -0,0 +1,112 @@
+"""Break-even: постраничное чтение plan ордеров и пропуск позиций без списка стоп-лоссов"""
+
+import logging
+from types import SimpleNamespace
+import pytest
+from api.bitget_connector import BitgetConnector
+from api.entity.plan_order import PlanOrderRecord
+from config import ExchangeConfig
+from trayding.position_manager import PositionManager
+
+
+def plan_order(order_id, plan_type="loss_plan", trigger_price="90"):
+    return {
+        "orderId": order_id, "clientOid": "", "symbol": "BTCUSDT", "planType": plan_type,
+        "side": "sell", "triggerPrice": trigger_price
+    }
+
+
+def make_connector(pages):
+    connector = BitgetConnector.__new__(BitgetConnector)
+    connector.logger = logging.getLogger("test")
+    connector.requests = []
+
+    def fake_request(method, endpoint, params=None, body=None, operation=""):
+        connector.requests.append(dict(params))
+        return {"success": True, "data": pages.pop(0)}
+
+    connector._safe_api_request = fake_request
+    return connector
+
+
+def test_plan_orders_read_all_pages():
+    connector = make_connector([
+        {"entrustedList": [plan_order("3"), plan_order("2")], "endId": "2"},
+        {"entrustedList": [plan_order("1")], "endId": "1"},
+    ])
+    orders = connector.get_active_plan_orders(plan_type="profit_loss", limit=2)
+
+    assert [order["orderId"] for order in orders] == ["3", "2", "1"]
+    assert "idLessThan" not in connector.requests[0]
+    assert connector.requests[1]["idLessThan"] == "2"
+
+
+def test_plan_orders_over_page_limit_raise(monkeypatch):
+    monkeypatch.setattr(ExchangeConfig, "PLAN_ORDERS_MAX_PAGES", 2)
+    connector = make_connector([
+        {"entrustedList": [plan_order("4")], "endId": "4"},
+        {"entrustedList": [plan_order("3")], "endId": "3"},
+    ])
+
+    with pytest.raises(Exception, match="exceed 2 pages"):
+        connector.get_active_plan_orders(plan_type="profit_loss", limit=1)
+
+
+def test_plan_orders_single_page_for_order_lookup():
+    connector = make_connector([{"entrustedList": [plan_order("3")], "endId": "3"}])
+    orders = connector.get_active_plan_orders(plan_type="profit_loss", order_id="3", limit=1)
+
+    assert len(orders) == 1 and len(connector.requests) == 1
+
+
+def make_position_manager(get_active_plan_orders):
+    pm = PositionManager.__new__(PositionManager)
+    pm.logger = logging.getLogger("test")
+    pm.exchange = SimpleNamespace(get_active_plan_orders=get_active_plan_orders)
+    pm.get_current_prices = lambda symbols, product_type: {"BTCUSDT": 110.0}
+    pm.set_stop_loss = lambda **kwargs: pm.created.append(kwargs)
+    pm.modify_stop_loss_direct = lambda **kwargs: pm.modified.append(kwargs) or {"code": "00000"}
+    pm.created = []
+    pm.modified = []
+    return pm
+
+
+POSITIONS = [{"symbol": "BTCUSDT", "holdSide": "long", "total": "1", "openPriceAvg": "100"}]
+
+
+def test_sweep_skips_positions_when_stop_loss_lookup_fails():
+    def failing_lookup(**kwargs):
+        raise Exception("timeout")
+
+    pm = make_position_manager(failing_lookup)
+    results = pm._break_even_sweep(POSITIONS, 0.03, 0.001, "USDT-FUTURES", "USDT")
+
+    assert pm.created == []
+    assert results["BTCUSDT"][0]["status"] == "error"
+
+
+def test_sweep_creates_stop_loss_when_none_exists():
+    pm = make_position_manager(lambda **kwargs: [])
+    pm._break_even_sweep(POSITIONS, 0.03, 0.001, "USDT-FUTURES", "USDT")
+
+    assert len(pm.created) == 1
+    assert pm.created[0]["hold_side"] == "long"
+
+
+@pytest.mark.parametrize("trigger_price", ["100.1", "104"])
+def test_sweep_keeps_stop_already_at_or_above_break_even(trigger_price):
+    pm = make_position_manager(lambda **kwargs: [PlanOrderRecord.from_api(plan_order("7", trigger_price=trigger_price))])
+    results = pm._break_even_sweep(POSITIONS, 0.03, 0.001, "USDT-FUTURES", "USDT")
+
+    assert pm.modified == [] and pm.created == []
+    assert results["BTCUSDT"][0]["action"] == "kept"
+    assert results["BTCUSDT"][0]["status"] == "success"
+
+
+def test_sweep_raises_stop_below_break_even():
+    pm = make_position_manager(lambda **kwargs: [PlanOrderRecord.from_api(plan_order("7", trigger_price="95"))])
+    pm._break_even_sweep(POSITIONS, 0.03, 0.001, "USDT-FUTURES", "USDT")
+
+    assert len(pm.modified) == 1
+    assert pm.modified[0]["order_id"] == "7"
+    assert pm.modified[0]["new_stop_loss_price"] == pytest.approx(100.1)
@@ -0,0 +1,53 @@
+"""CandleSeries: разбор строк Bitget в колонки и обратно в Candle"""
+
+from api.entity.candle_series import CandleSeries
+
+
+ROWS = [
+    ["1700000000000", "100.5", "101", "99.5", "100.8", "12.5", "1260.0"],
+    ["1700003600000", "100.8", "102", "100.1", "101.9", "7", "713.3"],
+    ["1700007200000", "101.9", "103.5", "101.2", "103.1", "9.25", "953.7"],
+]
+
+
+def test_rows_round_trip_through_candles():
+    series = CandleSeries.from_rows(ROWS)
+    candles = series.candles()
+
+    assert len(series) == 3 and series.skipped == 0
+    assert [c.timestamp for c in candles] == [int(row[0]) for row in ROWS]
+    assert [(c.open, c.high, c.low, c.close, c.volume) for c in candles] == [
+        tuple(float(value) for value in row[1:6]) for row in ROWS
+    ]
+    assert series[1] == candles[1]
+    assert series.candles() is candles
+
+    rebuilt = CandleSeries.from_candles(candles)
+    assert rebuilt.to_dicts() == series.to_dicts()
+    assert series.last_timestamp == 1700007200000
+
+
+def test_closes_column():
+    series = CandleSeries.from_rows(ROWS)
+
+    assert list(series.closes) == [100.8, 101.9, 103.1]
+    assert series.closes.typecode == "d"
+    assert series.timestamps.typecode == "q"
+
+
+def test_malformed_rows_skipped():
+    rows = [ROWS[0], ["1700003600000", "n/a", "1", "1", "1", "1"], ["1700007200000"], ROWS[2]]
+    series = CandleSeries.from_rows(rows)
+
+    assert series.skipped == 2
+    assert list(series.timestamps) == [1700000000000, 1700007200000]
+    assert list(series.closes) == [100.8, 103.1]
+    assert all(len(column) == 2 for column in (series.open, series.high, series.low, series.volume))
+
+
+def test_empty_series():
+    series = CandleSeries.from_rows([])
+
+    assert len(series) == 0
+    assert series.last_timestamp is None
+    assert series.candles() == [] and series.to_dicts() == []
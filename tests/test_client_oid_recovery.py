@@ -0,0 +1,111 @@
+"""Размещение ордера с clientOid: восстановление после неоднозначных ошибок и дубликатов"""
+
+import logging
+import pytest
+from api.bitget_connector import BitgetConnector
+
+
+ENDPOINT = "/api/v2/mix/order/place-order"
+
+
+def make_connector(responses):
+    connector = BitgetConnector.__new__(BitgetConnector)
+    connector.logger = logging.getLogger("test")
+    connector.calls = []
+
+    def fake_request(method, endpoint, params=None, body=None, operation=""):
+        connector.calls.append(body)
+        return responses.pop(0)
+
+    connector._safe_api_request = fake_request
+    return connector
+
+
+def ok(order_id="1"):
+    return {"success": True, "data": {"orderId": order_id}, "code": "00000"}
+
+
+def network_error():
+    return {"success": False, "network_error": True, "message": "timeout"}
+
+
+def duplicate():
+    return {"success": False, "http_status": 400, "code": "40786", "message": "Duplicate clientOid"}
+
+
+def validation_error():
+    return {"success": False, "http_status": 400, "code": "40762", "message": "balance not enough"}
+
+
+@pytest.fixture
+def body():
+    return {"symbol": "BTCUSDT", "clientOid": "oid-1"}
+
+
+def test_success_returned_without_lookup(body):
+    connector = make_connector([ok()])
+    lookup_calls = []
+    result = connector._submit_order(ENDPOINT, body, "place_order", lambda: lookup_calls.append(1))
+
+    assert result["data"]["orderId"] == "1"
+    assert lookup_calls == []
+
+
+def test_validation_error_not_retried(body):
+    connector = make_connector([validation_error()])
+    result = connector._submit_order(ENDPOINT, body, "place_order", lambda: pytest.fail("lookup"))
+
+    assert not result["success"]
+    assert len(connector.calls) == 1
+
+
+def test_ambiguous_failure_recovered_by_lookup(body):
+    connector = make_connector([network_error()])
+    result = connector._submit_order(
+        ENDPOINT, body, "place_order", lambda: {"orderId": "77", "clientOid": "oid-1"}
+    )
+
+    assert result["success"] and result["recovered"]
+    assert result["data"]["orderId"] == "77"
+    assert len(connector.calls) == 1
+
+
+def test_ambiguous_failure_retried_with_same_client_oid(body):
+    connector = make_connector([network_error(), ok("2")])
+    result = connector._submit_order(ENDPOINT, body, "place_order", lambda: None)
+
+    assert result["data"]["orderId"] == "2"
+    assert [call["clientOid"] for call in connector.calls] == ["oid-1", "oid-1"]
+
+
+def test_duplicate_on_first_result_recovered(body):
+    # Внутренний сетевой повтор _make_request получил "дубликат": ордер уже принят
+    connector = make_connector([duplicate()])
+    result = connector._submit_order(
+        ENDPOINT, body, "place_order", lambda: {"orderId": "9", "clientOid": "oid-1"}
+    )
+
+    assert result["success"] and result["data"]["orderId"] == "9"
+    assert len(connector.calls) == 1
+
+
+def test_duplicate_on_retry_recovered(body):
+    lookups = iter([None, {"orderId": "5", "clientOid": "oid-1"}])
+    connector = make_connector([network_error(), duplicate()])
+    result = connector._submit_order(ENDPOINT, body, "place_order", lambda: next(lookups))
+
+    assert result["success"] and result["data"]["orderId"] == "5"
+    assert len(connector.calls) == 2
+
+
+def test_duplicate_without_order_not_resubmitted(body):
+    connector = make_connector([duplicate()])
+    result = connector._submit_order(ENDPOINT, body, "place_order", lambda: None)
+
+    assert not result["success"]
+    assert len(connector.calls) == 1
+
+
+def test_duplicate_matched_by_error_code():
+    assert BitgetConnector._is_duplicate_client_oid({"code": "40786", "message": ""})
+    assert not BitgetConnector._is_duplicate_client_oid({"code": "40762", "message": "balance"})
@@ -0,0 +1,79 @@
+"""ContractMetadataService: пауза перед повторной загрузкой после ошибки; точность по типу продукта"""
+
+import logging
+import time
+from types import SimpleNamespace
+from api.contract_metadata import ContractMetadataService
+from config import ExchangeConfig
+from trayding.position_manager import PositionManager
+
+
+CONTRACT = {"symbol": "BTCUSDT", "pricePlace": "1", "priceEndStep": "1", "volumePlace": "4"}
+
+
+class FlakyConnector:
+    def __init__(self):
+        self.calls = 0
+        self.available = False
+
+    def get_contracts(self, product_type="USDT-FUTURES"):
+        self.calls += 1
+        if not self.available:
+            raise RuntimeError("exchange unavailable")
+        return [CONTRACT]
+
+
+def test_failed_load_is_not_retried_until_backoff(monkeypatch):
+    monkeypatch.setattr(ExchangeConfig, "CONTRACTS_RETRY_DELAY", 0.05)
+    connector = FlakyConnector()
+    contracts = ContractMetadataService(connector)
+
+    assert contracts.get("BTCUSDT") is None
+    assert contracts.size_precision("BTCUSDT") == ExchangeConfig.QUANTITY_PRECISION_MAP["BTC"]
+    assert contracts.round_price("BTCUSDT", 100.04) is None
+    assert connector.calls == 1
+
+    time.sleep(0.06)
+    connector.available = True
+    assert contracts.get("BTCUSDT").price_place == 1
+    assert connector.calls == 2
+
+
+def test_backoff_doubles_after_repeated_failures(monkeypatch):
+    monkeypatch.setattr(ExchangeConfig, "CONTRACTS_RETRY_DELAY", 0.05)
+    connector = FlakyConnector()
+    contracts = ContractMetadataService(connector)
+
+    contracts.get("BTCUSDT")
+    time.sleep(0.06)
+    contracts.get("BTCUSDT")
+    assert connector.calls == 2
+
+    time.sleep(0.06)  # вторая пауза - 0.1 с
+    contracts.get("BTCUSDT")
+    assert connector.calls == 2
+
+
+class DemoConnector:
+    """Контракты демо-счёта есть только в SUSDT-FUTURES"""
+
+    def __init__(self):
+        self.product_types = []
+
+    def get_contracts(self, product_type="USDT-FUTURES"):
+        self.product_types.append(product_type)
+        if product_type != "SUSDT-FUTURES":
+            return []
+        return [{"symbol": "SBTCSUSDT", "pricePlace": "3", "priceEndStep": "1", "volumePlace": "5"}]
+
+
+def test_precision_uses_caller_product_type():
+    connector = DemoConnector()
+    pm = PositionManager.__new__(PositionManager)
+    pm.logger = logging.getLogger("test")
+    pm.exchange = SimpleNamespace(contracts=ContractMetadataService(connector))
+
+    assert pm.get_price_precision("SBTCSUSDT", "susdt-futures") == 3
+    assert pm.get_size_precision("SBTCSUSDT", "SUSDT-FUTURES") == 5
+    assert pm.round_order_size(0.1234567, "SBTCSUSDT", "SUSDT-FUTURES") == "0.12346"
+    assert connector.product_types == ["SUSDT-FUTURES"]
@@ -0,0 +1,124 @@
+"""Хеджированные GET: порог запасного запроса, бюджет и выбор первого ответа"""
+
+import logging
+import threading
+import pytest
+import api.bitget_connector as bitget_connector
+from api.bitget_connector import BitgetConnector
+from api.hedging import HedgeBudget, RequestHedger
+from config import HedgingConfig
+
+
+class FakeMonitor:
+    def __init__(self, latency_ms):
+        self.latency_ms = latency_ms
+        self.calls = []
+
+    def get_latency_percentile(self, q, endpoint=None, operation=None, min_samples=1):
+        self.calls.append((q, endpoint, min_samples))
+        return self.latency_ms
+
+
+class RecordingHedger:
+    def __init__(self):
+        self.delays = []
+
+    def execute(self, request, hedge_after_seconds):
+        self.delays.append(hedge_after_seconds)
+        return request()
+
+
+@pytest.fixture
+def hedged_read(monkeypatch):
+    monkeypatch.setattr(HedgingConfig, "ENABLED", True)
+    hedger = RecordingHedger()
+    monkeypatch.setattr(bitget_connector, "get_request_hedger", lambda: hedger)
+
+    def read(latency_ms):
+        connector = BitgetConnector.__new__(BitgetConnector)
+        connector.logger = logging.getLogger("test")
+        connector.api_monitor = FakeMonitor(latency_ms)
+        connector._safe_api_request = lambda *args, **kwargs: {"success": True}
+        connector._read_request("/api/v2/mix/market/ticker", {}, "fetch_ticker")
+        return connector.api_monitor.calls[0], hedger.delays[-1]
+
+    return read
+
+
+@pytest.mark.parametrize("latency_ms, expected", [
+    (20.0, HedgingConfig.MIN_HEDGE_DELAY_MS / 1000),
+    (800.0, 0.8),
+    (60000.0, HedgingConfig.MAX_HEDGE_DELAY_MS / 1000),
+    (None, None),
+])
+def test_hedge_delay_clamped(hedged_read, latency_ms, expected):
+    (q, _, min_samples), delay = hedged_read(latency_ms)
+
+    assert delay == expected
+    assert 0 < q < 1
+    assert min_samples == HedgingConfig.MIN_SAMPLES
+
+
+def test_budget_exhausted_after_burst():
+    budget = HedgeBudget(rate=0.0, burst=2)
+
+    assert budget.try_acquire() and budget.try_acquire()
+    assert not budget.try_acquire()
+
+
+def test_budget_refills_at_rate():
+    budget = HedgeBudget(rate=1.0, burst=1)
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+
+    budget._updated -= 1.0
+    assert budget.try_acquire()
+
+
+def slow_then_fast(release: threading.Event):
+    """Первый вызов ждёт release, следующие отвечают сразу"""
+    calls = []
+
+    def request():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)
+            return {"success": True, "source": "primary"}
+        return {"success": True, "source": "hedge"}
+
+    return request, calls
+
+
+def test_hedge_wins_over_slow_primary():
+    hedger = RequestHedger(budget=HedgeBudget(rate=0.0, burst=1), max_workers=2)
+    release = threading.Event()
+    request, calls = slow_then_fast(release)
+    try:
+        result = hedger.execute(request, 0.01)
+    finally:
+        release.set()
+
+    assert result["source"] == "hedge"
+    assert len(calls) == 2
+    assert hedger.stats["hedges_sent"] == 1 and hedger.stats["hedges_won"] == 1
+
+
+def test_no_hedge_without_budget():
+    hedger = RequestHedger(budget=HedgeBudget(rate=0.0, burst=0), max_workers=2)
+    release = threading.Event()
+    request, calls = slow_then_fast(release)
+    threading.Timer(0.05, release.set).start()
+
+    result = hedger.execute(request, 0.01)
+
+    assert result["source"] == "primary"
+    assert len(calls) == 1
+    assert hedger.stats["hedges_skipped"] == 1 and hedger.stats["hedges_sent"] == 0
+
+
+def test_fast_primary_sends_no_hedge():
+    hedger = RequestHedger(budget=HedgeBudget(rate=0.0, burst=1), max_workers=2)
+    result = hedger.execute(lambda: {"success": True, "source": "primary"}, 1.0)
+
+    assert result["source"] == "primary"
+    assert hedger.stats["hedges_sent"] == 0
@@ -0,0 +1,112 @@
+"""MetricsRegistry: агрегация сэмплов и счётчики ушедших источников"""
+
+import gc
+import pytest
+import threading
+import weakref
+from utils.metrics_exporter import MetricSample, MetricsRegistry
+import utils.monitoring as monitoring
+from utils.monitoring import APIMonitor
+
+
+class Source:
+    def __init__(self, errors, queue_depth):
+        self.errors = errors
+        self.queue_depth = queue_depth
+
+    def collect_metrics(self):
+        return [
+            MetricSample("bot_errors", "counter", "Errors", self.errors, {}, "_total"),
+            MetricSample("bot_queue_depth", "gauge", "Queue depth", self.queue_depth, {}),
+        ]
+
+
+def test_counters_summed_gauges_not():
+    registry = MetricsRegistry()
+    sources = [Source(2, 3), Source(5, 7)]
+    for source in sources:
+        registry.register(source)
+
+    text = registry.render()
+    assert "bot_errors_total 7\n" in text
+    assert "bot_queue_depth 7\n" in text
+
+
+def test_counters_of_collected_source_kept():
+    registry = MetricsRegistry()
+    survivor = Source(1, 1)
+    registry.register(survivor)
+    gone = Source(4, 9)
+    registry.register(gone)
+    registry.render()
+
+    del gone
+    gc.collect()
+
+    text = registry.render()
+    assert "bot_errors_total 5\n" in text
+    assert "bot_queue_depth 1\n" in text
+
+    registry.unregister(survivor)
+    assert "bot_errors_total 5\n" in registry.render()
+
+
+def test_flusher_does_not_keep_monitor_alive(tmp_path):
+    monitor = APIMonitor(monitoring_file=str(tmp_path / "monitoring.json"), save_interval=60)
+    monitor_ref = weakref.ref(monitor)
+
+    del monitor
+    gc.collect()
+
+    assert monitor_ref() is None
+
+
+def test_collected_monitor_saves_pending_requests(tmp_path):
+    path = tmp_path / "monitoring.json"
+    monitor = APIMonitor(monitoring_file=str(path), save_interval=60)
+    monitor.record_request(True, 10.0)
+
+    del monitor
+    gc.collect()
+
+    assert path.exists()
+
+
+def test_one_flusher_thread_for_all_monitors(tmp_path):
+    monitors = [
+        APIMonitor(monitoring_file=str(tmp_path / f"monitoring{i}.json"), save_interval=60)
+        for i in range(3)
+    ]
+    flushers = [t for t in threading.enumerate() if t.name == "APIMonitorFlusher"]
+
+    assert len(flushers) == 1
+    for monitor in monitors:
+        monitor.stop_flusher(final_flush=False)
+
+
+def test_exit_hook_flushes_running_monitors(tmp_path):
+    path = tmp_path / "monitoring.json"
+    monitor = APIMonitor(monitoring_file=str(path), save_interval=60)
+    monitor.record_request(True, 10.0)
+
+    monitoring._flush_all_at_exit()
+
+    assert path.exists()
+    assert monitor._flushed_requests_count == 1
+    assert monitor not in monitoring._flush_monitors
+
+
+def test_session_latency_from_bounded_histogram(tmp_path):
+    monitor = APIMonitor(monitoring_file=str(tmp_path / "monitoring.json"), auto_flush=False)
+    for latency_ms in range(1, 1001):
+        monitor.record_request(True, float(latency_ms))
+
+    latency = monitor.get_metrics()["latency"]
+
+    assert not hasattr(monitor, "latencies")
+    assert len(monitor.recent_latencies) == 10
+    assert latency["min_ms"] == 1.0 and latency["max_ms"] == 1000.0
+    assert latency["average_ms"] == pytest.approx(500.5)
+    assert latency["median_ms"] == pytest.approx(500, rel=0.05)
+    assert latency["p95_ms"] == pytest.approx(950, rel=0.05)
+    assert latency["p99_ms"] <= 1000.0
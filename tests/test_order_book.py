@@ -0,0 +1,156 @@
+"""OrderBook: снимок, изменения, контрольная сумма, VWAP; переподписка и проверка проскальзывания"""
+
+import asyncio
+import zlib
+import pytest
+from api.bitget_websocket import BitgetWebSocketClient
+from api.order_book import OrderBook, OrderBookStore
+from utils.safety_checks import SafetyValidator
+
+
+SNAPSHOT = {
+    "bids": [["99.5", "2"], ["99", "3"], ["100", "1"]],
+    "asks": [["101", "1"], ["100.5", "2"], ["102", "5"]],
+    "seq": "10",
+    "ts": "1000",
+}
+
+
+def bitget_checksum(bids, asks):
+    """Независимый расчёт по описанию Bitget: bid1:ask1:bid2:ask2..."""
+    parts = []
+    for i in range(25):
+        if i < len(bids):
+            parts.append(":".join(bids[i]))
+        if i < len(asks):
+            parts.append(":".join(asks[i]))
+    value = zlib.crc32(":".join(parts).encode())
+    return value - (1 << 32) if value >= (1 << 31) else value
+
+
+@pytest.fixture
+def book():
+    book = OrderBook("BTCUSDT")
+    book.apply_snapshot(SNAPSHOT)
+    return book
+
+
+def test_snapshot_sorts_levels(book):
+    assert book.synced
+    assert book.best_bid() == (100.0, 1.0)
+    assert book.best_ask() == (100.5, 2.0)
+    assert book.mid_price() == pytest.approx(100.25)
+    assert book.spread() == pytest.approx(0.5)
+    assert book.depth(2) == {"bids": [(100.0, 1.0), (99.5, 2.0)], "asks": [(100.5, 2.0), (101.0, 1.0)]}
+    assert book.seq == 10 and len(book) == 6
+
+
+def test_update_changes_and_removes_levels(book):
+    bids = [["100", "1"], ["99", "3"]]
+    asks = [["100.5", "4"], ["101", "1"], ["102", "5"]]
+    update = {
+        "bids": [["99.5", "0"]],
+        "asks": [["100.5", "4"]],
+        "checksum": str(bitget_checksum(bids, asks)),
+    }
+
+    assert book.apply_update(update)
+    assert book.depth(5) == {
+        "bids": [(100.0, 1.0), (99.0, 3.0)],
+        "asks": [(100.5, 4.0), (101.0, 1.0), (102.0, 5.0)],
+    }
+
+
+def test_checksum_mismatch_unsyncs(book):
+    assert not book.apply_update({"bids": [["99.9", "1"]], "checksum": "12345"})
+    assert not book.synced
+    assert not book.apply_update({"bids": [["99.8", "1"]]})
+
+
+def test_checksum_keeps_exchange_strings():
+    book = OrderBook("BTCUSDT")
+    book.apply_snapshot({"bids": [["100.10", "1.500"]], "asks": [["100.20", "2"]]})
+    assert book.checksum() == bitget_checksum([["100.10", "1.500"]], [["100.20", "2"]])
+
+
+def test_vwap_and_slippage(book):
+    avg_price, filled = book.vwap("buy", 3)
+    assert filled == 3
+    assert avg_price == pytest.approx((2 * 100.5 + 101) / 3)
+    assert book.slippage("buy", 3) == pytest.approx((avg_price - 100.5) / 100.5)
+    assert book.price_for_size("sell", 2.5) == 99.5
+    assert book.depth_to_price("sell", 99.5) == 3.0
+
+    avg_price, filled = book.vwap("buy", 100)
+    assert filled == 8
+    assert book.slippage("buy", 100) is None
+
+
+def test_store_returns_only_synced_fresh_books():
+    store = OrderBookStore(max_age=60)
+    assert store.get("BTCUSDT") is None
+
+    book = store.book("BTCUSDT", "books15")
+    assert store.get("BTCUSDT") is None
+    book.apply_snapshot(SNAPSHOT)
+    assert store.get("BTCUSDT") is book and not book.full_depth
+
+
+# ----- WebSocket: один запрос снимка на расхождение -----
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+
+def test_checksum_failure_resubscribes_once_until_snapshot():
+    async def scenario():
+        client = BitgetWebSocketClient(order_books=OrderBookStore(max_age=60))
+        client.websocket = FakeSocket()
+        client.is_connected = True
+        client.book_subscriptions["BTCUSDT"] = "books"
+
+        def message(action, data):
+            return {"arg": {"channel": "books", "instId": "BTCUSDT"}, "action": action, "data": [data]}
+
+        client._handle_books_data(message("snapshot", SNAPSHOT))
+        for _ in range(5):
+            client._handle_books_data(message("update", {"bids": [["99.9", "1"]], "checksum": "1"}))
+        await asyncio.sleep(0)
+
+        assert client.stats["book_resyncs"] == 1
+        assert len(client.websocket.sent) == 2  # unsubscribe + subscribe
+
+        client._handle_books_data(message("snapshot", SNAPSHOT))
+        assert client.order_books.get("BTCUSDT") is not None
+        client._handle_books_data(message("update", {"bids": [["99.9", "1"]], "checksum": "1"}))
+        await asyncio.sleep(0)
+        assert client.stats["book_resyncs"] == 2
+
+    asyncio.run(scenario())
+
+
+# ----- Проверка проскальзывания -----
+
+class FakeExchange:
+    def __init__(self, channel):
+        self.order_books = OrderBookStore(max_age=60)
+        self.order_books.book("BTCUSDT", channel).apply_snapshot(SNAPSHOT)
+
+
+def test_slippage_shallow_full_book_is_error():
+    result = SafetyValidator(FakeExchange("books")).validate_slippage("BTCUSDT", "buy", 100)
+    assert not result["valid"]
+
+
+def test_slippage_shallow_partial_book_only_warns():
+    result = SafetyValidator(FakeExchange("books15")).validate_slippage("BTCUSDT", "buy", 100)
+    assert result["valid"] and result["warnings"]
+
+
+def test_slippage_over_limit_is_error():
+    result = SafetyValidator(FakeExchange("books15")).validate_slippage("BTCUSDT", "buy", 8, max_slippage=0.001)
+    assert not result["valid"]
@@ -0,0 +1,147 @@
+"""PnLEngine: сверка позиций с биржей и запуск монитора из работающего цикла"""
+
+import asyncio
+import logging
+import pytest
+from types import SimpleNamespace
+from trayding.pnl_engine import PnLEngine
+from trayding.position_manager import PositionManager
+
+
+def position(symbol="BTCUSDT", total="1", upnl="5"):
+    return {
+        "symbol": symbol, "holdSide": "long", "total": total, "openPriceAvg": "100",
+        "markPrice": "105", "unrealizedPL": upnl, "achievedProfits": "0", "marginSize": "10",
+        "leverage": 10
+    }
+
+
+def make_engine(get_positions):
+    pm = SimpleNamespace(exchange=SimpleNamespace(get_positions=get_positions))
+    return PnLEngine(pm)
+
+
+def test_sync_replaces_positions():
+    responses = [[position()], [position("ETHUSDT", upnl="2")]]
+    engine = make_engine(lambda *args: responses.pop(0))
+
+    asyncio.run(engine.sync_positions())
+    asyncio.run(engine.sync_positions())
+
+    assert engine._symbols == ["ETHUSDT"]
+    assert engine.total_unrealized_pnl == 2.0
+
+
+def test_failed_sync_keeps_positions():
+    responses = [[position()], RuntimeError("timeout")]
+
+    def get_positions(*args):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    engine = make_engine(get_positions)
+    asyncio.run(engine.sync_positions())
+    with pytest.raises(RuntimeError):
+        asyncio.run(engine.sync_positions())
+
+    assert engine._symbols == ["BTCUSDT"]
+    assert engine.total_unrealized_pnl == 5.0
+
+
+def test_realtime_monitor_scheduled_on_running_loop():
+    pm = PositionManager.__new__(PositionManager)
+    pm.logger = logging.getLogger("test")
+    calls = []
+
+    async def fake_monitor(*args):
+        calls.append(args)
+
+    pm._run_pnl_monitor = fake_monitor
+
+    async def main():
+        task = pm.start_realtime_pnl_monitor("BTCUSDT", max_iterations=1)
+        assert isinstance(task, asyncio.Task)
+        await task
+
+    asyncio.run(main())
+    assert len(calls) == 1
+
+
+def short_position(symbol="BTCUSDT"):
+    return {**position(symbol, upnl="0"), "holdSide": "short", "markPrice": "100"}
+
+
+def test_mark_price_updates_totals_by_delta():
+    engine = make_engine(None)
+    engine.set_positions([position(upnl="5"), short_position("ETHUSDT")])
+
+    assert engine.on_mark_price("BTCUSDT", 110.0)
+    assert engine.on_mark_price("ETHUSDT", 90.0)
+    assert not engine.on_mark_price("XRPUSDT", 1.0)
+
+    assert engine.total_unrealized_pnl == pytest.approx(10.0 + 10.0)
+    assert engine.on_mark_price("ETHUSDT", 104.0)
+    assert engine.total_unrealized_pnl == pytest.approx(10.0 - 4.0)
+    assert engine.stats["mark_updates"] == 3
+
+
+def test_snapshot_pnl_and_roe():
+    engine = make_engine(None)
+    engine.set_positions([position(), short_position("ETHUSDT")])
+    engine.on_mark_price("BTCUSDT", 110.0)
+    engine.on_mark_price("ETHUSDT", 95.0)
+
+    snapshot = engine.snapshot()
+    long_row, short_row = snapshot["positions"]
+
+    assert long_row["pnl_percent"] == pytest.approx(10.0)
+    assert long_row["roe_percent"] == pytest.approx(100.0)
+    assert short_row["side"] == "short"
+    assert short_row["pnl_percent"] == pytest.approx(5.0)
+    assert short_row["roe_percent"] == pytest.approx(50.0)
+    assert snapshot["total_unrealized_pnl"] == pytest.approx(15.0)
+
+
+def test_throttled_publish_delivers_last_tick():
+    engine = make_engine(None)
+    engine.publish_interval = 0.05
+    engine.set_positions([position()])
+    published = []
+    engine.subscribe(lambda snapshot: published.append(snapshot["total_unrealized_pnl"]))
+
+    async def main():
+        for price in (101.0, 102.0, 103.0):
+            engine.on_mark_price("BTCUSDT", price)
+            await engine._publish()
+        assert published == [1.0]
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert published == [1.0, 3.0]
+
+
+def test_stop_cancels_pending_publish():
+    engine = make_engine(None)
+    engine.publish_interval = 0.05
+    engine.set_positions([position()])
+    published = []
+    engine.subscribe(lambda snapshot: published.append(snapshot))
+
+    async def disconnect():
+        pass
+
+    engine.ws_client.disconnect = disconnect
+
+    async def main():
+        engine.is_active = True
+        await engine._publish()
+        await engine._publish()
+        assert engine._publish_handle is not None
+        await engine.stop()
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert len(published) == 1
+    assert engine._publish_handle is None
@@ -0,0 +1,38 @@
+"""PriceSnapshotService: свежесть цен после неудачной загрузки и тики во время запроса"""
+
+import time
+from api.entity.ticker import TickerRecord
+from api.price_snapshot import PriceSnapshotService
+
+
+class FakeConnector:
+    def __init__(self):
+        self.tickers = [{"symbol": "BTCUSDT", "lastPr": "100"}]
+        self.error = None
+        self.during_request = None
+
+    def fetch_tickers(self, product_type="USDT-FUTURES"):
+        if self.during_request:
+            self.during_request()
+        if self.error:
+            raise self.error
+        return self.tickers
+
+
+def test_failed_refresh_does_not_return_stale_price():
+    connector = FakeConnector()
+    snapshot = PriceSnapshotService(connector, max_age=0.05)
+    assert snapshot.get_price("BTCUSDT") == 100.0
+
+    time.sleep(0.06)
+    connector.error = RuntimeError("timeout")
+    assert snapshot.get_price("BTCUSDT") is None
+
+
+def test_websocket_tick_during_refresh_wins():
+    connector = FakeConnector()
+    snapshot = PriceSnapshotService(connector, max_age=5)
+    connector.during_request = lambda: snapshot.update(TickerRecord("BTCUSDT", 101.0, 0, 0, 0, 0))
+
+    assert snapshot.refresh()
+    assert snapshot.get_price("BTCUSDT") == 101.0
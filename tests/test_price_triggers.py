@@ -0,0 +1,72 @@
+"""PriceTriggerIndex.check: границы уровней, порядок и повторная установка"""
+
+import pytest
+from trayding.price_triggers import PriceTriggerIndex
+
+
+@pytest.fixture
+def index():
+    index = PriceTriggerIndex()
+    for level in (101.0, 102.0, 103.0):
+        index.add_level("BTCUSDT", "up", level, f"up-{level}")
+    for level in (97.0, 98.0, 99.0):
+        index.add_level("BTCUSDT", "down", level, f"down-{level}")
+    return index
+
+
+def owners(fired):
+    return sorted(trigger.owner for trigger in fired)
+
+
+def test_price_between_levels_fires_nothing(index):
+    assert index.check("BTCUSDT", 100.0) == []
+    assert len(index) == 6
+
+
+def test_up_level_fires_at_exact_price(index):
+    assert owners(index.check("BTCUSDT", 101.0)) == ["up-101.0"]
+    assert index.nearest("BTCUSDT") == {"up": 102.0, "down": 99.0}
+
+
+def test_down_level_fires_at_exact_price(index):
+    assert owners(index.check("BTCUSDT", 99.0)) == ["down-99.0"]
+    assert index.nearest("BTCUSDT") == {"up": 101.0, "down": 98.0}
+
+
+def test_just_below_and_above_boundaries(index):
+    assert index.check("BTCUSDT", 100.999999) == []
+    assert index.check("BTCUSDT", 99.000001) == []
+
+
+def test_gap_fires_every_crossed_level(index):
+    assert owners(index.check("BTCUSDT", 102.5)) == ["up-101.0", "up-102.0"]
+    assert owners(index.check("BTCUSDT", 96.0)) == ["down-97.0", "down-98.0", "down-99.0"]
+    assert index.nearest("BTCUSDT") == {"up": 103.0}
+
+
+def test_equal_levels_fire_together(index):
+    index.add_level("BTCUSDT", "up", 101.0, "second")
+    assert owners(index.check("BTCUSDT", 101.0)) == ["second", "up-101.0"]
+
+
+def test_fired_triggers_are_removed_until_rearmed(index):
+    fired = index.check("BTCUSDT", 101.0)
+    assert index.check("BTCUSDT", 101.0) == []
+    index.rearm(fired)
+    assert owners(index.check("BTCUSDT", 101.0)) == ["up-101.0"]
+
+
+def test_symbol_removed_when_empty():
+    index = PriceTriggerIndex()
+    index.add_level("ETHUSDT", "up", 10.0)
+    assert "ETHUSDT" in index
+    assert len(index.check("ETHUSDT", 10.0)) == 1
+    assert "ETHUSDT" not in index
+    assert index.check("ETHUSDT", 10.0) == []
+    assert index.nearest("ETHUSDT") == {}
+
+
+def test_discard_by_owner(index):
+    index.discard("BTCUSDT", lambda trigger: trigger.owner.startswith("up"))
+    assert index.nearest("BTCUSDT") == {"down": 99.0}
+    assert index.check("BTCUSDT", 1000.0) == []
@@ -0,0 +1,99 @@
+"""Политика повторов: безопасность повтора, full jitter, вложенные дедлайны и отмена"""
+
+import threading
+import time
+import pytest
+import api.api_client as api_client
+from api.api_client import APIClient
+from api.retry_policy import Deadline, RetryPolicy, cancel_scope, is_retry_safe, request_deadline
+from utils.exceptions import RequestDeadlineExceeded
+
+
+def policy(**overrides):
+    params = dict(
+        name="test", max_attempts=3, deadline_seconds=5.0, base_delay=0.1, max_delay=0.5,
+        connect_timeout=1.0, read_timeout=1.0
+    )
+    params.update(overrides)
+    return RetryPolicy(**params)
+
+
+class Client(APIClient):
+    def _sign(self, message):
+        return "signature"
+
+    def _get_headers(self, timestamp, signature, method, body_str):
+        return {}
+
+
+@pytest.mark.parametrize("method, body, expected", [
+    ("GET", None, True),
+    ("POST", {"symbol": "BTCUSDT"}, False),
+    ("POST", {"symbol": "BTCUSDT", "clientOid": "abc"}, True),
+    ("POST", None, False),
+])
+def test_is_retry_safe(method, body, expected):
+    assert is_retry_safe(method, body) is expected
+
+
+def test_backoff_full_jitter_bounds(monkeypatch):
+    caps = []
+    monkeypatch.setattr("api.retry_policy.random.uniform", lambda low, high: caps.append((low, high)) or high)
+
+    delays = [policy().backoff_delay(attempt) for attempt in range(5)]
+
+    assert caps == [(0, 0.1), (0, 0.2), (0, 0.4), (0, 0.5), (0, 0.5)]
+    assert delays == [0.1, 0.2, 0.4, 0.5, 0.5]
+
+
+def test_nested_deadline_capped_by_outer():
+    with request_deadline(0.5) as outer:
+        with request_deadline(60) as inner:
+            assert inner.expires_at == outer.expires_at
+        with request_deadline(0.1) as shorter:
+            assert shorter.expires_at < outer.expires_at
+
+
+def test_cancel_interrupts_wait():
+    cancel = threading.Event()
+    with cancel_scope(cancel), request_deadline(10) as deadline:
+        threading.Timer(0.05, cancel.set).start()
+        started = time.monotonic()
+
+        assert deadline.wait(5) is False
+        assert deadline.cancelled()
+        assert time.monotonic() - started < 1
+
+
+def test_exhausted_deadline_sends_no_request(monkeypatch):
+    calls = []
+    monkeypatch.setattr(api_client.requests, "get", lambda *args, **kwargs: calls.append(kwargs))
+    # Бюджет истекает между проверкой цикла и расчётом таймаута
+    monkeypatch.setattr(Deadline, "expired", lambda self: False)
+    client = Client("https://example.test", "key", "secret")
+
+    with request_deadline(0):
+        with pytest.raises(RequestDeadlineExceeded):
+            client._make_request("GET", "/api/v2/public/time", policy=policy())
+
+    assert calls == []
+
+
+def test_cancelled_request_not_retried(monkeypatch):
+    cancel = threading.Event()
+    calls = []
+
+    def timeout(*args, **kwargs):
+        calls.append(kwargs["timeout"])
+        cancel.set()
+        raise api_client.requests.exceptions.Timeout("slow")
+
+    monkeypatch.setattr(api_client.requests, "get", timeout)
+    client = Client("https://example.test", "key", "secret")
+
+    with cancel_scope(cancel):
+        with pytest.raises(RequestDeadlineExceeded):
+            client._make_request("GET", "/api/v2/public/time", policy=policy())
+
+    assert len(calls) == 1
+    assert all(0 < value <= 1.0 for value in calls[0])
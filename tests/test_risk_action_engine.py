@@ -0,0 +1,230 @@
+"""RiskActionEngine: жизненный цикл правил, закрытия в режиме хеджа, сверка позиций"""
+
+import asyncio
+from types import SimpleNamespace
+import pytest
+import logging
+from trayding.position_manager import PositionManager
+from trayding.risk_action_engine import BreakEvenMonitor, RiskActionEngine
+from trayding.risk_rules import BreakEvenRule, PartialTakeProfitRule, TrailingStopRule
+
+
+SYMBOL = "BTCUSDT"
+
+
+def position(hold_side="long", total="1", entry="100"):
+    return {"symbol": SYMBOL, "holdSide": hold_side, "total": total, "openPriceAvg": entry, "cTime": "0"}
+
+
+class FakePositionManager:
+    def __init__(self):
+        self.exchange = SimpleNamespace(prices=None, order_books=None, get_positions=self.get_positions)
+        self.exchange_positions = []
+        self.positions_error = None
+        self.closes = []
+
+    def get_positions(self, symbol="", product_type="USDT-FUTURES", margin_coin="USDT"):
+        if self.positions_error:
+            raise self.positions_error
+        return list(self.exchange_positions)
+
+    def get_current_positions(self, symbol="", product_type="USDT-FUTURES", margin_coin="USDT"):
+        return list(self.exchange_positions)
+
+    def close_position_partial(self, symbol, close_type, close_value, product_type="USDT-FUTURES",
+                               margin_coin="USDT", hold_side="", **kwargs):
+        self.closes.append({"kind": "partial", "hold_side": hold_side, "close_value": close_value})
+        size = next(float(p["total"]) for p in self.exchange_positions if p["holdSide"] == hold_side)
+        return {"success": True, "close_quantity": size * close_value}
+
+    def close_position_full(self, symbol, product_type="USDT-FUTURES", margin_coin="USDT", hold_side="", **kwargs):
+        self.closes.append({"kind": "full", "hold_side": hold_side})
+        return {"success": True}
+
+    def auto_break_even(self, symbol, profit_threshold=0.03, buffer_percent=0.001,
+                        product_type="USDT-FUTURES", margin_coin="USDT", hold_side=""):
+        self.closes.append({"kind": "break_even", "hold_side": hold_side, "threshold": profit_threshold})
+        return {"success": True, "break_even_activated": 1, "details": []}
+
+
+@pytest.fixture
+def pm():
+    return FakePositionManager()
+
+
+@pytest.fixture
+def engine(pm):
+    engine = RiskActionEngine(pm)
+    engine.is_active = True
+
+    async def subscribe_ticker(symbol, callback):
+        return True
+
+    engine.ws_client.subscribe_ticker = subscribe_ticker
+    return engine
+
+
+async def tick(engine, price):
+    await engine._on_ticker({"symbol": SYMBOL, "last_price": price})
+    for _ in range(200):
+        if not engine._in_flight:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("действие риск-движка не завершилось")
+
+
+def test_partial_take_profit_ladder_lifecycle(engine, pm):
+    async def scenario():
+        pm.exchange_positions = [position()]
+        rule = PartialTakeProfitRule([(0.02, 0.5), (0.04, 0.5)])
+        assert await engine.add_position(SYMBOL, [rule], positions=pm.exchange_positions)
+        assert engine.triggers.nearest(SYMBOL) == {"up": pytest.approx(102.0)}
+
+        await tick(engine, 101.0)
+        assert pm.closes == []
+
+        await tick(engine, 102.5)
+        assert pm.closes == [{"kind": "partial", "hold_side": "long", "close_value": 0.5}]
+        state = engine.positions[SYMBOL][0]
+        assert state.size == pytest.approx(0.5)
+        assert engine.triggers.nearest(SYMBOL) == {"up": pytest.approx(104.0)}
+
+        pm.exchange_positions = [position(total="0.5")]
+        await tick(engine, 104.5)
+        assert pm.closes[-1]["close_value"] == pytest.approx(1.0)
+        assert SYMBOL not in engine.positions
+        assert engine.stats["actions_applied"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_hedge_mode_closes_only_triggered_side(engine, pm):
+    async def scenario():
+        pm.exchange_positions = [position("long"), position("short")]
+        rule = TrailingStopRule(activation_profit=0.02, callback_rate=0.01)
+        assert await engine.add_position(SYMBOL, [rule], positions=pm.exchange_positions)
+
+        await tick(engine, 97.0)   # short в прибыли - трейлинг активирован
+        await tick(engine, 98.5)   # откат > 1% от лучшей цены
+        assert pm.closes == [{"kind": "full", "hold_side": "short"}]
+        assert [state.hold_side for state in engine.positions[SYMBOL]] == ["long"]
+
+    asyncio.run(scenario())
+
+
+def test_failed_action_is_retried_after_cooldown(engine, pm):
+    async def scenario():
+        pm.exchange_positions = [position()]
+        rule = TrailingStopRule(activation_profit=0.02, callback_rate=0.01)
+        rule.cooldown = 0.0
+        pm.close_position_full = lambda **kwargs: {"success": False, "error": "rejected"}
+        assert await engine.add_position(SYMBOL, [rule], positions=pm.exchange_positions)
+
+        await tick(engine, 103.0)
+        await tick(engine, 101.0)
+        assert engine.stats["actions_failed"] == 1
+        assert not engine.positions[SYMBOL][0].closed
+
+        pm.close_position_full = lambda **kwargs: {"success": True}
+        await tick(engine, 101.0)
+        assert SYMBOL not in engine.positions
+
+    asyncio.run(scenario())
+
+
+def test_sync_updates_entry_and_rearms(engine, pm):
+    async def scenario():
+        pm.exchange_positions = [position()]
+        assert await engine.add_position(
+            SYMBOL, [PartialTakeProfitRule([(0.02, 0.5)])], positions=pm.exchange_positions
+        )
+
+        pm.exchange_positions = [position(total="2", entry="90")]
+        assert await engine.sync_positions() == {"synced": 1, "gone": 0}
+        state = engine.positions[SYMBOL][0]
+        assert (state.size, state.entry_price, state.initial_size) == (2.0, 90.0, 2.0)
+        assert engine.triggers.nearest(SYMBOL) == {"up": pytest.approx(91.8)}
+
+    asyncio.run(scenario())
+
+
+def test_sync_drops_closed_position_but_not_on_error(engine, pm):
+    async def scenario():
+        pm.exchange_positions = [position()]
+        assert await engine.add_position(
+            SYMBOL, [PartialTakeProfitRule([(0.02, 0.5)])], positions=pm.exchange_positions
+        )
+
+        pm.positions_error = RuntimeError("timeout")
+        with pytest.raises(RuntimeError):
+            await engine.sync_positions()
+        assert SYMBOL in engine.positions
+
+        pm.positions_error = None
+        pm.exchange_positions = []
+        assert await engine.sync_positions() == {"synced": 0, "gone": 1}
+        assert SYMBOL not in engine.positions
+        assert len(engine.triggers) == 0
+
+    asyncio.run(scenario())
+
+
+def test_break_even_rule_acts_on_its_side_only(engine, pm):
+    async def scenario():
+        pm.exchange_positions = [position("long"), position("short")]
+        assert await engine.add_position(SYMBOL, [BreakEvenRule(0.02)], positions=pm.exchange_positions)
+
+        await tick(engine, 103.0)
+        assert pm.closes == [{"kind": "break_even", "hold_side": "long", "threshold": 0.02}]
+        # long завершил правило и снят с наблюдения, short ждёт своего уровня
+        [short_state] = engine.positions[SYMBOL]
+        assert short_state.hold_side == "short" and not short_state.done
+
+    asyncio.run(scenario())
+
+
+def test_auto_break_even_filters_hold_side():
+    manager = PositionManager.__new__(PositionManager)
+    manager.logger = logging.getLogger("test")
+    manager.get_current_positions = lambda **kwargs: [position("long"), position("short")]
+    swept = []
+    manager._break_even_sweep = lambda positions, *args, **kwargs: swept.extend(positions) or {}
+
+    manager.auto_break_even(SYMBOL, hold_side="short")
+    assert [pos["holdSide"] for pos in swept] == ["short"]
+
+
+def test_re_adding_rule_replaces_it(engine, pm):
+    async def scenario():
+        pm.exchange_positions = [position()]
+        assert await engine.add_position(SYMBOL, [BreakEvenRule(0.02, owner="m")], positions=pm.exchange_positions)
+        assert await engine.add_position(SYMBOL, [BreakEvenRule(0.05, owner="m")], positions=pm.exchange_positions)
+
+        state = engine.positions[SYMBOL][0]
+        assert [rule.profit_threshold for rule in state.rules] == [0.05]
+        assert engine.triggers.nearest(SYMBOL) == {"up": pytest.approx(105.0)}
+
+        await tick(engine, 103.0)
+        assert pm.closes == []
+
+    asyncio.run(scenario())
+
+
+def test_monitors_keep_their_own_rules(engine, pm):
+    async def scenario():
+        pm.exchange_positions = [position()]
+        first, second = BreakEvenMonitor(pm, engine), BreakEvenMonitor(pm, engine)
+        first.is_active = second.is_active = True
+
+        assert await first.add(SYMBOL, 0.02, positions=pm.exchange_positions)
+        assert await second.add(SYMBOL, 0.04, positions=pm.exchange_positions)
+        await first.stop()
+
+        state = engine.positions[SYMBOL][0]
+        assert [(rule.owner, rule.profit_threshold) for rule in state.rules] == [(second.owner, 0.04)]
+
+        await tick(engine, 104.5)
+        assert second.get_status()["positions_details"][SYMBOL]["break_even_activated"]
+        assert second.stats["break_even_activated"] == 1
+
+    asyncio.run(scenario())
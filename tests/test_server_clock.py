@@ -0,0 +1,100 @@
+"""ServerClock: выбор замера с минимальным RTT, дрейф и пересинхронизация по коду 40008"""
+
+import json
+import logging
+import time
+from types import SimpleNamespace
+import api.server_clock as server_clock
+from api.bitget_connector import BitgetConnector
+from api.server_clock import ServerClock
+from utils.unified_error_handler import UnifiedErrorHandler
+
+
+def make_clock(samples, **kwargs):
+    clock = ServerClock("https://example.test", samples=len(samples), **kwargs)
+    pending = list(samples)
+
+    def sample():
+        value = pending.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    clock._sample = sample
+    return clock
+
+
+def test_offset_taken_from_min_rtt_sample():
+    clock = make_clock([(500.0, 80.0), RuntimeError("timeout"), (120.0, 12.0), (300.0, 40.0)])
+
+    assert clock.sync()
+    assert clock.offset_ms == 120.0 and clock.rtt_ms == 12.0
+    assert clock.drift_ms == 0.0 and clock.sync_count == 1
+
+    clock._sample = lambda: (150.0, 10.0)
+    assert clock.sync()
+    assert clock.drift_ms == 30.0
+
+
+def test_failed_sync_keeps_previous_offset():
+    clock = make_clock([(120.0, 12.0)])
+    clock.sync()
+    clock._sample = lambda: (_ for _ in ()).throw(RuntimeError("timeout"))
+
+    assert not clock.sync()
+    assert clock.offset_ms == 120.0 and clock.sync_failures == 1
+
+
+def test_sample_assumes_reply_at_rtt_midpoint(monkeypatch):
+    times = iter([1000.0, 1000.2])
+    response = SimpleNamespace(raise_for_status=lambda: None, json=lambda: {"data": {"serverTime": "1000600"}})
+    monkeypatch.setattr(server_clock.time, "time", lambda: next(times))
+    monkeypatch.setattr(server_clock.requests, "get", lambda *args, **kwargs: response)
+
+    offset_ms, rtt_ms = ServerClock("https://example.test")._sample()
+
+    assert round(rtt_ms, 6) == 200.0
+    assert round(offset_ms, 6) == 500.0
+
+
+def test_timestamp_applies_offset():
+    clock = ServerClock("https://example.test")
+    clock.offset_ms = 5000.0
+
+    assert abs(int(clock.timestamp()) - (time.time() * 1000 + 5000)) < 1000
+
+
+def test_request_sync_wakes_background_loop():
+    clock = ServerClock("https://example.test", sync_interval=3600, samples=1)
+    syncs = []
+    clock._sample = lambda: syncs.append(1) or (1.0, 1.0)
+    clock.start()
+    try:
+        deadline = time.monotonic() + 2
+        while not syncs and time.monotonic() < deadline:
+            time.sleep(0.01)
+        clock.request_sync()
+        while len(syncs) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        clock.stop()
+
+    assert len(syncs) == 2
+
+
+def test_stale_timestamp_error_requests_resync():
+    requested = []
+    connector = BitgetConnector.__new__(BitgetConnector)
+    connector.logger = logging.getLogger("test")
+    connector.error_handler = UnifiedErrorHandler("test")
+    connector.clock = SimpleNamespace(request_sync=lambda: requested.append(1))
+
+    def response(code):
+        body = json.dumps({"code": code, "msg": "error"})
+        return SimpleNamespace(status_code=400, content=body.encode(), text=body)
+
+    result = connector._handle_api_error(response("40008"), "fetch_positions")
+    assert result["code"] == "40008" and requested == [1]
+
+    connector._handle_api_error(response("40762"), "place_order")
+    assert requested == [1]
@@ -0,0 +1,83 @@
+"""Логирование через очередь: общий фоновый поток, ротация с gzip, уровни модулей, переполнение"""
+
+import gzip
+import logging
+import queue
+import pytest
+import utils.simple_logger as simple_logger
+from utils.simple_logger import ModuleLevelFilter, get_simple_logger, stop_logging
+
+
+@pytest.fixture
+def log_file(monkeypatch, tmp_path):
+    monkeypatch.setattr(simple_logger, "_log_queue", None)
+    monkeypatch.setattr(simple_logger, "_listener", None)
+    monkeypatch.setattr(simple_logger.atexit, "register", lambda func: func)
+    path = tmp_path / "bot.log"
+    monkeypatch.setenv("LOG_FILE", str(path))
+    yield path
+    stop_logging()
+
+
+def test_loggers_share_one_listener(log_file):
+    first = get_simple_logger("test.shared.first")
+    listener = simple_logger._listener
+    second = get_simple_logger("test.shared.second")
+    try:
+        assert simple_logger._listener is listener
+        assert first.handlers[0].queue is second.handlers[0].queue
+
+        first.warning("from first")
+        second.warning("from second")
+        stop_logging()
+
+        text = log_file.read_text(encoding="utf-8")
+        assert "from first" in text and "from second" in text
+    finally:
+        first.handlers.clear()
+        second.handlers.clear()
+
+
+def test_rotated_files_are_gzipped(monkeypatch, tmp_path):
+    monkeypatch.setenv("LOG_ROTATION", "size")
+    monkeypatch.setenv("LOG_MAX_BYTES", "200")
+    monkeypatch.setenv("LOG_BACKUP_COUNT", "2")
+    path = tmp_path / "rotating.log"
+    handler = simple_logger._create_file_handler(str(path))
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    try:
+        for i in range(20):
+            handler.emit(logging.makeLogRecord({"msg": f"line {i:02d} " + "x" * 20}))
+    finally:
+        handler.close()
+
+    backups = sorted(p.name for p in tmp_path.iterdir() if p.name != "rotating.log")
+    assert backups == ["rotating.log.1.gz", "rotating.log.2.gz"]
+    with gzip.open(tmp_path / "rotating.log.1.gz", "rt", encoding="utf-8") as f:
+        assert "line" in f.read()
+
+
+def test_module_levels_override_default():
+    levels = simple_logger._parse_module_levels("bitget_connector=DEBUG, monitoring=ERROR,broken,x=NOPE")
+    log_filter = ModuleLevelFilter(levels, logging.INFO)
+
+    def passes(module, level):
+        return log_filter.filter(logging.makeLogRecord({"module": module, "levelno": level}))
+
+    assert levels == {"bitget_connector": logging.DEBUG, "monitoring": logging.ERROR}
+    assert passes("bitget_connector", logging.DEBUG)
+    assert not passes("monitoring", logging.WARNING)
+    assert passes("monitoring", logging.ERROR)
+    assert not passes("position_manager", logging.DEBUG)
+    assert passes("position_manager", logging.INFO)
+
+
+def test_full_queue_drops_records():
+    log_queue = queue.Queue(maxsize=1)
+    handler = simple_logger._DeferredQueueHandler(log_queue)
+
+    handler.emit(logging.makeLogRecord({"msg": "kept"}))
+    handler.emit(logging.makeLogRecord({"msg": "dropped"}))
+
+    assert log_queue.qsize() == 1
+    assert log_queue.get_nowait().msg == "kept"
@@ -0,0 +1,94 @@
+"""Усреднения по тикам: уровень срабатывает один раз, повтор при back-pressure, остановка потока"""
+
+import asyncio
+import threading
+import strategies.tick_averaging as tick_averaging
+from strategies.entity.strategy_state import AveragingLevel, StrategyState
+from strategies.tick_averaging import TickAveragingTriggers
+from strategies.wavexTradingService import WAVEXTradingService
+from utils.exceptions import BlockingCallRejected
+
+
+def make_state(*levels):
+    return StrategyState(
+        position_open=True,
+        entry_price=100.0,
+        averaging_levels=[AveragingLevel(percentage=0, level=level) for level in levels]
+    )
+
+
+def make_triggers(on_level):
+    triggers = TickAveragingTriggers("BTCUSDT", on_level)
+    triggers.start = lambda: None
+    return triggers
+
+
+def tick(triggers, price):
+    asyncio.run(triggers._on_ticker({"symbol": "BTCUSDT", "last_price": price}))
+
+
+def test_level_fires_once():
+    fired = []
+    triggers = make_triggers(lambda index, price: fired.append((index, price)))
+    assert triggers.arm(make_state(95.0, 90.0)) == 2
+
+    tick(triggers, 94.0)
+    tick(triggers, 93.0)
+
+    assert fired == [(0, 94.0)]
+    assert triggers.nearest_level() == 90.0
+
+
+def test_level_rearmed_when_executor_rejects(monkeypatch):
+    fired = []
+    triggers = make_triggers(lambda index, price: fired.append(index))
+    triggers.arm(make_state(95.0))
+
+    class Rejecting:
+        async def run(self, key, func, *args):
+            raise BlockingCallRejected(key, 1)
+
+    real_executor = tick_averaging.get_blocking_executor
+    monkeypatch.setattr(tick_averaging, "get_blocking_executor", lambda: Rejecting())
+    tick(triggers, 94.0)
+    assert fired == [] and len(triggers.triggers) == 1
+
+    monkeypatch.setattr(tick_averaging, "get_blocking_executor", real_executor)
+    tick(triggers, 94.0)
+    assert fired == [0]
+
+
+class FakePositionManager:
+    def __init__(self):
+        self.opened = []
+
+    def open_position(self, **kwargs):
+        self.opened.append(kwargs)
+
+
+def test_filled_guard_between_tick_and_candle():
+    pm = FakePositionManager()
+    service = WAVEXTradingService(
+        "user", "BTCUSDT", position_manager=pm, state_strategy=make_state(95.0), averaging_mode="tick"
+    )
+    service.tick_averaging.start = lambda: None
+
+    service._on_tick_level(0, 94.0)
+    service.handler_signal({"signal": "AVER1", "index": 0}, 94.0)
+    service._on_tick_level(0, 93.0)
+
+    assert len(pm.opened) == 1
+    assert service.state.averaging_levels[0].filled
+
+
+def test_stream_stopped_when_no_levels_armed():
+    triggers = make_triggers(lambda index, price: None)
+    triggers.arm(make_state(95.0, 90.0))
+    triggers._running = True
+    stop_event = triggers._stop_event = threading.Event()
+
+    triggers.disarm(0)
+    assert triggers._running and not stop_event.is_set()
+
+    triggers.disarm()
+    assert not triggers._running and stop_event.is_set()
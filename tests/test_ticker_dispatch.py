@@ -0,0 +1,97 @@
+"""Конфлюэнция тиков WebSocket: медленный обработчик получает только самый свежий тик"""
+
+import asyncio
+from api.bitget_websocket import BitgetWebSocketClient
+
+
+def ticker_message(price, symbol="BTCUSDT"):
+    return {
+        "arg": {"instType": "USDT-FUTURES", "channel": "ticker", "instId": symbol},
+        "data": [{"instId": symbol, "lastPr": str(price), "markPrice": str(price), "ts": "1"}],
+    }
+
+
+def slow_subscriber(client, symbol="BTCUSDT"):
+    """Обработчик ждёт release после каждого тика"""
+    delivered = []
+    release = asyncio.Event()
+
+    async def callback(ticker):
+        delivered.append(ticker.last_price)
+        await release.wait()
+        release.clear()
+
+    client.subscriptions[symbol] = callback
+    return delivered, release
+
+
+def test_slow_callback_gets_freshest_tick():
+    client = BitgetWebSocketClient()
+
+    async def main():
+        delivered, release = slow_subscriber(client)
+
+        await client._handle_ticker_data(ticker_message(100))
+        await asyncio.sleep(0)
+        for price in (101, 102, 103):
+            await client._handle_ticker_data(ticker_message(price))
+
+        assert delivered == [100.0]
+        assert client.stats["ticks_dropped"] == 2
+
+        release.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert delivered == [100.0, 103.0]
+
+        task = client._dispatch_tasks["BTCUSDT"]
+        release.set()
+        await task
+
+        assert "BTCUSDT" not in client._dispatch_tasks
+        assert client.stats["ticks_delivered"] == 2
+
+    asyncio.run(main())
+
+
+def test_symbols_dispatched_independently():
+    client = BitgetWebSocketClient()
+
+    async def main():
+        slow, _ = slow_subscriber(client)
+        fast = []
+
+        async def callback(ticker):
+            fast.append(ticker.last_price)
+
+        client.subscriptions["ETHUSDT"] = callback
+
+        await client._handle_ticker_data(ticker_message(100))
+        await asyncio.sleep(0)
+        await client._handle_ticker_data(ticker_message(10, "ETHUSDT"))
+        await client._dispatch_tasks["ETHUSDT"]
+
+        assert slow == [100.0] and fast == [10.0]
+        await client.disconnect()
+
+    asyncio.run(main())
+
+
+def test_disconnect_cancels_pending_dispatch():
+    client = BitgetWebSocketClient()
+
+    async def main():
+        delivered, _ = slow_subscriber(client)
+        await client._handle_ticker_data(ticker_message(100))
+        await asyncio.sleep(0)
+        await client._handle_ticker_data(ticker_message(101))
+        task = client._dispatch_tasks["BTCUSDT"]
+
+        await client.disconnect()
+        await asyncio.sleep(0)
+
+        assert task.cancelled()
+        assert client._dispatch_tasks == {} and client._latest_ticks == {}
+        assert delivered == [100.0]
+
+    asyncio.run(main())
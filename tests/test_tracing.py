@@ -0,0 +1,99 @@
+"""Трассировка: распространение трассы и спана через contextvars, формат clientOid"""
+
+import asyncio
+import re
+import threading
+import pytest
+from api.client_oid import make_client_oid
+from utils.blocking_executor import get_blocking_executor
+from utils.tracing import Tracer, current_span, current_trace_id, global_tracer
+
+
+CLIENT_OID = re.compile(r"^wx[0-9a-f]{16}-[0-9a-f]{6}$")
+
+
+@pytest.fixture
+def tracer():
+    return Tracer(buffer_size=100)
+
+
+def test_nested_spans_share_trace_and_parent(tracer):
+    with tracer.start_trace("signal.BUYX") as root:
+        trace_id = current_trace_id()
+        with tracer.span("open_position") as child:
+            assert current_span() is child
+            with tracer.start_trace("nested") as nested:
+                assert current_trace_id() == trace_id
+        assert current_span() is root
+
+    assert current_trace_id() is None and current_span() is None
+    assert child.parent_id == root.span_id and nested.parent_id == child.span_id
+    assert [span.name for span in tracer.get_trace(trace_id)] == ["signal.BUYX", "open_position", "nested"]
+    assert tracer.get_recent_traces() == [trace_id]
+
+
+def test_span_outside_trace_records_nothing(tracer):
+    calls = []
+
+    @tracer.traced()
+    def work():
+        calls.append(current_span())
+
+    with tracer.span("background") as span:
+        work()
+
+    assert span is None and calls == [None]
+    assert tracer.get_recent_traces() == []
+
+
+def test_failed_span_marked_as_error(tracer):
+    with pytest.raises(ValueError):
+        with tracer.start_trace("signal.CLOSEX") as root:
+            raise ValueError("rejected")
+
+    assert root.status == "error" and root.error == "ValueError: rejected"
+
+
+def test_trace_follows_tasks_and_executor_but_not_foreign_threads(tracer):
+    seen = {}
+
+    def in_pool():
+        return current_trace_id(), current_span().name
+
+    async def main():
+        with tracer.start_trace("signal.AVER1"):
+            with tracer.span("order"):
+                seen["task"] = await asyncio.create_task(asyncio.sleep(0, current_trace_id()))
+                seen["pool"] = await get_blocking_executor().run("BTCUSDT", in_pool)
+                thread = threading.Thread(target=lambda: seen.setdefault("thread", current_trace_id()))
+                thread.start()
+                thread.join()
+                return current_trace_id()
+
+    trace_id = asyncio.run(main())
+
+    assert seen["task"] == trace_id
+    assert seen["pool"] == (trace_id, "order")
+    assert seen["thread"] is None
+
+
+def test_client_oid_format(tracer):
+    assert tracer.client_oid() is None
+
+    with tracer.start_trace("signal.BUYX") as root:
+        oid = tracer.client_oid()
+        assert CLIENT_OID.match(oid)
+        assert oid == f"wx{current_trace_id()}-{root.span_id}"
+        assert len(tracer.client_oid(prefix="x" * 60)) == 50
+
+
+def test_order_client_oid_tied_to_trace():
+    body = {"symbol": "BTCUSDT", "side": "buy", "size": "0.01", "orderType": "market"}
+    with global_tracer.start_trace("signal.BUYX"):
+        first = make_client_oid(body)
+        assert first == make_client_oid(dict(body))
+        assert first != make_client_oid({**body, "size": "0.02"})
+        assert first.startswith(f"wx{current_trace_id()}")
+
+    assert len(first) <= 50
+    assert make_client_oid(body) != make_client_oid(body)
@@ -0,0 +1,200 @@
+"""UnifiedErrorHandler: ответы об ошибках, переходы CircuitBreaker и коннектор при открытом breaker"""
+
+import logging
+import time
+import pytest
+from api.bitget_connector import BitgetConnector
+from api.request_scheduler import global_request_scheduler
+from config import CircuitBreakerConfig
+from utils.unified_error_handler import CircuitBreaker, CircuitState, ErrorType, UnifiedErrorHandler
+
+
+def test_handle_error_response_and_counts():
+    handler = UnifiedErrorHandler()
+    response = handler.handle_error(ValueError("bad"), ErrorType.VALIDATION_ERROR, {"op": "x"}, should_log=False)
+
+    assert response["success"] is False
+    assert response["error_type"] == "validation_error"
+    assert response["error_message"] == "bad"
+    assert response["context"] == {"op": "x"}
+    assert handler.error_counts["validation_error"] == 1
+
+
+def test_handle_error_reraises_when_requested():
+    handler = UnifiedErrorHandler()
+    with pytest.raises(ValueError):
+        handler.handle_error(ValueError("bad"), ErrorType.SYSTEM_ERROR, should_raise=True, should_log=False)
+
+
+@pytest.mark.parametrize("status_code, error_type", [
+    (429, "rate_limit_error"),
+    (503, "api_error"),
+    (400, "validation_error"),
+])
+def test_handle_api_error_classifies_status(status_code, error_type):
+    response = UnifiedErrorHandler().handle_api_error(status_code, {"code": "1", "msg": "m"}, "op")
+    assert response["error_type"] == error_type
+    assert "API Error 1: m" in response["error_message"]
+
+
+def test_circuit_breaker_registry_reuses_instance():
+    handler = UnifiedErrorHandler()
+    breaker = handler.get_circuit_breaker("/a", min_calls=3)
+    assert handler.get_circuit_breaker("/a") is breaker
+    assert set(handler.get_circuit_states()) == {"/a"}
+
+
+def make_breaker(**overrides):
+    settings = dict(
+        window_seconds=60.0,
+        min_calls=4,
+        error_rate_threshold=0.5,
+        slow_call_ms=1000.0,
+        slow_call_rate_threshold=0.8,
+        open_seconds=0.05,
+        half_open_max_calls=1,
+    )
+    settings.update(overrides)
+    return CircuitBreaker("test", **settings)
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.min_calls):
+        assert breaker.allow_request()
+        breaker.record(False)
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_stays_closed_below_min_calls():
+    breaker = make_breaker()
+    for _ in range(breaker.min_calls - 1):
+        breaker.record(False)
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_opens_on_error_rate():
+    breaker = make_breaker()
+    breaker.record(True)
+    breaker.record(True)
+    breaker.record(False)
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record(False)
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.times_opened == 1
+
+
+def test_opens_on_slow_calls():
+    breaker = make_breaker()
+    for _ in range(breaker.min_calls):
+        breaker.record(True, latency_ms=2000.0)
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_open_rejects_until_cool_down():
+    breaker = make_breaker(open_seconds=60.0)
+    open_breaker(breaker)
+    assert not breaker.allow_request()
+    assert breaker.rejected_calls == 1
+
+
+def test_half_open_limits_probes_and_closes_on_success():
+    breaker = make_breaker()
+    open_breaker(breaker)
+    time.sleep(breaker.open_seconds)
+
+    assert breaker.allow_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert not breaker.allow_request()
+
+    breaker.record(True)
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.get_state()["calls_in_window"] == 0
+
+
+def test_half_open_failure_reopens():
+    breaker = make_breaker()
+    open_breaker(breaker)
+    time.sleep(breaker.open_seconds)
+
+    assert breaker.allow_request()
+    breaker.record(False)
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.times_opened == 2
+
+
+def test_release_frees_half_open_slot():
+    breaker = make_breaker()
+    open_breaker(breaker)
+    time.sleep(breaker.open_seconds)
+
+    assert breaker.allow_request()
+    breaker.release()
+    assert breaker.allow_request()
+
+
+# ----- Коннектор при открытом breaker -----
+
+ENDPOINT = "/api/v2/mix/market/ticker"
+
+
+@pytest.fixture
+def connector(monkeypatch):
+    monkeypatch.setitem(CircuitBreakerConfig.SETTINGS, "min_calls", 1)
+    monkeypatch.setitem(CircuitBreakerConfig.SETTINGS, "open_seconds", 60.0)
+
+    connector = BitgetConnector.__new__(BitgetConnector)
+    connector.logger = logging.getLogger("test")
+    connector.error_handler = UnifiedErrorHandler()
+    connector._last_good_responses = {}
+    connector.responses = []
+    connector._execute_api_request = lambda *args: connector.responses.pop(0)
+    return connector
+
+
+def request(connector, params, allow_stale=False, body=None, method="GET", operation="fetch_ticker"):
+    return connector._safe_api_request(
+        method, ENDPOINT, params=params, body=body, operation=operation, allow_stale=allow_stale
+    )
+
+
+def test_stale_response_only_when_requested(connector):
+    params = {"symbol": "BTCUSDT"}
+    connector.responses = [
+        {"success": True, "data": [{"lastPr": "100"}]},
+        {"success": False, "network_error": True},
+    ]
+    assert request(connector, params)["success"]
+    assert not request(connector, params)["success"]
+
+    refused = request(connector, params)
+    assert not refused["success"] and refused["circuit_open"]
+
+    stale = request(connector, params, allow_stale=True)
+    assert stale["success"] and stale["stale"]
+
+
+def test_closing_order_bypasses_open_breaker(connector):
+    connector.responses = [{"success": False, "network_error": True}]
+    request(connector, None, method="POST", operation="place_order", body={"clientOid": "a"})
+
+    blocked = request(connector, None, method="POST", operation="place_order", body={"clientOid": "b"})
+    assert blocked["circuit_open"]
+
+    connector.responses = [{"success": True, "data": {"orderId": "1"}}]
+    closed = request(
+        connector, None, method="POST", operation="place_order",
+        body={"clientOid": "c", "tradeSide": "close", "reduceOnly": "YES"}
+    )
+    assert closed["success"]
+
+
+def test_rate_limit_wait_after_lane_slot_released(connector):
+    in_flight = []
+    connector.responses = [{"success": False, "rate_limit": True}]
+    connector._wait_rate_limit = lambda: in_flight.append(
+        global_request_scheduler.get_state()["market_data"]["in_flight"]
+    )
+
+    result = request(connector, {"symbol": "BTCUSDT"})
+    assert result["rate_limit"]
+    assert in_flight == [0]
@@ -53,10 +53,52 @@ class PositionManagerProtocol(ABC):
             margin_coin: str = "USDT",
             margin_mode: str = "isolated",
             trigger_type: str = "fill_price",  # или "fill_price"
-            plan_type: str = "normal_plan"
+            plan_type: str = "normal_plan",
+            client_oid: str = ""
     ):
         pass
 
+    @abstractmethod
+    def get_pending_orders(
+            self,
+            symbol: str = "",
+            product_type: str = "USDT-FUTURES",
+            plan_type: str = "normal_plan"
+    ) -> list:
+        pass
+
+    @abstractmethod
+    def get_pending_order_status(
+            self,
+            symbol: str,
+            order_id: str,
+            product_type: str = "USDT-FUTURES",
+            plan_type: str = "normal_plan"
+    ) -> str:
+        pass
+
+    @abstractmethod
+    def cancel_pending_orders(
+            self,
+            symbol: str,
+            orders: list,
+            product_type: str = "USDT-FUTURES",
+            margin_coin: str = "USDT",
+            plan_type: str = "normal_plan"
+    ) -> dict:
+        pass
+
+    @abstractmethod
+    def calculate_futures_size_at_price(
+            self,
+            symbol: str,
+            required_amount: float,
+            leverage: float,
+            price: float,
+            product_type: str = "USDT-FUTURES"
+    ) -> str:
+        pass
+
     @abstractmethod
     def set_stop_loss(
             self,
@@ -104,15 +146,15 @@ class PositionManagerProtocol(ABC):
         pass
 
     @abstractmethod
-    def get_size_precision(self, symbol: str) -> int:
+    def get_size_precision(self, symbol: str, product_type: str = "USDT-FUTURES") -> int:
         pass
 
     @abstractmethod
-    def get_price_precision(self, symbol: str) -> int:
+    def get_price_precision(self, symbol: str, product_type: str = "USDT-FUTURES") -> int:
         pass
 
     @abstractmethod
-    def round_order_size(self, size: float, symbol: str = "") -> str:
+    def round_order_size(self, size: float, symbol: str = "", product_type: str = "USDT-FUTURES") -> str:
         pass
 
     @abstractmethod
@@ -284,7 +326,8 @@ class PositionManagerProtocol(ABC):
             margin_coin: str = "USDT",
             order_type: str = "market",
             price: float = 0.0,  # для лимитных ордеров
-            client_oid: str = ""
+            client_oid: str = "",
+            hold_side: str = ""
     ) -> dict:
         pass
 
@@ -322,7 +365,8 @@ class PositionManagerProtocol(ABC):
             margin_coin: str = "USDT",
             order_type: str = "market",
             price: float = 0.0,
-            client_oid: str = ""
+            client_oid: str = "",
+            hold_side: str = ""
     ) -> dict:
         pass
 
@@ -463,7 +507,8 @@ class PositionManagerProtocol(ABC):
             profit_threshold: float = 0.03,  # 3% прибыли для активации
             buffer_percent: float = 0.001,  # 0.1% буфер для покрытия комиссии/спреда
             product_type: str = "USDT-FUTURES",
-            margin_coin: str = "USDT"
+            margin_coin: str = "USDT",
+            hold_side: str = ""
     ) -> dict:
         pass
 
@@ -0,0 +1,341 @@
+"""
+Потоковый расчёт PnL по mark price
+
+Позиции загружаются при старте и перечитываются раз в sync_interval секунд
+(открытия, усреднения и закрытия), между сверками PnL считается локально по
+тикам WebSocket без REST опросов.
+
+Позиции хранятся колонками array('d') (размер, цена входа, направление, mark,
+нереализованный PnL), индекс symbol -> строки. Тик пересчитывает только строки
+своего символа и поправляет итог на разницу, поэтому стоимость тика не зависит
+от числа позиций. Снимки (формат get_realtime_pnl) рассылаются подписчикам
+(Telegram, логи) не чаще publish_interval секунд и доступны в метриках.
+"""
+
+import asyncio
+import inspect
+import time
+from array import array
+from typing import Callable, Dict, List, Optional
+from config import MonitoringConfig
+from utils.blocking_executor import get_blocking_executor
+from utils.logging_setup import setup_logger
+from utils.metrics_exporter import MetricSample, global_metrics_registry
+from api.bitget_websocket import BitgetWebSocketClient
+
+
+class PnLEngine:
+    """ Нереализованный PnL всех позиций по mark price из WebSocket """
+
+    def __init__(
+        self,
+        position_manager,
+        product_type: str = "USDT-FUTURES",
+        margin_coin: str = "USDT",
+        publish_interval: float = 1.0,
+        sync_interval: Optional[float] = None
+    ):
+        self.position_manager = position_manager
+        self.product_type = product_type
+        self.margin_coin = margin_coin
+        self.publish_interval = publish_interval
+        self.sync_interval = sync_interval or MonitoringConfig.PNL_POSITION_SYNC_INTERVAL
+        self.logger = setup_logger()
+
+        self.ws_client = BitgetWebSocketClient(
+            price_snapshot=getattr(position_manager.exchange, "prices", None),
+            order_books=getattr(position_manager.exchange, "order_books", None)
+        )
+
+        # Колонки позиций
+        self._symbols: List[str] = []
+        self._hold_sides: List[str] = []
+        self._size = array("d")
+        self._entry = array("d")
+        self._direction = array("d")  # +1 long, -1 short
+        self._mark = array("d")
+        self._upnl = array("d")
+        self._realized = array("d")
+        self._margin = array("d")
+        self._leverage: List[int] = []
+        self._index: Dict[str, List[int]] = {}
+
+        self.total_unrealized_pnl = 0.0
+        self.total_realized_pnl = 0.0
+
+        self.subscribers: List[Callable] = []
+        self._last_published = 0.0
+        self._publish_pending = False
+        self._publish_handle = None
+        self._publish_task = None
+
+        self.is_active = False
+        self.monitoring_task = None
+        self.sync_task = None
+
+        self.stats = {
+            "mark_updates": 0,
+            "snapshots_published": 0,
+            "position_syncs": 0,
+            "errors": 0,
+            "started_at": None
+        }
+
+        global_metrics_registry.register(self)
+
+    def subscribe(self, callback: Callable) -> None:
+        """Добавить получателя снимков PnL (обычная или async функция)"""
+        self.subscribers.append(callback)
+
+    def set_positions(self, positions: list) -> None:
+        """Заменить набор позиций (PositionRecord или словари API)"""
+        symbols, hold_sides, leverage = [], [], []
+        size, entry, direction, mark, upnl, realized, margin = (array("d") for _ in range(7))
+        index: Dict[str, List[int]] = {}
+
+        for pos in positions:
+            total = float(pos.get("total", 0))
+            if total == 0:
+                continue
+            symbol = pos.get("symbol")
+            row = len(symbols)
+            index.setdefault(symbol, []).append(row)
+
+            symbols.append(symbol)
+            hold_sides.append(str(pos.get("holdSide", "")).lower())
+            leverage.append(pos.get("leverage", 1))
+            size.append(abs(total))
+            entry.append(float(pos.get("openPriceAvg", 0)))
+            direction.append(-1.0 if hold_sides[-1] == "short" else 1.0)
+            mark.append(float(pos.get("markPrice", 0)))
+            upnl.append(float(pos.get("unrealizedPL", 0)))
+            realized.append(float(pos.get("achievedProfits", 0)))
+            margin.append(float(pos.get("marginSize", 0)))
+
+        self._symbols, self._hold_sides, self._leverage = symbols, hold_sides, leverage
+        self._size, self._entry, self._direction = size, entry, direction
+        self._mark, self._upnl, self._realized, self._margin = mark, upnl, realized, margin
+        self._index = index
+
+        self.total_unrealized_pnl = sum(upnl)
+        self.total_realized_pnl = sum(realized)
+
+    async def sync_positions(self) -> int:
+        """
+        Перечитать позиции с биржи (один REST запрос) и подписаться на
+        тикеры новых символов. Вызывается при старте, периодически и после
+        изменения позиций.
+
+        Raises:
+            Exception: позиции не получены - текущий набор не меняется
+        """
+        # get_positions (а не get_current_positions): ошибка запроса не должна обнулять позиции
+        positions = await get_blocking_executor().run(
+            "positions", self.position_manager.exchange.get_positions,
+            "", self.product_type, self.margin_coin
+        )
+
+        previous = set(self._index)
+        self.set_positions(positions)
+        self.stats["position_syncs"] += 1
+
+        if self.ws_client.is_connected:
+            for symbol in previous - set(self._index):
+                await self.ws_client.unsubscribe_ticker(symbol)
+            for symbol in set(self._index) - previous:
+                await self.ws_client.subscribe_ticker(symbol, self._on_ticker)
+
+        self.logger.info("PnL: отслеживается %s позиций по %s символам", len(self._symbols), len(self._index))
+        await self._publish(force=True)
+        return len(self._symbols)
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync_positions()
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.logger.warning(f"PnL: сверка позиций не удалась: {e}")
+
+    def on_mark_price(self, symbol: str, mark_price: float) -> bool:
+        """Пересчитать PnL позиций символа; True, если символ отслеживается"""
+        rows = self._index.get(symbol)
+        if not rows or mark_price <= 0:
+            return False
+
+        delta = 0.0
+        for row in rows:
+            pnl = self._direction[row] * (mark_price - self._entry[row]) * self._size[row]
+            delta += pnl - self._upnl[row]
+            self._upnl[row] = pnl
+            self._mark[row] = mark_price
+
+        self.total_unrealized_pnl += delta
+        self.stats["mark_updates"] += 1
+        return True
+
+    async def _on_ticker(self, ticker_data):
+        try:
+            mark_price = ticker_data["mark_price"] or ticker_data["last_price"]
+            if self.on_mark_price(ticker_data["symbol"], mark_price):
+                await self._publish()
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.logger.error(f"Ошибка обработки mark price: {e}")
+
+    def snapshot(self) -> dict:
+        """Текущий PnL в формате PositionManager.get_realtime_pnl"""
+        positions = []
+        for row, symbol in enumerate(self._symbols):
+            entry = self._entry[row]
+            mark = self._mark[row]
+            margin = self._margin[row]
+            upnl = self._upnl[row]
+            pnl_percent = self._direction[row] * (mark - entry) / entry * 100 if entry > 0 and mark > 0 else 0.0
+
+            positions.append({
+                "symbol": symbol,
+                "side": self._hold_sides[row],
+                "size": self._size[row],
+                "avg_price": entry,
+                "current_price": mark,
+                "unrealized_pnl": upnl,
+                "realized_pnl": self._realized[row],
+                "pnl_percent": pnl_percent,
+                "roe_percent": upnl / margin * 100 if margin > 0 else 0.0,
+                "leverage": self._leverage[row],
+                "margin_size": margin
+            })
+
+        return {
+            "success": True,
+            "total_positions": len(positions),
+            "total_unrealized_pnl": self.total_unrealized_pnl,
+            "total_realized_pnl": self.total_realized_pnl,
+            "total_pnl": self.total_unrealized_pnl + self.total_realized_pnl,
+            "positions": positions,
+            "updated_at": time.time()
+        }
+
+    async def _publish(self, force: bool = False):
+        if not self.subscribers:
+            return
+
+        now = time.monotonic()
+        if not force and now - self._last_published < self.publish_interval:
+            # Отложенная рассылка в конце интервала, чтобы последний тик не потерялся
+            if not self._publish_pending:
+                self._publish_pending = True
+                self._publish_handle = asyncio.get_running_loop().call_later(
+                    self.publish_interval - (now - self._last_published),
+                    self._publish_deferred
+                )
+            return
+
+        # Внеочередная рассылка (сверка позиций) заменяет отложенную
+        if self._publish_handle is not None:
+            self._publish_handle.cancel()
+            self._publish_handle = None
+        self._publish_pending = False
+        self._last_published = now
+        snapshot = self.snapshot()
+        self.stats["snapshots_published"] += 1
+
+        for callback in list(self.subscribers):
+            try:
+                result = callback(snapshot)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.logger.error(f"Ошибка подписчика PnL: {e}")
+
+    def _publish_deferred(self):
+        self._publish_handle = None
+        self._publish_task = asyncio.ensure_future(self._publish(force=True))
+
+    async def start(self) -> bool:
+        """Подключение к WebSocket, загрузка позиций и подписка на их тикеры"""
+        if self.is_active:
+            return True
+
+        if not await self.ws_client.connect():
+            self.logger.error("Не удалось подключиться к WebSocket")
+            return False
+
+        self.monitoring_task = asyncio.create_task(self.ws_client.listen())
+        self.is_active = True
+        self.stats["started_at"] = time.time()
+
+        try:
+            await self.sync_positions()
+        except Exception as e:
+            # Позиции подтянет следующая периодическая сверка
+            self.stats["errors"] += 1
+            self.logger.error(f"PnL: не удалось загрузить позиции: {e}")
+        self.sync_task = asyncio.create_task(self._sync_loop())
+        self.logger.info("Потоковый расчёт PnL запущен")
+        return True
+
+    async def stop(self):
+        if not self.is_active:
+            return
+
+        self.is_active = False
+
+        if self._publish_handle is not None:
+            self._publish_handle.cancel()
+            self._publish_handle = None
+        self._publish_pending = False
+
+        for task in (self.monitoring_task, self.sync_task, self._publish_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+        await self.ws_client.disconnect()
+        self.logger.info("Потоковый расчёт PnL остановлен")
+
+    def collect_metrics(self) -> List[MetricSample]:
+        """PnL и статистика движка для экспорта в OpenMetrics"""
+        samples = [
+            MetricSample(
+                "bot_pnl_unrealized", "gauge",
+                "Unrealized PnL of all open positions by mark price", self.total_unrealized_pnl, {}
+            ),
+            MetricSample(
+                "bot_pnl_realized", "gauge",
+                "Realized PnL of currently open positions", self.total_realized_pnl, {}
+            ),
+            MetricSample(
+                "bot_pnl_positions", "gauge",
+                "Positions tracked by the PnL engine", len(self._symbols), {}
+            ),
+        ]
+        for row, symbol in enumerate(self._symbols):
+            samples.append(MetricSample(
+                "bot_pnl_position_unrealized", "gauge",
+                "Unrealized PnL per position by mark price", self._upnl[row],
+                {"symbol": symbol, "side": self._hold_sides[row]}
+            ))
+        for stat_name, help_text in (
+            ("mark_updates", "Mark price updates applied by the PnL engine"),
+            ("snapshots_published", "PnL snapshots delivered to subscribers"),
+            ("position_syncs", "Position reloads performed by the PnL engine"),
+            ("errors", "Errors in the PnL engine"),
+        ):
+            samples.append(MetricSample(
+                f"bot_pnl_{stat_name}", "counter", help_text, self.stats[stat_name], {}, "_total"
+            ))
+        return samples
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
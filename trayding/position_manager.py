@@ -1,7 +1,14 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
 from api.base_exchange_connector import BaseExchangeConnector
+from config import ExchangeConfig
 from trayding.PositionManagerProtocol import PositionManagerProtocol
 from utils.logging_setup import setup_logger
+from api.request_scheduler import emergency_priority
 from utils.safety_checks import SafetyValidator
+from utils.tracing import global_tracer
 from utils.unified_error_handler import UnifiedErrorHandler, ErrorType
 
 
@@ -43,6 +50,7 @@ class PositionManager(PositionManagerProtocol):
     #             level.level = None
     #             level.filled = False
 
+    @global_tracer.traced("position.open_position")
     def open_position(
         self,
         symbol: str,
@@ -96,6 +104,12 @@ class PositionManager(PositionManagerProtocol):
             self.logger.warning("Quantity = 0, order skipped")
             return {}
 
+        if self.enable_safety_checks and order_type == "market":
+            validation = self.safety_validator.validate_slippage(symbol, side, quantity)
+            if not validation["valid"]:
+                self.logger.error(f"Ордер {symbol} отклонён: {'; '.join(validation['errors'])}")
+                return {}
+
         is_validate_position = self.risk_manager.validate_position(
             symbol=symbol,
             required_amount=required_amount,
@@ -206,7 +220,8 @@ class PositionManager(PositionManagerProtocol):
             margin_coin: str = "USDT",
             margin_mode: str = "isolated",
             trigger_type: str = "fill_price",  # или "fill_price"
-            plan_type: str = "normal_plan"
+            plan_type: str = "normal_plan",
+            client_oid: str = ""
     ):
         if not self.risk_manager.is_trading_allowed():
             self.logger.warning("Торговля запрещена: превышен дневной лимит убытков")
@@ -234,8 +249,94 @@ class PositionManager(PositionManagerProtocol):
                 raise ValueError("Для лимитного ордера нужно указать price")
             order["price"] = str(price)
 
+        if client_oid:
+            order["clientOid"] = client_oid
+
         return self.exchange.place_plan_order(order_params=order, market_type=market_type)
 
+    def get_pending_orders(
+            self,
+            symbol: str = "",
+            product_type: str = "USDT-FUTURES",
+            plan_type: str = "normal_plan"
+    ) -> list:
+        """
+        Активные плановые ордера (по умолчанию - условные на открытие/закрытие).
+        """
+        return self.exchange.get_active_plan_orders(
+            symbol=symbol,
+            product_type=product_type,
+            plan_type=plan_type
+        )
+
+    def get_pending_order_status(
+            self,
+            symbol: str,
+            order_id: str,
+            product_type: str = "USDT-FUTURES",
+            plan_type: str = "normal_plan"
+    ) -> str:
+        """
+        Статус завершённого планового ордера из истории биржи
+        ("executed", "cancelled", "fail_execute"); "" - ордер в истории не найден.
+        """
+        history = self.exchange.get_plan_order_history(
+            symbol=symbol,
+            product_type=product_type,
+            plan_type=plan_type,
+            order_id=order_id
+        )
+        for order in history:
+            if order.get("orderId") == order_id:
+                return order.get("planStatus") or ""
+        return ""
+
+    def cancel_pending_orders(
+            self,
+            symbol: str,
+            orders: list,  # [{"orderId": ...} или {"clientOid": ...}]
+            product_type: str = "USDT-FUTURES",
+            margin_coin: str = "USDT",
+            plan_type: str = "normal_plan"
+    ) -> dict:
+        """
+        Отмена плановых ордеров символа одним запросом.
+        """
+        if not orders:
+            return {}
+
+        return self.exchange.cancel_trigger_order(
+            product_type=product_type,
+            order_id_list=orders,
+            symbol=symbol,
+            margin_coin=margin_coin,
+            plan_type=plan_type
+        )
+
+    def calculate_futures_size_at_price(
+            self,
+            symbol: str,
+            required_amount: float,
+            leverage: float,
+            price: float,
+            product_type: str = "USDT-FUTURES"
+    ) -> str:
+        """
+        Размер позиции в базовой валюте для ордера по заданной цене (а не по
+        текущей, как calculate_futures_position_size) - для заранее выставленных
+        плановых ордеров.
+        """
+        if price <= 0:
+            raise ValueError("Цена должна быть положительной")
+
+        leverage = leverage if leverage > 0 else 1
+        commission_rate = self.exchange.get_commission_rate("futures", "market")
+        effective_amount = required_amount * leverage
+
+        return self.round_order_size(
+            (effective_amount - effective_amount * commission_rate) / price, symbol, product_type
+        )
+
     def set_stop_loss(
             self,
             symbol: str,
@@ -278,7 +379,7 @@ class PositionManager(PositionManagerProtocol):
         # Определяем тип плана: позиционный или частичный
         plan_type = "pos_loss" if size is None else "loss_plan"
         
-        precision = self.get_price_precision(symbol)
+        precision = self.get_price_precision(symbol, product_type)
         rounded_sl_price = round(stop_loss_price, precision)
         
         if self.enable_safety_checks and self.safety_validator:
@@ -425,7 +526,7 @@ class PositionManager(PositionManagerProtocol):
             elif hold_side == "short" and activation_price >= entry_price:
                 raise ValueError("Для short позиции цена активации должна быть ниже цены входа")
         
-        precision = self.get_price_precision(symbol)
+        precision = self.get_price_precision(symbol, product_type)
         rounded_activation_price = round(activation_price, precision)
         
         # Округляем rangeRate до 2 знаков после запятой (требование Bitget)
@@ -500,10 +601,17 @@ class PositionManager(PositionManagerProtocol):
             self.logger.error(f"Ошибка расчета размера позиции для {symbol}: {e}")
             raise ValueError(f"Не удалось рассчитать размер позиции: {e}")
 
-    def get_size_precision(self, symbol: str) -> int:
+    def get_size_precision(self, symbol: str, product_type: str = "USDT-FUTURES") -> int:
         """
         Определяет точность размера ордера для конкретной торговой пары.
+        Берётся из справочника контрактов биржи, при его недоступности - из таблицы ниже.
         """
+        contracts = getattr(self.exchange, "contracts", None)
+        if contracts is not None:
+            spec = contracts.get(symbol, product_type.upper().replace("_", "-"))
+            if spec is not None:
+                return spec.volume_place
+
         if symbol.startswith('ETH'):
             return 2
         elif symbol.startswith('BTC'):
@@ -532,10 +640,43 @@ class PositionManager(PositionManagerProtocol):
             # По умолчанию для неизвестных пар
             return 2
 
-    def get_price_precision(self, symbol: str) -> int:
+    def get_current_prices(self, symbols, product_type: str = "USDT-FUTURES") -> dict:
+        """
+        Текущие цены (last) для набора символов: {symbol: price}.
+        Берутся из общей таблицы тикеров коннектора одним запросом на все символы.
+        """
+        symbols = list(symbols)
+        prices = getattr(self.exchange, "prices", None)
+        if prices is not None:
+            return {
+                symbol: record.last_price
+                for symbol, record in prices.get_many(symbols, product_type).items()
+                if record.last_price
+            }
+
+        result = {}
+        for symbol in symbols:
+            try:
+                ticker_data = self.exchange.fetch_ticker(symbol, "futures", product_type)
+                result[symbol] = float(ticker_data["data"][0]["lastPr"])
+            except Exception as e:
+                self.logger.warning("Не удалось получить цену для %s: %s", symbol, e)
+        return result
+
+    def get_current_price(self, symbol: str, product_type: str = "USDT-FUTURES"):
+        """Текущая цена символа или None"""
+        return self.get_current_prices((symbol,), product_type).get(symbol)
+
+    def get_price_precision(self, symbol: str, product_type: str = "USDT-FUTURES") -> int:
         """
         Определяет количество знаков после запятой для цены в зависимости от торговой пары.
         """
+        contracts = getattr(self.exchange, "contracts", None)
+        if contracts is not None:
+            price_place = contracts.price_precision(symbol, product_type.upper().replace("_", "-"))
+            if price_place is not None:
+                return price_place
+
         if "BTC" in symbol and "USDT" in symbol:
             return 1  # BTCUSDT: 1 знак после запятой
         elif "USDT" in symbol:
@@ -543,12 +684,12 @@ class PositionManager(PositionManagerProtocol):
         else:
             return 4  # По умолчанию: 4 знака
 
-    def round_order_size(self, size: float, symbol: str = "") -> str:
+    def round_order_size(self, size: float, symbol: str = "", product_type: str = "USDT-FUTURES") -> str:
         """
         Округляет размер ордера до требуемой точности для конкретной торговой пары.
         """
         if symbol:
-            precision = self.get_size_precision(symbol)
+            precision = self.get_size_precision(symbol, product_type)
         else:
             # Общая точность по умолчанию
             precision = 4
@@ -591,7 +732,7 @@ class PositionManager(PositionManagerProtocol):
             
             trailing_stop_size = calculated_position_size * size_percent
             # Округляем размер до требований Bitget
-            size_str = self.round_order_size(trailing_stop_size, symbol)
+            size_str = self.round_order_size(trailing_stop_size, symbol, product_type)
             
             self.logger.info(
                 f"Автоматический расчет для трейлинг-стопа {symbol}:\n"
@@ -714,7 +855,7 @@ class PositionManager(PositionManagerProtocol):
         
         plan_type = "pos_profit" if size is None else "profit_plan"
         
-        precision = self.get_price_precision(symbol)
+        precision = self.get_price_precision(symbol, product_type)
         rounded_tp_price = round(tp_price, precision)
         
         order_params = {
@@ -913,7 +1054,7 @@ class PositionManager(PositionManagerProtocol):
                     price = entry_price - profit_amount
                 
                 # Округляем цену для отображения (как будет отправлено в API)
-                precision = self.get_price_precision(symbol)
+                precision = self.get_price_precision(symbol, product_type)
                 display_price = round(price, precision)
                     
                 self.logger.info(f"Цель {i+1}: {percent*100}% позиции при {profit_percent*100}% прибыли (от {entry_price} до {display_price})")
@@ -921,7 +1062,7 @@ class PositionManager(PositionManagerProtocol):
             # Рассчитываем размер для данной цели
             if calculated_position_size:
                 target_size = calculated_position_size * percent
-                size_str = self.round_order_size(target_size, symbol)
+                size_str = self.round_order_size(target_size, symbol, product_type)
                 self.logger.info(f"  → Размер ордера: {target_size:.4f}")
             else:
                 # Если размер не рассчитан автоматически, пользователь должен указать его
@@ -930,7 +1071,7 @@ class PositionManager(PositionManagerProtocol):
                 size_str = str(target["size"])
             
             # Округляем цену в соответствии с требованиями Bitget
-            precision = self.get_price_precision(symbol)
+            precision = self.get_price_precision(symbol, product_type)
             rounded_price = round(price, precision)
                 
             # Формируем параметры ордера
@@ -1112,26 +1253,29 @@ class PositionManager(PositionManagerProtocol):
         Получает список активных стоп-лосс ордеров.
         """
         try:
-            # Используем plan_type="profit_loss" для получения стоп-лоссов и тейк-профитов
-            all_orders = self.exchange.get_active_plan_orders(
-                symbol=symbol, 
-                product_type=product_type,
-                plan_type="profit_loss"
-            )
-            
-            if all_orders is None:
-                return []
-            
-            # Фильтруем только стоп-лоссы по planType
-            stop_loss_orders = [
-                order for order in all_orders 
-                if order.get('planType') in ['loss_plan', 'pos_loss']
-            ]
-            return stop_loss_orders
+            return self._fetch_stop_loss_orders(symbol, product_type)
         except Exception as e:
             self.logger.error(f"Ошибка получения стоп-лосс ордеров: {e}")
             return []
 
+    def _fetch_stop_loss_orders(self, symbol: str, product_type: str) -> list:
+        """Активные стоп-лоссы; исключение, если биржа не ответила"""
+        # Используем plan_type="profit_loss" для получения стоп-лоссов и тейк-профитов
+        all_orders = self.exchange.get_active_plan_orders(
+            symbol=symbol,
+            product_type=product_type,
+            plan_type="profit_loss"
+        )
+
+        if all_orders is None:
+            return []
+
+        # Фильтруем только стоп-лоссы по planType
+        return [
+            order for order in all_orders
+            if order.get('planType') in ['loss_plan', 'pos_loss']
+        ]
+
     def get_active_take_profit_orders(
         self,
         symbol="",
@@ -1214,6 +1358,7 @@ class PositionManager(PositionManagerProtocol):
             self.logger.error(f"Ошибка получения позиций: {e}")
             return []
 
+    @global_tracer.traced("position.close_position_partial")
     def close_position_partial(
         self,
         symbol: str,
@@ -1223,7 +1368,8 @@ class PositionManager(PositionManagerProtocol):
         margin_coin: str = "USDT",
         order_type: str = "market",
         price: float = 0.0,  # для лимитных ордеров
-        client_oid: str = ""
+        client_oid: str = "",
+        hold_side: str = ""  # "long" / "short" - сторона в режиме хеджа; "" - первая позиция
     ) -> dict:
         """
         Частично закрывает позицию по проценту или фиксированному количеству.
@@ -1236,8 +1382,13 @@ class PositionManager(PositionManagerProtocol):
         
         positions = self.get_current_positions(symbol, product_type, margin_coin)
         
+        if hold_side:
+            # В режиме хеджа у символа две позиции - закрываем только указанную сторону
+            positions = [pos for pos in positions if str(pos.get('holdSide', '')).lower() == hold_side]
+
         if not positions:
-            raise ValueError(f"Открытые позиции по {symbol} не найдены")
+            side_info = f" ({hold_side})" if hold_side else ""
+            raise ValueError(f"Открытые позиции по {symbol}{side_info} не найдены")
         
         # Берем первую позицию (обычно одна позиция на символ)
         position = positions[0]
@@ -1366,6 +1517,7 @@ class PositionManager(PositionManagerProtocol):
             client_oid=client_oid
         )
 
+    @global_tracer.traced("position.close_position_full")
     def close_position_full(
         self,
         symbol: str,
@@ -1373,10 +1525,11 @@ class PositionManager(PositionManagerProtocol):
         margin_coin: str = "USDT",
         order_type: str = "market",
         price: float = 0.0,
-        client_oid: str = ""
+        client_oid: str = "",
+        hold_side: str = ""
     ) -> dict:
         """
-        Полностью закрывает позицию.
+        Полностью закрывает позицию (в режиме хеджа - сторону hold_side).
         """
         return self.close_position_partial(
             symbol=symbol,
@@ -1386,9 +1539,11 @@ class PositionManager(PositionManagerProtocol):
             margin_coin=margin_coin,
             order_type=order_type,
             price=price,
-            client_oid=client_oid
+            client_oid=client_oid,
+            hold_side=hold_side
         )
 
+    @global_tracer.traced("position.set_leverage")
     def set_leverage(
         self,
         symbol: str,
@@ -1509,40 +1664,31 @@ class PositionManager(PositionManagerProtocol):
             total_realized_pnl = 0.0
             position_details = []
 
+            # Цены всех позиций одним запросом
+            current_prices = self.get_current_prices({pos.symbol for pos in positions}, product_type)
+
             # Обрабатываем каждую позицию
             for pos in positions:
-                pos_symbol = pos.get('symbol')
-                hold_side = pos.get('holdSide')  # long/short
-                total_size = float(pos.get('total', 0))
-                available_size = float(pos.get('available', 0))
-                avg_price = float(pos.get('openPriceAvg', 0))
-                unrealized_pnl = float(pos.get('unrealizedPL', 0))
-                realized_pnl = float(pos.get('achievedProfits', 0))
-                leverage = pos.get('leverage', 1)
-                margin_mode = pos.get('marginMode', 'unknown')
-                margin_size = float(pos.get('marginSize', 0))
+                pos_symbol = pos.symbol
+                hold_side = pos.hold_side  # long/short
+                total_size = pos.total
+                available_size = pos.available
+                avg_price = pos.open_price_avg
+                unrealized_pnl = pos.unrealized_pl
+                realized_pnl = pos.achieved_profits
+                leverage = pos.leverage
+                margin_mode = pos.margin_mode
+                margin_size = pos.margin_size
                 
-                # Получаем текущую цену
-                try:
-                    ticker_data = self.exchange.fetch_ticker(
-                        symbol=pos_symbol,
-                        market_type="futures",
-                        product_type=product_type
-                    )
-                    current_price = float(ticker_data.get('close', 0))
-                    
-                    # Рассчитываем PnL процент
-                    if avg_price > 0:
-                        if hold_side == "long":
-                            pnl_percent = ((current_price - avg_price) / avg_price) * 100
-                        else:  # short
-                            pnl_percent = ((avg_price - current_price) / avg_price) * 100
-                    else:
-                        pnl_percent = 0.0
-                        
-                except Exception as e:
-                    self.logger.warning(f"Не удалось получить цену для {pos_symbol}: {e}")
-                    current_price = 0.0
+                current_price = current_prices.get(pos_symbol, 0.0)
+
+                # Рассчитываем PnL процент
+                if avg_price > 0 and current_price > 0:
+                    if hold_side == "long":
+                        pnl_percent = ((current_price - avg_price) / avg_price) * 100
+                    else:  # short
+                        pnl_percent = ((avg_price - current_price) / avg_price) * 100
+                else:
                     pnl_percent = 0.0
                 
                 # Накапливаем общий PnL
@@ -1622,62 +1768,94 @@ class PositionManager(PositionManagerProtocol):
     ):
         """
         Запускает мониторинг PnL в реальном времени.
+        PnL считается PnLEngine по mark price из WebSocket, снимки выводятся
+        не чаще раза в update_interval секунд.
+
+        Вне цикла событий блокирует до завершения; из работающего цикла
+        (например, обработчика Telegram) запускает задачу и возвращает её.
         """
-        import time
-        import os
-        
-        iteration = 0
-        
+        monitor = self._run_pnl_monitor_guarded(symbol, update_interval, product_type, margin_coin, max_iterations)
         try:
-            self.logger.info("ЗАПУСК МОНИТОРИНГА PnL В РЕАЛЬНОМ ВРЕМЕНИ")
-            self.logger.info("=" * 80)
-            self.logger.info(f"Символ: {symbol if symbol else 'ВСЕ ПОЗИЦИИ'}")
-            self.logger.info(f"Интервал обновления: {update_interval} сек")
-            self.logger.info(f"Максимум итераций: {max_iterations if max_iterations else 'БЕСКОНЕЧНО'}")
-            self.logger.info(f"Для остановки нажмите Ctrl+C")
-            self.logger.info("=" * 80)
-            
-            while True:
-                # Очищаем экран
-                if iteration > 0:
-                    os.system('clear' if os.name == 'posix' else 'cls')
-                
-                # Показываем заголовок
-                current_time = time.strftime("%Y-%m-%d %H:%M:%S")
-                self.logger.info(f"Обновление: {current_time} | Итерация: {iteration + 1}")
-                self.logger.info("")
-                
-                # Получаем и отображаем PnL
-                pnl_data = self.get_realtime_pnl(
-                    symbol=symbol,
-                    product_type=product_type,
-                    margin_coin=margin_coin,
-                    show_details=True
-                )
-                
-                if not pnl_data.get("success"):
-                    self.logger.error(f"Ошибка: {pnl_data.get('error')}")
-                
-                iteration += 1
-                
-                # Проверяем лимит итераций
-                if max_iterations and iteration >= max_iterations:
-                    self.logger.info(f"\nДостигнуто максимальное количество итераций: {max_iterations}")
-                    break
-                
-                # Показываем информацию о следующем обновлении
-                self.logger.info(f"\nСледующее обновление через {update_interval} сек... (Ctrl+C для остановки)")
-                
-                # Ждем указанный интервал
-                time.sleep(update_interval)
-                
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None:
+            return loop.create_task(monitor)
+
+        try:
+            asyncio.run(monitor)
         except KeyboardInterrupt:
-            self.logger.info(f"\n\nМониторинг остановлен пользователем")
-            self.logger.info(f"Выполнено итераций: {iteration}")
+            self.logger.info("Мониторинг остановлен пользователем")
+
+    async def _run_pnl_monitor_guarded(self, *args):
+        try:
+            await self._run_pnl_monitor(*args)
         except Exception as e:
-            self.logger.error(f"\nКритическая ошибка мониторинга: {e}")
             self.logger.error(f"Критическая ошибка мониторинга PnL: {e}")
 
+    async def _run_pnl_monitor(
+        self,
+        symbol: str,
+        update_interval: int,
+        product_type: str,
+        margin_coin: str,
+        max_iterations: int
+    ):
+        from trayding.pnl_engine import PnLEngine
+
+        engine = PnLEngine(self, product_type, margin_coin, publish_interval=update_interval)
+        done = asyncio.Event()
+        iteration = 0
+
+        def show(snapshot: dict):
+            nonlocal iteration
+            iteration += 1
+            self.logger.info("Обновление: %s | Итерация: %s", time.strftime("%Y-%m-%d %H:%M:%S"), iteration)
+            self._log_pnl_snapshot(snapshot, symbol)
+            if max_iterations and iteration >= max_iterations:
+                done.set()
+
+        engine.subscribe(show)
+
+        self.logger.info("ЗАПУСК МОНИТОРИНГА PnL В РЕАЛЬНОМ ВРЕМЕНИ")
+        self.logger.info(f"Символ: {symbol if symbol else 'ВСЕ ПОЗИЦИИ'}")
+        self.logger.info(f"Интервал обновления: {update_interval} сек")
+        self.logger.info(f"Максимум итераций: {max_iterations if max_iterations else 'БЕСКОНЕЧНО'}")
+
+        async with engine:
+            if not engine.is_active:
+                self.logger.error("Не удалось запустить потоковый расчёт PnL")
+                return
+            await done.wait()
+
+        self.logger.info(f"Выполнено итераций: {iteration}")
+
+    def _log_pnl_snapshot(self, snapshot: dict, symbol: str = ""):
+        """Вывод снимка PnL в лог (опционально только по одному символу)"""
+        positions = [p for p in snapshot["positions"] if not symbol or p["symbol"] == symbol]
+        if not positions:
+            self.logger.info("Открытых позиций не найдено")
+            return
+
+        for pos in positions:
+            self.logger.info(f"{pos['symbol']} {pos['side'].upper()}")
+            self.logger.info(f"   Размер: {pos['size']}")
+            self.logger.info(f"   Средняя цена: ${pos['avg_price']:,.4f}")
+            self.logger.info(f"   Mark цена: ${pos['current_price']:,.4f}")
+            self.logger.info(f"   Нереализованный PnL: {pos['unrealized_pnl']:+.2f} USDT ({pos['pnl_percent']:+.2f}%)")
+            self.logger.info(f"   Плечо: {pos['leverage']}x | Маржа: {pos['margin_size']:.2f} USDT")
+            self.logger.info("-" * 80)
+
+        total_unrealized = sum(p["unrealized_pnl"] for p in positions)
+        total_realized = sum(p["realized_pnl"] for p in positions)
+        self.logger.info("ОБЩАЯ СТАТИСТИКА:")
+        self.logger.info(f"   Позиций: {len(positions)}")
+        self.logger.info(f"   Нереализованный PnL: {total_unrealized:+.2f} USDT")
+        self.logger.info(f"   Реализованный PnL: {total_realized:+.2f} USDT")
+        self.logger.info(f"   Общий PnL: {total_unrealized + total_realized:+.2f} USDT")
+        self.logger.info("=" * 80)
+
     def get_position_summary(
         self,
         product_type: str = "USDT-FUTURES",
@@ -1731,6 +1909,7 @@ class PositionManager(PositionManagerProtocol):
                 "error": str(e)
             }
 
+    @emergency_priority()
     def emergency_close_all_positions(
         self,
         product_type: str = "USDT-FUTURES",
@@ -1935,6 +2114,7 @@ class PositionManager(PositionManagerProtocol):
         
         return results
 
+    @emergency_priority()
     def emergency_close_positions_by_symbol(
         self,
         symbols: list,
@@ -2096,16 +2276,13 @@ class PositionManager(PositionManagerProtocol):
             raise ValueError("Параметр new_trigger_price обязателен")
         
         # Округляем цену в соответствии с требованиями Bitget
-        precision = self.get_price_precision(symbol)
+        precision = self.get_price_precision(symbol, product_type)
         rounded_trigger_price = round(new_trigger_price, precision)
 
         if self.enable_safety_checks and self.safety_validator:
-            try:
-                ticker_data = self.exchange.fetch_ticker(symbol, "futures", product_type)
-                current_price = float(ticker_data["data"][0]["lastPr"])
-            except Exception as e:
-                self.logger.warning(f"Не удалось получить текущую цену для валидации: {e}")
-                current_price = None
+            current_price = self.get_current_price(symbol, product_type)
+            if current_price is None:
+                self.logger.warning("Не удалось получить текущую цену для валидации %s", symbol)
             
             # Валидация цены
             validation = self.safety_validator.validate_price(
@@ -2314,10 +2491,12 @@ class PositionManager(PositionManagerProtocol):
         profit_threshold: float = 0.03,  # 3% прибыли для активации
         buffer_percent: float = 0.001,  # 0.1% буфер для покрытия комиссии/спреда
         product_type: str = "USDT-FUTURES",
-        margin_coin: str = "USDT"
+        margin_coin: str = "USDT",
+        hold_side: str = ""
     ) -> dict:
         """
-        Автоматический перевод позиции в безубыток.
+        Автоматический перевод позиции в безубыток
+        (в режиме хеджа с hold_side - только этой стороны).
         
         Алгоритм:
         1. Проверяет, есть ли открытая позиция по символу
@@ -2334,6 +2513,8 @@ class PositionManager(PositionManagerProtocol):
                 product_type=product_type,
                 margin_coin=margin_coin
             )
+            if hold_side:
+                positions = [pos for pos in positions if str(pos.get("holdSide", "")).lower() == hold_side]
             
             if not positions:
                 return {
@@ -2341,197 +2522,11 @@ class PositionManager(PositionManagerProtocol):
                     "message": f"Нет открытых позиций для {symbol}",
                     "symbol": symbol
                 }
-            
-            # Фильтруем только открытые позиции 
-            # Проверяем и 'size' и 'total' для совместимости с разными форматами API
-            open_positions = []
-            for pos in positions:
-                size_field = float(pos.get("size", 0))
-                total_field = float(pos.get("total", 0))
-                
-                self.logger.debug(f"Позиция {symbol}: size={size_field}, total={total_field}, holdSide={pos.get('holdSide')}")
-                
-                # Позиция считается активной если любое из полей не равно 0
-                if size_field != 0 or total_field != 0:
-                    open_positions.append(pos)
-            
-            if not open_positions:
-                return {
-                    "success": False,
-                    "message": f"Нет активных позиций для {symbol}",
-                    "symbol": symbol
-                }
-            
-            results = []
-            
-            for position in open_positions:
-                position_side = ""  # Инициализируем переменную
-                try:
-                    # Извлекаем данные позиции
-                    position_side = position.get("holdSide", "").lower()  # long/short
-                    
-                    # Получаем размер позиции (проверяем разные поля для совместимости)
-                    position_size = float(position.get("size", position.get("total", 0)))
-                    
-                    entry_price = float(position.get("averageOpenPrice", position.get("openPriceAvg", 0)))
-                    unrealized_pnl = float(position.get("unrealizedPL", 0))
-                    margin_size = float(position.get("marginSize", 0))
-                    
-                    if entry_price == 0:
-                        self.logger.warning(f"Некорректная цена входа для позиции {symbol} {position_side}")
-                        continue
-                    
-                    ticker_data = self.exchange.fetch_ticker(symbol, "futures", product_type)
-                    if not ticker_data.get("data"):
-                        self.logger.error(f"Не удалось получить текущую цену для {symbol}")
-                        continue
 
-                    ticker_item = ticker_data["data"][0]  # первый элемент списка
-                    current_price = float(ticker_item["lastPr"])
-                    
-                    if position_side == "long":
-                        profit_percent = (current_price - entry_price) / entry_price
-                    elif position_side == "short":
-                        profit_percent = (entry_price - current_price) / entry_price
-                    else:
-                        self.logger.warning(f"Неизвестная сторона позиции: {position_side}")
-                        continue
-                    
-                    self.logger.info(
-                        f"{symbol} {position_side}: entry=${entry_price:.4f}, current=${current_price:.4f}, "
-                        f"profit={profit_percent:.2%} (threshold={profit_threshold:.2%})"
-                    )
-                    
-                    if profit_percent < profit_threshold:
-                        results.append({
-                            "position_side": position_side,
-                            "entry_price": entry_price,
-                            "current_price": current_price,
-                            "profit_percent": profit_percent,
-                            "status": "waiting",
-                            "message": f"Прибыль {profit_percent:.2%} < порога {profit_threshold:.2%}"
-                        })
-                        continue
-                    
-                    if position_side == "long":
-                        new_stop_loss = entry_price * (1 + buffer_percent)
-                    else:  # short
-                        new_stop_loss = entry_price * (1 - buffer_percent)
-                    
-                    self.logger.info(
-                        f"Активация break-even для {symbol} {position_side}: "
-                        f"новый SL = ${new_stop_loss:.4f} (entry=${entry_price:.4f} + buffer={buffer_percent:.3%})"
-                    )
-                    
-                    existing_stop_orders = self.get_active_stop_loss_orders(
-                        symbol=symbol,
-                        product_type=product_type,
-                    )
-                    
-                    # Фильтруем стоп-лоссы по стороне позиции
-                    position_stop_orders = []
-                    for order in existing_stop_orders:
-                        order_side = order.get("side", "").lower()
-                        # Для long позиции нужны sell стоп-лоссы, для short - buy стоп-лоссы
-                        if ((position_side == "long" and order_side == "sell") or 
-                            (position_side == "short" and order_side == "buy")):
-                            position_stop_orders.append(order)
-                    
-                    if position_stop_orders:
-                        stop_order = position_stop_orders[0]  # Берем первый найденный
-                        order_id = stop_order.get("orderId")
-                        
-                        self.logger.info(f"Обновление существующего стоп-лосса {order_id}")
-                        
-                        modify_result = self.modify_stop_loss_direct(
-                            symbol=symbol,
-                            new_stop_loss_price=new_stop_loss,
-                            order_id=order_id,
-                            product_type=product_type,
-                            margin_coin=margin_coin
-                        )
-                        
-                        if modify_result and not modify_result.get("error"):
-                            results.append({
-                                "position_side": position_side,
-                                "entry_price": entry_price,
-                                "current_price": current_price,
-                                "profit_percent": profit_percent,
-                                "new_stop_loss": new_stop_loss,
-                                "action": "updated",
-                                "order_id": order_id,
-                                "status": "success",
-                                "message": "Стоп-лосс успешно обновлен"
-                            })
-                        else:
-                            error_msg = modify_result.get("error", "Неизвестная ошибка") if modify_result else "Нет ответа от API"
-                            results.append({
-                                "position_side": position_side,
-                                "status": "error",
-                                "message": f"Ошибка обновления стоп-лосса: {error_msg}"
-                            })
-                    
-                    else:
-                        self.logger.info(f"Создание нового стоп-лосса")
-                        
-                        create_result = self.set_stop_loss(
-                            symbol=symbol,
-                            hold_side=position_side,
-                            stop_loss_price=new_stop_loss,
-                            product_type=product_type.replace("-", ""),  # "usdt-futures" -> "usdt_futures"
-                            margin_coin=margin_coin,
-                            size="",  # Позиционный стоп-лосс
-                            trigger_type="mark_price"
-                        )
-                        
-                        if create_result and create_result.get("code") == "00000":
-                            order_id = create_result.get("data", {}).get("orderId")
-                            results.append({
-                                "position_side": position_side,
-                                "entry_price": entry_price,
-                                "current_price": current_price,
-                                "profit_percent": profit_percent,
-                                "new_stop_loss": new_stop_loss,
-                                "action": "created",
-                                "order_id": order_id,
-                                "status": "success",
-                                "message": "Новый стоп-лосс успешно создан"
-                            })
-                        else:
-                            error_msg = create_result.get("msg", "Неизвестная ошибка") if create_result else "Нет ответа от API"
-                            results.append({
-                                "position_side": position_side,
-                                "status": "error",
-                                "message": f"Ошибка создания стоп-лосса: {error_msg}"
-                            })
-                    
-                except Exception as pos_error:
-                    self.logger.error(f"Ошибка обработки позиции {position_side}: {pos_error}")
-                    results.append({
-                        "position_side": position_side,
-                        "status": "error",
-                        "message": f"Ошибка обработки: {str(pos_error)}"
-                    })
-            
-            # Подготавливаем итоговый результат
-            successful_activations = [r for r in results if r["status"] == "success"]
-            waiting_positions = [r for r in results if r["status"] == "waiting"]
-            errors = [r for r in results if r["status"] == "error"]
-            
-            return {
-                "success": len(successful_activations) > 0,
-                "symbol": symbol,
-                "total_positions": len(results),
-                "break_even_activated": len(successful_activations),
-                "waiting_for_profit": len(waiting_positions),
-                "errors": len(errors),
-                "details": results,
-                "summary": {
-                    "activated": [r["message"] for r in successful_activations],
-                    "waiting": [r["message"] for r in waiting_positions],
-                    "errors": [r["message"] for r in errors]
-                }
-            }
+            results = self._break_even_sweep(
+                positions, profit_threshold, buffer_percent, product_type, margin_coin, symbol=symbol
+            )
+            return self._break_even_summary(symbol, results.get(symbol, []))
             
         except Exception as e:
             error_msg = f"Критическая ошибка в auto_break_even для {symbol}: {e}"
@@ -2543,6 +2538,272 @@ class PositionManager(PositionManagerProtocol):
                 "exception": str(e)
             }
 
+    def _break_even_sweep(
+        self,
+        positions: list,
+        profit_threshold: float,
+        buffer_percent: float,
+        product_type: str,
+        margin_coin: str,
+        symbol: str = ""
+    ) -> dict:
+        """
+        Проверка break-even для набора позиций за один проход: {symbol: [результаты]}.
+
+        Цены берутся одним снимком тикеров, стоп-лоссы - одним запросом plan
+        ордеров (только если есть позиции для перевода), запросы к бирже
+        отправляются только для позиций, достигших порога.
+        """
+        open_positions = [pos for pos in positions if float(pos.get("total", 0)) != 0]
+        current_prices = self.get_current_prices({pos.get("symbol") for pos in open_positions}, product_type)
+
+        results = {}
+        actions = []
+
+        for position in open_positions:
+            pos_symbol = position.get("symbol")
+            position_side = position.get("holdSide", "").lower()  # long/short
+            entry_price = float(position.get("openPriceAvg", 0))
+            symbol_results = results.setdefault(pos_symbol, [])
+
+            if entry_price == 0:
+                self.logger.warning(f"Некорректная цена входа для позиции {pos_symbol} {position_side}")
+                continue
+
+            current_price = current_prices.get(pos_symbol)
+            if current_price is None:
+                self.logger.error(f"Не удалось получить текущую цену для {pos_symbol}")
+                continue
+
+            if position_side == "long":
+                profit_percent = (current_price - entry_price) / entry_price
+            elif position_side == "short":
+                profit_percent = (entry_price - current_price) / entry_price
+            else:
+                self.logger.warning(f"Неизвестная сторона позиции: {position_side}")
+                continue
+
+            self.logger.debug(
+                "%s %s: entry=%.4f, current=%.4f, profit=%.2f%% (threshold=%.2f%%)",
+                pos_symbol, position_side, entry_price, current_price,
+                profit_percent * 100, profit_threshold * 100
+            )
+
+            if profit_percent < profit_threshold:
+                symbol_results.append({
+                    "position_side": position_side,
+                    "entry_price": entry_price,
+                    "current_price": current_price,
+                    "profit_percent": profit_percent,
+                    "status": "waiting",
+                    "message": f"Прибыль {profit_percent:.2%} < порога {profit_threshold:.2%}"
+                })
+                continue
+
+            if position_side == "long":
+                new_stop_loss = entry_price * (1 + buffer_percent)
+            else:  # short
+                new_stop_loss = entry_price * (1 - buffer_percent)
+
+            self.logger.info(
+                f"Активация break-even для {pos_symbol} {position_side}: "
+                f"новый SL = ${new_stop_loss:.4f} (entry=${entry_price:.4f} + buffer={buffer_percent:.3%})"
+            )
+            actions.append({
+                "symbol": pos_symbol,
+                "position_side": position_side,
+                "entry_price": entry_price,
+                "current_price": current_price,
+                "profit_percent": profit_percent,
+                "new_stop_loss": new_stop_loss,
+            })
+
+        if not actions:
+            return results
+
+        # Один снимок стоп-лоссов на все символы
+        try:
+            stop_loss_orders = self._fetch_stop_loss_orders(symbol, product_type)
+        except Exception as e:
+            # Без списка стоп-лоссов нельзя отличить "нет стопа" от сбоя - иначе создали бы дубликаты
+            self.logger.error(f"Break-even пропущен: стоп-лоссы не получены: {e}")
+            for action in actions:
+                results[action["symbol"]].append({
+                    "position_side": action["position_side"],
+                    "status": "error",
+                    "message": f"Стоп-лоссы не получены, break-even отложен: {e}"
+                })
+            return results
+
+        stop_orders = {}
+        for order in stop_loss_orders:
+            stop_orders.setdefault(order.get("symbol"), []).append(order)
+
+        updates = []
+        for action in actions:
+            # Для long позиции нужны sell стоп-лоссы, для short - buy стоп-лоссы
+            close_side = "sell" if action["position_side"] == "long" else "buy"
+            action["stop_order"] = next(
+                (
+                    order for order in stop_orders.get(action["symbol"], [])
+                    if order.get("side", "").lower() == close_side
+                ),
+                None
+            )
+
+            # Стоп уже в безубытке или выше (например, подтянут трейлингом) - не трогаем
+            if self._stop_covers_break_even(action, product_type):
+                stop_order = action["stop_order"]
+                results[action["symbol"]].append({
+                    "position_side": action["position_side"],
+                    "entry_price": action["entry_price"],
+                    "current_price": action["current_price"],
+                    "profit_percent": action["profit_percent"],
+                    "new_stop_loss": float(stop_order.get("triggerPrice")),
+                    "action": "kept",
+                    "order_id": stop_order.get("orderId"),
+                    "status": "success",
+                    "message": "Стоп-лосс уже не хуже безубытка"
+                })
+            else:
+                updates.append(action)
+
+        if not updates:
+            return results
+        actions = updates
+
+        # Изменения стоп-лоссов разных позиций независимы - отправляем параллельно
+        workers = min(len(actions), ExchangeConfig.BREAK_EVEN_MAX_PARALLEL_UPDATES)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="BreakEven") as executor:
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self._apply_break_even, action, product_type, margin_coin
+                )
+                for action in actions
+            ]
+            for action, future in zip(actions, futures):
+                results[action["symbol"]].append(future.result())
+
+        return results
+
+    def _stop_covers_break_even(self, action: dict, product_type: str) -> bool:
+        """Существующий стоп-лосс не хуже нового уровня безубытка (с учётом шага цены)"""
+        stop_order = action.get("stop_order")
+        if stop_order is None:
+            return False
+        trigger_price = float(stop_order.get("triggerPrice") or 0)
+        if trigger_price <= 0:
+            return False
+
+        target = action["new_stop_loss"]
+        contracts = getattr(self.exchange, "contracts", None)
+        if contracts is not None:
+            target = contracts.round_price(action["symbol"], target, product_type) or target
+
+        if action["position_side"] == "long":
+            return trigger_price >= target
+        return trigger_price <= target
+
+    def _apply_break_even(self, action: dict, product_type: str, margin_coin: str) -> dict:
+        """Обновить существующий стоп-лосс позиции или создать новый"""
+        symbol = action["symbol"]
+        position_side = action["position_side"]
+        new_stop_loss = action["new_stop_loss"]
+        stop_order = action.get("stop_order")
+
+        details = {
+            "position_side": position_side,
+            "entry_price": action["entry_price"],
+            "current_price": action["current_price"],
+            "profit_percent": action["profit_percent"],
+            "new_stop_loss": new_stop_loss,
+        }
+
+        try:
+            if stop_order is not None:
+                order_id = stop_order.get("orderId")
+                self.logger.info(f"Обновление существующего стоп-лосса {order_id}")
+
+                modify_result = self.modify_stop_loss_direct(
+                    symbol=symbol,
+                    new_stop_loss_price=new_stop_loss,
+                    order_id=order_id,
+                    product_type=product_type,
+                    margin_coin=margin_coin
+                )
+
+                if modify_result and not modify_result.get("error"):
+                    return {
+                        **details,
+                        "action": "updated",
+                        "order_id": order_id,
+                        "status": "success",
+                        "message": "Стоп-лосс успешно обновлен"
+                    }
+                error_msg = modify_result.get("error", "Неизвестная ошибка") if modify_result else "Нет ответа от API"
+                return {
+                    "position_side": position_side,
+                    "status": "error",
+                    "message": f"Ошибка обновления стоп-лосса: {error_msg}"
+                }
+
+            self.logger.info(f"Создание нового стоп-лосса")
+
+            create_result = self.set_stop_loss(
+                symbol=symbol,
+                hold_side=position_side,
+                stop_loss_price=new_stop_loss,
+                product_type=product_type.replace("-", ""),  # "usdt-futures" -> "usdt_futures"
+                margin_coin=margin_coin,
+                size="",  # Позиционный стоп-лосс
+                trigger_type="mark_price"
+            )
+
+            if create_result and create_result.get("code") == "00000":
+                return {
+                    **details,
+                    "action": "created",
+                    "order_id": create_result.get("data", {}).get("orderId"),
+                    "status": "success",
+                    "message": "Новый стоп-лосс успешно создан"
+                }
+            error_msg = create_result.get("msg", "Неизвестная ошибка") if create_result else "Нет ответа от API"
+            return {
+                "position_side": position_side,
+                "status": "error",
+                "message": f"Ошибка создания стоп-лосса: {error_msg}"
+            }
+
+        except Exception as pos_error:
+            self.logger.error(f"Ошибка обработки позиции {position_side}: {pos_error}")
+            return {
+                "position_side": position_side,
+                "status": "error",
+                "message": f"Ошибка обработки: {str(pos_error)}"
+            }
+
+    def _break_even_summary(self, symbol: str, results: list) -> dict:
+        """Итог проверки break-even по символу"""
+        successful_activations = [r for r in results if r["status"] == "success"]
+        waiting_positions = [r for r in results if r["status"] == "waiting"]
+        errors = [r for r in results if r["status"] == "error"]
+
+        return {
+            "success": len(successful_activations) > 0,
+            "symbol": symbol,
+            "total_positions": len(results),
+            "break_even_activated": len(successful_activations),
+            "waiting_for_profit": len(waiting_positions),
+            "errors": len(errors),
+            "details": results,
+            "summary": {
+                "activated": [r["message"] for r in successful_activations],
+                "waiting": [r["message"] for r in waiting_positions],
+                "errors": [r["message"] for r in errors]
+            }
+        }
+
     def auto_break_even_all_positions(
         self,
         profit_threshold: float = 0.03,
@@ -2552,6 +2813,7 @@ class PositionManager(PositionManagerProtocol):
     ) -> dict:
         """
         Автоматический перевод в безубыток для всех открытых позиций.
+        Один снимок позиций, цен и стоп-лоссов на все символы.
         """
         try:
             self.logger.info("Проверка break-even для всех открытых позиций")
@@ -2569,16 +2831,12 @@ class PositionManager(PositionManagerProtocol):
                     "total_positions": 0,
                     "results": []
                 }
-            
-            # Получаем уникальные символы (проверяем оба поля для активных позиций)
-            symbols = []
-            for pos in all_positions:
-                size_field = float(pos.get("size", 0))
-                total_field = float(pos.get("total", 0))
-                if size_field != 0 or total_field != 0:
-                    symbols.append(pos.get("symbol"))
-            symbols = list(set(symbols))
-            
+
+            sweep = self._break_even_sweep(
+                all_positions, profit_threshold, buffer_percent, product_type, margin_coin
+            )
+            symbols = list(sweep)
+
             if not symbols:
                 return {
                     "success": False,
@@ -2589,27 +2847,18 @@ class PositionManager(PositionManagerProtocol):
             
             self.logger.info(f"Найдено {len(symbols)} символов с активными позициями: {', '.join(symbols)}")
             
-            # Обрабатываем каждый символ
             all_results = []
             total_activated = 0
             total_waiting = 0
             total_errors = 0
             
             for symbol in symbols:
-                result = self.auto_break_even(
-                    symbol=symbol,
-                    profit_threshold=profit_threshold,
-                    buffer_percent=buffer_percent,
-                    product_type=product_type,
-                    margin_coin=margin_coin
-                )
-                
+                result = self._break_even_summary(symbol, sweep[symbol])
                 all_results.append(result)
                 
-                if result.get("success"):
-                    total_activated += result.get("break_even_activated", 0)
-                    total_waiting += result.get("waiting_for_profit", 0)
-                    total_errors += result.get("errors", 0)
+                total_activated += result["break_even_activated"]
+                total_waiting += result["waiting_for_profit"]
+                total_errors += result["errors"]
             
             return {
                 "success": total_activated > 0,
@@ -0,0 +1,118 @@
+"""
+Индекс ценовых триггеров
+
+Правила риск-движка, срабатывающие на уровне цены (перевод в безубыток при
+entry * (1 ± threshold), ступени частичного тейк-профита, активация
+трейлинга), регистрируют здесь свои уровни. Уровни хранятся по символам в
+отсортированных списках, и тик проверяется бинарным поиском за O(log n) в
+памяти - правило вызывается только когда его уровень действительно пересечён.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+
+@dataclass(slots=True)
+class PriceTrigger:
+    symbol: str
+    direction: str  # up - срабатывает при цене >= уровня, down - при цене <=
+    activation_price: float
+    owner: Any = None  # кто ждёт срабатывания (например, (позиция, правило))
+
+
+class _SymbolTriggers:
+    """Триггеры одного символа"""
+
+    __slots__ = ("up", "down")
+
+    def __init__(self):
+        # Отсортированные списки (activation_price, seq, trigger)
+        self.up: List[Tuple[float, int, PriceTrigger]] = []
+        self.down: List[Tuple[float, int, PriceTrigger]] = []
+
+    def __len__(self) -> int:
+        return len(self.up) + len(self.down)
+
+
+class PriceTriggerIndex:
+    """Ценовые уровни по символам"""
+
+    def __init__(self):
+        self._symbols: Dict[str, _SymbolTriggers] = {}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return sum(len(triggers) for triggers in self._symbols.values())
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._symbols
+
+    def add(self, trigger: PriceTrigger) -> PriceTrigger:
+        triggers = self._symbols.setdefault(trigger.symbol, _SymbolTriggers())
+        self._seq += 1
+        book = triggers.down if trigger.direction == "down" else triggers.up
+        insort(book, (trigger.activation_price, self._seq, trigger))
+        return trigger
+
+    def add_level(self, symbol: str, direction: str, activation_price: float, owner: Any = None) -> PriceTrigger:
+        return self.add(PriceTrigger(symbol, direction, activation_price, owner))
+
+    def check(self, symbol: str, price: float) -> List[PriceTrigger]:
+        """
+        Сработавшие при цене price триггеры символа. Они удаляются из индекса;
+        чтобы ждать следующего пересечения, их возвращают через rearm().
+        """
+        triggers = self._symbols.get(symbol)
+        if triggers is None:
+            return []
+
+        fired = []
+
+        # up: уровень <= price - префикс списка
+        cut = bisect_right(triggers.up, (price, float("inf")))
+        if cut:
+            fired.extend(item[2] for item in triggers.up[:cut])
+            del triggers.up[:cut]
+
+        # down: уровень >= price - суффикс списка
+        cut = bisect_left(triggers.down, (price, -1))
+        if cut < len(triggers.down):
+            fired.extend(item[2] for item in triggers.down[cut:])
+            del triggers.down[cut:]
+
+        if not triggers:
+            del self._symbols[symbol]
+        return fired
+
+    def rearm(self, fired: List[PriceTrigger]) -> None:
+        for trigger in fired:
+            self.add(trigger)
+
+    def discard(self, symbol: str, predicate: Callable[[PriceTrigger], bool]) -> None:
+        """Удалить триггеры символа, для которых predicate(trigger) истинно"""
+        triggers = self._symbols.get(symbol)
+        if triggers is None:
+            return
+        triggers.up = [item for item in triggers.up if not predicate(item[2])]
+        triggers.down = [item for item in triggers.down if not predicate(item[2])]
+        if not triggers:
+            del self._symbols[symbol]
+
+    def remove_symbol(self, symbol: str) -> None:
+        self._symbols.pop(symbol, None)
+
+    def clear(self) -> None:
+        self._symbols.clear()
+
+    def nearest(self, symbol: str) -> Dict[str, float]:
+        """Ближайшие уровни символа сверху (up) и снизу (down)"""
+        triggers = self._symbols.get(symbol)
+        if triggers is None:
+            return {}
+        result = {}
+        if triggers.up:
+            result["up"] = triggers.up[0][0]
+        if triggers.down:
+            result["down"] = triggers.down[-1][0]
+        return result
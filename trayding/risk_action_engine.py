@@ -0,0 +1,798 @@
+"""
+Риск-движок реального времени
+
+Один поток рыночных данных (BitgetWebSocketClient) на все позиции и
+подключаемые правила на каждую позицию: перевод в безубыток, трейлинг-стоп,
+стоп по времени, лестница частичных тейк-профитов (trayding/risk_rules.py).
+
+На тике правила, ждущие уровня цены, проверяются через PriceTriggerIndex
+(бинарный поиск), остальные - напрямую; всё в памяти за один проход по
+позициям символа. REST вызывается только для сработавших правил, вне цикла
+событий; пока действие по паре (позиция, правило) выполняется, повторно оно
+не запускается. Статистика и метрики общие для всех правил.
+
+Размер и цена входа позиций периодически сверяются с биржей
+(RiskEngineConfig.POSITION_SYNC_INTERVAL): после усреднения уровни правил
+пересчитываются, закрытые вне движка позиции снимаются с наблюдения.
+"""
+
+import asyncio
+import itertools
+import time
+import weakref
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from config import RiskEngineConfig
+from utils.logging_setup import setup_logger
+from utils.blocking_executor import get_blocking_executor
+from utils.exceptions import BlockingCallRejected
+from utils.metrics_exporter import MetricSample, global_metrics_registry
+from api.bitget_websocket import BitgetWebSocketClient
+from trayding.price_triggers import PriceTriggerIndex
+from trayding.risk_rules import BreakEvenRule, PositionState, RiskAction, RiskRule
+
+
+class RiskActionEngine:
+    """ Правила риска по всем позициям на общем потоке тикеров """
+
+    def __init__(self, position_manager, default_rules: Optional[List[RiskRule]] = None):
+        self.position_manager = position_manager
+        self.default_rules = list(default_rules or [])
+        self.logger = setup_logger()
+
+        self.ws_client = BitgetWebSocketClient(
+            price_snapshot=getattr(position_manager.exchange, "prices", None),
+            order_books=getattr(position_manager.exchange, "order_books", None)
+        )
+        # REST вызовы правил: вне цикла событий, по очереди на символ
+        self.executor = get_blocking_executor()
+
+        # symbol -> [PositionState]
+        self.positions: Dict[str, List[PositionState]] = {}
+        self.triggers = PriceTriggerIndex()
+        # symbol -> [(позиция, правило)], которые проверяются на каждом тике
+        self._continuous: Dict[str, list] = {}
+        self._in_flight = set()
+
+        self.subscribers: List[Callable] = []
+
+        self.is_active = False
+        self.monitoring_task = None
+        self.sync_task = None
+
+        self.stats = {
+            "price_updates": 0,
+            "rule_evaluations": 0,
+            "trigger_fires": 0,
+            "actions_started": 0,
+            "actions_applied": 0,
+            "actions_failed": 0,
+            "actions_deferred": 0,
+            "positions_synced": 0,
+            "positions_gone": 0,
+            "errors": 0,
+            "started_at": None
+        }
+        self.rule_stats: Dict[str, Dict[str, int]] = {}
+
+        global_metrics_registry.register(self)
+
+    def subscribe(self, callback: Callable) -> None:
+        """
+        Получатель событий callback(event: dict) о выполненных действиях
+        (обычная или async функция), например уведомления в Telegram.
+        """
+        self.subscribers.append(callback)
+
+    async def start(self) -> bool:
+        if self.is_active:
+            return True
+
+        try:
+            if not await self.ws_client.connect():
+                self.logger.error("Не удалось подключиться к WebSocket")
+                return False
+
+            self.monitoring_task = asyncio.create_task(self.ws_client.listen())
+            self.sync_task = asyncio.create_task(self._sync_loop())
+            self.is_active = True
+            self.stats["started_at"] = time.time()
+
+            self.logger.info("Риск-движок запущен")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Ошибка запуска риск-движка: {e}")
+            return False
+
+    async def stop(self):
+        if not self.is_active:
+            return
+
+        self.is_active = False
+
+        for task in (self.monitoring_task, self.sync_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+        await self.ws_client.disconnect()
+
+        self.positions.clear()
+        self._continuous.clear()
+        self.triggers.clear()
+
+        self.logger.info("Риск-движок остановлен")
+
+    async def add_position(
+        self,
+        symbol: str,
+        rules: Optional[List[RiskRule]] = None,
+        product_type: str = "USDT-FUTURES",
+        margin_coin: str = "USDT",
+        positions: Optional[list] = None
+    ) -> bool:
+        """
+        Поставить открытые позиции символа под наблюдение с набором правил
+        (по умолчанию default_rules). Правила добавляются к уже назначенным;
+        правило с тем же ключом (тип и владелец) заменяет прежнее вместе с
+        его состоянием.
+        """
+        if not self.is_active:
+            self.logger.error("Риск-движок не запущен")
+            return False
+
+        rules = list(rules) if rules is not None else self.default_rules
+        if not rules:
+            self.logger.warning(f"Не заданы правила для {symbol}")
+            return False
+
+        if positions is None:
+            positions = await self.executor.run(
+                symbol, self.position_manager.get_current_positions, symbol, product_type, margin_coin
+            )
+        positions = [
+            pos for pos in positions
+            if pos.get("symbol") == symbol and float(pos.get("total", 0)) != 0
+        ]
+        if not positions:
+            self.logger.warning(f"Нет активных позиций для {symbol}")
+            return False
+
+        subscribe = symbol not in self.positions
+        states = self.positions.setdefault(symbol, [])
+
+        for pos in positions:
+            hold_side = str(pos.get("holdSide", "long")).lower()
+            state = next((s for s in states if s.hold_side == hold_side), None)
+            if state is None:
+                state = PositionState.from_position(pos, [], product_type, margin_coin)
+                states.append(state)
+            elif state.sync(pos):
+                self._rearm(state)
+            for rule in rules:
+                existing = next((r for r in state.rules if r.key == rule.key), None)
+                if existing is rule:
+                    continue
+                if existing is not None:
+                    self._unassign(state, existing)
+                state.rules.append(rule)
+                self._arm(state, rule)
+
+        if subscribe:
+            if not await self.ws_client.subscribe_ticker(symbol, self._on_ticker):
+                self._forget(symbol)
+                self.logger.error(f"Не удалось подписаться на {symbol}")
+                return False
+
+        self.logger.info(
+            "Риск-движок: %s (%s) - правила: %s",
+            symbol, ", ".join(s.hold_side for s in states),
+            ", ".join(sorted({rule.key for s in states for rule in s.rules}))
+        )
+        return True
+
+    async def add_all_positions(
+        self,
+        rules: Optional[List[RiskRule]] = None,
+        product_type: str = "USDT-FUTURES",
+        margin_coin: str = "USDT"
+    ) -> Dict:
+        """Все открытые позиции - одним запросом позиций"""
+        if not self.is_active:
+            return {"success": False, "message": "Риск-движок не запущен"}
+
+        all_positions = await self.executor.run(
+            "positions", self.position_manager.get_current_positions, "", product_type, margin_coin
+        )
+
+        by_symbol: Dict[str, list] = {}
+        for pos in all_positions:
+            if float(pos.get("total", 0)) != 0:
+                by_symbol.setdefault(pos.get("symbol"), []).append(pos)
+
+        if not by_symbol:
+            return {"success": False, "message": "Нет открытых позиций"}
+
+        results = []
+        for symbol, positions in by_symbol.items():
+            success = await self.add_position(symbol, rules, product_type, margin_coin, positions)
+            results.append({"symbol": symbol, "success": success})
+
+        added = sum(1 for r in results if r["success"])
+        return {
+            "success": added > 0,
+            "total_symbols": len(by_symbol),
+            "successful_additions": added,
+            "results": results,
+            "message": f"Добавлено {added} из {len(by_symbol)} символов"
+        }
+
+    async def remove_position(
+        self, symbol: str, rule_names: Optional[List[str]] = None, owner: Optional[str] = None
+    ) -> bool:
+        """
+        Снять правила с позиций символа: все, перечисленные по имени и/или
+        только правила владельца owner
+        """
+        states = self.positions.get(symbol)
+        if states is None:
+            self.logger.warning(f"Позиция {symbol} не отслеживается")
+            return False
+
+        if rule_names is not None or owner is not None:
+            def matches(rule: RiskRule) -> bool:
+                return (rule_names is None or rule.name in rule_names) and (owner is None or rule.owner == owner)
+
+            for state in states:
+                for rule in [rule for rule in state.rules if matches(rule)]:
+                    self._unassign(state, rule)
+            if any(state.rules for state in states):
+                return True
+
+        self._forget(symbol)
+        if self.ws_client.is_connected:
+            await self.ws_client.unsubscribe_ticker(symbol)
+
+        self.logger.info(f"Удален из риск-движка: {symbol}")
+        return True
+
+    async def sync_positions(self) -> Dict[str, int]:
+        """
+        Сверить отслеживаемые позиции с биржей: размер и цена входа
+        обновляются (уровни правил пересчитываются), позиции, которых на
+        бирже больше нет, снимаются с наблюдения.
+
+        Raises:
+            Exception: позиции не получены - состояние не меняется
+        """
+        synced = gone = 0
+        groups = {
+            (state.product_type, state.margin_coin)
+            for states in self.positions.values() for state in states
+        }
+
+        for product_type, margin_coin in groups:
+            # get_positions (а не get_current_positions): ошибка запроса не должна выглядеть как "позиций нет"
+            current = await self.executor.run(
+                "positions", self.position_manager.exchange.get_positions, "", product_type, margin_coin
+            )
+            by_key = {
+                (pos.get("symbol"), str(pos.get("holdSide", "long")).lower()): pos
+                for pos in current if float(pos.get("total", 0)) != 0
+            }
+
+            for states in list(self.positions.values()):
+                for state in list(states):
+                    if (state.product_type, state.margin_coin) != (product_type, margin_coin):
+                        continue
+                    # Позицию сейчас меняет правило - сверим на следующем проходе
+                    if any(key[:2] == state.key for key in self._in_flight):
+                        continue
+
+                    pos = by_key.get(state.key)
+                    if pos is None:
+                        gone += 1
+                        self.logger.info(
+                            "Риск-движок: позиция %s %s закрыта на бирже", state.symbol, state.hold_side
+                        )
+                        state.closed = True
+                        await self._drop_position(state)
+                    elif state.sync(pos):
+                        synced += 1
+                        self._rearm(state)
+
+        self.stats["positions_synced"] += synced
+        self.stats["positions_gone"] += gone
+        return {"synced": synced, "gone": gone}
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(RiskEngineConfig.POSITION_SYNC_INTERVAL)
+            if not self.positions:
+                continue
+            try:
+                await self.sync_positions()
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.logger.warning(f"Риск-движок: сверка позиций не удалась: {e}")
+
+    def _rearm(self, state: PositionState):
+        """Пересчитать уровни правил позиции (после изменения цены входа)"""
+        self.triggers.discard(state.symbol, lambda t: t.owner[0] is state)
+        for rule in state.rules:
+            self._arm(state, rule)
+
+    def _unassign(self, state: PositionState, rule: RiskRule):
+        """Снять правило с позиции вместе с его уровнями и состоянием"""
+        state.rules.remove(rule)
+        self.triggers.discard(state.symbol, lambda t: t.owner[0] is state and t.owner[1] is rule)
+        self._disarm_continuous(state, rule)
+        state.done.discard(rule.key)
+        state.rule_state.pop(rule.key, None)
+        state.cooldown_until.pop(rule.key, None)
+
+    def _forget(self, symbol: str):
+        self.positions.pop(symbol, None)
+        self._continuous.pop(symbol, None)
+        self.triggers.remove_symbol(symbol)
+
+    def _arm(self, state: PositionState, rule: RiskRule):
+        """Зарегистрировать правило: уровень цены в индексе или проверка на каждом тике"""
+        if state.closed or rule.key in state.done or rule not in state.rules:
+            return
+
+        level = rule.arm_price(state)
+        if level is not None:
+            self.triggers.add_level(state.symbol, state.direction, level, (state, rule))
+            return
+
+        continuous = self._continuous.setdefault(state.symbol, [])
+        if not any(s is state and r is rule for s, r in continuous):
+            continuous.append((state, rule))
+
+    def _disarm_continuous(self, state: PositionState, rule: RiskRule):
+        continuous = self._continuous.get(state.symbol)
+        if continuous:
+            self._continuous[state.symbol] = [
+                (s, r) for s, r in continuous if not (s is state and r is rule)
+            ]
+
+    async def _on_ticker(self, ticker_data):
+        try:
+            symbol = ticker_data["symbol"]
+            price = ticker_data["last_price"]
+            if symbol not in self.positions or price <= 0:
+                return
+
+            self.stats["price_updates"] += 1
+            now = time.time()
+
+            fired = self.triggers.check(symbol, price)
+            if fired:
+                self.stats["trigger_fires"] += len(fired)
+                for trigger in fired:
+                    state, rule = trigger.owner
+                    self._evaluate(state, rule, price, now, from_level=True)
+
+            for state, rule in list(self._continuous.get(symbol, ())):
+                self._evaluate(state, rule, price, now, from_level=False)
+
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.logger.error(f"Ошибка обработки тика риск-движком: {e}")
+
+    def _evaluate(self, state: PositionState, rule: RiskRule, price: float, now: float, from_level: bool):
+        key = (state.symbol, state.hold_side, rule.key)
+        if state.closed or rule.key in state.done or rule not in state.rules:
+            self._disarm_continuous(state, rule)
+            return
+
+        if key in self._in_flight or now < state.cooldown_until.get(rule.key, 0):
+            if from_level:
+                self._arm(state, rule)
+            return
+
+        self.stats["rule_evaluations"] += 1
+        action = rule.evaluate(state, price, now)
+
+        if action is None:
+            if from_level:
+                # Уровень пересечён, но правило решило ждать (или перешло в режим каждого тика)
+                self._arm(state, rule)
+            elif rule.arm_price(state) is not None:
+                self._disarm_continuous(state, rule)
+                self._arm(state, rule)
+            return
+
+        self._in_flight.add(key)
+        self.stats["actions_started"] += 1
+        asyncio.create_task(self._execute(state, rule, action, key))
+
+    async def _execute(self, state: PositionState, rule: RiskRule, action: RiskAction, key):
+        rule_stats = self.rule_stats.setdefault(rule.name, {"applied": 0, "failed": 0})
+        self.logger.info(
+            "Риск-движок: %s %s %s - %s", rule.name, state.symbol, state.hold_side, action.reason
+        )
+
+        try:
+            try:
+                result = await self.executor.run(
+                    state.symbol, rule.execute, self.position_manager, state, action
+                )
+            except BlockingCallRejected as e:
+                # Очередь REST вызовов заполнена: повтор после паузы правила
+                self.stats["actions_deferred"] += 1
+                state.cooldown_until[rule.key] = time.time() + rule.cooldown
+                self.logger.warning(f"Риск-движок: {rule.name} {state.symbol} отложено - {e}")
+                self._arm(state, rule)
+                return
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+
+            result = result or {"success": False, "error": "Нет ответа"}
+            applied = bool(result.get("success"))
+            finished = rule.on_result(state, action, result) if applied else False
+
+            if applied:
+                self.stats["actions_applied"] += 1
+                rule_stats["applied"] += 1
+                if rule.closes_position:
+                    state.closed = True
+            else:
+                self.stats["actions_failed"] += 1
+                rule_stats["failed"] += 1
+                state.cooldown_until[rule.key] = time.time() + rule.cooldown
+                self.logger.warning(
+                    "Риск-движок: %s %s не выполнено: %s",
+                    rule.name, state.symbol, result.get("error") or result.get("message")
+                )
+
+            if rule not in state.rules:
+                pass  # правило заменено или снято, пока выполнялось действие
+            elif finished:
+                state.done.add(rule.key)
+                self._disarm_continuous(state, rule)
+            elif not state.closed:
+                self._arm(state, rule)
+
+            await self._publish({
+                "symbol": state.symbol,
+                "side": state.hold_side,
+                "rule": rule.name,
+                "owner": rule.owner,
+                "action": action.kind,
+                "reason": action.reason,
+                "price": action.params.get("price"),
+                "applied": applied,
+                "result": result
+            })
+
+            if state.closed:
+                await self._drop_position(state)
+            elif all(r.key in state.done for r in state.rules):
+                self.logger.info("Риск-движок: все правила %s %s выполнены", state.symbol, state.hold_side)
+                await self._drop_position(state)
+
+        finally:
+            self._in_flight.discard(key)
+
+    async def _drop_position(self, state: PositionState):
+        states = self.positions.get(state.symbol)
+        if states is None:
+            return
+        if state in states:
+            states.remove(state)
+        self.triggers.discard(state.symbol, lambda t: t.owner[0] is state)
+        self._continuous[state.symbol] = [
+            (s, r) for s, r in self._continuous.get(state.symbol, []) if s is not state
+        ]
+        if not states:
+            await self.remove_position(state.symbol)
+
+    async def _publish(self, event: dict):
+        for callback in list(self.subscribers):
+            try:
+                result = callback(event)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.logger.error(f"Ошибка подписчика риск-движка: {e}")
+
+    def get_status(self) -> Dict:
+        uptime = time.time() - self.stats["started_at"] if self.stats["started_at"] else 0
+        return {
+            "is_active": self.is_active,
+            "websocket_connected": self.ws_client.is_connected,
+            "monitored_symbols": list(self.positions),
+            "monitored_count": len(self.positions),
+            "uptime_seconds": uptime,
+            "statistics": self.stats.copy(),
+            "rules": {name: stats.copy() for name, stats in self.rule_stats.items()},
+            "positions": {
+                symbol: [
+                    {
+                        "side": state.hold_side,
+                        "size": state.size,
+                        "entry_price": state.entry_price,
+                        "rules": [rule.key for rule in state.rules],
+                        "done": sorted(state.done),
+                        "rule_state": {name: dict(value) for name, value in state.rule_state.items()}
+                    }
+                    for state in states
+                ]
+                for symbol, states in self.positions.items()
+            },
+            "nearest_levels": {symbol: self.triggers.nearest(symbol) for symbol in self.positions}
+        }
+
+    def collect_metrics(self) -> List[MetricSample]:
+        """Статистика риск-движка для экспорта в OpenMetrics"""
+        samples = [
+            MetricSample(
+                "bot_risk_monitored_positions", "gauge",
+                "Positions watched by the risk action engine",
+                sum(len(states) for states in self.positions.values()), {}
+            ),
+            MetricSample(
+                "bot_risk_armed_triggers", "gauge",
+                "Price levels armed in the risk trigger index", len(self.triggers), {}
+            ),
+        ]
+        for stat_name, help_text in (
+            ("price_updates", "Price ticks processed by the risk action engine"),
+            ("rule_evaluations", "Risk rule evaluations"),
+            ("trigger_fires", "Armed price levels crossed"),
+            ("actions_started", "Risk actions sent to the exchange"),
+            ("actions_deferred", "Risk actions postponed because the blocking call queue was full"),
+            ("positions_synced", "Watched positions updated from the exchange (size or entry price)"),
+            ("positions_gone", "Watched positions found closed on the exchange"),
+            ("errors", "Errors in the risk action engine"),
+        ):
+            samples.append(MetricSample(
+                f"bot_risk_{stat_name}", "counter", help_text, self.stats[stat_name], {}, "_total"
+            ))
+        for rule_name, stats in self.rule_stats.items():
+            for outcome, value in stats.items():
+                samples.append(MetricSample(
+                    "bot_risk_actions", "counter",
+                    "Risk actions by rule and outcome", value,
+                    {"rule": rule_name, "outcome": outcome}, "_total"
+                ))
+        return samples
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+
+_engines = weakref.WeakKeyDictionary()
+_monitor_ids = itertools.count(1)
+
+
+def get_risk_action_engine(position_manager) -> RiskActionEngine:
+    """Общий риск-движок PositionManager: одно WebSocket соединение на все правила"""
+    engine = _engines.get(position_manager)
+    if engine is None:
+        engine = _engines[position_manager] = RiskActionEngine(position_manager)
+    return engine
+
+
+class BreakEvenMonitor:
+    """
+    Мониторинг break-even поверх общего риск-движка: позиции символа
+    получают BreakEvenRule, а WebSocket поток и проверки - общие для всех
+    мониторов одного PositionManager. Основа для RealtimeBreakEvenManager и
+    AutoBreakEvenSystem.
+
+    Правила монитора помечены его owner: остановка одного монитора не снимает
+    правила другого на том же символе.
+    """
+
+    def __init__(self, position_manager, engine: Optional[RiskActionEngine] = None):
+        self.position_manager = position_manager
+        self.logger = setup_logger()
+        self.engine = engine or get_risk_action_engine(position_manager)
+        self.engine.subscribe(self._on_engine_event)
+        self.owner = f"{type(self).__name__}-{next(_monitor_ids)}"
+
+        # Символы этого монитора: {symbol: config}
+        self.monitored_positions = {}
+        self.is_active = False
+
+        self.stats = {
+            "break_even_activated": 0,
+            "positions_added": 0,
+            "positions_removed": 0,
+            "errors": 0,
+            "started_at": None
+        }
+
+    async def start(self) -> bool:
+        if self.is_active:
+            self.logger.warning("Мониторинг break-even уже запущен")
+            return True
+        if not await self.engine.start():
+            return False
+        self.is_active = True
+        self.stats["started_at"] = time.time()
+        self.logger.info("Мониторинг break-even запущен")
+        return True
+
+    async def stop(self):
+        if not self.is_active:
+            return
+        self.is_active = False
+
+        for symbol in list(self.monitored_positions):
+            if symbol in self.engine.positions:
+                await self.engine.remove_position(symbol, ["break_even"], owner=self.owner)
+        self.monitored_positions.clear()
+
+        # Движок общий: останавливаем, только если за ним больше никто не следит
+        if not self.engine.positions:
+            await self.engine.stop()
+        self.logger.info("Мониторинг break-even остановлен")
+
+    async def add(
+        self,
+        symbol: str,
+        profit_threshold: float = 0.03,
+        buffer_percent: float = 0.001,
+        product_type: str = "USDT-FUTURES",
+        margin_coin: str = "USDT",
+        positions: Optional[list] = None
+    ) -> bool:
+        if not self.is_active:
+            self.logger.error("Мониторинг break-even не запущен")
+            return False
+
+        # Повторный add заменяет правило монитора на символе новыми параметрами
+        rule = BreakEvenRule(profit_threshold, buffer_percent, owner=self.owner)
+        if not await self.engine.add_position(symbol, [rule], product_type, margin_coin, positions):
+            return False
+
+        self.monitored_positions[symbol] = {
+            "profit_threshold": profit_threshold,
+            "buffer_percent": buffer_percent,
+            "product_type": product_type,
+            "margin_coin": margin_coin,
+            "break_even_activated": False,
+            "added_at": time.time()
+        }
+        self.stats["positions_added"] += 1
+        self.logger.info(
+            f"Добавлен в мониторинг break-even: {symbol} "
+            f"(порог: {profit_threshold:.1%}, буфер: {buffer_percent:.3%})"
+        )
+        return True
+
+    async def remove(self, symbol: str) -> bool:
+        if symbol not in self.monitored_positions:
+            self.logger.warning(f"Позиция {symbol} не отслеживается")
+            return False
+
+        del self.monitored_positions[symbol]
+        self.stats["positions_removed"] += 1
+        if symbol in self.engine.positions:
+            await self.engine.remove_position(symbol, ["break_even"], owner=self.owner)
+
+        self.logger.info(f"Удален из мониторинга break-even: {symbol}")
+        return True
+
+    async def add_all(
+        self,
+        profit_threshold: float = 0.03,
+        buffer_percent: float = 0.001,
+        product_type: str = "USDT-FUTURES",
+        margin_coin: str = "USDT"
+    ) -> Dict:
+        if not self.is_active:
+            return {"success": False, "message": "Мониторинг не запущен"}
+
+        all_positions = await self.engine.executor.run(
+            "positions", self.position_manager.get_current_positions, "", product_type, margin_coin
+        )
+
+        by_symbol: Dict[str, list] = {}
+        for pos in all_positions:
+            if float(pos.get("total", 0)) != 0:
+                by_symbol.setdefault(pos.get("symbol"), []).append(pos)
+
+        if not by_symbol:
+            return {"success": False, "message": "Нет открытых позиций"}
+
+        results = []
+        for symbol, positions in by_symbol.items():
+            success = await self.add(
+                symbol, profit_threshold, buffer_percent, product_type, margin_coin, positions
+            )
+            results.append({"symbol": symbol, "success": success})
+
+        added = sum(1 for r in results if r["success"])
+        self.logger.info(f"Добавлено в мониторинг break-even: {added}/{len(by_symbol)} символов")
+        return {
+            "success": added > 0,
+            "total_symbols": len(by_symbol),
+            "successful_additions": added,
+            "results": results,
+            "message": f"Добавлено {added} из {len(by_symbol)} символов"
+        }
+
+    async def _on_engine_event(self, event: dict):
+        if event["rule"] != "break_even" or event.get("owner") != self.owner:
+            return
+        config = self.monitored_positions.get(event["symbol"])
+        if config is None:
+            return
+
+        result = event["result"]
+        if not event["applied"]:
+            self.stats["errors"] += result.get("errors", 0) or 1
+            return
+        if not result.get("break_even_activated", 0):
+            return
+
+        config["break_even_activated"] = True
+        self.stats["break_even_activated"] += result.get("break_even_activated", 0)
+
+        successful = [d for d in result.get("details", []) if d.get("status") == "success"]
+        lines = [
+            "BREAK-EVEN АКТИВИРОВАН!",
+            f"Символ: {event['symbol']}",
+            f"Цена: ${event['price'] or 0:,.4f}",
+            f"Позиций обновлено: {len(successful)}",
+        ]
+        for detail in successful:
+            lines.append(
+                f"   • {detail.get('position_side', '').upper()}: "
+                f"SL {detail.get('action', 'unknown')} → ${detail.get('new_stop_loss', 0):.4f}"
+            )
+        lines.append(f"Время: {datetime.now().strftime('%H:%M:%S')}")
+        self.logger.info("\n".join(lines))
+
+    def get_status(self) -> Dict:
+        uptime = time.time() - self.stats["started_at"] if self.stats["started_at"] else 0
+        engine_stats = self.engine.stats
+        return {
+            "is_active": self.is_active,
+            "websocket_connected": self.engine.ws_client.is_connected,
+            "monitored_symbols": list(self.monitored_positions),
+            "monitored_count": len(self.monitored_positions),
+            "uptime_seconds": uptime,
+            "uptime_formatted": format_duration(uptime),
+            "statistics": {
+                **self.stats,
+                "price_updates": engine_stats["price_updates"],
+                "trigger_fires": engine_stats["trigger_fires"],
+            },
+            "positions_details": {
+                symbol: {
+                    "profit_threshold": f"{config['profit_threshold']:.1%}",
+                    "buffer_percent": f"{config['buffer_percent']:.3%}",
+                    "break_even_activated": config["break_even_activated"],
+                    "monitoring_duration": time.time() - config["added_at"],
+                    "activation_prices": self.engine.triggers.nearest(symbol)
+                }
+                for symbol, config in self.monitored_positions.items()
+            }
+        }
+
+
+def format_duration(seconds: float) -> str:
+    """Форматирование длительности"""
+    if seconds < 60:
+        return f"{seconds:.0f}с"
+    elif seconds < 3600:
+        return f"{seconds/60:.0f}м {seconds%60:.0f}с"
+    else:
+        hours = int(seconds // 3600)
+        minutes = int((seconds % 3600) // 60)
+        return f"{hours}ч {minutes}м"
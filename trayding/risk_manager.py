@@ -1,6 +1,7 @@
 from utils.logging_setup import setup_logger
 from config import ExchangeConfig
 from api.base_exchange_connector import BaseExchangeConnector
+from utils.tracing import global_tracer
 from datetime import datetime, timezone
 
 class RiskManager:
@@ -60,6 +61,7 @@ class RiskManager:
 
         return available_balance >= total_required
 
+    @global_tracer.traced("risk.validate_position")
     def validate_position(
         self,
         symbol: str,
@@ -87,6 +89,7 @@ class RiskManager:
             return False
         return True
 
+    @global_tracer.traced("risk.is_trading_allowed")
     def is_trading_allowed(self, product_type="SUSDT-FUTURES") -> bool:
         """
         Проверяет, разрешена ли торговля на основе дневного PnL.
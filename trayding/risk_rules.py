@@ -0,0 +1,313 @@
+"""
+Правила риск-движка (RiskActionEngine)
+
+Правило - объект без состояния позиции: параметры хранятся в правиле, а всё,
+что относится к конкретной позиции (пик цены, пройденные ступени), лежит в
+PositionState.rule_state[rule.key]. Одно правило можно назначить многим
+позициям. owner - владелец правила (например, монитор break-even): правила
+одного типа разных владельцев живут на позиции независимо.
+
+Интерфейс правила:
+    arm_price(position)  - уровень цены в сторону прибыли, при пересечении
+                           которого нужно вызвать evaluate; None - evaluate
+                           вызывается на каждом тике
+    evaluate(position, price, now) - RiskAction или None (только память)
+    execute(position_manager, position, action) - действие на бирже (REST)
+    on_result(position, action, result) - учесть результат; True, если
+                           правило для этой позиции завершено
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass(slots=True)
+class PositionState:
+    """Позиция под наблюдением риск-движка"""
+    symbol: str
+    hold_side: str  # long / short
+    size: float
+    entry_price: float
+    opened_at: float  # unix time, сек
+    product_type: str = "USDT-FUTURES"
+    margin_coin: str = "USDT"
+    initial_size: float = 0.0
+    rules: list = field(default_factory=list)
+    rule_state: Dict[str, dict] = field(default_factory=dict)
+    done: set = field(default_factory=set)
+    cooldown_until: Dict[str, float] = field(default_factory=dict)
+    closed: bool = False
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.symbol, self.hold_side
+
+    @property
+    def direction(self) -> str:
+        """Направление движения цены в сторону прибыли"""
+        return "down" if self.hold_side == "short" else "up"
+
+    def profit_percent(self, price: float) -> float:
+        if self.entry_price <= 0:
+            return 0.0
+        if self.hold_side == "short":
+            return (self.entry_price - price) / self.entry_price
+        return (price - self.entry_price) / self.entry_price
+
+    def sync(self, pos) -> bool:
+        """
+        Обновить размер и цену входа по позиции биржи (после усреднения или
+        ручного частичного закрытия); True, если что-то изменилось
+        """
+        size = abs(float(pos.get("total", 0)))
+        entry_price = float(pos.get("openPriceAvg", 0)) or self.entry_price
+        if size == self.size and entry_price == self.entry_price:
+            return False
+        self.size = size
+        self.entry_price = entry_price
+        # Доли лестницы тейк-профитов считаются от наибольшего размера позиции
+        self.initial_size = max(self.initial_size, size)
+        return True
+
+    def price_at_profit(self, profit: float) -> float:
+        """Цена, при которой доходность позиции равна profit"""
+        if self.hold_side == "short":
+            return self.entry_price * (1 - profit)
+        return self.entry_price * (1 + profit)
+
+    @classmethod
+    def from_position(cls, pos, rules: list, product_type: str, margin_coin: str) -> "PositionState":
+        """Из PositionRecord (или словаря API)"""
+        size = abs(float(pos.get("total", 0)))
+        c_time = float(pos.get("cTime", 0) or 0)
+        return cls(
+            symbol=pos.get("symbol"),
+            hold_side=str(pos.get("holdSide", "long")).lower(),
+            size=size,
+            entry_price=float(pos.get("openPriceAvg", 0)),
+            opened_at=c_time / 1000 if c_time else time.time(),
+            product_type=product_type,
+            margin_coin=margin_coin,
+            initial_size=size,
+            rules=list(rules),
+        )
+
+
+@dataclass(slots=True)
+class RiskAction:
+    """Действие, которое правило просит выполнить на бирже"""
+    rule: str
+    symbol: str
+    kind: str  # break_even / close_full / close_partial
+    reason: str
+    params: dict = field(default_factory=dict)
+
+
+class RiskRule:
+    """Базовое правило"""
+
+    name = "rule"
+    # Кто назначил правило; None - общее правило движка
+    owner: Optional[str] = None
+    # Пауза перед повторной попыткой, если действие не удалось (сек)
+    cooldown = 2.0
+    # Действие закрывает позицию полностью
+    closes_position = False
+
+    @property
+    def key(self) -> str:
+        """Ключ правила на позиции: состояние, пауза и завершение хранятся по нему"""
+        return self.name if self.owner is None else f"{self.name}@{self.owner}"
+
+    def arm_price(self, position: PositionState) -> Optional[float]:
+        return None
+
+    def evaluate(self, position: PositionState, price: float, now: float) -> Optional[RiskAction]:
+        raise NotImplementedError
+
+    def execute(self, position_manager, position: PositionState, action: RiskAction) -> dict:
+        raise NotImplementedError
+
+    def on_result(self, position: PositionState, action: RiskAction, result: dict) -> bool:
+        return bool(result.get("success"))
+
+    def state(self, position: PositionState) -> dict:
+        return position.rule_state.setdefault(self.key, {})
+
+    def _close_full(self, position_manager, position: PositionState) -> dict:
+        return position_manager.close_position_full(
+            symbol=position.symbol,
+            product_type=position.product_type,
+            margin_coin=position.margin_coin,
+            hold_side=position.hold_side
+        )
+
+
+class BreakEvenRule(RiskRule):
+    """Перенос стоп-лосса в точку входа + буфер при доходности >= profit_threshold"""
+
+    name = "break_even"
+
+    def __init__(self, profit_threshold: float = 0.03, buffer_percent: float = 0.001, owner: Optional[str] = None):
+        self.profit_threshold = profit_threshold
+        self.buffer_percent = buffer_percent
+        self.owner = owner
+
+    def arm_price(self, position: PositionState) -> Optional[float]:
+        return position.price_at_profit(self.profit_threshold)
+
+    def evaluate(self, position: PositionState, price: float, now: float) -> Optional[RiskAction]:
+        profit = position.profit_percent(price)
+        if profit < self.profit_threshold:
+            return None
+        return RiskAction(
+            self.name, position.symbol, "break_even",
+            f"Прибыль {profit:.2%} >= порога {self.profit_threshold:.2%}",
+            {"price": price}
+        )
+
+    def execute(self, position_manager, position: PositionState, action: RiskAction) -> dict:
+        return position_manager.auto_break_even(
+            symbol=position.symbol,
+            profit_threshold=self.profit_threshold,
+            buffer_percent=self.buffer_percent,
+            product_type=position.product_type,
+            margin_coin=position.margin_coin,
+            hold_side=position.hold_side
+        )
+
+    def on_result(self, position: PositionState, action: RiskAction, result: dict) -> bool:
+        return bool(result.get("success")) and result.get("break_even_activated", 0) > 0
+
+
+class TrailingStopRule(RiskRule):
+    """
+    Локальный трейлинг-стоп: после доходности activation_profit отслеживается
+    лучшая цена, откат от неё на callback_rate закрывает позицию.
+    """
+
+    name = "trailing_stop"
+    closes_position = True
+
+    def __init__(self, activation_profit: float = 0.02, callback_rate: float = 0.01):
+        self.activation_profit = activation_profit
+        self.callback_rate = callback_rate
+
+    def arm_price(self, position: PositionState) -> Optional[float]:
+        if self.state(position).get("best_price"):
+            return None  # активирован - нужен каждый тик
+        return position.price_at_profit(self.activation_profit)
+
+    def evaluate(self, position: PositionState, price: float, now: float) -> Optional[RiskAction]:
+        state = self.state(position)
+        best = state.get("best_price")
+
+        if best is None:
+            if position.profit_percent(price) < self.activation_profit:
+                return None
+            state["best_price"] = price
+            return None
+
+        if position.hold_side == "short":
+            best = state["best_price"] = min(best, price)
+            retrace = (price - best) / best
+        else:
+            best = state["best_price"] = max(best, price)
+            retrace = (best - price) / best
+
+        if retrace < self.callback_rate:
+            return None
+        return RiskAction(
+            self.name, position.symbol, "close_full",
+            f"Откат {retrace:.2%} от лучшей цены {best:.4f}",
+            {"price": price, "best_price": best}
+        )
+
+    def execute(self, position_manager, position: PositionState, action: RiskAction) -> dict:
+        return self._close_full(position_manager, position)
+
+
+class TimeStopRule(RiskRule):
+    """Закрытие позиции, которая дольше max_holding_seconds не вышла в доходность min_profit"""
+
+    name = "time_stop"
+    closes_position = True
+    cooldown = 30.0
+
+    def __init__(self, max_holding_seconds: float, min_profit: float = 0.0):
+        self.max_holding_seconds = max_holding_seconds
+        self.min_profit = min_profit
+
+    def evaluate(self, position: PositionState, price: float, now: float) -> Optional[RiskAction]:
+        held = now - position.opened_at
+        if held < self.max_holding_seconds:
+            return None
+        profit = position.profit_percent(price)
+        if profit >= self.min_profit:
+            return None
+        return RiskAction(
+            self.name, position.symbol, "close_full",
+            f"Позиция открыта {held / 3600:.1f} ч, доходность {profit:.2%} < {self.min_profit:.2%}",
+            {"price": price}
+        )
+
+    def execute(self, position_manager, position: PositionState, action: RiskAction) -> dict:
+        return self._close_full(position_manager, position)
+
+
+class PartialTakeProfitRule(RiskRule):
+    """
+    Лестница частичных тейк-профитов: levels = [(доходность, доля исходного
+    размера), ...], например [(0.02, 0.25), (0.04, 0.25), (0.08, 0.5)].
+    """
+
+    name = "partial_take_profit"
+
+    def __init__(self, levels: Sequence[Tuple[float, float]]):
+        self.levels: List[Tuple[float, float]] = sorted(levels)
+
+    def _next_level(self, position: PositionState) -> int:
+        return self.state(position).get("next_level", 0)
+
+    def arm_price(self, position: PositionState) -> Optional[float]:
+        level = self._next_level(position)
+        if level >= len(self.levels):
+            return None
+        return position.price_at_profit(self.levels[level][0])
+
+    def evaluate(self, position: PositionState, price: float, now: float) -> Optional[RiskAction]:
+        level = self._next_level(position)
+        if level >= len(self.levels) or position.size <= 0:
+            return None
+
+        profit_target, fraction = self.levels[level]
+        if position.profit_percent(price) < profit_target:
+            return None
+
+        close_percent = min(1.0, fraction * position.initial_size / position.size)
+        return RiskAction(
+            self.name, position.symbol, "close_partial",
+            f"Ступень {level + 1}/{len(self.levels)}: доходность >= {profit_target:.2%}",
+            {"price": price, "level": level, "close_percent": close_percent}
+        )
+
+    def execute(self, position_manager, position: PositionState, action: RiskAction) -> dict:
+        return position_manager.close_position_partial(
+            symbol=position.symbol,
+            close_type="percent",
+            close_value=action.params["close_percent"],
+            product_type=position.product_type,
+            margin_coin=position.margin_coin,
+            hold_side=position.hold_side
+        )
+
+    def on_result(self, position: PositionState, action: RiskAction, result: dict) -> bool:
+        if not result.get("success"):
+            return False
+
+        position.size = max(0.0, position.size - float(result.get("close_quantity", 0)))
+        self.state(position)["next_level"] = action.params["level"] + 1
+        if position.size <= 0:
+            position.closed = True
+        return self._next_level(position) >= len(self.levels)
@@ -0,0 +1,186 @@
+"""
+Выполнение синхронных вызовов биржи из асинхронного кода
+
+Обработчики WebSocket не должны ждать REST запрос в цикле событий: пока
+requests ждёт ответа, не читаются кадры, не уходят ping и не обрабатываются
+команды Telegram. Вызовы уходят в отдельный ограниченный пул потоков:
+
+- вызовы с одним ключом (символом) выполняются строго по очереди - у ключа
+  своя очередь, из которой в пул уходит один вызов за раз, поэтому два тика
+  одного символа не меняют его стоп-лосс параллельно, из какого бы цикла
+  событий они ни пришли;
+- очередь ограничена общим лимитом и лимитом на ключ: лишний вызов сразу
+  получает BlockingCallRejected, а не копится, пока биржа отвечает медленно.
+
+Настройки - BlockingExecutorConfig.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from config import BlockingExecutorConfig
+from utils.exceptions import BlockingCallRejected
+from utils.metrics_exporter import MetricSample, global_metrics_registry
+
+
+class BlockingExecutor:
+    """Ограниченный пул потоков с последовательным выполнением по ключу"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        max_pending_per_key: Optional[int] = None
+    ):
+        self.max_workers = max_workers or BlockingExecutorConfig.MAX_WORKERS
+        self.max_pending = max_pending or BlockingExecutorConfig.MAX_PENDING
+        self.max_pending_per_key = max_pending_per_key or BlockingExecutorConfig.MAX_PENDING_PER_KEY
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="BlockingCall"
+        )
+
+        # Учёт общий для всех циклов событий процесса
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._pending_by_key: Dict[str, int] = {}
+        self._running = 0
+        # Очередь ключа: key -> deque[(Future, вызов)]; ключ есть, пока у него есть вызовы
+        self._queues: Dict[str, deque] = {}
+
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+        }
+
+        global_metrics_registry.register(self)
+
+    def _reserve(self, key: str):
+        with self._lock:
+            key_pending = self._pending_by_key.get(key, 0)
+            if self._pending >= self.max_pending or key_pending >= self.max_pending_per_key:
+                self.stats["rejected"] += 1
+                raise BlockingCallRejected(key, self._pending)
+            self._pending += 1
+            self._pending_by_key[key] = key_pending + 1
+            self.stats["submitted"] += 1
+
+    def _release(self, key: str):
+        with self._lock:
+            self._pending -= 1
+            remaining = self._pending_by_key[key] - 1
+            if remaining:
+                self._pending_by_key[key] = remaining
+            else:
+                del self._pending_by_key[key]
+
+    def _call(self, func: Callable, args: tuple, kwargs: dict):
+        with self._lock:
+            self._running += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _run_next(self, key: str):
+        """Выполнить очередной вызов ключа в потоке пула и передать пулу следующий"""
+        with self._lock:
+            future, call = self._queues[key].popleft()
+
+        try:
+            # Отменённый до старта вызов (задача вызывающего отменена) пропускается
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(call())
+                except BaseException as e:
+                    future.set_exception(e)
+        finally:
+            self._release(key)
+            with self._lock:
+                if self._queues[key]:
+                    self._executor.submit(self._run_next, key)
+                else:
+                    del self._queues[key]
+
+    async def run(self, key: str, func: Callable, *args, **kwargs):
+        """
+        Выполнить func(*args, **kwargs) в пуле после предыдущих вызовов с тем же key.
+
+        Raises:
+            BlockingCallRejected: очередь (общая или ключа) заполнена
+        """
+        self._reserve(key)
+
+        # Трасса и дедлайн вызывающей задачи переносятся в поток пула
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, self._call, func, args, kwargs)
+        future = Future()
+
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue is None:
+                queue = self._queues[key] = deque()
+                self._executor.submit(self._run_next, key)
+            queue.append((future, call))
+
+        try:
+            result = await asyncio.wrap_future(future)
+        except Exception:
+            with self._lock:
+                self.stats["failed"] += 1
+            raise
+        with self._lock:
+            self.stats["completed"] += 1
+        return result
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "running": self._running,
+                "pending": self._pending,
+                "pending_by_key": dict(self._pending_by_key),
+                "statistics": dict(self.stats)
+            }
+
+    def collect_metrics(self) -> List[MetricSample]:
+        samples = [
+            MetricSample(
+                "bot_blocking_calls_running", "gauge",
+                "Blocking exchange calls running in the executor", self._running, {}
+            ),
+            MetricSample(
+                "bot_blocking_calls_pending", "gauge",
+                "Blocking exchange calls running or waiting for their key", self._pending, {}
+            ),
+        ]
+        for stat_name, help_text in (
+            ("submitted", "Blocking exchange calls accepted by the executor"),
+            ("completed", "Blocking exchange calls finished successfully"),
+            ("failed", "Blocking exchange calls that raised an exception"),
+            ("rejected", "Blocking exchange calls rejected because the queue was full"),
+        ):
+            samples.append(MetricSample(
+                f"bot_blocking_calls_{stat_name}", "counter", help_text, self.stats[stat_name], {}, "_total"
+            ))
+        return samples
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_blocking_executor() -> BlockingExecutor:
+    """Общий BlockingExecutor процесса (создаётся при первом использовании)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = BlockingExecutor()
+        return _executor
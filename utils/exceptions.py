@@ -29,3 +29,30 @@ class APIKeySecurityError(Exception):
     """
     pass
 
+
+class RequestDeadlineExceeded(Exception):
+    """
+    Исключение выбрасывается когда запрос не уложился в бюджет времени
+    (или был отменён) до успешной попытки
+    """
+    def __init__(self, endpoint: str, attempts: int, last_error: Exception = None):
+        self.endpoint = endpoint
+        self.attempts = attempts
+        self.last_error = last_error
+        super().__init__(
+            f"Дедлайн запроса к {endpoint} истёк после {attempts} попыток: {last_error}"
+        )
+
+
+
+class BlockingCallRejected(Exception):
+    """
+    Исключение выбрасывается когда очередь синхронных вызовов переполнена
+    и новый вызов не принят (back-pressure)
+    """
+    def __init__(self, key: str, pending: int):
+        self.key = key
+        self.pending = pending
+        super().__init__(
+            f"Очередь синхронных вызовов переполнена ({pending} в ожидании), вызов для {key} отклонён"
+        )
@@ -0,0 +1,37 @@
+"""
+JSON кодек для REST и WebSocket
+
+Использует orjson, если он установлен (в несколько раз быстрее на разборе
+тикеров и ответов API), иначе стандартный json. Интерфейс одинаковый:
+dumps() возвращает str, loads() принимает str или bytes.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - зависит от окружения
+    orjson = None
+
+
+# orjson.JSONDecodeError наследуется от json.JSONDecodeError
+JSONDecodeError = json.JSONDecodeError
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+if orjson is not None:
+    def dumps(obj) -> str:
+        """Компактная сериализация (без пробелов между элементами)"""
+        return orjson.dumps(obj).decode("utf-8")
+
+    def loads(data):
+        return orjson.loads(data)
+
+else:
+    def dumps(obj) -> str:
+        """Компактная сериализация (без пробелов между элементами)"""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+    def loads(data):
+        return json.loads(data)
@@ -0,0 +1,278 @@
+"""
+Экспорт внутренних метрик бота в формате OpenMetrics
+
+Компоненты (APIMonitor, коннектор, WebSocket клиент, break-even менеджеры,
+торговые сессии, обработчики ошибок) регистрируются в global_metrics_registry
+и отдают свои метрики через метод collect_metrics(). MetricsExporter
+поднимает локальный HTTP endpoint /metrics для Prometheus.
+
+Экспортер включается только явно (см. MonitoringConfig в config.py).
+"""
+
+import threading
+import weakref
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from utils.logging_setup import setup_logger
+
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+class MetricSample(NamedTuple):
+    """Одно значение метрики"""
+    family: str  # имя семейства метрик, например "bot_api_requests"
+    kind: str  # "counter", "gauge", "histogram", "summary"
+    help: str
+    value: float
+    labels: Dict[str, str] = {}
+    suffix: str = ""  # "_total", "_bucket", "_sum", "_count" или ""
+
+
+def histogram_samples(
+    family: str,
+    help_text: str,
+    bucket_bounds: Iterable[float],
+    bucket_counts: Iterable[int],
+    total_sum: float,
+    labels: Dict[str, str]
+) -> List[MetricSample]:
+    """Развернуть гистограмму (некумулятивные корзины) в сэмплы OpenMetrics"""
+    samples = []
+    cumulative = 0
+    total_count = 0
+
+    for upper_bound, count in zip(bucket_bounds, bucket_counts):
+        cumulative += count
+        total_count += count
+        le = "+Inf" if upper_bound == float("inf") else _format_value(upper_bound)
+        samples.append(MetricSample(
+            family, "histogram", help_text, cumulative, {**labels, "le": le}, "_bucket"
+        ))
+
+    samples.append(MetricSample(family, "histogram", help_text, total_sum, labels, "_sum"))
+    samples.append(MetricSample(family, "histogram", help_text, total_count, labels, "_count"))
+    return samples
+
+
+def _format_value(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    return repr(float(value))
+
+
+def _is_cumulative(sample: MetricSample) -> bool:
+    """Значение только растёт (счётчик, корзины гистограммы, _sum/_count)"""
+    return sample.kind in ("counter", "histogram") or sample.suffix in ("_sum", "_count")
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{_escape_label_value(value)}"' for key, value in labels.items())
+    return "{" + inner + "}"
+
+
+class MetricsRegistry:
+    """
+    Реестр источников метрик.
+
+    Источники хранятся по слабым ссылкам, поэтому остановленные сессии
+    и их коннекторы пропадают из экспорта вместе с объектами. Последние
+    собранные значения их счётчиков остаются в экспорте, чтобы суммарные
+    счётчики не уменьшались (Prometheus принял бы это за сброс).
+    """
+
+    def __init__(self):
+        self.logger = setup_logger()
+        self._sources = weakref.WeakSet()
+        self._lock = threading.Lock()
+        # id источника -> weakref.finalize; удалённые сборщиком мусора id попадают в _dead
+        self._finalizers: Dict[int, weakref.finalize] = {}
+        self._dead = deque()
+        # id источника -> последние собранные накопительные сэмплы
+        self._last_cumulative: Dict[int, List[MetricSample]] = {}
+        # (family, suffix, метки) -> сэмпл с суммой значений ушедших источников
+        self._retired: Dict[tuple, MetricSample] = {}
+
+    def register(self, source) -> None:
+        """Зарегистрировать объект с методом collect_metrics()"""
+        with self._lock:
+            self._retire_dead()
+            if source in self._sources:
+                return
+            self._sources.add(source)
+            # Колбэк только запоминает id: он может сработать в любом потоке, в том числе под self._lock
+            self._finalizers[id(source)] = weakref.finalize(source, self._dead.append, id(source))
+
+    def unregister(self, source) -> None:
+        with self._lock:
+            self._sources.discard(source)
+            finalizer = self._finalizers.get(id(source))
+            if finalizer is not None:
+                finalizer.detach()
+                self._retire(id(source))
+
+    def _retire(self, source_id: int) -> None:
+        """Перенести последние счётчики источника в _retired (под self._lock)"""
+        self._finalizers.pop(source_id, None)
+        for sample in self._last_cumulative.pop(source_id, ()):
+            key = (sample.family, sample.suffix, tuple(sample.labels.items()))
+            retired = self._retired.get(key)
+            self._retired[key] = sample if retired is None else retired._replace(
+                value=retired.value + sample.value
+            )
+
+    def _retire_dead(self) -> None:
+        while self._dead:
+            self._retire(self._dead.popleft())
+
+    def collect(self) -> List[MetricSample]:
+        with self._lock:
+            self._retire_dead()
+            sources = list(self._sources)
+
+        samples = []
+        for source in sources:
+            try:
+                source_samples = source.collect_metrics()
+            except Exception as e:
+                self.logger.warning(f"Ошибка сбора метрик из {type(source).__name__}: {e}")
+                continue
+
+            samples.extend(source_samples)
+            with self._lock:
+                if id(source) in self._finalizers:
+                    self._last_cumulative[id(source)] = [
+                        sample for sample in source_samples if _is_cumulative(sample)
+                    ]
+
+        with self._lock:
+            samples.extend(self._retired.values())
+        return samples
+
+    def render(self) -> str:
+        """
+        Сформировать текст в формате OpenMetrics.
+
+        Накопительные сэмплы с одинаковым именем и метками суммируются
+        (например, счётчики ошибок нескольких обработчиков одного компонента),
+        для gauge берётся максимум.
+        """
+        families = {}  # family -> {"kind", "help", "samples": {(suffix, labels): value}}
+
+        for sample in self.collect():
+            family = families.get(sample.family)
+            if family is None:
+                family = families[sample.family] = {
+                    "kind": sample.kind,
+                    "help": sample.help,
+                    "samples": {}
+                }
+
+            key = (sample.suffix, tuple(sample.labels.items()))
+            previous = family["samples"].get(key)
+            if previous is None:
+                family["samples"][key] = sample.value
+            elif _is_cumulative(sample):
+                family["samples"][key] = previous + sample.value
+            else:
+                family["samples"][key] = max(previous, sample.value)
+
+        lines = []
+        for name, family in families.items():
+            lines.append(f"# TYPE {name} {family['kind']}")
+            lines.append(f"# HELP {name} {family['help']}")
+            for (suffix, labels), value in family["samples"].items():
+                lines.append(f"{name}{suffix}{_format_labels(dict(labels))} {_format_value(value)}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Локальный HTTP endpoint /metrics в отдельном потоке"""
+
+    def __init__(
+        self,
+        registry: Optional[MetricsRegistry] = None,
+        host: str = "127.0.0.1",
+        port: int = 9108
+    ):
+        self.registry = registry or global_metrics_registry
+        self.host = host
+        self.port = port
+        self.logger = setup_logger()
+
+        self._server = None
+        self._thread = None
+
+    def start(self) -> bool:
+        if self._server:
+            return True
+
+        registry = self.registry
+
+        class _MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Запросы Prometheus не засоряют торговый лог
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+        except OSError as e:
+            self.logger.error(f"Не удалось запустить экспортер метрик на {self.host}:{self.port}: {e}")
+            self._server = None
+            return False
+
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="MetricsExporter",
+            daemon=True
+        )
+        self._thread.start()
+
+        self.logger.info(f"Экспортер метрик OpenMetrics запущен: http://{self.host}:{self.port}/metrics")
+        return True
+
+    def stop(self):
+        if not self._server:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+        self.logger.info("Экспортер метрик остановлен")
+
+
+# Global instance for use across the application
+global_metrics_registry = MetricsRegistry()
@@ -1,9 +1,227 @@
+import atexit
 import json
 import time
 import os
+import threading
+import weakref
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from utils.logging_setup import setup_logger
+from utils.metrics_exporter import MetricSample, global_metrics_registry, histogram_samples
+
+
+# Несколько мониторов в одном процессе пишут в один и тот же файл
+_monitoring_file_lock = threading.Lock()
+
+# Один общий поток сохраняет все мониторы процесса (коннекторов может быть несколько).
+# WeakSet не мешает сборщику мусора удалить брошенный монитор
+_flush_monitors = weakref.WeakSet()
+_flusher_lock = threading.Lock()
+_flusher_thread = None
+_FLUSH_TICK_SECONDS = 1.0
+
+
+def _ensure_flusher():
+    global _flusher_thread
+    with _flusher_lock:
+        if _flusher_thread and _flusher_thread.is_alive():
+            return
+        _flusher_thread = threading.Thread(target=_flush_loop, name="APIMonitorFlusher", daemon=True)
+        _flusher_thread.start()
+
+
+def _flush_loop():
+    while True:
+        time.sleep(_FLUSH_TICK_SECONDS)
+        with _flusher_lock:
+            monitors = list(_flush_monitors)
+        now = time.time()
+        for monitor in monitors:
+            # Нет новых запросов - файл не трогаем
+            if (now - monitor.last_save_time >= monitor.save_interval
+                    and monitor.requests_count != monitor._flushed_requests_count):
+                monitor.save_metrics()
+        # Не держать сильные ссылки до следующего тика
+        monitors = monitor = None
+
+
+def _flush_all_at_exit():
+    """Финальное сохранение всех мониторов при завершении процесса"""
+    with _flusher_lock:
+        monitors = list(_flush_monitors)
+    for monitor in monitors:
+        monitor.stop_flusher(final_flush=True)
+
+
+atexit.register(_flush_all_at_exit)
+
+
+class _RingWindow:
+    """
+    Кольцевой буфер счётчиков запросов/ошибок для скользящего окна.
+
+    Окно разбито на buckets корзин по bucket_seconds секунд. Корзина
+    переиспользуется, когда в неё попадает новый временной интервал,
+    поэтому запись и чтение не создают новых списков.
+    """
+
+    __slots__ = ("bucket_seconds", "buckets", "bucket_ids", "counts", "errors")
+
+    def __init__(self, bucket_seconds: int, buckets: int):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self.bucket_ids = [-1] * buckets
+        self.counts = [0] * buckets
+        self.errors = [0] * buckets
+
+    def add(self, now: float, is_error: bool = False):
+        bucket_id = int(now // self.bucket_seconds)
+        idx = bucket_id % self.buckets
+
+        if self.bucket_ids[idx] != bucket_id:
+            self.bucket_ids[idx] = bucket_id
+            self.counts[idx] = 0
+            self.errors[idx] = 0
+
+        self.counts[idx] += 1
+        if is_error:
+            self.errors[idx] += 1
+
+    def totals(self, now: float) -> Tuple[int, int]:
+        """Количество запросов и ошибок в пределах окна"""
+        oldest_id = int(now // self.bucket_seconds) - self.buckets
+
+        total = 0
+        errors = 0
+        for idx in range(self.buckets):
+            if self.bucket_ids[idx] > oldest_id:
+                total += self.counts[idx]
+                errors += self.errors[idx]
+
+        return total, errors
+
+    @property
+    def window_seconds(self) -> int:
+        return self.bucket_seconds * self.buckets
+
+    def reset(self):
+        for idx in range(self.buckets):
+            self.bucket_ids[idx] = -1
+            self.counts[idx] = 0
+            self.errors[idx] = 0
+
+
+def _window_rates(windows: Dict[str, _RingWindow], now: float) -> Dict:
+    """Частоты запросов и ошибок для набора скользящих окон"""
+    rates = {}
+    for name, window in windows.items():
+        count, errors = window.totals(now)
+        rates[name] = {
+            "requests": count,
+            "errors": errors,
+            "requests_per_minute": count * 60 / window.window_seconds,
+            "error_rate": errors / count if count > 0 else 0,
+        }
+    return rates
+
+
+class _RequestStats:
+    """Счётчики, ошибки по типам и гистограмма задержек для группы запросов"""
+
+    # Верхние границы корзин гистограммы задержек (мс)
+    LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+    # Скользящие окна: имя -> (размер корзины в секундах, количество корзин)
+    WINDOWS = {
+        "1m": (1, 60),
+        "5m": (5, 60),
+        "1h": (60, 60),
+    }
+
+    def __init__(self):
+        self.total = 0
+        self.successful = 0
+        self.failed = 0
+        self.errors_by_type = {}
+        self.latency_sum_ms = 0.0
+        self.latency_min_ms = None
+        self.latency_max_ms = 0.0
+        self.latency_histogram = [0] * len(self.LATENCY_BUCKETS_MS)
+        self.windows = {
+            name: _RingWindow(bucket_seconds, buckets)
+            for name, (bucket_seconds, buckets) in self.WINDOWS.items()
+        }
+
+    def record(self, now: float, success: bool, latency_ms: float, error_type: str = None):
+        self.total += 1
+
+        if success:
+            self.successful += 1
+        else:
+            self.failed += 1
+            if error_type:
+                self.errors_by_type[error_type] = self.errors_by_type.get(error_type, 0) + 1
+
+        self.latency_sum_ms += latency_ms
+        if self.latency_min_ms is None or latency_ms < self.latency_min_ms:
+            self.latency_min_ms = latency_ms
+        if latency_ms > self.latency_max_ms:
+            self.latency_max_ms = latency_ms
+
+        for idx, upper_bound in enumerate(self.LATENCY_BUCKETS_MS):
+            if latency_ms <= upper_bound:
+                self.latency_histogram[idx] += 1
+                break
+
+        for window in self.windows.values():
+            window.add(now, not success)
+
+    def percentile(self, q: float) -> float:
+        """Оценка перцентиля задержки по гистограмме (линейная интерполяция внутри корзины)"""
+        if self.total == 0:
+            return 0.0
+
+        target = q * self.total
+        cumulative = 0
+        lower_bound = 0.0
+
+        for idx, upper_bound in enumerate(self.LATENCY_BUCKETS_MS):
+            bucket_count = self.latency_histogram[idx]
+            if bucket_count and cumulative + bucket_count >= target:
+                if upper_bound == float("inf"):
+                    return self.latency_max_ms
+                fraction = (target - cumulative) / bucket_count
+                estimate = lower_bound + (upper_bound - lower_bound) * fraction
+                return min(estimate, self.latency_max_ms)
+            cumulative += bucket_count
+            lower_bound = upper_bound
+
+        return self.latency_max_ms
+
+    def snapshot(self, now: float) -> Dict:
+        histogram = {}
+        for upper_bound, count in zip(self.LATENCY_BUCKETS_MS, self.latency_histogram):
+            label = "+Inf" if upper_bound == float("inf") else str(upper_bound)
+            histogram[label] = count
+
+        return {
+            "total_requests": self.total,
+            "successful_requests": self.successful,
+            "failed_requests": self.failed,
+            "error_rate": self.failed / self.total if self.total > 0 else 0,
+            "errors_by_type": self.errors_by_type.copy(),
+            "latency": {
+                "average_ms": self.latency_sum_ms / self.total if self.total > 0 else 0,
+                "min_ms": self.latency_min_ms or 0,
+                "max_ms": self.latency_max_ms,
+                "p50_ms": self.percentile(0.50),
+                "p95_ms": self.percentile(0.95),
+                "p99_ms": self.percentile(0.99),
+                "histogram_ms": histogram,
+            },
+            "rates": _window_rates(self.windows, now),
+        }
 
 
 class APIMonitor:
@@ -12,8 +230,10 @@ class APIMonitor:
     
     Функции:
     - Сбор метрик по каждому запросу
+    - Разбивка метрик по endpoint и по операции (operation из _safe_api_request)
+    - Частоты запросов в скользящих окнах 1m/5m/1h
     - Расчёт статистики (среднее время, процент ошибок)
-    - Сохранение в файл каждые 5 минут
+    - Сохранение в файл каждые 5 минут фоновым потоком (вне пути запроса)
     - Обнаружение аномальной активности
     """
     
@@ -22,11 +242,20 @@ class APIMonitor:
     MAX_ERROR_RATE = 0.20  # Максимум 20% ошибок
     MAX_LATENCY_MS = 5000  # Максимальная задержка 5 секунд
     
-    def __init__(self, monitoring_file: str = "monitoring.json", save_interval: int = 300):
+    # Сколько последних сессий хранить в файле мониторинга
+    MAX_STORED_SESSIONS = 50
+    
+    def __init__(
+        self,
+        monitoring_file: str = "monitoring.json",
+        save_interval: int = 300,
+        auto_flush: bool = True
+    ):
         """
         Args:
             monitoring_file: Путь к файлу для сохранения метрик
             save_interval: Интервал сохранения в секундах (по умолчанию 300 = 5 минут)
+            auto_flush: Запустить фоновый поток периодического сохранения
         """
         self.logger = setup_logger()
         self.monitoring_file = monitoring_file
@@ -37,18 +266,38 @@ class APIMonitor:
         self.successful_requests = 0
         self.failed_requests = 0
         self.total_latency_ms = 0
-        self.latencies = []  # Список всех задержек для расчёта статистики
+        self.recent_latencies = deque(maxlen=10)  # Последние задержки для проверки аномалий
         self.errors_by_type = {}  # Счётчик ошибок по типам
         
+        # Разбивка по endpoint и операциям
+        self.endpoint_stats: Dict[str, _RequestStats] = {}
+        self.operation_stats: Dict[str, _RequestStats] = {}
+        
+        # Гистограмма задержек и скользящие окна по всем запросам: память не растёт с сессией
+        self.global_stats = _RequestStats()
+        self.global_windows = self.global_stats.windows
+        
+        # Запросы приходят из разных торговых потоков
+        self._lock = threading.Lock()
+        
         # Временные метки
         self.session_start = time.time()
         self.last_save_time = time.time()
         self.last_anomaly_check = time.time()
         
-        # История для обнаружения аномалий
-        self.recent_requests_timestamps = []  # Временные метки последних запросов
         self.anomalies_detected = 0
         
+        # UnifiedErrorHandler с circuit breaker'ами endpoint'ов (задаёт коннектор)
+        self.error_handler = None
+        
+        # Фоновое сохранение метрик
+        self._flushed_requests_count = 0
+        self._flushing = False
+        if auto_flush:
+            self.start_flusher()
+        
+        global_metrics_registry.register(self)
+        
         self.logger.info("API Monitor инициализирован")
     
     def record_request(
@@ -56,43 +305,44 @@ class APIMonitor:
         success: bool,
         latency_ms: float,
         error_type: str = None,
-        endpoint: str = None
+        endpoint: str = None,
+        operation: str = None
     ):
         """
         Записать метрики одного API запроса
         """
         current_time = time.time()
         
-        self.requests_count += 1
-        
-        if success:
-            self.successful_requests += 1
-        else:
-            self.failed_requests += 1
+        with self._lock:
+            self.requests_count += 1
             
-            if error_type:
-                self.errors_by_type[error_type] = self.errors_by_type.get(error_type, 0) + 1
-        
-        # Записываем задержку
-        self.total_latency_ms += latency_ms
-        self.latencies.append(latency_ms)
-        
-        # Сохраняем временную метку для обнаружения аномалий
-        self.recent_requests_timestamps.append(current_time)
-        
-        # Удаляем старые метки (старше 1 минуты)
-        one_minute_ago = current_time - 60
-        self.recent_requests_timestamps = [
-            ts for ts in self.recent_requests_timestamps 
-            if ts > one_minute_ago
-        ]
+            if success:
+                self.successful_requests += 1
+            else:
+                self.failed_requests += 1
+                
+                if error_type:
+                    self.errors_by_type[error_type] = self.errors_by_type.get(error_type, 0) + 1
+            
+            # Записываем задержку
+            self.total_latency_ms += latency_ms
+            self.recent_latencies.append(latency_ms)
+            self.global_stats.record(current_time, success, latency_ms, error_type)
+            
+            if endpoint:
+                stats = self.endpoint_stats.get(endpoint)
+                if stats is None:
+                    stats = self.endpoint_stats[endpoint] = _RequestStats()
+                stats.record(current_time, success, latency_ms, error_type)
+            
+            if operation:
+                stats = self.operation_stats.get(operation)
+                if stats is None:
+                    stats = self.operation_stats[operation] = _RequestStats()
+                stats.record(current_time, success, latency_ms, error_type)
         
         # Проверка аномальной активности
         self._check_anomalies()
-        
-        # Периодическое сохранение
-        if current_time - self.last_save_time >= self.save_interval:
-            self.save_metrics()
     
     def _check_anomalies(self):
         """Проверка на аномальную активность"""
@@ -107,7 +357,7 @@ class APIMonitor:
         anomalies = []
         
         # Слишком много запросов в минуту
-        requests_per_minute = len(self.recent_requests_timestamps)
+        requests_per_minute = self.get_requests_in_window("1m")
         if requests_per_minute > self.MAX_REQUESTS_PER_MINUTE:
             anomalies.append(
                 f"Высокая частота запросов: {requests_per_minute}/мин "
@@ -124,8 +374,9 @@ class APIMonitor:
                 )
         
         # Высокая задержка
-        if self.latencies:
-            avg_latency = sum(self.latencies[-10:]) / len(self.latencies[-10:])  # Среднее по последним 10
+        if self.recent_latencies:
+            recent = list(self.recent_latencies)
+            avg_latency = sum(recent) / len(recent)  # Среднее по последним 10
             if avg_latency > self.MAX_LATENCY_MS:
                 anomalies.append(
                     f"Высокая задержка API: {avg_latency:.0f}мс "
@@ -163,25 +414,16 @@ class APIMonitor:
             ),
         }
         
-        # Метрики задержки
-        if self.latencies:
-            sorted_latencies = sorted(self.latencies)
-            metrics["latency"] = {
-                "average_ms": self.total_latency_ms / len(self.latencies),
-                "min_ms": min(self.latencies),
-                "max_ms": max(self.latencies),
-                "median_ms": sorted_latencies[len(sorted_latencies) // 2],
-                "p95_ms": sorted_latencies[int(len(sorted_latencies) * 0.95)] if len(sorted_latencies) > 20 else sorted_latencies[-1],
-                "p99_ms": sorted_latencies[int(len(sorted_latencies) * 0.99)] if len(sorted_latencies) > 100 else sorted_latencies[-1]
-            }
-        else:
+        # Метрики задержки: перцентили оцениваются по гистограмме, без сортировки всех запросов
+        with self._lock:
+            stats = self.global_stats
             metrics["latency"] = {
-                "average_ms": 0,
-                "min_ms": 0,
-                "max_ms": 0,
-                "median_ms": 0,
-                "p95_ms": 0,
-                "p99_ms": 0
+                "average_ms": stats.latency_sum_ms / stats.total if stats.total > 0 else 0,
+                "min_ms": stats.latency_min_ms or 0,
+                "max_ms": stats.latency_max_ms,
+                "median_ms": stats.percentile(0.50),
+                "p95_ms": stats.percentile(0.95),
+                "p99_ms": stats.percentile(0.99)
             }
         
         # Метрики частоты
@@ -197,7 +439,20 @@ class APIMonitor:
         
         # Аномалии
         metrics["anomalies_detected"] = self.anomalies_detected
-        metrics["current_requests_per_minute"] = len(self.recent_requests_timestamps)
+        metrics["current_requests_per_minute"] = self.get_requests_in_window("1m")
+        
+        # Скользящие окна и разбивка по endpoint/операциям
+        now = time.time()
+        with self._lock:
+            metrics["rates"] = _window_rates(self.global_windows, now)
+            metrics["endpoints"] = {
+                endpoint: stats.snapshot(now)
+                for endpoint, stats in self.endpoint_stats.items()
+            }
+            metrics["operations"] = {
+                operation: stats.snapshot(now)
+                for operation, stats in self.operation_stats.items()
+            }
         
         # Метаданные
         metrics["timestamp"] = datetime.now().isoformat()
@@ -205,42 +460,160 @@ class APIMonitor:
         
         return metrics
     
+    def get_requests_in_window(self, window: str = "1m") -> int:
+        """Количество запросов в скользящем окне ("1m", "5m", "1h")"""
+        count, _ = self.global_windows[window].totals(time.time())
+        return count
+    
+    def get_latency_percentile(
+        self,
+        q: float,
+        endpoint: str = None,
+        operation: str = None,
+        min_samples: int = 1
+    ) -> Optional[float]:
+        """
+        Оценка перцентиля задержки (мс) для endpoint или операции.
+        Возвращает None, если запросов по ним меньше min_samples.
+        """
+        with self._lock:
+            if endpoint:
+                stats = self.endpoint_stats.get(endpoint)
+            else:
+                stats = self.operation_stats.get(operation)
+            
+            if stats is None or stats.total < max(min_samples, 1):
+                return None
+            
+            return stats.percentile(q)
+    
+    def collect_metrics(self) -> List[MetricSample]:
+        """Метрики для экспорта в OpenMetrics (задержки в секундах)"""
+        samples = [
+            MetricSample(
+                "bot_api_anomalies", "counter",
+                "Number of API anomaly detections", self.anomalies_detected, {}, "_total"
+            ),
+            MetricSample(
+                "bot_api_requests_per_minute", "gauge",
+                "API requests during the last minute", self.get_requests_in_window("1m")
+            ),
+        ]
+        
+        bucket_bounds_s = [bound / 1000 for bound in _RequestStats.LATENCY_BUCKETS_MS]
+        
+        with self._lock:
+            groups = (
+                ("bot_api", "endpoint", self.endpoint_stats),
+                ("bot_api_operation", "operation", self.operation_stats),
+            )
+            for prefix, label_name, stats_by_key in groups:
+                for key, stats in stats_by_key.items():
+                    labels = {label_name: key}
+                    samples.append(MetricSample(
+                        f"{prefix}_requests", "counter",
+                        f"API requests by {label_name}", stats.total, labels, "_total"
+                    ))
+                    samples.append(MetricSample(
+                        f"{prefix}_failed_requests", "counter",
+                        f"Failed API requests by {label_name}", stats.failed, labels, "_total"
+                    ))
+                    for error_type, count in stats.errors_by_type.items():
+                        samples.append(MetricSample(
+                            f"{prefix}_errors", "counter",
+                            f"API errors by {label_name} and error type",
+                            count, {**labels, "error_type": error_type}, "_total"
+                        ))
+                    samples.extend(histogram_samples(
+                        f"{prefix}_request_duration_seconds",
+                        f"API request latency by {label_name}",
+                        bucket_bounds_s,
+                        stats.latency_histogram,
+                        stats.latency_sum_ms / 1000,
+                        labels
+                    ))
+        
+        return samples
+    
+    def start_flusher(self):
+        """Подключить монитор к общему потоку, сохраняющему метрики раз в save_interval секунд"""
+        with _flusher_lock:
+            _flush_monitors.add(self)
+        self._flushing = True
+        _ensure_flusher()
+    
+    def stop_flusher(self, final_flush: bool = True):
+        """Отключить монитор от фонового сохранения и (по умолчанию) сохранить последний снимок"""
+        with _flusher_lock:
+            _flush_monitors.discard(self)
+        self._flushing = False
+        
+        if final_flush:
+            self.save_metrics()
+    
+    def __del__(self):
+        # Монитор брошен без stop_flusher (коннектор удалён): не терять несохранённые запросы
+        try:
+            if self._flushing and self.requests_count != self._flushed_requests_count:
+                self.save_metrics()
+        except Exception:
+            pass
+    
     def save_metrics(self):
-        """Сохранить метрики в файл"""
+        """
+        Сохранить снимок метрик текущей сессии в файл.
+        
+        Снимок пишется компактно во временный файл и атомарно
+        подменяет monitoring.json, в файле остаются только последние
+        MAX_STORED_SESSIONS сессий.
+        """
         try:
+            requests_count = self.requests_count
             metrics = self.get_metrics()
-            
-            # Создаём или обновляем файл
-            monitoring_data = {}
-            
-            if os.path.exists(self.monitoring_file):
-                try:
-                    with open(self.monitoring_file, 'r') as f:
-                        monitoring_data = json.load(f)
-                except json.JSONDecodeError:
-                    self.logger.warning("Не удалось прочитать monitoring.json, создаём новый")
-                    monitoring_data = {}
-            
-            # Добавляем текущую сессию
             session_id = datetime.fromtimestamp(self.session_start).strftime("%Y%m%d_%H%M%S")
             
-            if "sessions" not in monitoring_data:
-                monitoring_data["sessions"] = {}
-            
-            monitoring_data["sessions"][session_id] = metrics
-            monitoring_data["last_update"] = datetime.now().isoformat()
-            
-            # Сохраняем
-            with open(self.monitoring_file, 'w') as f:
-                json.dump(monitoring_data, f, indent=2)
+            with _monitoring_file_lock:
+                monitoring_data = {}
+                
+                if os.path.exists(self.monitoring_file):
+                    try:
+                        with open(self.monitoring_file, 'r') as f:
+                            monitoring_data = json.load(f)
+                    except json.JSONDecodeError:
+                        self.logger.warning("Не удалось прочитать monitoring.json, создаём новый")
+                        monitoring_data = {}
+                
+                sessions = monitoring_data.get("sessions", {})
+                sessions[session_id] = metrics
+                
+                # Идентификаторы сессий - время начала, поэтому сортировка хронологическая
+                if len(sessions) > self.MAX_STORED_SESSIONS:
+                    for old_session_id in sorted(sessions)[:-self.MAX_STORED_SESSIONS]:
+                        del sessions[old_session_id]
+                
+                monitoring_data["sessions"] = sessions
+                monitoring_data["last_update"] = datetime.now().isoformat()
+                
+                directory = os.path.dirname(os.path.abspath(self.monitoring_file))
+                tmp_file = os.path.join(
+                    directory,
+                    f".{os.path.basename(self.monitoring_file)}.{os.getpid()}.tmp"
+                )
+                
+                with open(tmp_file, 'w') as f:
+                    json.dump(monitoring_data, f, separators=(",", ":"))
+                
+                os.replace(tmp_file, self.monitoring_file)
             
             self.last_save_time = time.time()
+            self._flushed_requests_count = requests_count
             
             self.logger.info(
-                f"Метрики сохранены в {self.monitoring_file}\n"
-                f"   Запросов: {metrics['total_requests']}, "
-                f"Успешно: {metrics['successful_requests']}, "
-                f"Ошибок: {metrics['failed_requests']}"
+                "Метрики сохранены в %s\n   Запросов: %s, Успешно: %s, Ошибок: %s",
+                self.monitoring_file,
+                metrics['total_requests'],
+                metrics['successful_requests'],
+                metrics['failed_requests']
             )
             
         except Exception as e:
@@ -282,6 +655,17 @@ class APIMonitor:
             for error_type, count in sorted(metrics["errors_by_type"].items(), key=lambda x: x[1], reverse=True):
                 print(f"   • {error_type}: {count}")
         
+        # Разбивка по endpoint
+        if metrics["endpoints"]:
+            print(f"\n ПО ENDPOINT:")
+            for endpoint, stats in sorted(metrics["endpoints"].items(), key=lambda x: x[1]["total_requests"], reverse=True):
+                print(
+                    f"   • {endpoint}: {stats['total_requests']} запр., "
+                    f"ошибок {stats['failed_requests']}, "
+                    f"p50 {stats['latency']['p50_ms']:.0f} мс, "
+                    f"p95 {stats['latency']['p95_ms']:.0f} мс"
+                )
+        
         # Аномалии
         if metrics["anomalies_detected"] > 0:
             print(f"\nАНОМАЛИИ: {metrics['anomalies_detected']} обнаружено")
@@ -294,12 +678,17 @@ class APIMonitor:
         self.successful_requests = 0
         self.failed_requests = 0
         self.total_latency_ms = 0
-        self.latencies = []
+        self.recent_latencies.clear()
         self.errors_by_type = {}
-        self.recent_requests_timestamps = []
+        with self._lock:
+            self.endpoint_stats.clear()
+            self.operation_stats.clear()
+            self.global_stats = _RequestStats()
+            self.global_windows = self.global_stats.windows
         self.anomalies_detected = 0
         self.session_start = time.time()
         self.last_save_time = time.time()
+        self._flushed_requests_count = 0
         
         self.logger.info("Метрики сброшены, начата новая сессия")
     
@@ -335,10 +724,21 @@ class APIMonitor:
             if status == "healthy":
                 status = "degraded"
         
+        # Circuit breakers
+        circuit_breakers = self.error_handler.get_circuit_states() if self.error_handler else {}
+        open_circuits = [name for name, state in circuit_breakers.items() if state["state"] != "closed"]
+        if open_circuits:
+            issues.append(f"Circuit breaker открыт: {', '.join(open_circuits)}")
+            if len(open_circuits) * 2 >= len(circuit_breakers):
+                status = "critical"
+            elif status == "healthy":
+                status = "degraded"
+        
         return {
             "status": status,
             "issues": issues,
             "metrics": metrics,
+            "circuit_breakers": circuit_breakers,
             "timestamp": datetime.now().isoformat()
         }
     
@@ -348,6 +748,6 @@ class APIMonitor:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Автоматическое сохранение при выходе"""
-        self.save_metrics()
+        self.stop_flusher(final_flush=True)
         self.print_summary()
 
@@ -20,6 +20,7 @@ class SafetyValidator:
     MAX_STOP_LOSS_DISTANCE_PERCENT = 0.15  # Максимальное расстояние SL от текущей цены: 15%
     MIN_STOP_LOSS_DISTANCE_PERCENT = 0.005  # Минимальное расстояние SL от текущей цены: 0.5%
     MAX_TAKE_PROFIT_DISTANCE_PERCENT = 0.50  # Максимальное расстояние TP: 50%
+    MAX_SLIPPAGE_PERCENT = 0.01  # Максимальное проскальзывание рыночного ордера по стакану: 1%
     
     def __init__(self, exchange_connector):
         """
@@ -29,6 +30,18 @@ class SafetyValidator:
         self.exchange = exchange_connector
         self.logger = setup_logger()
     
+    def _current_price(self, symbol: str) -> float:
+        """Текущая цена из общей таблицы тикеров коннектора"""
+        prices = getattr(self.exchange, "prices", None)
+        if prices is not None:
+            price = prices.get_price(symbol)
+            if price is None:
+                raise ValueError(f"Нет текущей цены для {symbol}")
+            return price
+
+        ticker = self.exchange.fetch_ticker(symbol, "futures", "USDT-FUTURES")
+        return float(ticker["data"][0]["lastPr"])
+
     def validate_price(
         self,
         symbol: str,
@@ -45,8 +58,7 @@ class SafetyValidator:
         
         try:
             if current_price is None:
-                ticker = self.exchange.fetch_ticker(symbol)
-                current_price = float(ticker["last"])
+                current_price = self._current_price(symbol)
             
             # Цена должна быть положительной
             if price <= 0:
@@ -159,6 +171,65 @@ class SafetyValidator:
                 "deviation_percent": 0
             }
     
+    def validate_slippage(
+        self,
+        symbol: str,
+        side: str,  # "buy" или "sell"
+        quantity: float,
+        max_slippage: Optional[float] = None
+    ) -> Dict:
+        """
+        Проверка проскальзывания рыночного ордера по локальному стакану.
+        Без свежего стакана проверка пропускается с предупреждением. Нехватка
+        глубины - ошибка только для полного стакана (канал books): в books1/5/15
+        видны лишь лучшие уровни, и проверка тоже пропускается.
+        """
+        errors = []
+        warnings = []
+        max_slippage = self.MAX_SLIPPAGE_PERCENT if max_slippage is None else max_slippage
+
+        order_books = getattr(self.exchange, "order_books", None)
+        book = order_books.get(symbol) if order_books is not None else None
+        if book is None:
+            warnings.append(f"Нет свежего стакана {symbol}, проскальзывание не проверено")
+            return {"valid": True, "errors": errors, "warnings": warnings, "slippage": None, "vwap": None}
+
+        avg_price, filled = book.vwap(side, quantity)
+        slippage = book.slippage(side, quantity)
+
+        if filled < quantity:
+            if book.full_depth:
+                errors.append(
+                    f"Глубины стакана не хватает:\n"
+                    f"   Ордер: {quantity}, доступно: {filled}"
+                )
+            else:
+                warnings.append(
+                    f"Стакан {symbol} ({book.channel}) короче ордера {quantity} "
+                    f"(видно {filled}), проскальзывание не проверено"
+                )
+        elif slippage is not None and slippage > max_slippage:
+            errors.append(
+                f"Проскальзывание слишком большое:\n"
+                f"   {slippage:.3%} > {max_slippage:.3%} (VWAP: {avg_price:.6f})"
+            )
+
+        if errors:
+            self.logger.error(
+                f"Проверка проскальзывания FAILED для {symbol} {side} {quantity}:\n"
+                f"   Ошибки: {'; '.join(errors)}"
+            )
+        elif slippage is not None:
+            self.logger.debug(f" Проверка проскальзывания OK для {symbol}: {slippage:.3%}")
+
+        return {
+            "valid": len(errors) == 0,
+            "errors": errors,
+            "warnings": warnings,
+            "slippage": slippage,
+            "vwap": avg_price
+        }
+
     def validate_order_size(
         self,
         symbol: str,
@@ -1,32 +1,176 @@
+import atexit
+import gzip
 import logging
+import logging.handlers
 import os
+import queue
+import shutil
+import threading
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Одна очередь и один фоновый поток, который форматирует и пишет записи
+# всех логгеров процесса (и один файловый обработчик на файл лога)
+_log_queue = None
+_listener = None
+_listener_lock = threading.Lock()
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler без форматирования в потоке-производителе.
+
+    Стандартный prepare() форматирует сообщение до постановки в очередь;
+    здесь слушатель работает в том же процессе, поэтому запись передаётся
+    как есть и форматируется уже в фоновом потоке.
+    """
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Лог никогда не блокирует торговый поток: при переполнении запись отбрасывается
+            pass
+
+
+class ModuleLevelFilter(logging.Filter):
+    """
+    Уровни логирования по модулям.
+
+    LOG_MODULE_LEVELS="bitget_connector=INFO,monitoring=WARNING" - имя модуля
+    берётся из record.module (имя файла без .py).
+    """
+
+    def __init__(self, module_levels: dict, default_level: int):
+        super().__init__()
+        self.module_levels = module_levels
+        self.default_level = default_level
+
+    def filter(self, record):
+        return record.levelno >= self.module_levels.get(record.module, self.default_level)
+
+
+def _parse_module_levels(spec: str) -> dict:
+    levels = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        module, level = item.split("=", 1)
+        level_no = logging.getLevelName(level.strip().upper())
+        if isinstance(level_no, int):
+            levels[module.strip()] = level_no
+    return levels
+
+
+def _gzip_namer(name):
+    return name + ".gz"
+
+
+def _gzip_rotator(source, dest):
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def _create_file_handler(log_file):
+    """
+    Файловый обработчик с ротацией по размеру (LOG_ROTATION=size, по умолчанию)
+    или по времени (LOG_ROTATION=time). Ротированные файлы сжимаются gzip.
+    """
+    backup_count = int(os.getenv("LOG_BACKUP_COUNT", 5))
+
+    if os.getenv("LOG_ROTATION", "size").lower() == "time":
+        handler = logging.handlers.TimedRotatingFileHandler(
+            log_file,
+            when=os.getenv("LOG_ROTATE_WHEN", "midnight"),
+            backupCount=backup_count,
+            encoding="utf-8"
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024)),
+            backupCount=backup_count,
+            encoding="utf-8"
+        )
+
+    handler.namer = _gzip_namer
+    handler.rotator = _gzip_rotator
+    return handler
+
+
+def _start_listener(formatter):
+    """Запустить общий фоновый поток (если ещё не запущен) и вернуть очередь логов"""
+    global _log_queue, _listener
+
+    with _listener_lock:
+        if _log_queue is None:
+            _log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", 10000)))
+            atexit.register(stop_logging)
+
+        if _listener is None:
+            # Console handler
+            console_handler = logging.StreamHandler()
+            console_handler.setLevel(logging.DEBUG)
+            console_handler.setFormatter(formatter)
+            handlers = [console_handler]
+
+            # File handler
+            try:
+                file_handler = _create_file_handler(os.getenv("LOG_FILE", "trading_bot.log"))
+                file_handler.setLevel(logging.DEBUG)
+                file_handler.setFormatter(formatter)
+                handlers.append(file_handler)
+            except Exception:
+                # If file logging fails, continue with console only
+                pass
+
+            _listener = logging.handlers.QueueListener(
+                _log_queue,
+                *handlers,
+                respect_handler_level=True
+            )
+            _listener.start()
+
+        return _log_queue
+
+
+def stop_logging():
+    """Дописать оставшиеся в очереди записи и остановить фоновый поток"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
 
 def get_simple_logger(name=__name__, log_level=None):
     """Simple logger setup without circular dependencies"""
     if log_level is None:
         log_level = os.getenv("LOG_LEVEL", "INFO")
-    
+
     logger = logging.getLogger(name)
-    logger.setLevel(log_level)
-    
+
     # Prevent adding handlers multiple times
     if not logger.handlers:
-        formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(log_level)
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
-        
-        # File handler
-        try:
-            file_handler = logging.FileHandler("trading_bot.log")
-            file_handler.setLevel(logging.DEBUG)
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
-        except Exception:
-            # If file logging fails, continue with console only
-            pass
-    
-    return logger
\ No newline at end of file
+        formatter = logging.Formatter(LOG_FORMAT)
+        level = logging.getLevelName(str(log_level).upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+
+        module_levels = _parse_module_levels(os.getenv("LOG_MODULE_LEVELS", ""))
+
+        # Производители только кладут записи в общую очередь, запись на диск - в фоновом потоке
+        queue_handler = _DeferredQueueHandler(_start_listener(formatter))
+        queue_handler.addFilter(ModuleLevelFilter(module_levels, level))
+        logger.addHandler(queue_handler)
+
+        # Уровень логгера - самый подробный из настроенных, точнее отсекает фильтр
+        logger.setLevel(min([level, *module_levels.values()]))
+
+    return logger
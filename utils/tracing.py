@@ -0,0 +1,242 @@
+"""
+Лёгкая трассировка пути сигнал -> ордер
+
+Трасса открывается при обработке сигнала стратегии (WAVEXTradingService) и
+получает correlation id, который через contextvars доступен во всех вложенных
+вызовах того же потока: PositionManager, RiskManager, коннекторе и каждом
+запросе к бирже. Этот же id попадает в clientOid ордеров, поэтому ордер на
+бирже можно сопоставить с трассой.
+
+Длительности меряются по time.monotonic(), завершённые спаны хранятся в
+кольцевом буфере. При заданном TracingConfig.TRACE_EXPORT_FILE каждая
+завершённая трасса дописывается строкой JSON в файл.
+"""
+
+import contextvars
+import itertools
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, List, Optional
+from config import TracingConfig
+from utils.logging_setup import setup_logger
+
+
+class Span:
+    """Один завершённый (или выполняющийся) участок трассы"""
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name", "attributes",
+        "start", "end", "wall_time", "status", "error"
+    )
+
+    def __init__(self, trace_id: str, span_id: str, parent_id: Optional[str], name: str, attributes: Dict):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start = time.monotonic()
+        self.end = None
+        self.wall_time = time.time()
+        self.status = "ok"
+        self.error = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.monotonic()
+        return (end - self.start) * 1000
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "wall_time": self.wall_time,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+# Текущая трасса и текущий спан потока/задачи
+_current_trace_id = contextvars.ContextVar("trace_id", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def current_trace_id() -> Optional[str]:
+    """Correlation id активной трассы или None"""
+    return _current_trace_id.get()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+class Tracer:
+    """
+    Сборщик спанов.
+
+    Вне активной трассы span() ничего не записывает, поэтому вызовы
+    из фоновых циклов (мониторинг, break-even) не засоряют буфер.
+    """
+
+    def __init__(self, buffer_size: int = 2000, export_file: Optional[str] = None):
+        self.logger = setup_logger()
+        self.export_file = export_file
+
+        self._spans = deque(maxlen=buffer_size)
+        self._span_counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+
+    def _next_span_id(self) -> str:
+        return format(next(self._span_counter) & 0xFFFFFF, "06x")
+
+    @contextmanager
+    def start_trace(self, name: str, **attributes):
+        """
+        Открыть новую трассу (корневой спан).
+
+        Если трасса уже активна, создаётся обычный вложенный спан.
+        """
+        if _current_trace_id.get() is not None:
+            with self.span(name, **attributes) as span:
+                yield span
+            return
+
+        trace_id = uuid.uuid4().hex[:16]
+        trace_token = _current_trace_id.set(trace_id)
+        try:
+            with self.span(name, **attributes) as root:
+                yield root
+        finally:
+            _current_trace_id.reset(trace_token)
+
+        self._export_trace(trace_id)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Замерить участок кода внутри активной трассы"""
+        trace_id = _current_trace_id.get()
+        if trace_id is None:
+            yield None
+            return
+
+        parent = _current_span.get()
+        span = Span(
+            trace_id,
+            self._next_span_id(),
+            parent.span_id if parent else None,
+            name,
+            attributes
+        )
+        span_token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end = time.monotonic()
+            _current_span.reset(span_token)
+            with self._lock:
+                self._spans.append(span)
+
+    def traced(self, name: Optional[str] = None):
+        """Декоратор: обернуть вызов функции в спан"""
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if _current_trace_id.get() is None:
+                    return func(*args, **kwargs)
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def client_oid(self, prefix: str = "wx") -> Optional[str]:
+        """
+        clientOid для ордера, связанный с активной трассой.
+
+        Формат: <prefix><trace_id>-<span_id>, не длиннее 50 символов (лимит Bitget).
+        """
+        trace_id = _current_trace_id.get()
+        if trace_id is None:
+            return None
+
+        span = _current_span.get()
+        span_id = span.span_id if span else self._next_span_id()
+        return f"{prefix}{trace_id}-{span_id}"[:50]
+
+    def get_trace(self, trace_id: str) -> List[Span]:
+        """Спаны трассы в порядке начала"""
+        with self._lock:
+            spans = [span for span in self._spans if span.trace_id == trace_id]
+        return sorted(spans, key=lambda span: span.start)
+
+    def get_recent_traces(self, limit: int = 10) -> List[str]:
+        """Id последних завершённых трасс (по корневым спанам)"""
+        with self._lock:
+            roots = [span.trace_id for span in self._spans if span.parent_id is None]
+        return roots[-limit:]
+
+    def format_waterfall(self, trace_id: str) -> str:
+        """Текстовая диаграмма задержек по трассе"""
+        spans = self.get_trace(trace_id)
+        if not spans:
+            return f"Трасса {trace_id} не найдена"
+
+        trace_start = spans[0].start
+        depth = {}
+        lines = [f"Трасса {trace_id}:"]
+
+        for span in spans:
+            level = depth.get(span.parent_id, -1) + 1
+            depth[span.span_id] = level
+            offset_ms = (span.start - trace_start) * 1000
+            status = "" if span.status == "ok" else f" [{span.error}]"
+            lines.append(
+                f"{offset_ms:9.1f}ms {'  ' * level}{span.name}: {span.duration_ms:.1f}ms{status}"
+            )
+
+        return "\n".join(lines)
+
+    def _export_trace(self, trace_id: str) -> None:
+        if not self.export_file:
+            return
+
+        record = {
+            "trace_id": trace_id,
+            "spans": [span.to_dict() for span in self.get_trace(trace_id)],
+        }
+
+        try:
+            with self._export_lock, open(self.export_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        except Exception as e:
+            self.logger.warning("Не удалось экспортировать трассу %s: %s", trace_id, e)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+# Global instance for use across the application
+global_tracer = Tracer(
+    buffer_size=TracingConfig.TRACE_BUFFER_SIZE,
+    export_file=TracingConfig.TRACE_EXPORT_FILE
+)
@@ -1,9 +1,12 @@
+from collections import deque
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import logging
+import threading
 import time
 import traceback
 from utils.logging_setup import setup_logger
+from utils.metrics_exporter import MetricSample, global_metrics_registry
 
 class ErrorType(Enum):
     """Enumeration of error types for categorization"""
@@ -17,12 +20,166 @@ class ErrorType(Enum):
     TIMEOUT_ERROR = "timeout_error"
     UNKNOWN_ERROR = "unknown_error"
 
+class CircuitState(Enum):
+    """Circuit breaker states"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single endpoint/operation.
+
+    Tracks calls in a rolling time window. The circuit opens when the error
+    rate or the slow-call rate exceeds its threshold (given enough calls),
+    rejects calls while open, and after a cool-down lets a limited number of
+    probe calls through (half-open). A successful probe closes the circuit,
+    a failed one opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 60.0,
+        min_calls: int = 10,
+        error_rate_threshold: float = 0.5,
+        slow_call_ms: float = 5000.0,
+        slow_call_rate_threshold: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_ms = slow_call_ms
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = CircuitState.CLOSED
+        self.opened_at = None
+        self.times_opened = 0
+        self.rejected_calls = 0
+
+        self._calls = deque()  # (monotonic time, failed, slow)
+        self._failed = 0
+        self._slow = 0
+        self._half_open_in_flight = 0
+        self._lock = threading.Lock()
+        self.logger = setup_logger()
+
+    def _trim(self, now: float):
+        cutoff = now - self.window_seconds
+        while self._calls and self._calls[0][0] < cutoff:
+            _, failed, slow = self._calls.popleft()
+            self._failed -= failed
+            self._slow -= slow
+
+    def _transition(self, state: CircuitState):
+        if state == self.state:
+            return
+        self.logger.warning(f"Circuit breaker '{self.name}': {self.state.value} -> {state.value}")
+        self.state = state
+        if state == CircuitState.OPEN:
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+        elif state == CircuitState.CLOSED:
+            self.opened_at = None
+            self._calls.clear()
+            self._failed = 0
+            self._slow = 0
+
+    def allow_request(self) -> bool:
+        """Return True if the call may proceed, False to fail fast"""
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    self.rejected_calls += 1
+                    return False
+                self._transition(CircuitState.HALF_OPEN)
+                self._half_open_in_flight = 0
+
+            if self.state == CircuitState.HALF_OPEN:
+                if self._half_open_in_flight >= self.half_open_max_calls:
+                    self.rejected_calls += 1
+                    return False
+                self._half_open_in_flight += 1
+
+            return True
+
+    def release(self):
+        """Release a half-open probe slot without recording an outcome (call was not sent)"""
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def record(self, success: bool, latency_ms: float = 0.0):
+        """Record the outcome of a call that was allowed through"""
+        slow = latency_ms >= self.slow_call_ms
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                self._transition(CircuitState.CLOSED if success and not slow else CircuitState.OPEN)
+                return
+
+            now = time.monotonic()
+            self._calls.append((now, int(not success), int(slow)))
+            self._failed += int(not success)
+            self._slow += int(slow)
+            self._trim(now)
+
+            total = len(self._calls)
+            if self.state == CircuitState.CLOSED and total >= self.min_calls:
+                if (self._failed / total >= self.error_rate_threshold
+                        or self._slow / total >= self.slow_call_rate_threshold):
+                    self._transition(CircuitState.OPEN)
+
+    def get_state(self) -> Dict[str, Any]:
+        with self._lock:
+            self._trim(time.monotonic())
+            total = len(self._calls)
+            retry_in = None
+            if self.state == CircuitState.OPEN:
+                retry_in = max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+            return {
+                "name": self.name,
+                "state": self.state.value,
+                "calls_in_window": total,
+                "error_rate": self._failed / total if total else 0.0,
+                "slow_call_rate": self._slow / total if total else 0.0,
+                "times_opened": self.times_opened,
+                "rejected_calls": self.rejected_calls,
+                "retry_in_seconds": retry_in
+            }
+
+
 class UnifiedErrorHandler:
     """Centralized error handling system for the trading bot"""
     
     def __init__(self, logger_name: str = "UnifiedErrorHandler"):
         self.logger = setup_logger()
+        self.component = logger_name
         self.error_counts = {}
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+        
+        global_metrics_registry.register(self)
+
+    def get_circuit_breaker(self, name: str, **settings) -> CircuitBreaker:
+        """Get (or create) the circuit breaker for an endpoint/operation"""
+        breaker = self.circuit_breakers.get(name)
+        if breaker is None:
+            with self._breakers_lock:
+                breaker = self.circuit_breakers.get(name)
+                if breaker is None:
+                    breaker = self.circuit_breakers[name] = CircuitBreaker(name, **settings)
+        return breaker
+
+    def get_circuit_states(self) -> Dict[str, Dict[str, Any]]:
+        """Current state of every circuit breaker"""
+        return {name: breaker.get_state() for name, breaker in list(self.circuit_breakers.items())}
         
     def handle_error(
         self, 
@@ -153,6 +310,34 @@ class UnifiedErrorHandler:
     def reset_error_counts(self):
         """Reset error counters"""
         self.error_counts.clear()
+    
+    def collect_metrics(self) -> List[MetricSample]:
+        """Error counters and circuit breaker states for the OpenMetrics exporter"""
+        samples = [
+            MetricSample(
+                "bot_errors", "counter",
+                "Errors handled by UnifiedErrorHandler",
+                count, {"component": self.component, "error_type": error_type}, "_total"
+            )
+            for error_type, count in self.error_counts.items()
+        ]
+
+        for name, state in self.get_circuit_states().items():
+            labels = {"component": self.component, "circuit": name}
+            samples.extend([
+                MetricSample(
+                    "bot_circuit_open", "gauge",
+                    "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+                    {"closed": 0, "half_open": 1, "open": 2}[state["state"]], labels
+                ),
+                MetricSample(
+                    "bot_circuit_rejected_calls", "counter",
+                    "Calls rejected by an open circuit breaker",
+                    state["rejected_calls"], labels, "_total"
+                ),
+            ])
+
+        return samples
 
 # Global instance for use across the application
 global_error_handler = UnifiedErrorHandler()
\ No newline at end of file